@@ -0,0 +1,223 @@
+"""
+Distancia de cada incidente al cauce más cercano.
+
+`inferir_magnitud` es sólo un fallback: la magnitud real depende de si hay
+cauces afectados. Con los ríos, arroyos y canales en un GeoJSON local
+(LineString/MultiLineString en WGS84; los Polygon se toman por su borde),
+cada incidente recibe la distancia en metros (UTM 19S) al cauce más cercano.
+
+Los cauces se parten en segmentos y se indexan en grillas de celdas de
+TAM_CELDA_M, 4 veces más grandes, 16 veces, … (cada segmento queda en todas
+las celdas que toca su bounding box). Los incidentes cerca de un cauce se
+resuelven en la grilla fina; los que están en el desierto, lejos de todo,
+suben de nivel hasta encontrar uno. Las distancias se calculan vectorizadas,
+todos los puntos de una celda contra todos sus segmentos candidatos.
+"""
+
+import json
+import logging
+import sqlite3
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+
+from src.transformation.coordinates import transform_many_to_utm
+
+logger = logging.getLogger(__name__)
+
+GEOJSON_PATH = Path("data/cauces.geojson")
+
+TAM_CELDA_M = 1000.0
+FACTOR_NIVEL = 4
+
+# Puntos × segmentos por bloque al medir distancias
+_BLOQUE = 2_000_000
+
+
+class Segmentos(NamedTuple):
+    ax: np.ndarray           # extremos en UTM 19S (m)
+    ay: np.ndarray
+    bx: np.ndarray
+    by: np.ndarray
+    cauce: np.ndarray        # índice en `nombres`
+    nombres: list[str]
+
+
+# ── Carga ────────────────────────────────────────────────────────────────────
+
+def _lineas(geometria: dict) -> list:
+    tipo, coords = geometria['type'], geometria['coordinates']
+    if tipo == 'LineString':
+        return [coords]
+    if tipo in ('MultiLineString', 'Polygon'):
+        return list(coords)
+    if tipo == 'MultiPolygon':
+        return [anillo for parte in coords for anillo in parte]
+    raise ValueError(f"Geometría no soportada: {tipo}")
+
+
+def cargar_geojson(path: str | Path = GEOJSON_PATH) -> Segmentos:
+    with open(path, encoding='utf-8') as f:
+        coleccion = json.load(f)
+
+    nombres: list[str] = []
+    lons, lats, cauce, corte = [], [], [], []   # corte: el vértice cierra una línea
+    for feature in coleccion.get('features', []):
+        if not feature.get('geometry'):
+            continue
+        props = feature.get('properties') or {}
+        nombre = props.get('nombre') or props.get('NOMBRE') or props.get('name') or 'sin nombre'
+        nombres.append(nombre)
+        for linea in _lineas(feature['geometry']):
+            for i, (lon, lat, *_) in enumerate(linea):
+                lons.append(lon)
+                lats.append(lat)
+                cauce.append(len(nombres) - 1)
+                corte.append(i == len(linea) - 1)
+
+    este, norte = transform_many_to_utm(lats, lons)
+    este, norte = np.asarray(este, dtype=float), np.asarray(norte, dtype=float)
+    # Un segmento por par de vértices consecutivos de la misma línea
+    validos = ~np.asarray(corte, dtype=bool)[:-1] if len(corte) else np.zeros(0, bool)
+    segmentos = Segmentos(este[:-1][validos], norte[:-1][validos],
+                          este[1:][validos], norte[1:][validos],
+                          np.asarray(cauce, dtype=np.int64)[:-1][validos], nombres)
+    logger.info("%d cauce(s), %d segmento(s) cargados desde %s.",
+                len(nombres), len(segmentos.ax), path)
+    return segmentos
+
+
+# ── Distancias ───────────────────────────────────────────────────────────────
+
+def _distancias(px: np.ndarray, py: np.ndarray, seg: Segmentos,
+                ids: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Distancia mínima de cada punto a los segmentos `ids` y cuál es el más cercano."""
+    paso = max(1, _BLOQUE // max(len(ids), 1))
+    if len(px) > paso:
+        partes = [_distancias(px[i:i + paso], py[i:i + paso], seg, ids)
+                  for i in range(0, len(px), paso)]
+        return np.concatenate([p[0] for p in partes]), np.concatenate([p[1] for p in partes])
+    ax, ay = seg.ax[ids], seg.ay[ids]
+    dx, dy = seg.bx[ids] - ax, seg.by[ids] - ay
+    largo2 = dx * dx + dy * dy
+    largo2[largo2 == 0] = 1.0          # segmento degenerado: t = 0, queda el vértice
+    rx, ry = px[:, None] - ax, py[:, None] - ay
+    t = np.clip((rx * dx + ry * dy) / largo2, 0.0, 1.0)
+    d = np.hypot(rx - t * dx, ry - t * dy)
+    mejor = d.argmin(axis=1)
+    return d[np.arange(len(px)), mejor], ids[mejor]
+
+
+class IndiceSegmentos:
+    """
+    Grillas de segmentos a varias resoluciones: TAM_CELDA_M, ×4, ×16, …
+    hasta que una celda cubre todos los datos.
+    """
+
+    def __init__(self, segmentos: Segmentos, tam_celda_m: float = TAM_CELDA_M):
+        self.segmentos = segmentos
+        self.tam_celda_m = tam_celda_m
+        self.niveles: list[tuple[float, dict[tuple[int, int], np.ndarray]]] = []
+        self._bbox = (np.minimum(segmentos.ax, segmentos.bx), np.maximum(segmentos.ax, segmentos.bx),
+                      np.minimum(segmentos.ay, segmentos.by), np.maximum(segmentos.ay, segmentos.by))
+
+    def _asegurar_niveles(self, px: np.ndarray, py: np.ndarray) -> None:
+        """Agrega niveles hasta que una celda cubra segmentos y puntos juntos."""
+        x0, x1, y0, y1 = self._bbox
+        extension = max(max(x1.max(), px.max()) - min(x0.min(), px.min()),
+                        max(y1.max(), py.max()) - min(y0.min(), py.min()))
+        tam = self.niveles[-1][0] * FACTOR_NIVEL if self.niveles else self.tam_celda_m
+        while not self.niveles or self.niveles[-1][0] < extension:
+            self.niveles.append((tam, self._celdas(tam, x0, x1, y0, y1)))
+            tam *= FACTOR_NIVEL
+
+    @staticmethod
+    def _celdas(tam, x0, x1, y0, y1) -> dict[tuple[int, int], np.ndarray]:
+        """Celda → segmentos cuyo bounding box la toca."""
+        cx0, cx1 = np.floor(x0 / tam).astype(np.int64), np.floor(x1 / tam).astype(np.int64)
+        cy0, cy1 = np.floor(y0 / tam).astype(np.int64), np.floor(y1 / tam).astype(np.int64)
+        nx, ny = cx1 - cx0 + 1, cy1 - cy0 + 1
+        # Una fila por (segmento, celda): k recorre las nx·ny celdas de cada bbox
+        ids = np.repeat(np.arange(len(x0)), nx * ny)
+        k = np.arange(len(ids)) - np.repeat(np.cumsum(nx * ny) - nx * ny, nx * ny)
+        cx = cx0[ids] + k % nx[ids]
+        cy = cy0[ids] + k // nx[ids]
+        orden = np.lexsort((cy, cx))
+        cx, cy, ids = cx[orden].tolist(), cy[orden].tolist(), ids[orden]
+        cortes = np.flatnonzero(np.diff(cx) | np.diff(cy)) + 1
+        return {(cx[a], cy[a]): ids[a:b]
+                for a, b in zip(np.r_[0, cortes].tolist(), np.r_[cortes, len(ids)].tolist())}
+
+    def mas_cercano(self, este, norte) -> tuple[np.ndarray, np.ndarray]:
+        """
+        (distancia en m, índice de segmento) del segmento más cercano a cada
+        punto. Sin segmentos cargados la distancia es inf y el índice -1.
+
+        En cada nivel, los puntos de una misma celda se miden juntos contra
+        los segmentos de las 3 × 3 celdas vecinas. Todo lo que queda afuera
+        está a más de un lado de celda: si el mejor candidato está más cerca,
+        el resultado es exacto; si no, el punto pasa al nivel siguiente. En el
+        último nivel las 3 × 3 celdas cubren todo.
+        """
+        px = np.asarray(este, dtype=float)
+        py = np.asarray(norte, dtype=float)
+        dist = np.full(len(px), np.inf)
+        cercano = np.full(len(px), -1, dtype=np.int64)
+        if not len(self.segmentos.ax) or not len(px):
+            return dist, cercano
+        self._asegurar_niveles(px, py)
+
+        pendientes = np.arange(len(px))
+        for nivel, (tam, celdas) in enumerate(self.niveles):
+            ultimo = nivel == len(self.niveles) - 1
+            cx = np.floor(px[pendientes] / tam).astype(np.int64)
+            cy = np.floor(py[pendientes] / tam).astype(np.int64)
+            orden = np.lexsort((cy, cx))
+            cx, cy, pendientes = cx[orden], cy[orden], pendientes[orden]
+            cortes = np.flatnonzero(np.diff(cx) | np.diff(cy)) + 1
+            resueltos = np.zeros(len(pendientes), dtype=bool)
+            for a, b in zip(np.r_[0, cortes].tolist(), np.r_[cortes, len(pendientes)].tolist()):
+                gx, gy = int(cx[a]), int(cy[a])
+                ids = [celdas[(x, y)] for x in (gx - 1, gx, gx + 1) for y in (gy - 1, gy, gy + 1)
+                       if (x, y) in celdas]
+                if not ids:
+                    continue
+                idx = pendientes[a:b]
+                d, s = _distancias(px[idx], py[idx], self.segmentos,
+                                   np.unique(np.concatenate(ids)))
+                ok = (d <= tam) | ultimo
+                dist[idx[ok]], cercano[idx[ok]] = d[ok], s[ok]
+                resueltos[a:b] = ok
+            pendientes = pendientes[~resueltos]
+            if not len(pendientes):
+                break
+        return dist, cercano
+
+
+# ── Etapa de riesgo ──────────────────────────────────────────────────────────
+
+def puntuar_incidentes(conn: sqlite3.Connection, segmentos: Segmentos,
+                       todos: bool = True) -> int:
+    """
+    Calcula DIST_CAUCE_M y CAUCE_CERCANO. Con `todos=False`, sólo para los
+    incidentes que todavía no tienen distancia (nuevos o con coordenadas
+    corregidas). Retorna la cantidad de incidentes actualizados.
+    """
+    filas = conn.execute(
+        "SELECT NUM_INC, LAT, LON FROM incidentes "
+        "WHERE LAT IS NOT NULL AND LON IS NOT NULL" +
+        ("" if todos else " AND DIST_CAUCE_M IS NULL")
+    ).fetchall()
+    if not filas:
+        return 0
+    este, norte = transform_many_to_utm([f[1] for f in filas], [f[2] for f in filas])
+    dist, cercano = IndiceSegmentos(segmentos).mas_cercano(este, norte)
+    conn.executemany(
+        "UPDATE incidentes SET DIST_CAUCE_M = ?, CAUCE_CERCANO = ? WHERE NUM_INC = ?",
+        [(round(float(d), 1) if s >= 0 else None,
+          segmentos.nombres[segmentos.cauce[s]] if s >= 0 else None,
+          num_inc)
+         for (num_inc, _, _), d, s in zip(filas, dist, cercano)]
+    )
+    return len(filas)
@@ -0,0 +1,182 @@
+"""
+Asignación de concesión y yacimiento por punto en polígono.
+
+`AREA_CONCESION` sale del texto libre del formulario ("Área concesionada:",
+"Concesión:", "CONCESION:") y cada operadora lo escribe a su manera. Con los
+límites oficiales en un GeoJSON local (coordenadas WGS84 lon/lat), cada
+incidente se ubica en el polígono que lo contiene y se compara con lo
+reportado.
+
+El GeoJSON es una FeatureCollection de Polygon/MultiPolygon con propiedades:
+  nombre   nombre de la concesión o del yacimiento (también NOMBRE / name)
+  tipo     'concesion' (default) o 'yacimiento'
+
+Los polígonos se "preparan" una sola vez: todas las aristas de todos sus
+anillos en arrays de numpy, más su bounding box. La asignación es por lote:
+para cada polígono se filtran con una máscara los puntos dentro de su bbox y
+sólo a esos se les aplica el test de cruce de rayos (par-impar, así los
+huecos y las partes de un MultiPolygon salen solos), vectorizado sobre
+puntos × aristas. Miles de puntos contra cientos de polígonos toman
+decenas de milisegundos.
+"""
+
+import json
+import logging
+import re
+import sqlite3
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+
+from src.extractors.registry import normalizar_texto
+
+logger = logging.getLogger(__name__)
+
+GEOJSON_PATH = Path("data/concesiones.geojson")
+
+# Puntos × aristas por bloque del test de cruce (~16 MB por array float64)
+_BLOQUE = 2_000_000
+
+_NO_ALFANUM = re.compile(r'[^A-Z0-9]+')
+
+
+class Poligono(NamedTuple):
+    nombre: str
+    tipo: str                # 'concesion' | 'yacimiento'
+    bbox: tuple[float, float, float, float]   # lon_min, lat_min, lon_max, lat_max
+    area: float              # grados², sólo para desempatar solapamientos
+    x1: np.ndarray           # aristas de todos los anillos
+    y1: np.ndarray
+    x2: np.ndarray
+    y2: np.ndarray
+
+
+class Asignacion(NamedTuple):
+    num_inc: str
+    reportada: str | None    # AREA_CONCESION del formulario
+    concesion: str | None    # polígono que contiene al punto
+    yacimiento: str | None
+    estado: str              # 'coincide' | 'discrepancia' | 'fuera' | 'sin_area'
+
+
+# ── Carga ────────────────────────────────────────────────────────────────────
+
+def _area_anillo(anillo: np.ndarray) -> float:
+    x, y = anillo[:, 0], anillo[:, 1]
+    return abs(float(np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1)))) / 2
+
+
+def preparar_poligono(nombre: str, tipo: str, geometria: dict) -> Poligono:
+    if geometria['type'] == 'Polygon':
+        partes = [geometria['coordinates']]
+    elif geometria['type'] == 'MultiPolygon':
+        partes = geometria['coordinates']
+    else:
+        raise ValueError(f"Geometría no soportada: {geometria['type']}")
+
+    anillos = [np.asarray(anillo, dtype=float)[:, :2] for parte in partes for anillo in parte]
+    # El primer anillo de cada parte es el exterior; los demás son huecos
+    area = sum(_area_anillo(np.asarray(p[0], dtype=float)[:, :2]) for p in partes) \
+        - sum(_area_anillo(np.asarray(h, dtype=float)[:, :2]) for p in partes for h in p[1:])
+    x1 = np.concatenate([a[:, 0] for a in anillos])
+    y1 = np.concatenate([a[:, 1] for a in anillos])
+    x2 = np.concatenate([np.roll(a[:, 0], -1) for a in anillos])
+    y2 = np.concatenate([np.roll(a[:, 1], -1) for a in anillos])
+    return Poligono(nombre, tipo, (x1.min(), y1.min(), x1.max(), y1.max()),
+                    area, x1, y1, x2, y2)
+
+
+def cargar_geojson(path: str | Path = GEOJSON_PATH) -> list[Poligono]:
+    with open(path, encoding='utf-8') as f:
+        coleccion = json.load(f)
+    poligonos = []
+    for feature in coleccion.get('features', []):
+        props = feature.get('properties') or {}
+        nombre = props.get('nombre') or props.get('NOMBRE') or props.get('name')
+        if not nombre or not feature.get('geometry'):
+            logger.warning("Feature sin nombre o sin geometría en %s, se ignora.", path)
+            continue
+        tipo = (props.get('tipo') or props.get('TIPO') or 'concesion').lower()
+        poligonos.append(preparar_poligono(nombre, tipo, feature['geometry']))
+    logger.info("%d polígono(s) cargados desde %s.", len(poligonos), path)
+    return poligonos
+
+
+# ── Punto en polígono ────────────────────────────────────────────────────────
+
+def contiene(pol: Poligono, lon: np.ndarray, lat: np.ndarray) -> np.ndarray:
+    """Máscara de los puntos dentro de `pol` (cruce de rayos par-impar)."""
+    dentro = np.zeros(len(lon), dtype=bool)
+    paso = max(1, _BLOQUE // max(len(pol.x1), 1))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for i in range(0, len(lon), paso):
+            px, py = lon[i:i + paso, None], lat[i:i + paso, None]
+            cruza = (pol.y1 > py) != (pol.y2 > py)
+            x_corte = pol.x1 + (py - pol.y1) * (pol.x2 - pol.x1) / (pol.y2 - pol.y1)
+            dentro[i:i + paso] = np.count_nonzero(cruza & (px < x_corte), axis=1) % 2 == 1
+    return dentro
+
+
+def asignar_poligonos(poligonos: list[Poligono], lats, lons,
+                      tipo: str = 'concesion') -> list[str | None]:
+    """
+    Nombre del polígono de `tipo` que contiene cada punto, o None. Si varios
+    se solapan gana el de menor área (el más específico).
+    """
+    lat = np.asarray(lats, dtype=float)
+    lon = np.asarray(lons, dtype=float)
+    asignado: list[str | None] = [None] * len(lat)
+    mejor_area = np.full(len(lat), np.inf)
+    for pol in poligonos:
+        if pol.tipo != tipo:
+            continue
+        lon_min, lat_min, lon_max, lat_max = pol.bbox
+        en_bbox = np.flatnonzero((lon >= lon_min) & (lon <= lon_max) &
+                                 (lat >= lat_min) & (lat <= lat_max) &
+                                 (pol.area < mejor_area))
+        if not len(en_bbox):
+            continue
+        for i in en_bbox[contiene(pol, lon[en_bbox], lat[en_bbox])]:
+            asignado[i] = pol.nombre
+            mejor_area[i] = pol.area
+    return asignado
+
+
+# ── Comparación con lo reportado ─────────────────────────────────────────────
+
+def _clave(nombre: str) -> str:
+    return _NO_ALFANUM.sub(' ', normalizar_texto(nombre)).strip()
+
+
+def mismo_nombre(reportado: str, oficial: str) -> bool:
+    """Igualdad sin acentos, mayúsculas ni puntuación; acepta que uno contenga al otro."""
+    a, b = _clave(reportado), _clave(oficial)
+    return bool(a and b) and (a == b or f" {a} " in f" {b} " or f" {b} " in f" {a} ")
+
+
+def asignar_incidentes(conn: sqlite3.Connection,
+                       poligonos: list[Poligono]) -> list[Asignacion]:
+    filas = conn.execute(
+        "SELECT NUM_INC, AREA_CONCESION, LAT, LON FROM incidentes "
+        "WHERE LAT IS NOT NULL AND LON IS NOT NULL ORDER BY NUM_INC"
+    ).fetchall()
+    if not filas:
+        return []
+    lats = [f[2] for f in filas]
+    lons = [f[3] for f in filas]
+    concesiones = asignar_poligonos(poligonos, lats, lons, 'concesion')
+    yacimientos = asignar_poligonos(poligonos, lats, lons, 'yacimiento')
+
+    resultado = []
+    for (num_inc, reportada, _, _), concesion, yacimiento in zip(filas, concesiones, yacimientos):
+        if concesion is None:
+            estado = 'fuera'
+        elif not reportada:
+            estado = 'sin_area'
+        elif mismo_nombre(reportada, concesion):
+            estado = 'coincide'
+        else:
+            estado = 'discrepancia'
+        resultado.append(Asignacion(num_inc, reportada, concesion, yacimiento, estado))
+    return resultado
@@ -0,0 +1,169 @@
+"""
+DBSCAN incremental sobre coordenadas UTM.
+
+Un incidente es núcleo si tiene al menos `min_pts` incidentes (él incluido) a
+≤ `eps` metros. Los núcleos a ≤ eps entre sí forman un cluster; los demás
+puntos a ≤ eps de un núcleo son borde de ese cluster; el resto es ruido.
+
+Los vecinos se buscan en una grilla de celdas de `eps`: alcanza con las 3 × 3
+celdas alrededor del punto, así que cada consulta cuesta lo que haya cerca y
+no crece con el historial.
+
+Agregar puntos sólo puede sumar vecinos: un núcleo nunca deja de serlo y un
+cluster nunca se parte. Por eso los incidentes nuevos se insertan sin
+recalcular lo anterior (Ester et al., "Incremental Clustering for Mining in
+a Data Warehousing Environment", 1998):
+
+  1. se actualiza la cantidad de vecinos de los nuevos y de sus vecinos;
+  2. los que pasan a ser núcleo se unen con los núcleos vecinos
+     (union-find sobre puntos nuevos y clusters existentes);
+  3. si un núcleo nuevo toca varios clusters existentes, se fusionan en el
+     de menor id; si no toca ninguno, nace un cluster;
+  4. los puntos sin cluster a ≤ eps de un núcleo pasan a ser borde.
+
+Borrar o mover un punto sí puede partir un cluster: eso requiere rehacer
+todo desde cero (insertar todos los puntos en un estado vacío).
+"""
+
+import math
+from collections import defaultdict
+
+EPS_M = 500.0
+MIN_PTS = 3
+
+
+class EstadoDBSCAN:
+    """Puntos ya agrupados, con su grilla, cantidad de vecinos y cluster."""
+
+    def __init__(self, eps: float = EPS_M, min_pts: int = MIN_PTS):
+        self.eps = eps
+        self.min_pts = min_pts
+        self.claves: list[str] = []
+        self.x: list[float] = []
+        self.y: list[float] = []
+        self.vecinos: list[int] = []          # cantidad a ≤ eps, incluido el punto
+        self.nucleo: list[bool] = []
+        self.cluster: list[int | None] = []
+        self.cambiados: set[int] = set()     # tocados por el último insertar()
+        self._grilla: dict[tuple[int, int], list[int]] = defaultdict(list)
+
+    def _celda(self, x: float, y: float) -> tuple[int, int]:
+        return math.floor(x / self.eps), math.floor(y / self.eps)
+
+    def _agregar(self, clave: str, x: float, y: float, vecinos: int,
+                 nucleo: bool, cluster: int | None) -> int:
+        i = len(self.claves)
+        self.claves.append(clave)
+        self.x.append(x)
+        self.y.append(y)
+        self.vecinos.append(vecinos)
+        self.nucleo.append(nucleo)
+        self.cluster.append(cluster)
+        self._grilla[self._celda(x, y)].append(i)
+        return i
+
+    def cargar(self, clave: str, x: float, y: float, vecinos: int,
+               nucleo: bool, cluster: int | None) -> None:
+        """Agrega un punto ya agrupado en una corrida anterior, tal cual."""
+        self._agregar(clave, x, y, vecinos, nucleo, cluster)
+
+    def vecinos_de(self, i: int) -> list[int]:
+        """Índices a ≤ eps del punto i, incluido él mismo."""
+        x, y = self.x[i], self.y[i]
+        cx, cy = self._celda(x, y)
+        eps2 = self.eps * self.eps
+        return [j
+                for dx in (-1, 0, 1) for dy in (-1, 0, 1)
+                for j in self._grilla.get((cx + dx, cy + dy), ())
+                if (self.x[j] - x) ** 2 + (self.y[j] - y) ** 2 <= eps2]
+
+    def insertar(self, puntos: list[tuple[str, float, float]]) -> dict[int, int]:
+        """
+        Inserta (clave, x, y) y actualiza los clusters. Retorna las fusiones
+        {id viejo: id nuevo}; los índices de los puntos cuyo estado cambió
+        (nuevos, vecinos de nuevos, reetiquetados) quedan en `self.cambiados`.
+        """
+        nuevos = [self._agregar(clave, x, y, 0, False, None) for clave, x, y in puntos]
+        es_nuevo = set(nuevos)
+        afectados = set(nuevos)
+        for i in nuevos:
+            cerca = self.vecinos_de(i)
+            self.vecinos[i] = len(cerca)
+            for j in cerca:
+                if j not in es_nuevo:
+                    self.vecinos[j] += 1
+                    afectados.add(j)
+
+        nucleos_nuevos = [i for i in sorted(afectados)
+                          if not self.nucleo[i] and self.vecinos[i] >= self.min_pts]
+        for i in nucleos_nuevos:
+            self.nucleo[i] = True
+        son_nuevos = set(nucleos_nuevos)
+
+        # Union-find: ('p', i) un núcleo nuevo, ('c', id) un cluster existente
+        padre: dict[tuple, tuple] = {}
+
+        def raiz(n: tuple) -> tuple:
+            padre.setdefault(n, n)
+            while padre[n] != n:
+                padre[n] = padre[padre[n]]
+                n = padre[n]
+            return n
+
+        def nodo(i: int) -> tuple:
+            return ('p', i) if i in son_nuevos else ('c', self.cluster[i])
+
+        for i in nucleos_nuevos:
+            raiz(('p', i))
+            for j in self.vecinos_de(i):
+                if self.nucleo[j] and j != i:
+                    padre[raiz(nodo(i))] = raiz(nodo(j))
+
+        componentes: dict[tuple, list[tuple]] = defaultdict(list)
+        for n in list(padre):
+            componentes[raiz(n)].append(n)
+        siguiente = max((c for c in self.cluster if c is not None), default=0) + 1
+        fusiones: dict[int, int] = {}
+        self.cambiados = set()
+        for miembros in componentes.values():
+            existentes = sorted(n[1] for n in miembros if n[0] == 'c')
+            if existentes:
+                destino = existentes[0]
+            else:
+                destino, siguiente = siguiente, siguiente + 1
+            for viejo in existentes[1:]:
+                fusiones[viejo] = destino
+            for tipo, i in miembros:
+                if tipo == 'p' and self.cluster[i] != destino:
+                    self.cluster[i] = destino
+                    self.cambiados.add(i)
+
+        if fusiones:
+            for i, c in enumerate(self.cluster):
+                if c in fusiones:
+                    self.cluster[i] = fusiones[c]
+                    self.cambiados.add(i)
+
+        # Bordes: sin cluster y a ≤ eps de algún núcleo
+        candidatos = set(afectados)
+        for i in nucleos_nuevos:
+            candidatos.update(self.vecinos_de(i))
+        for i in sorted(candidatos):
+            if self.nucleo[i] or self.cluster[i] is not None:
+                continue
+            for j in self.vecinos_de(i):
+                if self.nucleo[j]:
+                    self.cluster[i] = self.cluster[j]
+                    self.cambiados.add(i)
+                    break
+        # Los afectados cambiaron al menos su cantidad de vecinos
+        self.cambiados.update(afectados)
+        return fusiones
+
+
+def dbscan(puntos: list[tuple[str, float, float]], eps: float = EPS_M,
+           min_pts: int = MIN_PTS) -> dict[str, int | None]:
+    """DBSCAN desde cero: clave → id de cluster (None = ruido)."""
+    estado = EstadoDBSCAN(eps, min_pts)
+    estado.insertar(puntos)
+    return dict(zip(estado.claves, estado.cluster))
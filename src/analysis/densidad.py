@@ -0,0 +1,138 @@
+"""
+Superficie de densidad de derrames (mapa de calor) para QGIS.
+
+Los incidentes se proyectan a UTM 19S y se acumulan en una grilla de celdas
+de `celda_m` metros sobre el bounding box de Mendoza de base_extractor
+(LAT_MIN..LAT_MAX, LON_MIN..LON_MAX), pesados por VOL_M3 o por cantidad.
+Después la grilla se suaviza con un kernel gaussiano de desvío
+`ancho_banda_m`: es una estimación de densidad por kernel sobre datos
+agrupados, que con celdas chicas frente al ancho de banda da lo mismo que la
+KDE punto a punto.
+
+El gaussiano es separable: se aplica por filas y por columnas como suma de
+copias desplazadas de la grilla, todo en numpy. El costo depende de la
+cantidad de celdas y del ancho del kernel, no de la cantidad de incidentes.
+
+La salida es un ESRI ASCII Grid (.asc) con su .prj, que QGIS abre sin GDAL
+extra. Los valores quedan en unidades de peso por km² (m³/km² o
+incidentes/km²).
+"""
+
+import sqlite3
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+
+from src.extractors.base_extractor import LAT_MAX, LAT_MIN, LON_MAX, LON_MIN
+from src.transformation.coordinates import transform_many_to_utm
+
+CELDA_M = 1000.0
+ANCHO_BANDA_M = 2000.0
+NODATA = -9999
+
+# WGS 84 / UTM zona 19S (EPSG:32719) en el WKT que espera un .prj de ESRI
+PRJ_UTM_19S = (
+    'PROJCS["WGS_1984_UTM_Zone_19S",GEOGCS["GCS_WGS_1984",DATUM["D_WGS_1984",'
+    'SPHEROID["WGS_1984",6378137.0,298.257223563]],PRIMEM["Greenwich",0.0],'
+    'UNIT["Degree",0.0174532925199433]],PROJECTION["Transverse_Mercator"],'
+    'PARAMETER["False_Easting",500000.0],PARAMETER["False_Northing",10000000.0],'
+    'PARAMETER["Central_Meridian",-69.0],PARAMETER["Scale_Factor",0.9996],'
+    'PARAMETER["Latitude_Of_Origin",0.0],UNIT["Meter",1.0]]'
+)
+
+
+class Grilla(NamedTuple):
+    valores: np.ndarray      # filas de norte a sur, como en el .asc
+    x_min: float             # esquina inferior izquierda (UTM 19S, m)
+    y_min: float
+    celda_m: float
+
+
+def cargar_puntos(conn: sqlite3.Connection, peso: str = 'volumen'):
+    """
+    (este, norte, pesos) de los incidentes con coordenadas. Con
+    peso='volumen' se omiten los que no informan VOL_M3; con 'cantidad'
+    cada incidente pesa 1.
+    """
+    filtro = " AND VOL_M3 IS NOT NULL" if peso == 'volumen' else ""
+    filas = conn.execute(
+        "SELECT LAT, LON, VOL_M3 FROM incidentes "
+        "WHERE LAT IS NOT NULL AND LON IS NOT NULL" + filtro).fetchall()
+    if not filas:
+        return np.zeros(0), np.zeros(0), np.zeros(0)
+    este, norte = transform_many_to_utm([f[0] for f in filas], [f[1] for f in filas])
+    pesos = [f[2] for f in filas] if peso == 'volumen' else [1.0] * len(filas)
+    return np.asarray(este), np.asarray(norte), np.asarray(pesos, dtype=float)
+
+
+def extension_mendoza(celda_m: float = CELDA_M) -> tuple[float, float, float, float]:
+    """
+    Bounding box en UTM 19S del rectángulo LAT/LON de Mendoza, ajustado a
+    múltiplos de la celda. Se proyectan puntos a lo largo de los bordes:
+    en UTM el rectángulo geográfico ya no tiene lados rectos.
+    """
+    t = np.linspace(0.0, 1.0, 50)
+    lats = np.concatenate([LAT_MIN + t * (LAT_MAX - LAT_MIN)] * 2 +
+                          [np.full_like(t, LAT_MIN), np.full_like(t, LAT_MAX)])
+    lons = np.concatenate([np.full_like(t, LON_MIN), np.full_like(t, LON_MAX)] +
+                          [LON_MIN + t * (LON_MAX - LON_MIN)] * 2)
+    este, norte = transform_many_to_utm(lats, lons)
+    return (np.floor(min(este) / celda_m) * celda_m, np.floor(min(norte) / celda_m) * celda_m,
+            np.ceil(max(este) / celda_m) * celda_m, np.ceil(max(norte) / celda_m) * celda_m)
+
+
+def _kernel(ancho_banda_m: float, celda_m: float) -> np.ndarray:
+    sigma = ancho_banda_m / celda_m
+    radio = max(1, int(np.ceil(3 * sigma)))
+    k = np.exp(-0.5 * (np.arange(-radio, radio + 1) / sigma) ** 2)
+    return k / k.sum()
+
+
+def _convolucion(a: np.ndarray, kernel: np.ndarray, eje: int) -> np.ndarray:
+    """Convolución 1D por `eje` como suma de copias desplazadas (bordes en cero)."""
+    radio = len(kernel) // 2
+    pad = [(0, 0), (0, 0)]
+    pad[eje] = (radio, radio)
+    a = np.pad(a, pad)
+    n = a.shape[eje] - 2 * radio
+    salida = np.zeros_like(a, shape=tuple(n if i == eje else s for i, s in enumerate(a.shape)))
+    for k, w in enumerate(kernel):
+        salida += w * (a[k:k + n] if eje == 0 else a[:, k:k + n])
+    return salida
+
+
+def densidad(este, norte, pesos=None, celda_m: float = CELDA_M,
+             ancho_banda_m: float = ANCHO_BANDA_M,
+             extension: tuple[float, float, float, float] | None = None) -> Grilla:
+    """
+    Grilla de densidad (peso por km²). Con `ancho_banda_m=0` no se suaviza:
+    queda el conteo por celda. Los puntos fuera de la extensión se ignoran.
+    """
+    x_min, y_min, x_max, y_max = extension or extension_mendoza(celda_m)
+    nx = int(round((x_max - x_min) / celda_m))
+    ny = int(round((y_max - y_min) / celda_m))
+    suma, _, _ = np.histogram2d(
+        np.asarray(norte, dtype=float), np.asarray(este, dtype=float),
+        bins=(ny, nx), range=((y_min, y_min + ny * celda_m), (x_min, x_min + nx * celda_m)),
+        weights=None if pesos is None else np.asarray(pesos, dtype=float),
+    )
+    if ancho_banda_m > 0:
+        kernel = _kernel(ancho_banda_m, celda_m)
+        suma = _convolucion(_convolucion(suma, kernel, 0), kernel, 1)
+    por_km2 = suma / (celda_m * celda_m / 1e6)
+    # histogram2d ordena las filas de sur a norte; el .asc empieza por el norte
+    return Grilla(por_km2[::-1], x_min, y_min, celda_m)
+
+
+def escribir_asc(path: str | Path, grilla: Grilla, decimales: int = 4) -> None:
+    """ESRI ASCII Grid + .prj (UTM 19S) al lado."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    filas, columnas = grilla.valores.shape
+    with open(path, 'w', encoding='ascii', newline='\n') as f:
+        f.write(f"ncols {columnas}\nnrows {filas}\n"
+                f"xllcorner {grilla.x_min:.1f}\nyllcorner {grilla.y_min:.1f}\n"
+                f"cellsize {grilla.celda_m:g}\nNODATA_value {NODATA}\n")
+        np.savetxt(f, np.round(grilla.valores, decimales), fmt='%.10g')
+    path.with_suffix('.prj').write_text(PRJ_UTM_19S, encoding='ascii')
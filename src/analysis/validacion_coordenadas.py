@@ -0,0 +1,133 @@
+"""
+Validación cruzada de las coordenadas que informa cada operadora.
+
+YPF informa el mismo punto tres veces: grados y minutos decimales (GM),
+grados, minutos y segundos (GMS) y grados decimales (DD). Pluspetrol informa
+DD y Gauss-Krüger Faja 2 (X norte, Y este). La base guarda el DD en LAT/LON
+y las demás representaciones crudas, tal como vienen en el PDF, en
+COORDS_REPORTADAS (JSON). Un error de tipeo en cualquiera de ellas se nota
+como un desacuerdo de cientos de metros o kilómetros.
+
+Todo se resuelve en una pasada sobre la tabla: una sola consulta, el texto
+DMS se parsea con la misma gramática (memorizada) que usan los extractores
+y cada sistema se proyecta en bloque con un Transformer cacheado (UTM 19S
+para GM/GMS, GK POSGAR para Pluspetrol).
+"""
+
+import json
+import logging
+import re
+import sqlite3
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from src.extractors import parseo
+from src.transformation.coordinates import (transform_many_to_gauss_kruger,
+                                            transform_many_to_utm)
+
+logger = logging.getLogger(__name__)
+
+# Por debajo de esto es redondeo (GM con 3 decimales ≈ 2 m, GMS con 1 ≈ 3 m)
+UMBRAL_M = 30.0
+
+# YPF separa grados, minutos y segundos con '/' ("37 ° / 20.936 '"); sin las
+# barras queda una de las formas que reconoce parseo
+_BARRA = re.compile(r'\s*/\s*')
+_NUMERO = re.compile(r'\d+(?:[.,]\d+)?')
+
+
+class Discrepancia(NamedTuple):
+    num_inc: str
+    sistema: str                  # 'GM', 'GMS' o 'GK'
+    reportada: str                # valores tal como vienen en el PDF
+    distancia_m: float | None     # None = no se pudo interpretar
+
+
+def parsear_dms(valores) -> np.ndarray:
+    """
+    Grados (positivos) de una serie de textos DMS, con parseo.parsear_dms_lote;
+    NaN donde no los reconoce o los minutos/segundos no son < 60 (parseo no
+    lo controla: un 75' es un error de tipeo que acá hay que informar).
+    """
+    textos = [_BARRA.sub(' ', v) if isinstance(v, str) else None for v in valores]
+    grados = -np.array(parseo.parsear_dms_lote(textos), dtype=float)
+    fuera_de_rango = [t is not None and any(float(n.replace(',', '.')) >= 60
+                                            for n in _NUMERO.findall(t)[1:])
+                      for t in textos]
+    return np.where(fuera_de_rango, np.nan, grados)
+
+
+def _texto(valores) -> str:
+    return " / ".join(str(v) for v in valores)
+
+
+def validar(conn: sqlite3.Connection, umbral_m: float = UMBRAL_M) -> list[Discrepancia]:
+    """
+    Compara cada representación guardada en COORDS_REPORTADAS con LAT/LON.
+    Retorna las que difieren en más de `umbral_m` metros o no se pueden
+    interpretar, de la peor a la mejor.
+    """
+    filas = conn.execute(
+        "SELECT NUM_INC, LAT, LON, COORDS_REPORTADAS FROM incidentes "
+        "WHERE COORDS_REPORTADAS IS NOT NULL AND LAT IS NOT NULL AND LON IS NOT NULL"
+    ).fetchall()
+    if not filas:
+        return []
+
+    # Una fila por (incidente, sistema)
+    por_sistema: dict[str, list[tuple[int, list]]] = {}
+    for i, (num_inc, _, _, crudo) in enumerate(filas):
+        try:
+            reportadas = json.loads(crudo)
+        except ValueError:
+            logger.warning("%s: COORDS_REPORTADAS ilegible: %r", num_inc, crudo)
+            continue
+        for sistema, valores in reportadas.items():
+            por_sistema.setdefault(sistema, []).append((i, valores))
+
+    lats = np.array([f[1] for f in filas], dtype=float)
+    lons = np.array([f[2] for f in filas], dtype=float)
+    discrepancias = []
+
+    def _comparar(sistema, items, distancias):
+        for (i, valores), d in zip(items, distancias):
+            if np.isnan(d):
+                discrepancias.append(Discrepancia(filas[i][0], sistema, _texto(valores), None))
+            elif d > umbral_m:
+                discrepancias.append(Discrepancia(filas[i][0], sistema, _texto(valores), float(d)))
+
+    # GM y GMS: a grados (S y W son negativos) y a UTM, contra el DD en UTM
+    en_grados = [(s, por_sistema[s]) for s in ('GM', 'GMS') if s in por_sistema]
+    if en_grados:
+        idx = np.array([i for _, items in en_grados for i, _ in items])
+        lat_rep = -parsear_dms([v[0] for _, items in en_grados for _, v in items])
+        lon_rep = -parsear_dms([v[1] for _, items in en_grados for _, v in items])
+        ok = ~(np.isnan(lat_rep) | np.isnan(lon_rep))
+        distancias = np.full(len(idx), np.nan)
+        if ok.any():
+            este_rep, norte_rep = transform_many_to_utm(lat_rep[ok], lon_rep[ok])
+            este_dd, norte_dd = transform_many_to_utm(lats[idx[ok]], lons[idx[ok]])
+            distancias[ok] = np.hypot(np.subtract(este_rep, este_dd),
+                                      np.subtract(norte_rep, norte_dd))
+        inicio = 0
+        for sistema, items in en_grados:
+            _comparar(sistema, items, distancias[inicio:inicio + len(items)])
+            inicio += len(items)
+
+    # GK: el DD se proyecta a GK Faja 2 y se compara con X (norte) / Y (este)
+    if 'GK' in por_sistema:
+        items = por_sistema['GK']
+        idx = np.array([i for i, _ in items])
+        este, norte = transform_many_to_gauss_kruger(lats[idx], lons[idx])
+        if este and este[0] is None:
+            logger.warning("Sin pyproj no se validan las coordenadas Gauss-Krüger.")
+        else:
+            gk = pd.DataFrame([v for _, v in items]).apply(pd.to_numeric, errors='coerce')
+            distancias = np.hypot(gk[1].to_numpy(dtype=float) - np.asarray(este),
+                                  gk[0].to_numpy(dtype=float) - np.asarray(norte))
+            _comparar('GK', items, distancias)
+
+    discrepancias.sort(key=lambda d: (d.distancia_m is not None, -(d.distancia_m or 0), d.num_inc))
+    return discrepancias
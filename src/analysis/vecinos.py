@@ -0,0 +1,157 @@
+"""
+Vecinos espacio-temporales: duplicados y fallas repetidas.
+
+Varias operadoras reportan pérdidas repetidas en la misma línea con días de
+diferencia. Para responder "incidentes a menos de R metros y D días de este"
+sin comparar todos contra todos, los incidentes se indexan en una grilla:
+
+  celda = (⌊este / R⌋, ⌊norte / R⌋, ⌊día / D⌋)
+
+con coordenadas UTM 19S en metros. Dos incidentes a ≤ R m y ≤ D días caen
+en celdas contiguas, así que basta revisar las 27 celdas vecinas (3 × 3 × 3).
+Construir el índice es O(n) y cada consulta cuesta lo que haya en esas celdas:
+casi lineal para la tabla completa.
+
+Los pares encontrados se clasifican:
+  duplicado    a ≤ DIST_DUPLICADO_M y ≤ DIAS_DUPLICADO: probablemente el
+               mismo incidente cargado dos veces
+  repeticion   el resto: otra falla en el mismo lugar
+
+Los incidentes unidos por repeticiones forman focos; un foco con al menos
+MIN_FOCO incidentes es un punto de fallas recurrentes.
+"""
+
+import math
+import sqlite3
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Iterable, NamedTuple
+
+from src.transformation.coordinates import transform_many_to_utm
+
+RADIO_M = 200.0
+DIAS = 30
+DIST_DUPLICADO_M = 50.0
+DIAS_DUPLICADO = 1
+MIN_FOCO = 3
+
+_FORMATOS_FECHA = ('%d-%m-%Y', '%Y-%m-%d', '%d/%m/%Y')
+
+
+class Punto(NamedTuple):
+    num_inc: str
+    este: float
+    norte: float
+    dia: int                 # date.toordinal()
+    operador: str | None
+    instalacion: str | None
+
+
+class ParVecino(NamedTuple):
+    a: Punto
+    b: Punto
+    distancia_m: float
+    dias: int
+    tipo: str                # 'duplicado' | 'repeticion'
+
+
+def parsear_fecha(valor: str | None) -> date | None:
+    if not valor:
+        return None
+    for formato in _FORMATOS_FECHA:
+        try:
+            return datetime.strptime(valor.strip(), formato).date()
+        except ValueError:
+            continue
+    return None
+
+
+def cargar_puntos(conn: sqlite3.Connection) -> list[Punto]:
+    """Incidentes con coordenadas y fecha válidas, proyectados a UTM 19S."""
+    filas = []
+    for num_inc, fecha, lat, lon, operador, instalacion in conn.execute(
+            "SELECT NUM_INC, FECHA, LAT, LON, OPERADOR, TIPO_INSTALACION FROM incidentes "
+            "WHERE LAT IS NOT NULL AND LON IS NOT NULL"):
+        dia = parsear_fecha(fecha)
+        if dia is not None:
+            filas.append((num_inc, lat, lon, dia.toordinal(), operador, instalacion))
+    if not filas:
+        return []
+    este, norte = transform_many_to_utm([f[1] for f in filas], [f[2] for f in filas])
+    return [Punto(f[0], e, n, f[3], f[4], f[5]) for f, e, n in zip(filas, este, norte)]
+
+
+class IndiceGrilla:
+    """Hash espacial (celdas de `radio_m`) × baldes de `dias` días."""
+
+    def __init__(self, puntos: Iterable[Punto], radio_m: float = RADIO_M,
+                 dias: int = DIAS):
+        self.radio_m = radio_m
+        self.dias = dias
+        self._celdas: dict[tuple[int, int, int], list[Punto]] = defaultdict(list)
+        for p in puntos:
+            self._celdas[self._celda(p)].append(p)
+
+    def _celda(self, p: Punto) -> tuple[int, int, int]:
+        return (math.floor(p.este / self.radio_m), math.floor(p.norte / self.radio_m),
+                p.dia // max(self.dias, 1))
+
+    def vecinos(self, p: Punto) -> list[tuple[Punto, float, int]]:
+        """(vecino, distancia en m, días de diferencia), sin incluir a `p`."""
+        cx, cy, ct = self._celda(p)
+        encontrados = []
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                for dt in (-1, 0, 1):
+                    for q in self._celdas.get((cx + dx, cy + dy, ct + dt), ()):
+                        if q.num_inc == p.num_inc:
+                            continue
+                        distancia = math.hypot(q.este - p.este, q.norte - p.norte)
+                        dias = abs(q.dia - p.dia)
+                        if distancia <= self.radio_m and dias <= self.dias:
+                            encontrados.append((q, distancia, dias))
+        encontrados.sort(key=lambda v: (v[1], v[2]))
+        return encontrados
+
+
+def clasificar(distancia_m: float, dias: int) -> str:
+    if distancia_m <= DIST_DUPLICADO_M and dias <= DIAS_DUPLICADO:
+        return 'duplicado'
+    return 'repeticion'
+
+
+def pares_vecinos(puntos: list[Punto], radio_m: float = RADIO_M,
+                  dias: int = DIAS) -> list[ParVecino]:
+    """Todos los pares a ≤ radio_m y ≤ dias, cada uno una sola vez."""
+    indice = IndiceGrilla(puntos, radio_m, dias)
+    pares = []
+    for p in puntos:
+        for q, distancia, d in indice.vecinos(p):
+            if p.num_inc < q.num_inc:
+                pares.append(ParVecino(p, q, distancia, d, clasificar(distancia, d)))
+    return pares
+
+
+def focos(pares: list[ParVecino], min_foco: int = MIN_FOCO) -> list[list[str]]:
+    """
+    Grupos de incidentes unidos por repeticiones (componentes conexas),
+    con al menos `min_foco` incidentes, del más grande al más chico.
+    """
+    padre: dict[str, str] = {}
+
+    def raiz(x: str) -> str:
+        padre.setdefault(x, x)
+        while padre[x] != x:
+            padre[x] = padre[padre[x]]
+            x = padre[x]
+        return x
+
+    for par in pares:
+        if par.tipo == 'repeticion':
+            padre[raiz(par.a.num_inc)] = raiz(par.b.num_inc)
+
+    grupos: dict[str, list[str]] = defaultdict(list)
+    for x in list(padre):
+        grupos[raiz(x)].append(x)
+    return sorted((sorted(g) for g in grupos.values() if len(g) >= min_foco),
+                  key=lambda g: (-len(g), g[0]))
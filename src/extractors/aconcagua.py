@@ -79,7 +79,7 @@ class AconcaguaExtractor(BaseExtractor):
 
         if not self.validate_coordinates(data['Y_COORD'], data['X_COORD']):
             logger.warning(
-                f"[Aconcagua] Coordenadas inválidas en {data['NUM_INC']}"
+                "[Aconcagua] Coordenadas inválidas en %s", data['NUM_INC']
             )
 
         # ── Volúmenes ───────────────────────────────────────────────────
@@ -106,8 +106,8 @@ class AconcaguaExtractor(BaseExtractor):
             data.get('VOL_D_m3'), data.get('PPM_HC')
         )
         logger.info(
-            f"[Aconcagua] Magnitud inferida por volumen: {data['MAGNITUD']} "
-            f"(vol={data.get('VOL_D_m3')} m3, ppm={data.get('PPM_HC')})"
+            "[Aconcagua] Magnitud inferida por volumen: %s (vol=%s m3, ppm=%s)",
+            data['MAGNITUD'], data.get('VOL_D_m3'), data.get('PPM_HC')
         )
 
         return data
\ No newline at end of file
@@ -5,9 +5,13 @@ normalización de fechas, conversión de coordenadas DMS→DD).
 """
 
 import re
+import sys
+import hashlib
+import inspect
 import logging
 from abc import ABC, abstractmethod
-from datetime import datetime
+
+from src.extractors import parseo
 
 logger = logging.getLogger(__name__)
 
@@ -31,6 +35,35 @@ class BaseExtractor(ABC):
         """
         raise NotImplementedError
 
+    # Regex del encabezado de cada formulario, con un grupo para el número
+    # de comunicado. Permite separar PDFs con varios incidentes concatenados.
+    # None = la operadora no tiene un encabezado numerado (un incidente por PDF).
+    ANCLA: str | None = None
+
+    # Versión explícita opcional (ej. "2"). Si es None se usa un hash del código.
+    VERSION: str | None = None
+
+    _versiones: dict[type, str] = {}
+
+    @classmethod
+    def version(cls) -> str:
+        """
+        Versión del código del extractor: la explícita (VERSION) o un hash
+        corto del fuente de su módulo, de este módulo base y de parseo,
+        que cambia cuando se edita un regex o un helper.
+        """
+        if cls.VERSION is not None:
+            return f"v{cls.VERSION}"
+        if cls not in BaseExtractor._versiones:
+            h = hashlib.sha1()
+            for modulo in sorted({cls.__module__, __name__, parseo.__name__}):
+                try:
+                    h.update(inspect.getsource(sys.modules[modulo]).encode('utf-8'))
+                except (OSError, TypeError, KeyError):
+                    h.update(modulo.encode())
+            BaseExtractor._versiones[cls] = h.hexdigest()[:12]
+        return BaseExtractor._versiones[cls]
+
     # ------------------------------------------------------------------ #
     #  Helpers de regex (seguros: nunca lanzan AttributeError)            #
     # ------------------------------------------------------------------ #
@@ -55,13 +88,14 @@ class BaseExtractor(ABC):
         try:
             return float(raw.replace(',', '.'))
         except ValueError:
-            logger.warning(f"No se pudo convertir a float: '{raw}'")
+            logger.warning("No se pudo convertir a float: '%s'", raw)
             return None
 
     # ------------------------------------------------------------------ #
     #  Normalización de fechas                                            #
     # ------------------------------------------------------------------ #
 
+    # Formatos aceptados (los reconoce parseo.normalizar_fecha)
     DATE_FORMATS = [
         "%d/%m/%Y",   # 10/10/2025
         "%d/%m/%y",   # 10/10/25
@@ -75,16 +109,7 @@ class BaseExtractor(ABC):
         Convierte cualquier formato de fecha soportado a dd-mm-yyyy.
         Retorna None si el valor es None o no puede parsearse.
         """
-        if raw is None:
-            return None
-        raw = raw.strip()
-        for fmt in self.DATE_FORMATS:
-            try:
-                return datetime.strptime(raw, fmt).strftime("%d-%m-%Y")
-            except ValueError:
-                continue
-        logger.warning(f"Formato de fecha no reconocido: '{raw}'")
-        return None
+        return parseo.normalizar_fecha(raw)
 
     # ------------------------------------------------------------------ #
     #  Conversión de coordenadas                                          #
@@ -96,20 +121,17 @@ class BaseExtractor(ABC):
         Convierte Grados° Minutos' Segundos'' a grados decimales.
         Aplica signo negativo automáticamente para S y W.
         """
-        dd = degrees + minutes / 60.0 + seconds / 3600.0
-        if hemisphere.upper() in ("S", "W"):
-            dd = -dd
-        return round(dd, 6)
+        return parseo.dms_to_dd(degrees, minutes, seconds, hemisphere)
 
     @staticmethod
     def _normalize_dms_symbols(text: str) -> str:
         """
-        Normaliza todos los símbolos Unicode de DMS a sus equivalentes ASCII:
+        Normaliza todos los símbolos Unicode de DMS a sus equivalentes ASCII
+        (ver parseo.normalizar_dms, que además colapsa los espacios):
           - Cualquier variante de minutos (´ ′ ' ') → '
           - Cualquier variante de segundos (" " ″ '' ´´) → "
           - Coma decimal → punto
 
-        Esto permite que los regex posteriores sean simples y mantenibles.
         Caracteres cubiertos observados en PDFs de PetSud:
           ´  U+00B4  ACUTE ACCENT         → minutos
           ′  U+2032  PRIME                → minutos
@@ -120,15 +142,7 @@ class BaseExtractor(ABC):
           "  U+201D  RIGHT DOUBLE QUOTE   → segundos
           '' dos apóstrofos consecutivos  → segundos (caso 468)
         """
-        # Normalizar símbolo de minutos
-        text = re.sub(r"[´′\u00B4\u2018\u2019\u02BC]", "'", text)
-        # Normalizar símbolo de segundos (comillas dobles y double prime)
-        text = re.sub(r'[″\u201C\u201D]', '"', text)
-        # Dos apóstrofos/primes/acentos consecutivos → "
-        text = re.sub(r"'{2}|′{2}|´{2}", '"', text)
-        # Coma decimal → punto (para float())
-        text = re.sub(r'(\d),(\d)', r'\1.\2', text)
-        return text
+        return parseo.normalizar_dms(text)
 
     def parse_dms_string(self, raw: str) -> float | None:
         """
@@ -142,49 +156,7 @@ class BaseExtractor(ABC):
           - '37°20.936''            → grados y minutos decimales
           - '37 ° / 20 ' / 56.2'   → con separadores /
         """
-        if raw is None:
-            return None
-
-        # 1. Normalizar saltos de línea y espacios múltiples
-        normalized = re.sub(r'\s+', ' ', raw.strip())
-
-        # 2. Normalizar todos los símbolos DMS a ASCII estándar
-        normalized = self._normalize_dms_symbols(normalized)
-
-        # 3. Grados°, minutos', segundos"
-        m = re.match(
-            r"(\d+)\s*°\s*(\d+)\s*'\s*([\d.]+)\s*\"?",
-            normalized
-        )
-        if m:
-            deg  = float(m.group(1))
-            mins = float(m.group(2))
-            secs = float(m.group(3))
-            return self.dms_to_dd(deg, mins, secs)
-
-        # 4. Solo grados y minutos decimales: 37°20.936'
-        m = re.match(
-            r"(\d+)\s*°\s*([\d.]+)\s*'",
-            normalized
-        )
-        if m:
-            deg  = float(m.group(1))
-            mins = float(m.group(2))
-            return self.dms_to_dd(deg, mins)
-
-        # 5. Formato con separadores /: 37 ° / 20 ' / 56.2
-        m = re.match(
-            r"(\d+)\s*°\s*/?\s*(\d+\.?\d*)\s*'\s*/?\s*([\d.]+)",
-            normalized
-        )
-        if m:
-            deg  = float(m.group(1))
-            mins = float(m.group(2))
-            secs = float(m.group(3))
-            return self.dms_to_dd(deg, mins, secs)
-
-        logger.warning(f"No se pudo parsear coordenada DMS: '{raw}'")
-        return None
+        return parseo.parsear_dms(raw)
 
     # ------------------------------------------------------------------ #
     #  Validación geográfica                                              #
@@ -233,9 +205,9 @@ class BaseExtractor(ABC):
 
         if not lat_ok or not lon_ok:
             logger.warning(
-                f"Coordenadas fuera de Mendoza: lat={lat}, lon={lon}. "
-                f"Rango válido lat [{LAT_MIN}, {LAT_MAX}], "
-                f"lon [{LON_MIN}, {LON_MAX}]."
+                "Coordenadas fuera de Mendoza: lat=%s, lon=%s. "
+                "Rango válido lat [%s, %s], lon [%s, %s].",
+                lat, lon, LAT_MIN, LAT_MAX, LON_MIN, LON_MAX
             )
             return False
         return True
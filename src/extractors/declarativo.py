@@ -0,0 +1,311 @@
+"""
+Extractores declarativos: el formato de una operadora descrito en un JSON.
+
+Agregar una operadora ya no requiere una clase Python nueva: alcanza con un
+archivo en data/operadoras/ (ver src/extractors/operadora_ejemplo.json) con
+
+  nombre            nombre de la clase (queda en documentos.EXTRACTOR)
+  etiqueta          prefijo de los logs, ej. "YPF"
+  palabras_clave    textos que identifican el PDF (registry.identify_extractor)
+  ancla             encabezado numerado del formulario (BaseExtractor.ANCLA)
+  campos            clave del dict de salida → cómo obtenerla, en orden
+
+Cada campo es uno de:
+
+  {"valor": X}                                 constante
+  {"patron": P, "tipo": T, ...}                regex; T = texto (default),
+                                               numero, fecha, dms o dms_lineas
+  {"desde_ancla": true, ...}                   regex = la del ancla
+  {"marcas": [[nombre, P], ...]}               primer nombre cuya P aparece
+  {"lista": [opción, ...], "patron": "{}..."}  opciones presentes, unidas
+  {"reportadas": {sistema: {...}}}             otras representaciones de
+                                               las coordenadas (ver abajo)
+
+con modificadores opcionales: "grupo" (default 1), "flags" (default
+["IGNORECASE"], como BaseExtractor._find), "formato" ("YPF-{}", sólo si hay
+valor), "defecto" (si no hay valor), "signo": "negativo" (S/W), "si_no" (otro
+campo si el primero no da valor), "fin" (dms_lineas: regex de los rótulos
+que cortan la coordenada) e "inferir": true (si al final no hay valor, la
+magnitud se infiere por VOL_D_m3 y PPM_HC).
+
+En "reportadas" cada sistema es {"patron": P, "grupos": [lat, lon]} (texto
+crudo) o {"campos": [x, y]} (valores de otros campos).
+
+Las regex se compilan una sola vez al cargar el archivo, y cada campo queda
+como una función; la definición compilada se cachea por el SHA-256 del
+archivo, así que recargar un JSON sin cambios no vuelve a compilar nada.
+"""
+
+import hashlib
+import inspect
+import json
+import logging
+import re
+import sys
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, NamedTuple
+
+from src.extractors import parseo
+from src.extractors.base_extractor import BaseExtractor
+
+logger = logging.getLogger(__name__)
+
+# Las operadoras del repo son clases Python; las definiciones JSON son de cada instalación
+DIRS_OPERADORAS = (Path('data') / 'operadoras',)
+
+_FLAGS = {'IGNORECASE': re.IGNORECASE, 'DOTALL': re.DOTALL, 'MULTILINE': re.MULTILINE}
+_DMS_EN_LINEA = re.compile(r'\d+\s*[°º]')
+_NO_DMS = re.compile(r'[^\d°º\'\".,′″´\u00B4\u2032\s]')
+
+# texto, data → valor
+Regla = Callable[[str, dict], object]
+
+
+class Definicion(NamedTuple):
+    nombre: str
+    etiqueta: str
+    palabras_clave: tuple[str, ...]
+    ancla: str | None
+    campos: tuple[tuple[str, Regla], ...]
+    inferir: tuple[str, ...]          # campos cuya magnitud se infiere si faltan
+    sha256: str
+
+
+# ── Helpers (mismo criterio que BaseExtractor._find / _find_float) ───────────
+
+def _buscar(patron: re.Pattern, texto: str, grupo: int = 1) -> str | None:
+    m = patron.search(texto)
+    if m is None:
+        return None
+    try:
+        return m.group(grupo).strip()
+    except IndexError:
+        return m.group(0).strip()
+
+
+def _a_float(raw: str | None) -> float | None:
+    if raw is None:
+        return None
+    try:
+        return float(raw.replace(',', '.'))
+    except ValueError:
+        logger.warning("No se pudo convertir a float: '%s'", raw)
+        return None
+
+
+def _dms_lineas(patron: re.Pattern, fin: re.Pattern, texto: str) -> str | None:
+    """
+    Coordenada DMS que puede seguir al rótulo en varias líneas: se acumulan
+    líneas hasta tener grados, minutos y segundos o hasta otro rótulo.
+    """
+    m = patron.search(texto)
+    if not m:
+        return None
+    lineas = [l.strip() for l in texto[m.end(): m.end() + 150].splitlines() if l.strip()]
+    juntas = []
+    for linea in lineas:
+        if fin.search(linea) and not _DMS_EN_LINEA.search(linea):
+            break
+        juntas.append(linea)
+        if parseo.dms_completo(' '.join(juntas)):
+            break
+    limpio = _NO_DMS.sub('', ' '.join(juntas)).strip()
+    if not _DMS_EN_LINEA.search(limpio):
+        return None
+    return limpio or None
+
+
+# ── Compilación ──────────────────────────────────────────────────────────────
+
+def _flags(spec: dict) -> int:
+    flags = 0
+    for nombre in spec.get('flags', ['IGNORECASE']):
+        flags |= _FLAGS[nombre]
+    return flags
+
+
+def _compilar_campo(nombre: str, spec: dict, ancla: str | None, etiqueta: str) -> Regla:
+    if 'valor' in spec:
+        valor = spec['valor']
+        return lambda texto, data: valor
+
+    if 'reportadas' in spec:
+        return _compilar_reportadas(spec['reportadas'], _flags(spec))
+
+    if 'marcas' in spec:
+        marcas = [(n, re.compile(p, _flags(spec))) for n, p in spec['marcas']]
+
+        def regla(texto, data):
+            return next((n for n, p in marcas if p.search(texto)), None)
+    elif 'lista' in spec:
+        opciones = [(o, re.compile(spec['patron'].replace('{}', o), _flags(spec)))
+                    for o in spec['lista']]
+        separador = spec.get('separador', ', ')
+
+        def regla(texto, data):
+            presentes = [o for o, p in opciones if p.search(texto)]
+            return separador.join(presentes) if presentes else None
+    else:
+        if spec.get('desde_ancla'):
+            if not ancla:
+                raise ValueError(f"{nombre}: 'desde_ancla' sin 'ancla' en la definición")
+            patron = re.compile(ancla, _flags(spec))
+        else:
+            patron = re.compile(spec['patron'], _flags(spec))
+        grupo = spec.get('grupo', 1)
+        tipo = spec.get('tipo', 'texto')
+
+        if tipo == 'texto':
+            def regla(texto, data):
+                return _buscar(patron, texto, grupo)
+        elif tipo == 'numero':
+            def regla(texto, data):
+                return _a_float(_buscar(patron, texto, grupo))
+        elif tipo == 'fecha':
+            def regla(texto, data):
+                return parseo.normalizar_fecha(_buscar(patron, texto, grupo))
+        elif tipo == 'dms':
+            def regla(texto, data):
+                raw = _buscar(patron, texto, grupo)
+                if not raw:
+                    return None
+                dd = parseo.parsear_dms(raw)
+                if dd is None:
+                    logger.warning("[%s] No se pudo parsear %s: '%s'", etiqueta, nombre, raw)
+                return dd
+        elif tipo == 'dms_lineas':
+            fin = re.compile(spec['fin'], re.IGNORECASE)
+
+            def regla(texto, data):
+                raw = _dms_lineas(patron, fin, texto)
+                if raw is None:
+                    logger.warning("[%s] %s no encontrada en el texto.", etiqueta, nombre)
+                    return None
+                return parseo.parsear_dms(raw)
+        else:
+            raise ValueError(f"{nombre}: tipo desconocido {tipo!r}")
+
+    return _modificadores(nombre, spec, ancla, etiqueta, regla)
+
+
+def _modificadores(nombre: str, spec: dict, ancla: str | None, etiqueta: str,
+                   regla: Regla) -> Regla:
+    formato = spec.get('formato')
+    defecto = spec.get('defecto')
+    negativo = spec.get('signo') == 'negativo'
+    si_no = _compilar_campo(nombre, spec['si_no'], ancla, etiqueta) if 'si_no' in spec else None
+    if not (formato or defecto is not None or negativo or si_no):
+        return regla
+
+    def con_modificadores(texto, data):
+        valor = regla(texto, data)
+        if si_no is not None and valor is None:
+            valor = si_no(texto, data)
+        if formato:
+            valor = formato.format(valor) if valor else None
+        if defecto is not None:
+            valor = valor or defecto
+        if negativo and valor is not None:
+            valor = -abs(valor)
+        return valor
+    return con_modificadores
+
+
+def _compilar_reportadas(sistemas: dict, flags: int) -> Regla:
+    compilados = []
+    for sistema, spec in sistemas.items():
+        if 'campos' in spec:
+            compilados.append((sistema, None, tuple(spec['campos'])))
+        else:
+            compilados.append((sistema, re.compile(spec['patron'], flags),
+                               tuple(spec.get('grupos', (1, 2)))))
+
+    def regla(texto, data):
+        reportadas = {}
+        for sistema, patron, refs in compilados:
+            if patron is None:
+                valores = [data.get(c) for c in refs]
+                if all(v is not None for v in valores):
+                    reportadas[sistema] = valores
+            else:
+                valores = [_buscar(patron, texto, g) for g in refs]
+                if all(valores):
+                    reportadas[sistema] = valores
+        return reportadas or None
+    return regla
+
+
+def compilar(spec: dict, sha256: str = '') -> Definicion:
+    """Valida una definición (dict del JSON) y compila sus regex y campos."""
+    faltan = [k for k in ('nombre', 'palabras_clave', 'campos') if k not in spec]
+    if faltan:
+        raise ValueError(f"Faltan claves en la definición: {faltan}")
+    etiqueta = spec.get('etiqueta', spec['nombre'])
+    ancla = spec.get('ancla')
+    if ancla:
+        re.compile(ancla)
+    campos, inferir = [], []
+    for nombre, campo in spec['campos'].items():
+        try:
+            campos.append((nombre, _compilar_campo(nombre, campo, ancla, etiqueta)))
+        except (KeyError, re.error) as e:
+            raise ValueError(f"Campo {nombre}: {type(e).__name__}: {e}") from e
+        if campo.get('inferir'):
+            inferir.append(nombre)
+    return Definicion(spec['nombre'], etiqueta, tuple(spec['palabras_clave']), ancla,
+                      tuple(campos), tuple(inferir), sha256)
+
+
+# ── Extractor ────────────────────────────────────────────────────────────────
+
+class ExtractorDeclarativo(BaseExtractor):
+    """Extractor cuyo comportamiento sale de una Definicion compilada."""
+
+    DEFINICION: Definicion
+
+    def extract(self, text: str) -> dict:
+        d = self.DEFINICION
+        data = {}
+        for nombre, regla in d.campos:
+            data[nombre] = regla(text, data)
+        for nombre in d.inferir:
+            if data[nombre] is None:
+                data[nombre] = self.inferir_magnitud(data.get('VOL_D_m3'), data.get('PPM_HC'))
+        if 'Y_COORD' in data and not self.validate_coordinates(data['Y_COORD'],
+                                                               data.get('X_COORD')):
+            logger.warning("[%s] Coordenadas inválidas en %s", d.etiqueta, data.get('NUM_INC'))
+        return data
+
+    @classmethod
+    def version(cls) -> str:
+        """Hash del motor, del módulo base y del JSON de la definición."""
+        if cls.VERSION is not None:
+            return f"v{cls.VERSION}"
+        if cls not in BaseExtractor._versiones:
+            h = hashlib.sha1()
+            for modulo in sorted({__name__, BaseExtractor.__module__, parseo.__name__}):
+                h.update(inspect.getsource(sys.modules[modulo]).encode('utf-8'))
+            h.update(cls.DEFINICION.sha256.encode())
+            BaseExtractor._versiones[cls] = h.hexdigest()[:12]
+        return BaseExtractor._versiones[cls]
+
+
+@lru_cache(maxsize=None)
+def _clase(sha256: str, contenido: bytes) -> type:
+    definicion = compilar(json.loads(contenido), sha256)
+    return type(definicion.nombre, (ExtractorDeclarativo,), {
+        'DEFINICION': definicion, 'ANCLA': definicion.ancla, '__module__': __name__,
+    })
+
+
+def cargar(path: str | Path) -> type:
+    """
+    Clase extractora de un archivo de definición. Se cachea por el SHA-256
+    del contenido: el mismo archivo da la misma clase sin recompilar.
+    """
+    contenido = Path(path).read_bytes()
+    try:
+        return _clase(hashlib.sha256(contenido).hexdigest(), contenido)
+    except ValueError as e:      # incluye JSONDecodeError
+        raise ValueError(f"{path}: {e}") from e
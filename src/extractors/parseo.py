@@ -0,0 +1,154 @@
+"""
+Parseo de coordenadas DMS y fechas, compartido por todos los extractores.
+
+Antes cada coordenada pasaba por cuatro re.sub de normalización y hasta tres
+re.match, y cada fecha probaba cinco formatos con strptime atrapando un
+ValueError por formato fallido. Acá:
+
+  - los símbolos Unicode de minutos y segundos se normalizan con una sola
+    tabla de str.translate;
+  - las tres variantes de DMS son alternativas de una única regex, en el
+    mismo orden en que se probaban (mismo resultado que antes);
+  - la fecha se reconoce con una regex que identifica el formato y arma la
+    fecha directamente, con el mismo criterio que strptime (día y mes de
+    1 o 2 dígitos, %y de 69 a 99 → 1900);
+  - los resultados se memorizan: los mismos textos se repiten entre
+    informes preliminares y finales y al reprocesar.
+
+Las funciones `*_lote` reciben listas de valores crudos y devuelven listas.
+"""
+
+import logging
+import re
+from datetime import date
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+
+_MEMO = 4096
+
+# ── Coordenadas DMS ──────────────────────────────────────────────────────────
+
+# Minutos: ´ (U+00B4), ′ (U+2032), ‘ ’ (U+2018/9), ʼ (U+02BC) → '
+# Segundos: ″ (U+2033), “ ” (U+201C/D) → "
+_SIMBOLOS_DMS = str.maketrans({
+    '\u00B4': "'", '\u2032': "'", '\u2018': "'", '\u2019': "'", '\u02BC': "'",
+    '\u2033': '"', '\u201C': '"', '\u201D': '"',
+})
+_COMA_DECIMAL = re.compile(r'(\d),(\d)')
+
+# Alternativas en orden de prioridad:
+#   1-3  grados° minutos' segundos"      33°34'39.63"
+#   4-5  grados° minutos decimales'      37°20.936'
+#   6-8  con separadores /               37 ° / 20 ' / 56.2
+_DMS = re.compile(
+    r"(?:(\d+)\s*°\s*(\d+)\s*'\s*([\d.]+)\s*\"?"
+    r"|(\d+)\s*°\s*([\d.]+)\s*'"
+    r"|(\d+)\s*°\s*/?\s*(\d+\.?\d*)\s*'\s*/?\s*([\d.]+))"
+)
+# Grados, minutos y segundos presentes en cualquier parte del texto
+_DMS_COMPLETO = re.compile(r"\d+\s*°\s*\d+\s*'\s*[\d.]+")
+
+
+@lru_cache(maxsize=_MEMO)
+def normalizar_dms(texto: str) -> str:
+    """
+    Espacios colapsados, símbolos de minutos/segundos en ASCII, dos
+    apóstrofos seguidos como segundos y coma decimal como punto.
+    """
+    texto = ' '.join(texto.split()).translate(_SIMBOLOS_DMS).replace("''", '"')
+    return _COMA_DECIMAL.sub(r'\1.\2', texto) if ',' in texto else texto
+
+
+def dms_to_dd(degrees: float, minutes: float, seconds: float = 0.0,
+              hemisphere: str = "S") -> float:
+    """Grados° minutos' segundos'' → grados decimales (negativo en S y W)."""
+    dd = degrees + minutes / 60.0 + seconds / 3600.0
+    if hemisphere.upper() in ("S", "W"):
+        dd = -dd
+    return round(dd, 6)
+
+
+@lru_cache(maxsize=_MEMO)
+def _parsear_dms(raw: str) -> float | None:
+    m = _DMS.match(normalizar_dms(raw))
+    if m is None:
+        return None
+    g = m.groups()
+    if g[0] is not None:
+        return dms_to_dd(float(g[0]), float(g[1]), float(g[2]))
+    if g[3] is not None:
+        return dms_to_dd(float(g[3]), float(g[4]))
+    return dms_to_dd(float(g[5]), float(g[6]), float(g[7]))
+
+
+def parsear_dms(raw: str | None) -> float | None:
+    """
+    Coordenada DMS en cualquiera de los formatos de los PDFs → grados
+    decimales (con signo de hemisferio sur), o None si no se reconoce.
+    """
+    if raw is None:
+        return None
+    dd = _parsear_dms(raw)
+    if dd is None:
+        logger.warning("No se pudo parsear coordenada DMS: '%s'", raw)
+    return dd
+
+
+def dms_completo(texto: str) -> bool:
+    """True si el texto ya contiene grados, minutos y segundos."""
+    return _DMS_COMPLETO.search(normalizar_dms(texto)) is not None
+
+
+def parsear_dms_lote(valores) -> list[float | None]:
+    return [parsear_dms(v) for v in valores]
+
+
+# ── Fechas ───────────────────────────────────────────────────────────────────
+
+# Los mismos sub-patrones que usa strptime para %d, %m, %Y y %y
+_DIA = r'3[01]|[12]\d|0[1-9]|[1-9]| [1-9]'
+_MES = r'1[0-2]|0[1-9]|[1-9]'
+# dd/mm/yyyy, dd/mm/yy, dd-mm-yyyy, dd-mm-yy, yyyy-mm-dd
+_FECHA = re.compile(
+    rf'(?:(?P<d>{_DIA})(?P<sep>[/-])(?P<m>{_MES})(?P=sep)(?:(?P<Y>\d{{4}})|(?P<y>\d\d))'
+    rf'|(?P<iso_Y>\d{{4}})-(?P<iso_m>{_MES})-(?P<iso_d>{_DIA}))\Z'
+)
+
+
+@lru_cache(maxsize=_MEMO)
+def _parsear_fecha(raw: str) -> str | None:
+    m = _FECHA.match(raw)
+    if m is None:
+        return None
+    if m['iso_Y'] is not None:
+        anio, mes, dia = int(m['iso_Y']), int(m['iso_m']), int(m['iso_d'])
+    else:
+        dia, mes = int(m['d']), int(m['m'])
+        if m['Y'] is not None:
+            anio = int(m['Y'])
+        else:
+            anio = int(m['y'])
+            anio += 2000 if anio <= 68 else 1900
+    try:
+        return date(anio, mes, dia).strftime("%d-%m-%Y")
+    except ValueError:          # 31/02, año 0000
+        return None
+
+
+def normalizar_fecha(raw: str | None) -> str | None:
+    """
+    Fecha en dd/mm/yyyy, dd/mm/yy, dd-mm-yyyy, dd-mm-yy o yyyy-mm-dd →
+    dd-mm-yyyy. None si el valor es None o no es una fecha válida.
+    """
+    if raw is None:
+        return None
+    raw = raw.strip()
+    fecha = _parsear_fecha(raw)
+    if fecha is None:
+        logger.warning("Formato de fecha no reconocido: '%s'", raw)
+    return fecha
+
+
+def normalizar_fecha_lote(valores) -> list[str | None]:
+    return [normalizar_fecha(v) for v in valores]
@@ -24,15 +24,16 @@ class PCRExtractor(BaseExtractor):
     separador de minutos, lo que requiere un patrón más permisivo.
     """
 
+    # Formato: "Comunicado MDZ-21-2025- Batería 216"
+    ANCLA = r'Comunicado\s+(MDZ-[\w-]+)'
+
     def extract(self, text: str) -> dict:
         data = {}
 
         # ── Identificación ──────────────────────────────────────────────
         data['OPERADOR'] = "Petroquímica Comodoro Rivadavia S.A."
 
-        # Formato: "Comunicado MDZ-21-2025- Batería 216"
-        num_inc = self._find(
-            r'Comunicado\s+(MDZ-[\w-]+)', text)
+        num_inc = self._find(self.ANCLA, text)
         data['NUM_INC'] = f"PCR-{num_inc}" if num_inc else None
 
         # ── Área y ubicación ────────────────────────────────────────────
@@ -80,7 +81,7 @@ class PCRExtractor(BaseExtractor):
 
         if not self.validate_coordinates(data['Y_COORD'], data['X_COORD']):
             logger.warning(
-                f"[PCR] Coordenadas inválidas en {data['NUM_INC']}"
+                "[PCR] Coordenadas inválidas en %s", data['NUM_INC']
             )
 
         # ── Volúmenes (en texto narrativo) ───────────────────────────────
@@ -114,8 +115,8 @@ class PCRExtractor(BaseExtractor):
                 data.get('VOL_D_m3'), data.get('PPM_HC')
             )
             logger.info(
-                f"[PCR] Magnitud inferida por volumen: {data['MAGNITUD']} "
-                f"(vol={data.get('VOL_D_m3')} m3)"
+                "[PCR] Magnitud inferida por volumen: %s (vol=%s m3)",
+                data['MAGNITUD'], data.get('VOL_D_m3')
             )
 
         return data
@@ -136,7 +137,7 @@ class PCRExtractor(BaseExtractor):
         normalized = raw.replace('\u00b4', "'").strip()
         result = self.parse_dms_string(normalized)
         if result is None:
-            logger.warning(f"[PCR] No se pudo parsear {label}: '{raw}'")
+            logger.warning("[PCR] No se pudo parsear %s: '%s'", label, raw)
         return result
 
     def _extract_tipo_incidente(self, text: str) -> str | None:
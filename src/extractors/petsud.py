@@ -10,6 +10,7 @@ Variantes de símbolos DMS observadas en PDFs de PetSud:
 
 import logging
 import re
+from src.extractors import parseo
 from src.extractors.base_extractor import BaseExtractor
 
 logger = logging.getLogger(__name__)
@@ -17,6 +18,8 @@ logger = logging.getLogger(__name__)
 
 class PetSudExtractor(BaseExtractor):
 
+    ANCLA = r'N[°º]\s*DE\s*COMUNICADO\s+(\d+)'
+
     # Patrones que indican inicio de un nuevo campo — detienen la captura de coord
     _STOP_FIELD = re.compile(
         r'Coordenadas|Concentraci|Volumen|rea|Medidas|Suelo|Fecha|Hora|' +
@@ -29,7 +32,7 @@ class PetSudExtractor(BaseExtractor):
 
         data['OPERADOR'] = "Petróleos Sudamericanos"
 
-        num_inc = self._find(r'N[°º]\s*DE\s*COMUNICADO\s+(\d+)', text)
+        num_inc = self._find(self.ANCLA, text)
         data['NUM_INC'] = f"PETSUD-{num_inc}" if num_inc else None
 
         data['AREA_CONCE'] = self._find(r'Área operativa\s*/\s*concesión\s+(.+)', text)
@@ -60,8 +63,9 @@ class PetSudExtractor(BaseExtractor):
 
         if not self.validate_coordinates(data['Y_COORD'], data['X_COORD']):
             logger.warning(
-                f"[PetSud] Coordenadas inválidas en {data['NUM_INC']}. "
-                "Verificar si hay error de tipeo en el informe original."
+                "[PetSud] Coordenadas inválidas en %s. "
+                "Verificar si hay error de tipeo en el informe original.",
+                data['NUM_INC']
             )
 
         data['VOL_D_m3']     = self._find_float(r'Volumen\s+m3?\s+derramado\s+([\d.,]+)', text)
@@ -84,10 +88,7 @@ class PetSudExtractor(BaseExtractor):
     @staticmethod
     def _is_dms_complete(s: str) -> bool:
         """True si el string ya contiene grados, minutos Y segundos normalizados."""
-        from src.extractors.base_extractor import BaseExtractor as _B
-        n = re.sub(r'\s+', ' ', s)
-        n = _B._normalize_dms_symbols(n)
-        return bool(re.search(r'\d+\s*°\s*\d+\s*\'\s*[\d.]+\s*"?', n))
+        return parseo.dms_completo(s)
 
     def _extract_coord_raw(self, label_pattern: str, text: str) -> str | None:
         """
@@ -133,7 +134,7 @@ class PetSudExtractor(BaseExtractor):
     def _parse_and_negate(self, raw: str | None, label: str) -> float | None:
         """Parsea DMS y aplica signo negativo (S/W siempre negativos en Mendoza)."""
         if raw is None:
-            logger.warning(f"[PetSud] {label} no encontrada en el texto.")
+            logger.warning("[PetSud] %s no encontrada en el texto.", label)
             return None
         dd = self.parse_dms_string(raw)
         if dd is None:
@@ -0,0 +1,175 @@
+"""
+Descubrimiento perezoso de extractores (plugins).
+
+Un plugin es la metadata de un extractor: nombre de la clase, palabras
+clave que identifican el PDF, ancla del formulario y dónde está el código.
+Con eso alcanza para armar el índice de identificación y la regex de
+segmentación; el módulo del extractor recién se importa (o el JSON se
+compila) la primera vez que un documento coincide con sus palabras clave.
+
+Fuentes, en orden de precedencia (ante dos plugins con el mismo nombre,
+gana el primero):
+
+  1. Los extractores incluidos en el repo (registry.PLUGINS_INTERNOS).
+  2. Entry points del grupo "incidentes.extractores" de paquetes instalados.
+     El entry point apunta a un Plugin o a un dict con sus campos, definido
+     en un módulo liviano que no importa el extractor:
+
+         [project.entry-points."incidentes.extractores"]
+         nueva = "incidentes_nueva.plugin:PLUGIN"
+
+  3. Archivos *.json de data/operadoras/:
+     definiciones declarativas (con "campos", ver declarativo.py) o
+     manifiestos de una clase Python ("clase": "modulo:Clase"; si
+     modulo.py está en el mismo directorio, se carga desde ahí).
+"""
+
+import hashlib
+import importlib
+import importlib.util
+import json
+import logging
+from functools import lru_cache
+from importlib.metadata import entry_points
+from pathlib import Path
+from typing import NamedTuple
+
+from src.extractors.declarativo import DIRS_OPERADORAS
+
+logger = logging.getLogger(__name__)
+
+GRUPO_ENTRY_POINTS = 'incidentes.extractores'
+
+
+class Plugin(NamedTuple):
+    nombre: str                          # __name__ de la clase
+    objetivo: str                        # "modulo:Clase" o ruta de un JSON declarativo
+    palabras_clave: tuple[str, ...]
+    ancla: str | None = None             # BaseExtractor.ANCLA, sin importar la clase
+    directorio: str | None = None        # para manifiestos con el módulo al lado
+
+
+def desde_dict(datos: dict, directorio: str | None = None) -> Plugin:
+    """Plugin a partir de un dict con nombre, clase, palabras_clave y ancla."""
+    faltan = [k for k in ('nombre', 'clase', 'palabras_clave') if k not in datos]
+    if faltan:
+        raise ValueError(f"Faltan claves en el plugin: {faltan}")
+    if ':' not in datos['clase']:
+        raise ValueError(f"'clase' debe ser 'modulo:Clase', no {datos['clase']!r}")
+    return Plugin(datos['nombre'], datos['clase'], tuple(datos['palabras_clave']),
+                  datos.get('ancla'), directorio)
+
+
+# ── Fuentes ──────────────────────────────────────────────────────────────────
+
+def desde_entry_points(grupo: str = GRUPO_ENTRY_POINTS) -> list[Plugin]:
+    """Plugins declarados por paquetes instalados (los inválidos se ignoran)."""
+    plugins = []
+    for ep in sorted(entry_points(group=grupo), key=lambda ep: ep.name):
+        try:
+            meta = ep.load()
+            plugins.append(meta if isinstance(meta, Plugin) else desde_dict(meta))
+        except Exception as e:
+            logger.error("Entry point %s inválido, se ignora: %s", ep.value, e)
+    return plugins
+
+
+def desde_directorio(directorio: str | Path) -> list[Plugin]:
+    """
+    Plugins de los *.json del directorio, en orden de nombre de archivo.
+    Sólo se lee la metadata: las regex de una definición se compilan al cargarla.
+    """
+    plugins = []
+    for path in sorted(Path(directorio).glob('*.json')):
+        try:
+            datos = json.loads(path.read_bytes())
+            if 'campos' in datos:
+                plugins.append(Plugin(datos['nombre'], str(path),
+                                      tuple(datos['palabras_clave']), datos.get('ancla')))
+            else:
+                plugins.append(desde_dict(datos, str(path.parent)))
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.error("Plugin %s inválido, se ignora: %s", path, e)
+    return plugins
+
+
+def descubrir(internos=(), directorios=DIRS_OPERADORAS,
+              grupo: str = GRUPO_ENTRY_POINTS) -> list[Plugin]:
+    """Internos, entry points y directorios, sin nombres repetidos."""
+    plugins, vistos = [], set()
+    fuentes = [list(internos), desde_entry_points(grupo)]
+    fuentes += [desde_directorio(d) for d in directorios]
+    for fuente in fuentes:
+        for plugin in fuente:
+            if plugin.nombre in vistos:
+                continue
+            vistos.add(plugin.nombre)
+            plugins.append(plugin)
+    return plugins
+
+
+# ── Carga ────────────────────────────────────────────────────────────────────
+
+def _modulo(nombre: str, directorio: str | None):
+    if directorio is not None:
+        archivo = Path(directorio) / (nombre.replace('.', '/') + '.py')
+        if archivo.is_file():
+            spec = importlib.util.spec_from_file_location(nombre, archivo)
+            modulo = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(modulo)
+            return modulo
+    return importlib.import_module(nombre)
+
+
+@lru_cache(maxsize=None)
+def _cargar(plugin: Plugin) -> type:
+    if plugin.objetivo.endswith('.json'):
+        from src.extractors import declarativo
+        cls = declarativo.cargar(plugin.objetivo)
+    else:
+        modulo, _, atributo = plugin.objetivo.partition(':')
+        cls = getattr(_modulo(modulo, plugin.directorio), atributo)
+    logger.debug("Plugin %s cargado desde %s", plugin.nombre, plugin.objetivo)
+    return cls
+
+
+def cargar(plugin: Plugin) -> type | None:
+    """
+    Clase extractora del plugin (importada una sola vez). None si no se
+    puede cargar; el error queda en el log.
+    """
+    try:
+        return _cargar(plugin)
+    except Exception as e:
+        logger.error("No se pudo cargar el plugin %s (%s): %s",
+                     plugin.nombre, plugin.objetivo, e)
+        return None
+
+
+@lru_cache(maxsize=None)
+def hash_fuente(modulo: str, directorio: str | None = None) -> str:
+    """SHA-1 del archivo fuente de un módulo, buscado sin importarlo."""
+    if directorio is not None:
+        archivo = Path(directorio) / (modulo.replace('.', '/') + '.py')
+        if archivo.is_file():
+            return hashlib.sha1(archivo.read_bytes()).hexdigest()
+    try:
+        spec = importlib.util.find_spec(modulo)
+    except (ImportError, ValueError):
+        spec = None
+    if spec is None or not spec.origin or not Path(spec.origin).is_file():
+        return 'sin-fuente'
+    return hashlib.sha1(Path(spec.origin).read_bytes()).hexdigest()
+
+
+def firma(plugin: Plugin) -> str:
+    """
+    Hash del código o de la definición del plugin, sin importarlo: cambia
+    cuando se edita el extractor.
+    """
+    if plugin.objetivo.endswith('.json'):
+        try:
+            return hashlib.sha1(Path(plugin.objetivo).read_bytes()).hexdigest()
+        except OSError:
+            return 'sin-fuente'
+    return hash_fuente(plugin.objetivo.partition(':')[0], plugin.directorio)
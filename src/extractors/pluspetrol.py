@@ -22,13 +22,15 @@ class PluspetrolExtractor(BaseExtractor):
     varios datos cuantitativos embebidos en el texto narrativo.
     """
 
+    ANCLA = r'COMUNICADO\s+N[°º]?[:\s]+(\S+)'
+
     def extract(self, text: str) -> dict:
         data = {}
 
         # ── Identificación ──────────────────────────────────────────────
         data['OPERADOR'] = "Pluspetrol S.A."
 
-        num_inc = self._find(r'COMUNICADO\s+N[°º]?[:\s]+(\S+)', text)
+        num_inc = self._find(self.ANCLA, text)
         data['NUM_INC'] = f"PP-{num_inc}" if num_inc else None
 
         data['CODIGO'] = self._find(r'CÓDIGO[:\s]+(\S+)', text)
@@ -67,10 +69,13 @@ class PluspetrolExtractor(BaseExtractor):
         data['Y_COORD'] = lat_dd
         data['X_COORD'] = lon_dd
         data['SRID_ORIGEN'] = "WGS84-DD"
+        # En el PDF X es la coordenada norte e Y la este (convención argentina)
+        data['COORDS_REPORTADAS'] = (
+            {'GK': [gk_x, gk_y]} if gk_x is not None and gk_y is not None else None)
 
         if not self.validate_coordinates(data['Y_COORD'], data['X_COORD']):
             logger.warning(
-                f"[Pluspetrol] Coordenadas inválidas en {data['NUM_INC']}"
+                "[Pluspetrol] Coordenadas inválidas en %s", data['NUM_INC']
             )
 
         # ── Volúmenes (embebidos en texto narrativo de DESCRIPCIÓN) ─────
@@ -0,0 +1,88 @@
+"""
+Registro de extractores: palabra clave en el PDF → extractor.
+
+El registro se arma con la metadata de los plugins (ver plugins.py): los
+extractores del repo, los de paquetes instalados (entry points) y las
+definiciones de data/operadoras/. Ningún módulo
+de extractor se importa al arrancar; cada uno se carga la primera vez que
+un documento coincide con sus palabras clave o se lo pide por nombre.
+
+Además expone la versión del registro: un hash de las palabras clave y del
+código de cada extractor (leído sin importarlo). Cambia cada vez que se
+toca cualquier extractor o se agrega una operadora, y se usa para invalidar
+resultados cacheados (cuarentena).
+"""
+
+import hashlib
+import unicodedata
+from functools import lru_cache
+
+from src.extractors import plugins
+from src.extractors.plugins import Plugin
+
+# Mismas palabras clave y anclas que las clases; el orden es el de búsqueda
+PLUGINS_INTERNOS: tuple[Plugin, ...] = (
+    Plugin('YPFExtractor', 'src.extractors.ypf:YPFExtractor',
+           ('YPF S.A.',), r'Comunicado Incidente\s+N[°º]\s*([\d]+)'),
+    Plugin('PluspetrolExtractor', 'src.extractors.pluspetrol:PluspetrolExtractor',
+           ('PLUSPETROL',), r'COMUNICADO\s+N[°º]?[:\s]+(\S+)'),
+    Plugin('PetSudExtractor', 'src.extractors.petsud:PetSudExtractor',
+           ('PETROLEOS SUDAMERICANOS', 'PETRÓLEOS SUDAMERICANOS'),
+           r'N[°º]\s*DE\s*COMUNICADO\s+(\d+)'),
+    Plugin('AconcaguaExtractor', 'src.extractors.aconcagua:AconcaguaExtractor',
+           ('ACONCAGUA ENERGIA',)),
+    Plugin('PCRExtractor', 'src.extractors.pcr:PCRExtractor',
+           ('PCR', 'COMODORO RIVADAVIA'), r'Comunicado\s+(MDZ-[\w-]+)'),
+)
+
+PLUGINS: list[Plugin] = plugins.descubrir(PLUGINS_INTERNOS)
+
+EXTRACTOR_REGISTRY: list[tuple[str, Plugin]] = [
+    (keyword, plugin) for plugin in PLUGINS for keyword in plugin.palabras_clave
+]
+
+# Código común a todos los extractores, para version_registro()
+_MODULOS_BASE = ('src.extractors.base_extractor', 'src.extractors.parseo',
+                 'src.extractors.declarativo')
+
+
+def normalizar_texto(s: str) -> str:
+    """Mayúsculas y sin acentos, para comparar palabras clave."""
+    return ''.join(
+        c for c in unicodedata.normalize('NFD', s.upper())
+        if unicodedata.category(c) != 'Mn'
+    )
+
+
+@lru_cache(maxsize=None)
+def _indice() -> tuple[tuple[str, Plugin], ...]:
+    return tuple((normalizar_texto(k), p) for k, p in EXTRACTOR_REGISTRY)
+
+
+def identify_extractor(text: str):
+    text_norm = normalizar_texto(text)
+    for keyword, plugin in _indice():
+        if keyword in text_norm:
+            extractor_cls = plugins.cargar(plugin)
+            if extractor_cls is not None:
+                return extractor_cls()
+    return None
+
+
+def extractor_por_nombre(nombre: str) -> type | None:
+    """Clase extractora registrada con ese __name__ (ej. 'YPFExtractor')."""
+    for plugin in PLUGINS:
+        if plugin.nombre == nombre:
+            return plugins.cargar(plugin)
+    return None
+
+
+@lru_cache(maxsize=None)
+def version_registro() -> str:
+    """Hash corto de las palabras clave y del código de cada extractor."""
+    h = hashlib.sha1()
+    for modulo in _MODULOS_BASE:
+        h.update(f"{modulo}@{plugins.hash_fuente(modulo)};".encode())
+    for keyword, plugin in EXTRACTOR_REGISTRY:
+        h.update(f"{keyword}={plugin.nombre}@{plugins.firma(plugin)};".encode())
+    return h.hexdigest()[:12]
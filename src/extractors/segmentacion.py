@@ -0,0 +1,100 @@
+"""
+Separación de PDFs con varios formularios de incidente.
+
+Algunas presentaciones provinciales y las impresiones de Webmail concatenan
+varios formularios en un mismo PDF. Cada extractor declara el encabezado de
+su formulario (BaseExtractor.ANCLA, con el número de comunicado como grupo);
+las anclas de todas las operadoras se combinan en una sola regex y el texto
+se recorre una única vez. Las anclas salen de la metadata de los plugins:
+sólo se importan los extractores de los formularios que aparecen.
+
+Un formulario nuevo empieza cuando aparece un ancla con otro número (u otra
+operadora): un mismo número repetido (ej. informe preliminar + final del
+mismo comunicado) sigue perteneciendo al mismo segmento. Los cortes se
+alinean al inicio de la página del ancla, salvo que el segmento anterior
+empiece en esa misma página.
+"""
+
+import re
+from bisect import bisect_right
+from functools import lru_cache
+from typing import NamedTuple
+
+from src.extractors import plugins
+from src.extractors.plugins import Plugin
+from src.extractors.registry import PLUGINS
+
+SALTO_PAGINA = chr(12)
+
+
+class Segmento(NamedTuple):
+    texto: str
+    pagina_desde: int            # 1-based, inclusive
+    pagina_hasta: int
+    extractor: type | None       # operadora del ancla (None = sin anclas)
+    numero: str | None           # número de comunicado del ancla
+
+
+@lru_cache(maxsize=None)
+def _patron_anclas() -> tuple[re.Pattern, tuple[tuple[int, Plugin], ...]]:
+    """Regex combinada de todas las anclas + (índice del grupo del número, plugin)."""
+    con_ancla = [p for p in PLUGINS if p.ancla]
+    if not con_ancla:
+        return re.compile(r'(?!)'), ()
+    patron = re.compile(
+        '|'.join(f'(?P<a{i}>{p.ancla})' for i, p in enumerate(con_ancla)),
+        re.IGNORECASE,
+    )
+    grupos = tuple((patron.groupindex[f'a{i}'] + 1, p) for i, p in enumerate(con_ancla))
+    return patron, grupos
+
+
+def dividir_en_segmentos(texto: str) -> list[Segmento]:
+    """
+    Divide el texto de un PDF (páginas separadas por \\f) en formularios.
+    Siempre retorna al menos un segmento; con uno solo, es el texto completo.
+    """
+    saltos = [i for i, c in enumerate(texto) if c == SALTO_PAGINA]
+    total_paginas = len(saltos) + 1
+
+    def _pagina(pos: int) -> int:
+        return bisect_right(saltos, pos - 1) + 1
+
+    def _inicio_pagina(pagina: int) -> int:
+        return 0 if pagina == 1 else saltos[pagina - 2] + 1
+
+    patron, grupos = _patron_anclas()
+    cortes: list[tuple[int, Plugin, str]] = []   # (posición, plugin, número)
+    for m in patron.finditer(texto):
+        indice = int(m.lastgroup[1:])
+        grupo, plugin = grupos[indice]
+        numero = (m.group(grupo) or '').strip().upper()
+        if cortes and cortes[-1][1] is plugin and cortes[-1][2] == numero:
+            continue
+        cortes.append((m.start(), plugin, numero))
+
+    if len(cortes) < 2:
+        if not cortes:
+            return [Segmento(texto, 1, total_paginas, None, None)]
+        return [Segmento(texto, 1, total_paginas, plugins.cargar(cortes[0][1]), cortes[0][2])]
+
+    inicios = [0]
+    for (pos, _, _), (pos_previa, _, _) in zip(cortes[1:], cortes):
+        pagina = _pagina(pos)
+        inicio = _inicio_pagina(pagina)
+        if inicio <= max(pos_previa, inicios[-1]):
+            # Dos formularios en la misma página: cortar al inicio de la línea
+            inicio = texto.rfind('\n', 0, pos) + 1
+            if inicio <= pos_previa:
+                inicio = pos
+        inicios.append(inicio)
+
+    segmentos = []
+    for i, (_, plugin, numero) in enumerate(cortes):
+        desde = inicios[i]
+        hasta = inicios[i + 1] if i + 1 < len(inicios) else len(texto)
+        # Un corte al inicio de página deja el \f final en este segmento:
+        # la página del último carácter sigue siendo la correcta
+        segmentos.append(Segmento(texto[desde:hasta], _pagina(desde),
+                                  _pagina(hasta - 1), plugins.cargar(plugin), numero))
+    return segmentos
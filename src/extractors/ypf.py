@@ -17,16 +17,20 @@ class YPFExtractor(BaseExtractor):
 
     El PDF de YPF es el más completo y estructurado: incluye tres
     representaciones de coordenadas (GMS, GM y DD). Priorizamos DD
-    porque viene explícita y no requiere conversión.
+    porque viene explícita y no requiere conversión; GM y GMS se guardan
+    crudas para detectar errores de tipeo en cualquiera de las tres.
     """
 
+    # Encabezado de cada formulario; el grupo es el número de comunicado
+    ANCLA = r'Comunicado Incidente\s+N[°º]\s*([\d]+)'
+
     def extract(self, text: str) -> dict:
         data = {}
 
         # ── Identificación ──────────────────────────────────────────────
         data['OPERADOR'] = "YPF S.A."
 
-        num_inc = self._find(r'Comunicado Incidente\s+N[°º]\s*([\d]+)', text)
+        num_inc = self._find(self.ANCLA, text)
         data['NUM_INC'] = f"YPF-{num_inc}" if num_inc else None
 
         # ── Área y ubicación ────────────────────────────────────────────
@@ -74,7 +78,20 @@ class YPFExtractor(BaseExtractor):
         data['SRID_ORIGEN'] = "WGS84-DD"
 
         if not self.validate_coordinates(data['Y_COORD'], data['X_COORD']):
-            logger.warning(f"[YPF] Coordenadas inválidas en {data['NUM_INC']}")
+            logger.warning("[YPF] Coordenadas inválidas en %s", data['NUM_INC'])
+
+        # Las otras dos representaciones se guardan tal cual y se cruzan con
+        # la DD en lote (src/analysis/validacion_coordenadas.py):
+        # "Latitud (S): 37 ° / 20.936 ' Longitud (W): 69 ° / 3.204 '"
+        # "Latitud (S): 37 ° / 20 ' / 56.2 '' Longitud (W): 69 ° / 3 ' / 12.2 ''"
+        reportadas = {}
+        for sistema, titulo in (('GM', r'Grados, minutos y decimales'),
+                                ('GMS', r'Grados, minutos, segundos y decimales')):
+            patron = titulo + r':\s*Latitud\s*\(S\):\s*(.+?)\s+Longitud\s*\(W\):\s*([^\n]+)'
+            lat_txt, lon_txt = self._find(patron, text, 1), self._find(patron, text, 2)
+            if lat_txt and lon_txt:
+                reportadas[sistema] = [lat_txt, lon_txt]
+        data['COORDS_REPORTADAS'] = reportadas or None
 
         # ── Volúmenes ───────────────────────────────────────────────────
         data['VOL_D_m3'] = self._find_float(
@@ -0,0 +1,248 @@
+"""
+Corpus de referencia para cambios de extractores (prueba diferencial).
+
+Tocar un regex de una operadora puede cambiar campos en documentos que no
+están en tests/conftest.py. El corpus guarda, para cada documento con texto
+cacheado, el texto y el dict crudo que produjo cada extractor (uno por
+formulario). Antes de un cambio:
+
+    python src/main.py golden record      # congela la salida actual
+    ... editar el extractor ...
+    python src/main.py golden diff --workers 4
+
+`diff` vuelve a extraer todo el corpus en el pool de workers (por lotes, con
+timeout: un regex desbocado aborta su lote en vez de colgar la corrida) y
+reporta, por operadora y campo, cuántos valores cambiaron, aparecieron
+(None → valor) o se perdieron (valor → None), con ejemplos.
+
+El archivo es JSONL comprimido con gzip: una línea de encabezado y una por
+documento, así que es autocontenido y no necesita la base ni los PDFs.
+"""
+
+import gzip
+import json
+import logging
+import os
+import sqlite3
+import time
+from collections import Counter, defaultdict
+from datetime import datetime
+from typing import NamedTuple
+
+logger = logging.getLogger(__name__)
+
+FORMATO = 1
+DOCS_POR_LOTE = 50
+EJEMPLOS_POR_CAMPO = 3
+
+# Pseudo-campos para cambios que no son de un campo del dict
+CAMPO_EXTRACTOR = '(extractor)'
+CAMPO_SEGMENTO = '(formulario)'
+CAMPO_ERROR = '(error)'
+
+
+class Diferencia(NamedTuple):
+    documento: str
+    operadora: str
+    campo: str
+    tipo: str               # 'cambiado' | 'agregado' | 'perdido'
+    antes: object
+    despues: object
+
+
+# ── Extracción cruda (corre en los workers) ──────────────────────────────────
+
+def extraer_segmentos(texto: str) -> list[dict]:
+    """
+    Dict crudo de cada formulario del texto, con el mismo criterio de
+    segmentación e identificación que analizar_texto, sin normalizar.
+    """
+    from src.extractors.registry import identify_extractor
+    from src.extractors.segmentacion import dividir_en_segmentos
+
+    segmentos = dividir_en_segmentos(texto)
+    if len(segmentos) == 1:
+        extractores = [(texto, identify_extractor(texto))]
+    else:
+        extractores = [(s.texto, s.extractor() if s.extractor else None) for s in segmentos]
+
+    salida = []
+    for seg_texto, extractor in extractores:
+        if extractor is None:
+            salida.append({'extractor': None, 'campos': None})
+            continue
+        nombre = type(extractor).__name__
+        try:
+            # Ida y vuelta por JSON: tuplas → listas, igual que en el archivo
+            campos = json.loads(json.dumps(extractor.extract(seg_texto), ensure_ascii=False))
+        except (KeyError, AttributeError, ValueError) as e:
+            salida.append({'extractor': nombre, 'campos': None,
+                           'error': f"{type(e).__name__}: {e}"})
+            continue
+        salida.append({'extractor': nombre, 'campos': campos})
+    return salida
+
+
+def _extraer_lote(etiqueta: str, lote):
+    """Función del worker: [(sha256, texto), ...] → {sha256: segmentos}."""
+    from src.ingestion.workers import ResultadoDocumento
+    return ResultadoDocumento('ok', data={sha: extraer_segmentos(t) for sha, t in lote})
+
+
+def extraer_corpus(documentos: list[dict], workers: int = 1,
+                   timeout: float | None = None) -> dict[str, list[dict] | str]:
+    """
+    Extrae todos los documentos del corpus en el pool. Retorna sha256 →
+    segmentos, o sha256 → detalle del error si su lote falló.
+    """
+    from src.ingestion.workers import MAX_MEM_MB, TIMEOUT_DOC, PoolCaliente
+
+    lotes = [documentos[i:i + DOCS_POR_LOTE] for i in range(0, len(documentos), DOCS_POR_LOTE)]
+    resultados: dict[str, list[dict] | str] = {}
+    with PoolCaliente(workers, timeout=timeout or TIMEOUT_DOC, max_mem_mb=MAX_MEM_MB,
+                      funcion=_extraer_lote) as pool:
+        futuros = [(lote, pool.enviar(f"lote {n}", [(d['sha256'], d['texto']) for d in lote]))
+                   for n, lote in enumerate(lotes, start=1)]
+        for lote, futuro in futuros:
+            r = futuro.result()
+            if r.estado == 'ok':
+                resultados.update(r.data)
+            else:
+                logger.error("Lote de %d documentos abortado (%s): %s",
+                             len(lote), r.estado, r.detalle)
+                resultados.update((d['sha256'], f"{r.estado}: {r.detalle}") for d in lote)
+    return resultados
+
+
+# ── Archivo del corpus ───────────────────────────────────────────────────────
+
+def leer_corpus(path: str) -> tuple[dict, list[dict]]:
+    """(encabezado, documentos) del archivo."""
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        encabezado = json.loads(f.readline())
+        if encabezado.get('formato') != FORMATO:
+            raise ValueError(f"{path}: formato de corpus {encabezado.get('formato')!r} "
+                             f"no soportado (se espera {FORMATO})")
+        return encabezado, [json.loads(linea) for linea in f]
+
+
+def escribir_corpus(path: str, documentos: list[dict]) -> None:
+    from src.extractors.registry import version_registro
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    temporal = path + '.tmp'
+    with gzip.open(temporal, 'wt', encoding='utf-8') as f:
+        encabezado = {'formato': FORMATO, 'registro': version_registro(),
+                      'generado': datetime.now().isoformat(timespec='seconds'),
+                      'documentos': len(documentos)}
+        f.write(json.dumps(encabezado) + '\n')
+        for doc in documentos:
+            f.write(json.dumps(doc, ensure_ascii=False) + '\n')
+    os.replace(temporal, path)
+
+
+def grabar_corpus(conn: sqlite3.Connection, path: str, workers: int = 1,
+                  timeout: float | None = None) -> int:
+    """
+    Congela la salida actual de los extractores para todos los documentos
+    con texto cacheado. Retorna cuántos documentos quedaron en el corpus.
+    """
+    from src.storage.textos import obtener_texto
+
+    filas = conn.execute('''
+        SELECT t.SHA256, COALESCE(d.NOMBRE, t.SHA256)
+        FROM textos t LEFT JOIN documentos d ON d.SHA256 = t.SHA256
+        ORDER BY 2, 1
+    ''').fetchall()
+    documentos = [{'sha256': sha, 'nombre': nombre, 'texto': obtener_texto(conn, sha)}
+                  for sha, nombre in filas]
+    resultados = extraer_corpus(documentos, workers, timeout)
+    grabados = []
+    for doc in documentos:
+        segmentos = resultados.get(doc['sha256'])
+        if isinstance(segmentos, list):
+            grabados.append({**doc, 'segmentos': segmentos})
+        else:
+            logger.warning("[%s] No se incluye en el corpus: %s", doc['nombre'], segmentos)
+    escribir_corpus(path, grabados)
+    return len(grabados)
+
+
+# ── Comparación ──────────────────────────────────────────────────────────────
+
+def _tipo(antes, despues) -> str:
+    if antes is None:
+        return 'agregado'
+    if despues is None:
+        return 'perdido'
+    return 'cambiado'
+
+
+def comparar_documento(nombre: str, esperado: list[dict],
+                       obtenido: list[dict]) -> list[Diferencia]:
+    """Diferencias campo a campo entre los formularios esperados y los obtenidos."""
+    difs = []
+    for i in range(max(len(esperado), len(obtenido))):
+        exp = esperado[i] if i < len(esperado) else None
+        obt = obtenido[i] if i < len(obtenido) else None
+        operadora = (exp or obt)['extractor'] or '(sin identificar)'
+        if exp is None or obt is None:
+            difs.append(Diferencia(nombre, operadora, CAMPO_SEGMENTO,
+                                   _tipo(exp and i + 1, obt and i + 1),
+                                   exp and i + 1, obt and i + 1))
+            continue
+        if exp['extractor'] != obt['extractor']:
+            difs.append(Diferencia(nombre, operadora, CAMPO_EXTRACTOR,
+                                   _tipo(exp['extractor'], obt['extractor']),
+                                   exp['extractor'], obt['extractor']))
+            continue
+        if exp.get('error') != obt.get('error'):
+            difs.append(Diferencia(nombre, operadora, CAMPO_ERROR,
+                                   _tipo(exp.get('error'), obt.get('error')),
+                                   exp.get('error'), obt.get('error')))
+        campos_exp, campos_obt = exp['campos'] or {}, obt['campos'] or {}
+        for campo in [*campos_exp, *(c for c in campos_obt if c not in campos_exp)]:
+            antes, despues = campos_exp.get(campo), campos_obt.get(campo)
+            if antes != despues:
+                difs.append(Diferencia(nombre, operadora, campo,
+                                       _tipo(antes, despues), antes, despues))
+    return difs
+
+
+class Reporte(NamedTuple):
+    documentos: int
+    con_cambios: int
+    conteos: Counter                         # (operadora, campo, tipo) → n
+    ejemplos: dict                           # (operadora, campo) → [Diferencia]
+    segundos: float
+
+    @property
+    def total(self) -> int:
+        return sum(self.conteos.values())
+
+
+def comparar_corpus(path: str, workers: int = 1, timeout: float | None = None,
+                    ejemplos: int = EJEMPLOS_POR_CAMPO) -> Reporte:
+    """Reextrae el corpus con el código actual y lo compara con lo grabado."""
+    t0 = time.perf_counter()
+    encabezado, documentos = leer_corpus(path)
+    logger.info("Corpus: %d documentos (grabado %s)", len(documentos), encabezado.get('generado'))
+    resultados = extraer_corpus(documentos, workers, timeout)
+
+    conteos: Counter = Counter()
+    muestras: dict = defaultdict(list)
+    con_cambios = 0
+    for doc in documentos:
+        obtenido = resultados[doc['sha256']]
+        if isinstance(obtenido, str):
+            obtenido = [{'extractor': s['extractor'], 'campos': None, 'error': obtenido}
+                        for s in doc['segmentos']]
+        difs = comparar_documento(doc['nombre'], doc['segmentos'], obtenido)
+        con_cambios += bool(difs)
+        for d in difs:
+            conteos[(d.operadora, d.campo, d.tipo)] += 1
+            if len(muestras[(d.operadora, d.campo)]) < ejemplos:
+                muestras[(d.operadora, d.campo)].append(d)
+    return Reporte(len(documentos), con_cambios, conteos, dict(muestras),
+                   time.perf_counter() - t0)
+
@@ -0,0 +1,166 @@
+"""
+Ingesta directa de exportaciones de correo (.eml y .mbox).
+
+Los comunicados llegan como adjuntos PDF en mails del webmail del Gobierno
+de Mendoza. En lugar de guardar cada adjunto a mano en data/raw, este módulo
+recorre los mensajes exportados, decodifica los adjuntos PDF en memoria y
+los pasa directamente a PyMuPDF con `fitz.open(stream=...)`: ningún adjunto
+se escribe en disco.
+
+    python src/main.py email exportes/2025.mbox exportes/sueltos/
+
+Memoria acotada: los mensajes se leen de a uno (mailbox sólo mantiene la
+tabla de offsets del .mbox) y cada adjunto se libera apenas se procesa.
+Los adjuntos repetidos (mismo SHA-256) se procesan una sola vez, tanto dentro
+de la pasada como entre corridas, gracias a la tabla `documentos`.
+"""
+
+import email
+import hashlib
+import logging
+import mailbox
+import os
+import sqlite3
+from email import policy
+from email.message import EmailMessage
+from email.utils import parsedate_to_datetime
+from typing import Iterable, Iterator, NamedTuple
+
+logger = logging.getLogger(__name__)
+
+class AdjuntoPDF(NamedTuple):
+    nombre: str            # filename declarado en el adjunto
+    datos: bytes           # contenido del PDF
+    sha256: str
+    message_id: str | None
+    fecha: str | None      # fecha del mensaje, ISO 8601
+    origen: str            # archivo .eml/.mbox de donde salió
+
+
+# ── Lectura de mensajes ─────────────────────────────────────────────────────
+
+def iterar_mensajes(paths: Iterable[str]) -> Iterator[tuple[str, EmailMessage]]:
+    """
+    Recorre archivos .eml, .mbox y directorios que los contengan.
+    Produce (origen, mensaje) de a uno por vez.
+    """
+    for path in paths:
+        if os.path.isdir(path):
+            hijos = sorted(
+                os.path.join(path, f) for f in os.listdir(path)
+                if f.lower().endswith(('.eml', '.mbox'))
+            )
+            yield from iterar_mensajes(hijos)
+        elif path.lower().endswith('.mbox'):
+            yield from _mensajes_mbox(path)
+        elif path.lower().endswith('.eml'):
+            with open(path, 'rb') as f:
+                yield path, email.message_from_binary_file(f, policy=policy.default)
+        else:
+            logger.warning("Se omite (no es .eml ni .mbox): %s", path)
+
+
+def _mensajes_mbox(path: str) -> Iterator[tuple[str, EmailMessage]]:
+    caja = mailbox.mbox(
+        path, create=False,
+        factory=lambda f: email.message_from_binary_file(f, policy=policy.default),
+    )
+    try:
+        for mensaje in caja.itervalues():
+            yield path, mensaje
+    finally:
+        caja.close()
+
+
+def extraer_adjuntos(mensaje: EmailMessage, origen: str) -> Iterator[AdjuntoPDF]:
+    """Adjuntos PDF de un mensaje (incluye mensajes reenviados anidados)."""
+    message_id = (mensaje.get('Message-ID') or '').strip() or None
+    fecha = _fecha_iso(mensaje.get('Date'))
+
+    for parte in mensaje.walk():
+        if parte.is_multipart():
+            continue
+        nombre = parte.get_filename() or ''
+        es_pdf = (parte.get_content_type() == 'application/pdf'
+                  or nombre.lower().endswith('.pdf'))
+        if not es_pdf:
+            continue
+        datos = parte.get_payload(decode=True)
+        if not datos:
+            continue
+        yield AdjuntoPDF(
+            nombre=nombre or 'adjunto.pdf',
+            datos=datos,
+            sha256=hashlib.sha256(datos).hexdigest(),
+            message_id=message_id,
+            fecha=fecha,
+            origen=origen,
+        )
+
+
+def iterar_adjuntos(paths: Iterable[str]) -> Iterator[AdjuntoPDF]:
+    """
+    Flujo de adjuntos PDF únicos (por SHA-256) dentro de esta pasada.
+    Sólo se guardan los hashes ya vistos, nunca los contenidos.
+    """
+    vistos: set[str] = set()
+    for origen, mensaje in iterar_mensajes(paths):
+        for adjunto in extraer_adjuntos(mensaje, origen):
+            if adjunto.sha256 in vistos:
+                logger.debug("Adjunto repetido en la pasada: %s", adjunto.nombre)
+                continue
+            vistos.add(adjunto.sha256)
+            yield adjunto
+
+
+def _fecha_iso(valor: str | None) -> str | None:
+    if not valor:
+        return None
+    try:
+        return parsedate_to_datetime(str(valor)).isoformat()
+    except (TypeError, ValueError):
+        logger.warning("Fecha de mensaje no reconocida: '%s'", valor)
+        return None
+
+
+# ── Carga en la base ────────────────────────────────────────────────────────
+
+def run_correo(paths: list[str], db_path: str, workers: int = 1,
+               timeout: float | None = None, max_mem_mb: int | None = None,
+               cola_log=None, nivel_log: int = logging.INFO,
+               eventos_jsonl: bool = False) -> dict:
+    """
+    Procesa todos los adjuntos PDF de los correos indicados en una pasada.
+    Cada adjunto corre en un worker aislado (timeout y tope de memoria);
+    como mucho `2 × workers` adjuntos están en memoria a la vez.
+    """
+    from src.main import (DocumentoEntrada, crear_pool, documento_registrado,
+                          init_database, nuevas_stats, procesar_documentos,
+                          resumen_stats)
+    from src.storage import cuarentena
+
+    init_database(db_path)
+    stats = nuevas_stats()
+    stats['ya_procesados'] = 0
+
+    def _documentos(conn):
+        for adj in iterar_adjuntos(paths):
+            # Un adjunto que falló también queda registrado: si está en
+            # cuarentena decide procesar_documentos (se reintenta cuando
+            # cambia la versión del extractor, como en data/raw)
+            if documento_registrado(conn, adj.sha256) and \
+                    not cuarentena.contiene(conn, adj.sha256):
+                stats['ya_procesados'] += 1
+                continue
+            yield DocumentoEntrada(
+                f"{os.path.basename(adj.origen)}:{adj.nombre}", adj.origen,
+                adj.sha256, adj.datos, adj.message_id, adj.fecha)
+
+    pool = crear_pool(workers, timeout, max_mem_mb, cola_log, nivel_log, eventos_jsonl)
+    with sqlite3.connect(db_path) as conn, pool:
+        procesar_documentos(conn, pool, _documentos(conn), stats)
+
+    resumen_stats("Correo procesado", stats)
+    logger.info("Adjuntos ya procesados en corridas anteriores: %d",
+                stats['ya_procesados'])
+    return stats
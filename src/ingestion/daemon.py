@@ -0,0 +1,93 @@
+"""
+Modo daemon: vigila data/raw y procesa cada PDF nuevo en cuanto termina
+de copiarse, usando un pool de workers precargados.
+
+    python src/main.py watch
+
+La conexión SQLite queda abierta durante toda la vida del daemon y cada
+incidente se confirma (commit) apenas llega, de modo que la fila aparece
+en la base a las pocas décimas de segundo de soltar el archivo.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+
+from src.ingestion.watcher import VigilanteCarpeta
+
+logger = logging.getLogger(__name__)
+
+
+def run_daemon(raw_dir: str, db_path: str, workers: int = 2,
+               intervalo: float = 0.2, estabilidad: float = 0.4,
+               procesar_existentes: bool = True, cola_log=None,
+               nivel_log: int = logging.INFO, eventos_jsonl: bool = False,
+               timeout: float | None = None, max_mem_mb: int | None = None,
+               detener: threading.Event | None = None) -> dict:
+    """
+    Bucle principal del daemon. Retorna las estadísticas al detenerse
+    (Ctrl+C o `detener.set()` desde otro hilo).
+    """
+    from src.main import (cargar_resultado, crear_pool, init_database, leer_documento,
+                          nuevas_stats, resumen_stats)
+    from src.storage.cuarentena import en_cuarentena
+
+    if not os.path.isdir(raw_dir):
+        logger.error("Directorio no encontrado: %s", raw_dir)
+        return {}
+
+    init_database(db_path)
+    detener = detener or threading.Event()
+    vigilante = VigilanteCarpeta(raw_dir, intervalo=intervalo,
+                                 estabilidad=estabilidad)
+    if not procesar_existentes:
+        n = vigilante.marcar_existentes()
+        logger.info("Se ignoran %d PDFs ya presentes en %s", n, raw_dir)
+
+    stats = nuevas_stats()
+    en_vuelo: dict[Future, tuple[str, str, float]] = {}
+    conn = sqlite3.connect(db_path)
+    pool = crear_pool(workers, timeout, max_mem_mb, cola_log, nivel_log, eventos_jsonl)
+
+    with pool:
+        pool.calentar()
+        logger.info("Daemon vigilando %s (sondeo cada %.2f s)", raw_dir, intervalo)
+        try:
+            while not detener.is_set():
+                for path in vigilante.escanear():
+                    t0 = time.perf_counter()
+                    doc = leer_documento(path)
+                    if doc is None:
+                        continue
+                    if en_cuarentena(conn, doc.sha256):
+                        logger.info("[%s] En cuarentena, se omite.", doc.nombre)
+                        stats['cuarentena'] += 1
+                        continue
+                    logger.info("Procesando: %s", doc.nombre)
+                    futuro = pool.enviar(path, doc.datos)
+                    en_vuelo[futuro] = (path, doc.sha256, t0)
+
+                if not en_vuelo:
+                    detener.wait(vigilante.intervalo)
+                    continue
+
+                hechos, _ = wait(en_vuelo, timeout=vigilante.intervalo,
+                                 return_when=FIRST_COMPLETED)
+                for futuro in hechos:
+                    path, sha256, t0 = en_vuelo.pop(futuro)
+                    filename = os.path.basename(path)
+                    ms = (time.perf_counter() - t0) * 1000
+                    desenlace = cargar_resultado(conn, futuro.result(), filename,
+                                                 path, stats, ms=ms, sha256=sha256)
+                    conn.commit()
+                    logger.info("[%s] %s en %.0f ms", filename, desenlace, ms)
+        except KeyboardInterrupt:
+            logger.info("Daemon detenido por el usuario.")
+        finally:
+            conn.close()
+
+    resumen_stats("Daemon finalizado", stats)
+    return stats
@@ -0,0 +1,162 @@
+"""
+Reextracción selectiva de documentos ya cargados.
+
+Cada documento guarda en la tabla `documentos` qué extractor produjo su
+incidente y la versión de ese extractor (BaseExtractor.version()). Al
+corregir un regex de una operadora, su versión cambia y:
+
+    python src/main.py reprocess --stale
+
+vuelve a extraer sólo los documentos de esa operadora. El texto sale de la
+caché (tabla `textos`), así que no hace falta abrir los PDFs ni que sigan
+en disco; si no está cacheado, se relee el PDF desde su origen. Sólo se
+escriben las filas cuyos campos cambiaron.
+"""
+
+import logging
+import sqlite3
+
+logger = logging.getLogger(__name__)
+
+
+def nuevas_stats_reproceso() -> dict:
+    return {'actualizados': 0, 'sin_cambios': 0, 'nuevos': 0, 'errores': 0,
+            'sin_origen': 0}
+
+
+def documentos_vencidos(conn: sqlite3.Connection, todos: bool = False) -> list[dict]:
+    """
+    Documentos que produjeron incidentes con una versión de extractor que ya
+    no es la vigente. Los cargados antes de registrar versiones (EXTRACTOR
+    NULL) también cuentan como vencidos. Con `todos`, retorna todos.
+    """
+    from src.extractors.registry import extractor_por_nombre
+
+    cursor = conn.execute('''
+        SELECT d.SHA256, d.NOMBRE, d.ORIGEN, d.EXTRACTOR, d.VERSION
+        FROM documentos d
+        WHERE d.EXTRACTOR IS NOT NULL
+           OR EXISTS (SELECT 1 FROM procedencia p WHERE p.SHA256 = d.SHA256)
+        ORDER BY d.REGISTRADO_EN, d.SHA256
+    ''')
+    columnas = [d[0] for d in cursor.description]
+    vencidos = []
+    for fila in cursor:
+        doc = dict(zip(columnas, fila))
+        cls = extractor_por_nombre(doc['EXTRACTOR']) if doc['EXTRACTOR'] else None
+        if todos or cls is None or cls.version() != doc['VERSION']:
+            vencidos.append(doc)
+    return vencidos
+
+
+def _cargar_reextraccion(conn: sqlite3.Connection, doc, resultado, stats: dict,
+                         ms: float) -> None:
+    from src.main import (IncidenteExtraido, actualizar_incidente, insert_incidents,
+                          registrar_documento)
+    from src.storage import textos
+
+    data = resultado.data
+    if data is None:
+        # El código nuevo ya no extrae este documento: se conserva la fila
+        # anterior y la versión vieja, para que siga figurando como vencido.
+        logger.error("[%s] La reextracción falló (%s): %s",
+                     doc.nombre, resultado.etapa or resultado.estado, resultado.detalle)
+        stats['errores'] += 1
+        return
+
+    previos = [f[0] for f in conn.execute(
+        "SELECT NUM_INC FROM procedencia WHERE SHA256 = ?", (doc.sha256,))]
+    incidentes = resultado.incidentes or (IncidenteExtraido(data),)
+    nuevos = []
+    for inc in incidentes:
+        num_inc = inc.data.get('NUM_INC')
+        if num_inc in previos:
+            previo = num_inc
+        elif len(incidentes) == 1 and len(previos) == 1:
+            previo = previos[0]   # el extractor corregido cambió el NUM_INC
+        else:
+            previo = None
+
+        cambios = actualizar_incidente(conn, inc.data, previo) if previo else None
+        if cambios is None:
+            nuevos.append(inc)     # se insertan juntos al final
+            continue
+        if cambios:
+            logger.info("[%s] %s actualizado: %s", doc.nombre, num_inc, ', '.join(cambios))
+            stats['actualizados'] += 1
+        else:
+            stats['sin_cambios'] += 1
+        registrar_documento(conn, doc.sha256, doc.nombre, doc.origen, num_inc=num_inc,
+                            paginas=(inc.pagina_desde, inc.pagina_hasta))
+
+    for inc, insertado in zip(nuevos, insert_incidents(conn, [inc.data for inc in nuevos])):
+        if not insertado:
+            stats['errores'] += 1
+            continue
+        stats['nuevos'] += 1
+        registrar_documento(conn, doc.sha256, doc.nombre, doc.origen,
+                            num_inc=inc.data.get('NUM_INC'),
+                            paginas=(inc.pagina_desde, inc.pagina_hasta))
+
+    registrar_documento(conn, doc.sha256, doc.nombre, doc.origen,
+                        extractor=resultado.extractor)
+    if resultado.texto is not None:
+        textos.guardar_texto(conn, doc.sha256, resultado.texto)
+
+
+def run_reproceso(db_path: str, todos: bool = False, workers: int = 1,
+                  timeout: float | None = None, max_mem_mb: int | None = None,
+                  cola_log=None, nivel_log: int = logging.INFO,
+                  eventos_jsonl: bool = False) -> dict:
+    """
+    Reextrae los documentos vencidos (o todos) en paralelo y actualiza sólo
+    las filas que cambian.
+    """
+    from src.main import (DocumentoEntrada, crear_pool, init_database,
+                          procesar_documentos, releer_documentos)
+    from src.storage import cambios
+    from src.storage.textos import obtener_texto
+
+    init_database(db_path)
+    stats = nuevas_stats_reproceso()
+    with sqlite3.connect(db_path) as conn:
+        vencidos = documentos_vencidos(conn, todos)
+        if not vencidos:
+            logger.info("No hay documentos para reextraer.")
+            return stats
+        logger.info("Documentos a reextraer: %d", len(vencidos))
+
+        def _documentos():
+            sin_cache = []
+            for d in vencidos:
+                texto = obtener_texto(conn, d['SHA256'])
+                if texto is None:
+                    sin_cache.append(d)
+                    continue
+                yield DocumentoEntrada(d['NOMBRE'], d['ORIGEN'], d['SHA256'], texto)
+            if sin_cache:
+                logger.info("Sin texto en caché: %d; se releen desde su origen",
+                            len(sin_cache))
+            releidos = 0
+            for doc in releer_documentos((d['ORIGEN'], d['SHA256']) for d in sin_cache):
+                releidos += 1
+                yield doc
+            stats['sin_origen'] += len(sin_cache) - releidos
+
+        pool = crear_pool(workers, timeout, max_mem_mb, cola_log, nivel_log, eventos_jsonl)
+        corrida = cambios.iniciar_corrida(conn, 'reprocess')
+        try:
+            with pool:
+                procesar_documentos(conn, pool, _documentos(), stats,
+                                    respetar_cuarentena=False,
+                                    cargar=_cargar_reextraccion)
+        finally:
+            cambios.cerrar_corrida(conn, corrida)
+
+    logger.info(
+        "Reextracción finalizada — Actualizados: %d | Sin cambios: %d | "
+        "Nuevos: %d | Errores: %d | Sin origen: %d",
+        stats['actualizados'], stats['sin_cambios'], stats['nuevos'],
+        stats['errores'], stats['sin_origen']
+    )
+    return stats
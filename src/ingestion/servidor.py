@@ -0,0 +1,482 @@
+"""
+Servicio HTTP local: carga de un PDF por pedido, con el incidente en la
+respuesta, y consulta de incidentes con caché condicional.
+
+    python src/main.py serve --port 8765 --workers 2
+    curl --data-binary @comunicado.pdf -H 'X-Nombre: comunicado.pdf' \\
+         http://127.0.0.1:8765/incidents
+
+Cada PDF se analiza en el mismo pool de workers precargados que usan `run` y
+`watch` (timeout y tope de memoria por documento). La carga en la base la
+hace un único hilo escritor con su propia conexión: junta los resultados que
+llegan casi juntos y los confirma con un solo commit (commit agrupado), con
+el mismo cargar_resultado de las otras entradas. La respuesta sale recién
+después del commit.
+
+Contrapresión: como mucho `max_cola` PDFs están en proceso a la vez (en el
+pool o esperando al escritor). El pedido siguiente recibe 503 con
+Retry-After en lugar de acumular bytes en memoria.
+
+Respuestas de POST /incidents (JSON):
+
+  201  se insertó al menos un incidente
+  200  se extrajo, pero no se insertó nada (NUM_INC ya cargado)
+  422  no se reconoció el formato o falló la extracción (queda en cuarentena)
+  504  superó el timeout del worker
+  500  error o falta de memoria en el worker
+  400 / 411 / 413  cuerpo vacío o que no es un PDF / sin Content-Length / demasiado grande
+  503  cola llena
+
+GET /incidents?operador=&desde=AAAA-MM-DD&hasta=&magnitud=&bbox=&limite=&despues=
+lee la base con los filtros y la paginación de storage/consultas.py. ETag y
+Last-Modified salen del contador de cambios de la tabla incidentes: si no
+hubo escrituras, If-None-Match responde 304 sin consultar. Last-Modified
+tiene resolución de segundos: If-Modified-Since responde 304 sólo si el
+último cambio es anterior a la fecha pedida (dos escrituras en el mismo
+segundo no deben parecer una sola).
+Las respuestas serializadas se memorizan por consulta y se descartan solas
+cuando cambia el contador, así que un tablero que pregunta cada minuto
+cuesta una lectura de una fila. `serve --solo-lectura` atiende sólo GET,
+sin levantar el pool.
+
+GET /changes?despues=SEQ&limite= devuelve el registro de cambios posterior a
+SEQ (storage/cambios.py) y la secuencia desde la cual pedir la próxima tanda.
+"""
+
+import hashlib
+import json
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import NamedTuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from src.extractors.base_extractor import LAT_MAX, LAT_MIN, LON_MAX, LON_MIN
+from src.storage import cambios, consultas
+
+logger = logging.getLogger(__name__)
+
+MAX_COLA = 16                     # PDFs en proceso a la vez antes de responder 503
+MAX_BYTES = 64 * 1024 * 1024      # tamaño máximo del cuerpo
+LOTE_MAX = 50                     # resultados por commit del escritor
+ESPERA_LOTE = 0.02                # segundos que el escritor espera para juntar un lote
+ORIGEN = 'http'
+CACHE_CONSULTAS = 256             # respuestas de GET /incidents memorizadas
+
+_ESTADO_HTTP = {'insertado': 201, 'no_insertado': 200, 'omitido': 422,
+                'timeout': 504, 'error': 500, 'oom': 500}
+
+
+class ColaLlena(Exception):
+    """No hay lugar para otro PDF en proceso."""
+
+
+class _Carga(NamedTuple):
+    nombre: str
+    sha256: str
+    resultado: object             # ResultadoDocumento
+    ms: float
+    futuro: Future                # resuelve al desenlace, después del commit
+
+
+# ── Advertencias de validación ───────────────────────────────────────────────
+
+def advertencias(registro) -> list[str]:
+    """Problemas de un registro que no impiden cargarlo pero conviene revisar."""
+    avisos = []
+    for campo in ('NUM_INC', 'OPERADOR', 'FECHA', 'VOL_M3'):
+        if registro.get(campo) is None:
+            avisos.append(f"{campo} ausente")
+    lat, lon = registro.get('LAT'), registro.get('LON')
+    if lat is None or lon is None:
+        avisos.append("Coordenadas ausentes")
+    elif not (LAT_MIN <= lat <= LAT_MAX and LON_MIN <= lon <= LON_MAX):
+        avisos.append(f"Coordenadas fuera de Mendoza: lat={lat}, lon={lon}")
+    return avisos
+
+
+def _respuesta(nombre: str, sha256: str, resultado, desenlace: str, ms: float) -> dict:
+    from src.main import IncidenteExtraido
+
+    incidentes = resultado.incidentes or (
+        (IncidenteExtraido(resultado.data),) if resultado.data else ())
+    salida = []
+    for inc in incidentes:
+        avisos = advertencias(inc.data)
+        if desenlace == 'no_insertado':
+            avisos.append("NUM_INC ya cargado: no se insertó")
+        salida.append({**dict(inc.data.items()), 'paginas': [inc.pagina_desde, inc.pagina_hasta],
+                       'advertencias': avisos})
+    return {'nombre': nombre, 'sha256': sha256, 'desenlace': desenlace,
+            'extractor': resultado.extractor, 'etapa': resultado.etapa,
+            'detalle': resultado.detalle, 'incidentes': salida, 'ms': round(ms, 1)}
+
+
+# ── Servicio ─────────────────────────────────────────────────────────────────
+
+class ServicioIngesta:
+    """
+    Analiza PDFs en el pool y los carga con commit agrupado. Se usa igual
+    desde el handler HTTP o directamente desde Python:
+
+        with crear_pool(2) as pool, ServicioIngesta(db_path, pool) as servicio:
+            estado, cuerpo = servicio.procesar('x.pdf', datos)
+    """
+
+    def __init__(self, db_path: str, pool, max_cola: int = MAX_COLA):
+        from src.main import nuevas_stats
+
+        self.db_path = db_path
+        self.pool = pool
+        self.max_cola = max_cola
+        self.stats = nuevas_stats()
+        self._cupo = threading.BoundedSemaphore(max_cola)
+        self._en_proceso = 0
+        self._lock = threading.Lock()
+        self._cargas: queue.Queue[_Carga | None] = queue.Queue()
+        self._escritor = threading.Thread(target=self._escribir, name='ingesta-escritor',
+                                          daemon=True)
+        self._escritor.start()
+
+    @property
+    def en_proceso(self) -> int:
+        return self._en_proceso
+
+    def procesar(self, nombre: str, datos: bytes) -> tuple[int, dict]:
+        """
+        (código HTTP, cuerpo JSON) para un PDF. Lanza ColaLlena si ya hay
+        `max_cola` PDFs en proceso.
+        """
+        if not self._cupo.acquire(blocking=False):
+            raise ColaLlena(f"{self.max_cola} documentos en proceso")
+        with self._lock:
+            self._en_proceso += 1
+        try:
+            t0 = time.perf_counter()
+            sha256 = hashlib.sha256(datos).hexdigest()
+            logger.info("Procesando (HTTP): %s", nombre)
+            resultado = self.pool.enviar(nombre, datos).result()
+            futuro: Future = Future()
+            self._cargas.put(_Carga(nombre, sha256, resultado,
+                                    (time.perf_counter() - t0) * 1000, futuro))
+            desenlace = futuro.result()
+            ms = (time.perf_counter() - t0) * 1000
+            logger.info("[%s] %s en %.0f ms (HTTP)", nombre, desenlace, ms)
+            return (_ESTADO_HTTP[desenlace],
+                    _respuesta(nombre, sha256, resultado, desenlace, ms))
+        finally:
+            with self._lock:
+                self._en_proceso -= 1
+            self._cupo.release()
+
+    def cerrar(self) -> None:
+        """Carga lo pendiente y detiene el escritor."""
+        self._cargas.put(None)
+        self._escritor.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+    def _lote(self) -> tuple[list[_Carga], bool]:
+        """Próximo lote de cargas (espera la primera). El bool indica fin."""
+        primera = self._cargas.get()
+        if primera is None:
+            return [], True
+        lote = [primera]
+        while len(lote) < LOTE_MAX:
+            try:
+                carga = self._cargas.get(timeout=ESPERA_LOTE)
+            except queue.Empty:
+                break
+            if carga is None:
+                return lote, True
+            lote.append(carga)
+        return lote, False
+
+    def _escribir(self) -> None:
+        from src.main import cargar_resultado
+
+        conn = sqlite3.connect(self.db_path)
+        try:
+            fin = False
+            while not fin:
+                lote, fin = self._lote()
+                desenlaces = []
+                for c in lote:
+                    try:
+                        desenlaces.append(cargar_resultado(
+                            conn, c.resultado, c.nombre, ORIGEN, self.stats,
+                            ms=c.ms, sha256=c.sha256))
+                    except sqlite3.Error as e:
+                        desenlaces.append(e)
+                try:
+                    conn.commit()
+                except sqlite3.Error as e:
+                    conn.rollback()
+                    desenlaces = [e] * len(lote)
+                for c, d in zip(lote, desenlaces):
+                    if isinstance(d, Exception):
+                        logger.error("[%s] Error cargando en la base: %s", c.nombre, d)
+                        c.futuro.set_exception(d)
+                    else:
+                        c.futuro.set_result(d)
+        finally:
+            conn.close()
+
+
+# ── Lectura ──────────────────────────────────────────────────────────────────
+
+class RespuestaConsulta(NamedTuple):
+    estado: int                   # 200, 304 o 400
+    cuerpo: bytes
+    etag: str | None = None
+    modificado: str | None = None   # fecha HTTP del último cambio
+
+
+class LecturaIncidentes:
+    """
+    GET /incidents: consulta con caché condicional. Cada hilo del servidor
+    usa su propia conexión de sólo lectura.
+    """
+
+    def __init__(self, db_path: str, capacidad: int = CACHE_CONSULTAS):
+        self.db_path = db_path
+        self.capacidad = capacidad
+        self.consultas_ejecutadas = 0
+        self._local = threading.local()
+        self._cache: OrderedDict[str, tuple[int, bytes]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            uri = Path(self.db_path).resolve().as_uri() + '?mode=ro'
+            conn = sqlite3.connect(uri, uri=True)
+            self._local.conn = conn
+        return conn
+
+    def responder(self, query: str, si_no_coincide: str | None = None,
+                  si_modificado_desde: str | None = None) -> RespuestaConsulta:
+        """Respuesta para la query string de un GET y sus encabezados condicionales."""
+        params = dict(parse_qsl(query))
+        clave = urlencode(sorted(params.items()))
+        conn = self._conn()
+        version, modificado = consultas.version(conn)
+        etag = _etag(version, clave)
+        ultima = _fecha(modificado)
+        fecha_http = format_datetime(ultima, usegmt=True)
+
+        if si_no_coincide is not None:
+            if etag in (e.strip() for e in si_no_coincide.split(',')) or si_no_coincide == '*':
+                return RespuestaConsulta(304, b'', etag, fecha_http)
+        elif si_modificado_desde is not None:
+            try:
+                if ultima < parsedate_to_datetime(si_modificado_desde):
+                    return RespuestaConsulta(304, b'', etag, fecha_http)
+            except (TypeError, ValueError):
+                pass
+
+        with self._lock:
+            memo = self._cache.get(clave)
+            if memo is not None and memo[0] == version:
+                self._cache.move_to_end(clave)
+                return RespuestaConsulta(200, memo[1], etag, fecha_http)
+
+        try:
+            filtros = consultas.filtros_desde_query(params)
+            limite = int(params.get('limite', consultas.LIMITE))
+            pagina = consultas.consultar(conn, filtros, limite, params.get('despues'))
+        except ValueError as e:
+            return RespuestaConsulta(400, _json_bytes({'error': str(e)}))
+        self.consultas_ejecutadas += 1
+        cuerpo = _json_bytes({'incidentes': pagina.filas, 'siguiente': pagina.siguiente,
+                              'version': pagina.version})
+        with self._lock:
+            self._cache[clave] = (pagina.version, cuerpo)
+            self._cache.move_to_end(clave)
+            while len(self._cache) > self.capacidad:
+                self._cache.popitem(last=False)
+        # Si hubo una escritura entre la versión leída y la consulta, valen las de la consulta
+        return RespuestaConsulta(200, cuerpo, _etag(pagina.version, clave),
+                                 format_datetime(_fecha(pagina.modificado), usegmt=True))
+
+    def cambios(self, query: str) -> RespuestaConsulta:
+        """GET /changes: cambios con SEQ > despues; sin caché, cuesta O(cambios)."""
+        params = dict(parse_qsl(query))
+        try:
+            despues = int(params.get('despues', 0))
+            limite = max(1, min(int(params.get('limite', cambios.LIMITE)), cambios.LIMITE))
+        except ValueError:
+            return RespuestaConsulta(400, _json_bytes({'error': "'despues' y 'limite' son enteros"}))
+        lote = cambios.despues(self._conn(), despues, limite)
+        return RespuestaConsulta(200, _json_bytes({
+            'cambios': [c.como_dict() for c in lote],
+            'siguiente': lote[-1].seq if lote else despues,
+        }))
+
+
+def _fecha(modificado: str) -> datetime:
+    return datetime.strptime(modificado, '%Y-%m-%dT%H:%M:%SZ').replace(tzinfo=timezone.utc)
+
+
+def _etag(version: int, clave: str) -> str:
+    return f'"{version}-{hashlib.sha1(clave.encode()).hexdigest()[:10]}"'
+
+
+def _json_bytes(cuerpo: dict) -> bytes:
+    return json.dumps(cuerpo, ensure_ascii=False).encode('utf-8')
+
+
+# ── HTTP ─────────────────────────────────────────────────────────────────────
+
+def _decodificar_encabezado(valor: str | None) -> str | None:
+    """http.server decodifica los encabezados como latin-1; curl los manda en UTF-8."""
+    if valor is None:
+        return None
+    try:
+        return valor.encode('latin-1').decode('utf-8')
+    except UnicodeError:
+        return valor
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = 'incidentes/1'
+    # Los fija crear_servidor en una subclase; None = endpoint deshabilitado
+    servicio: ServicioIngesta | None = None
+    lectura: LecturaIncidentes | None = None
+
+    def log_message(self, formato, *args):
+        logger.debug("%s %s", self.address_string(), formato % args)
+
+    def _enviar(self, estado: int, datos: bytes, encabezados: dict | None = None) -> None:
+        self.send_response(estado)
+        if estado != 304:
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(datos)))
+        for clave, valor in (encabezados or {}).items():
+            self.send_header(clave, valor)
+        self.end_headers()
+        if estado != 304:
+            self.wfile.write(datos)
+
+    def _json(self, estado: int, cuerpo: dict, encabezados: dict | None = None) -> None:
+        self._enviar(estado, _json_bytes(cuerpo), encabezados)
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path == '/health':
+            cuerpo = {'estado': 'ok'}
+            if self.servicio is not None:
+                cuerpo.update(en_proceso=self.servicio.en_proceso,
+                              max_cola=self.servicio.max_cola)
+            self._json(200, cuerpo)
+        elif url.path == '/incidents' and self.lectura is not None:
+            try:
+                r = self.lectura.responder(url.query, self.headers.get('If-None-Match'),
+                                           self.headers.get('If-Modified-Since'))
+            except sqlite3.Error as e:
+                self._json(500, {'error': f'base de datos: {e}'})
+                return
+            encabezados = {'Cache-Control': 'no-cache'}
+            if r.etag:
+                encabezados.update({'ETag': r.etag, 'Last-Modified': r.modificado})
+            self._enviar(r.estado, r.cuerpo, encabezados)
+        elif url.path == '/changes' and self.lectura is not None:
+            try:
+                r = self.lectura.cambios(url.query)
+            except sqlite3.Error as e:
+                self._json(500, {'error': f'base de datos: {e}'})
+                return
+            self._enviar(r.estado, r.cuerpo, {'Cache-Control': 'no-cache'})
+        else:
+            self._json(404, {'error': 'no encontrado'})
+
+    def do_POST(self):
+        if urlsplit(self.path).path != '/incidents' or self.servicio is None:
+            self._json(404, {'error': 'no encontrado'})
+            return
+        largo = self.headers.get('Content-Length')
+        if largo is None or not largo.isdigit():
+            self._json(411, {'error': 'falta Content-Length'})
+            return
+        # Sin leer el cuerpo: la conexión se cierra en lugar de drenarlo
+        if int(largo) > MAX_BYTES:
+            self.close_connection = True
+            self._json(413, {'error': f'el PDF supera {MAX_BYTES // (1024 * 1024)} MB'})
+            return
+        if self.servicio.en_proceso >= self.servicio.max_cola:
+            self.close_connection = True
+            self._json(503, {'error': 'cola llena'}, {'Retry-After': '1'})
+            return
+        datos = self.rfile.read(int(largo))
+        if not datos.startswith(b'%PDF'):
+            self._json(400, {'error': 'el cuerpo no es un PDF'})
+            return
+        nombre = _decodificar_encabezado(self.headers.get('X-Nombre')) or 'http.pdf'
+        try:
+            estado, cuerpo = self.servicio.procesar(nombre, datos)
+        except ColaLlena as e:
+            self._json(503, {'error': f'cola llena: {e}'}, {'Retry-After': '1'})
+            return
+        except sqlite3.Error as e:
+            self._json(500, {'error': f'base de datos: {e}'})
+            return
+        self._json(estado, cuerpo)
+
+
+def crear_servidor(servicio: ServicioIngesta | None, host: str = '127.0.0.1',
+                   port: int = 8765,
+                   lectura: LecturaIncidentes | None = None) -> ThreadingHTTPServer:
+    """
+    Servidor HTTP (un hilo por conexión). Sin `servicio` no acepta POST y sin
+    `lectura` no atiende GET /incidents. port=0 elige uno libre.
+    """
+    handler = type('Handler', (_Handler,), {'servicio': servicio, 'lectura': lectura})
+    servidor = ThreadingHTTPServer((host, port), handler)
+    servidor.daemon_threads = True
+    return servidor
+
+
+def run_servidor(db_path: str, host: str = '127.0.0.1', port: int = 8765,
+                 workers: int = 2, max_cola: int = MAX_COLA, solo_lectura: bool = False,
+                 timeout: float | None = None, max_mem_mb: int | None = None,
+                 cola_log=None, nivel_log: int = logging.INFO,
+                 eventos_jsonl: bool = False) -> dict:
+    """Atiende pedidos hasta Ctrl+C. Retorna las estadísticas de la sesión."""
+    from src.main import crear_pool, init_database, nuevas_stats, resumen_stats
+
+    init_database(db_path)
+    lectura = LecturaIncidentes(db_path)
+    if solo_lectura:
+        _servir(crear_servidor(None, host, port, lectura), "GET /incidents")
+        return nuevas_stats()
+
+    pool = crear_pool(workers, timeout, max_mem_mb, cola_log, nivel_log, eventos_jsonl)
+    with pool, ServicioIngesta(db_path, pool, max_cola) as servicio:
+        pool.calentar()
+        _servir(crear_servidor(servicio, host, port, lectura),
+                f"GET y POST /incidents, hasta {max_cola} PDFs en proceso")
+    resumen_stats("Servidor finalizado", servicio.stats)
+    return servicio.stats
+
+
+def _servir(servidor: ThreadingHTTPServer, descripcion: str) -> None:
+    host, port = servidor.server_address[:2]
+    logger.info("Escuchando en http://%s:%d (%s)", host, port, descripcion)
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Servidor detenido por el usuario.")
+    finally:
+        servidor.server_close()
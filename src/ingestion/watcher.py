@@ -0,0 +1,101 @@
+"""
+Vigilancia de la carpeta data/raw por sondeo de snapshots de stat().
+
+Cada sondeo lista la carpeta con os.scandir() (una sola llamada al sistema
+por directorio; en Windows el stat viene incluido en la entrada) y compara
+tamaño y mtime de cada PDF contra el sondeo anterior.
+
+Antirrebote: un archivo se entrega recién cuando su (tamaño, mtime) no
+cambió durante `estabilidad` segundos. Esto evita procesar PDFs que todavía
+se están copiando desde el webmail o desde un disco de red.
+"""
+
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class VigilanteCarpeta:
+    """
+    Detecta PDFs nuevos o modificados en un directorio.
+
+    Uso:
+        vigilante = VigilanteCarpeta('data/raw')
+        while True:
+            for path in vigilante.escanear():
+                ...
+            time.sleep(vigilante.intervalo)
+    """
+
+    def __init__(self, directorio: str, intervalo: float = 0.2,
+                 estabilidad: float = 0.4, extension: str = '.pdf',
+                 reloj=time.monotonic):
+        self.directorio = directorio
+        self.intervalo = intervalo
+        self.estabilidad = estabilidad
+        self.extension = extension.lower()
+        self._reloj = reloj
+        # path → (firma, instante en que se vio esa firma por primera vez)
+        self._pendientes: dict[str, tuple[tuple[int, int], float]] = {}
+        # path → firma ya entregada
+        self._entregados: dict[str, tuple[int, int]] = {}
+
+    def marcar_existentes(self) -> int:
+        """
+        Da por procesados los archivos presentes ahora mismo.
+        Retorna cuántos se marcaron.
+        """
+        snapshot = self._snapshot()
+        self._entregados.update(snapshot)
+        return len(snapshot)
+
+    def escanear(self) -> list[str]:
+        """
+        Hace un sondeo y retorna los paths que quedaron estables desde el
+        sondeo anterior y todavía no fueron entregados (o cambiaron).
+        """
+        ahora = self._reloj()
+        snapshot = self._snapshot()
+        listos = []
+
+        for path, firma in snapshot.items():
+            if self._entregados.get(path) == firma:
+                continue
+            previo = self._pendientes.get(path)
+            if previo is None or previo[0] != firma:
+                # Nuevo, o todavía creciendo: reiniciar el antirrebote
+                self._pendientes[path] = (firma, ahora)
+                continue
+            if firma[0] > 0 and ahora - previo[1] >= self.estabilidad:
+                del self._pendientes[path]
+                self._entregados[path] = firma
+                listos.append(path)
+
+        # Olvidar archivos borrados o movidos
+        for path in list(self._pendientes):
+            if path not in snapshot:
+                del self._pendientes[path]
+        for path in list(self._entregados):
+            if path not in snapshot:
+                del self._entregados[path]
+
+        return sorted(listos)
+
+    def _snapshot(self) -> dict[str, tuple[int, int]]:
+        resultado = {}
+        try:
+            with os.scandir(self.directorio) as it:
+                for entry in it:
+                    if not entry.name.lower().endswith(self.extension):
+                        continue
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        continue  # borrado entre el listado y el stat
+                    if entry.is_file():
+                        resultado[entry.path] = (st.st_size, st.st_mtime_ns)
+        except FileNotFoundError:
+            logger.warning("Directorio vigilado no existe: %s", self.directorio)
+        return resultado
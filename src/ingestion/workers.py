@@ -0,0 +1,365 @@
+"""
+Pool de procesos "calientes" y aislados para procesar PDFs.
+
+Cada worker importa una sola vez PyMuPDF, pandas, pyproj y los extractores,
+y construye los transformers de coordenadas al arrancar. Después de eso,
+procesar un PDF nuevo cuesta sólo la extracción en sí, sin el arranque del
+intérprete ni las importaciones que paga cada corrida de `python src/main.py`.
+
+Además, cada documento corre con presupuesto propio:
+  - timeout de reloj: si el worker no responde a tiempo (xref corrupto que
+    cuelga a MuPDF, regex DOTALL desbocado), se mata y se reemplaza.
+  - tope de memoria: en POSIX se fija RLIMIT_AS en cada worker; un
+    MemoryError (o la muerte del proceso por SIGKILL del OOM killer) se
+    registra como "oom" y el worker se recicla.
+Un archivo patológico nunca cuesta más que su presupuesto ni tira abajo la corrida.
+"""
+
+import hashlib
+import logging
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from multiprocessing.connection import wait
+from typing import NamedTuple
+
+from src.logging_setup import configurar_logging_worker
+from src.storage.incidentes import IncidentRecord
+
+logger = logging.getLogger(__name__)
+
+TIMEOUT_DOC = 60.0        # segundos de reloj por documento
+MAX_MEM_MB = 1024         # memoria adicional por worker (MB), 0 = sin tope
+MAX_TAREAS_WORKER = 500   # reciclar el worker cada N documentos
+
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:  # Windows
+    RESOURCE_AVAILABLE = False
+
+
+class ResultadoDocumento(NamedTuple):
+    """
+    Resultado de procesar un documento en un worker.
+
+    estado: 'ok' | 'omitido' | 'error' | 'timeout' | 'oom'
+    etapa:  para 'omitido', dónde falló ('apertura', 'identificacion', 'extraccion')
+    texto:  texto extraído del PDF, para la caché (None si no se abrió el PDF)
+    incidentes: todos los IncidenteExtraido del PDF; `data` es el primero
+    paginas / ms_ahorro: clasificación de páginas y render ahorrado (estimado)
+    """
+    estado: str
+    sha256: str | None = None
+    data: IncidentRecord | None = None
+    detalle: str | None = None
+    etapa: str | None = None
+    extractor: str | None = None
+    texto: str | None = None
+    incidentes: tuple = ()
+    paginas: tuple = ()
+    ms_ahorro: float = 0.0
+
+
+# ── Lado worker ─────────────────────────────────────────────────────────────
+
+def _inicializar_worker(cola_log, nivel: int, eventos_jsonl: bool) -> None:
+    """Logging a la cola del padre + precarga de módulos y transformers."""
+    if cola_log is not None:
+        configurar_logging_worker(cola_log, nivel, eventos_jsonl)
+    import src.main  # noqa: F401  (fitz, pandas y extractores quedan cargados)
+    from src.transformation.coordinates import warm_up
+    warm_up()
+
+
+def _limitar_memoria(max_mem_mb: int) -> None:
+    """
+    Fija RLIMIT_AS = espacio de direcciones actual + max_mem_mb.
+    Se mide después de las importaciones para que el tope sea el margen
+    disponible para el documento y no dependa del peso de las librerías.
+    """
+    if not max_mem_mb:
+        return
+    if not RESOURCE_AVAILABLE:
+        logger.warning("Tope de memoria no soportado en esta plataforma; sólo timeout.")
+        return
+    actual = _espacio_direcciones_bytes()
+    limite = actual + max_mem_mb * 1024 * 1024
+    try:
+        resource.setrlimit(resource.RLIMIT_AS, (limite, limite))
+    except (ValueError, OSError) as e:
+        logger.warning("No se pudo fijar el tope de memoria: %s", e)
+
+
+def _espacio_direcciones_bytes() -> int:
+    try:
+        with open('/proc/self/status', encoding='ascii') as f:
+            for linea in f:
+                if linea.startswith('VmSize:'):
+                    return int(linea.split()[1]) * 1024
+    except OSError:
+        pass
+    return 0
+
+
+def _procesar(path: str, datos: bytes | str | None = None) -> ResultadoDocumento:
+    """
+    Lee el PDF una sola vez: el mismo buffer sirve para el hash y para fitz.
+    Si `datos` es str, es el texto ya extraído (caché) y no se abre el PDF.
+    """
+    from src.main import analizar_pdf, analizar_texto
+    if isinstance(datos, str):
+        analisis = analizar_texto(os.path.basename(path), datos)
+        return ResultadoDocumento(
+            'ok' if analisis.data is not None else 'omitido', None, analisis.data,
+            detalle=analisis.error, etapa=analisis.etapa, extractor=analisis.extractor,
+            incidentes=analisis.incidentes,
+        )
+    if datos is None:
+        with open(path, 'rb') as f:
+            datos = f.read()
+    sha256 = hashlib.sha256(datos).hexdigest()
+    analisis = analizar_pdf(path, datos)
+    return ResultadoDocumento(
+        'ok' if analisis.data is not None else 'omitido', sha256, analisis.data,
+        detalle=analisis.error, etapa=analisis.etapa, extractor=analisis.extractor,
+        texto=analisis.texto, incidentes=analisis.incidentes,
+        paginas=analisis.paginas, ms_ahorro=analisis.ms_ahorro,
+    )
+
+
+def _bucle_worker(conn, cola_log, nivel: int, eventos_jsonl: bool,
+                  max_mem_mb: int, funcion) -> None:
+    # Ctrl+C lo maneja el proceso principal, que recicla o cierra el pool
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _inicializar_worker(cola_log, nivel, eventos_jsonl)
+    _limitar_memoria(max_mem_mb)
+    conn.send('listo')
+
+    while True:
+        try:
+            tarea = conn.recv()
+        except EOFError:
+            return
+        if tarea is None:
+            return
+        path, datos = tarea
+        try:
+            conn.send(funcion(path, datos))
+        except MemoryError:
+            datos = None
+            conn.send(ResultadoDocumento('oom', detalle='MemoryError'))
+            return  # el heap puede quedar fragmentado: mejor reciclar
+        except Exception as e:
+            conn.send(ResultadoDocumento('error', detalle=f"{type(e).__name__}: {e}"))
+
+
+# ── Lado proceso principal ──────────────────────────────────────────────────
+
+class _Tarea(NamedTuple):
+    path: str
+    datos: bytes | None
+    futuro: Future
+
+
+class _Worker:
+    def __init__(self, ctx, args):
+        self.conn, hijo = ctx.Pipe()
+        self.proc = ctx.Process(target=_bucle_worker, args=(hijo, *args), daemon=True)
+        self.proc.start()
+        hijo.close()
+        self.listo = False
+        self.tarea: _Tarea | None = None
+        self.inicio = 0.0
+        self.tareas = 0
+
+    def asignar(self, tarea: _Tarea) -> None:
+        self.tarea = tarea
+        self.inicio = time.monotonic()
+        self.tareas += 1
+        self.conn.send((tarea.path, tarea.datos))
+
+    def matar(self) -> None:
+        if self.proc.is_alive():
+            self.proc.kill()
+        self.proc.join()
+        self.conn.close()
+
+
+class PoolCaliente:
+    """
+    Pool supervisado de workers precargados.
+
+    Un hilo supervisor reparte las tareas, vigila el timeout de cada una y
+    reemplaza los workers que se cuelgan, se quedan sin memoria o mueren.
+
+    Uso:
+        with PoolCaliente(workers=2, cola_log=cola, timeout=60) as pool:
+            pool.calentar()
+            resultado = pool.enviar('data/raw/x.pdf').result()
+            if resultado.estado == 'ok':
+                ...
+
+    `funcion` es lo que ejecuta cada worker por tarea: recibe (path, datos)
+    y retorna un ResultadoDocumento. Debe ser una función de módulo (picklable).
+    """
+
+    def __init__(self, workers: int = 2, cola_log=None,
+                 nivel: int = logging.INFO, eventos_jsonl: bool = False,
+                 timeout: float = TIMEOUT_DOC, max_mem_mb: int = MAX_MEM_MB,
+                 max_tareas: int = MAX_TAREAS_WORKER, funcion=_procesar):
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        self.max_tareas = max_tareas
+        self._ctx = multiprocessing.get_context()
+        self._args = (cola_log, nivel, eventos_jsonl, max_mem_mb, funcion)
+        self._pendientes: deque[_Tarea] = deque()
+        self._lock = threading.Lock()
+        self._cerrando = False
+        self._listos = threading.Event()
+        self._aviso_r, self._aviso_w = self._ctx.Pipe(duplex=False)
+        self._pool = [_Worker(self._ctx, self._args) for _ in range(self.workers)]
+        self._supervisor = threading.Thread(
+            target=self._supervisar, name='pool-supervisor', daemon=True)
+        self._supervisor.start()
+
+    # ── API pública ─────────────────────────────────────────────────────
+
+    def calentar(self) -> None:
+        """Espera a que todos los workers terminen de precargar."""
+        self._listos.wait()
+        logger.info("Pool listo: %d workers precargados", self.workers)
+
+    def enviar(self, path: str, datos: bytes | None = None) -> Future:
+        """
+        Encola un PDF (por path, o en memoria con `datos`).
+        El Future resuelve siempre a un ResultadoDocumento; nunca lanza.
+        """
+        futuro = Future()
+        with self._lock:
+            if self._cerrando:
+                raise RuntimeError("El pool está cerrado")
+            self._pendientes.append(_Tarea(path, datos, futuro))
+        self._aviso_w.send_bytes(b'.')
+        return futuro
+
+    def cerrar(self) -> None:
+        """Termina las tareas encoladas y detiene los workers."""
+        with self._lock:
+            self._cerrando = True
+        self._aviso_w.send_bytes(b'.')
+        self._supervisor.join()
+        for w in self._pool:
+            try:
+                w.conn.send(None)
+            except (OSError, ValueError):
+                pass
+            w.proc.join(timeout=5)
+            w.matar()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+    # ── Supervisor ──────────────────────────────────────────────────────
+
+    def _supervisar(self) -> None:
+        while True:
+            with self._lock:
+                terminar = self._cerrando and not self._pendientes
+            ocupados = [w for w in self._pool if w.tarea is not None]
+            if terminar and not ocupados:
+                return
+
+            self._repartir()
+            ocupados = [w for w in self._pool if w.tarea is not None]
+            if all(w.listo for w in self._pool):
+                self._listos.set()
+
+            objetos = [self._aviso_r]
+            for w in self._pool:
+                objetos.append(w.conn)
+                objetos.append(w.proc.sentinel)
+            espera = None
+            if ocupados:
+                ahora = time.monotonic()
+                espera = max(0.0, min(w.inicio + self.timeout - ahora for w in ocupados))
+
+            listos = wait(objetos, timeout=espera)
+            if self._aviso_r in listos:
+                while self._aviso_r.poll():
+                    self._aviso_r.recv_bytes()
+
+            for i, w in enumerate(self._pool):
+                self._pool[i] = self._revisar(w)
+
+    def _repartir(self) -> None:
+        for w in self._pool:
+            if not w.listo or w.tarea is not None:
+                continue
+            with self._lock:
+                if not self._pendientes:
+                    return
+                tarea = self._pendientes.popleft()
+            try:
+                w.asignar(tarea)
+            except (OSError, ValueError):
+                # El worker murió entre ciclos; la tarea vuelve a la cola
+                w.tarea = None
+                with self._lock:
+                    self._pendientes.appendleft(tarea)
+
+    def _revisar(self, w: _Worker) -> _Worker:
+        """Procesa mensajes, muertes y timeouts de un worker; retorna su reemplazo si hizo falta."""
+        try:
+            while w.conn.poll():
+                mensaje = w.conn.recv()
+                if mensaje == 'listo':
+                    w.listo = True
+                    continue
+                tarea, w.tarea = w.tarea, None
+                if tarea is not None:
+                    tarea.futuro.set_result(mensaje)
+                if mensaje.estado == 'oom':
+                    if tarea is not None:
+                        logger.error("[%s] Sin memoria; worker reciclado.",
+                                     os.path.basename(tarea.path))
+                    else:
+                        logger.error("Un worker se quedó sin memoria; reciclado.")
+                    return self._reemplazar(w)
+        except (EOFError, OSError):
+            pass
+
+        if not w.proc.is_alive():
+            estado = 'oom' if w.proc.exitcode == -getattr(signal, 'SIGKILL', 9) else 'error'
+            detalle = f"worker terminó con código {w.proc.exitcode}"
+            if w.tarea is not None:
+                logger.error("[%s] %s (%s)", os.path.basename(w.tarea.path), detalle, estado)
+                w.tarea.futuro.set_result(ResultadoDocumento(estado, detalle=detalle))
+                w.tarea = None
+            elif not w.listo:
+                logger.error("Un worker no pudo inicializarse: %s", detalle)
+                time.sleep(1.0)  # evitar un bucle de relanzamientos
+            return self._reemplazar(w)
+
+        if w.tarea is not None and time.monotonic() - w.inicio >= self.timeout:
+            logger.error("[%s] Timeout de %.0f s; worker reciclado.",
+                         os.path.basename(w.tarea.path), self.timeout)
+            w.tarea.futuro.set_result(ResultadoDocumento(
+                'timeout', detalle=f"superó {self.timeout:.0f} s"))
+            w.tarea = None
+            return self._reemplazar(w)
+
+        if w.tarea is None and w.tareas >= self.max_tareas:
+            return self._reemplazar(w)
+        return w
+
+    def _reemplazar(self, w: _Worker) -> _Worker:
+        w.matar()
+        return _Worker(self._ctx, self._args)
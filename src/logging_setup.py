@@ -0,0 +1,167 @@
+"""
+Configuración de logging no bloqueante para el procesador de incidentes.
+
+Todos los loggers del paquete escriben en una cola en memoria (QueueHandler);
+un único hilo de fondo (QueueListener) es el que formatea y escribe en
+consola y en archivo. Así el bucle de ingesta nunca espera a una consola
+lenta de Windows ni a un disco de red.
+
+Archivos generados en el directorio de logs:
+  - processor.log   log de texto legible, rotado por tamaño
+  - eventos.jsonl   (opcional) un evento estructurado por línea, rotado por tamaño
+
+Los procesos hijos (workers paralelos) no abren archivos propios: envían
+sus registros a la misma cola multiproceso que drena el listener del
+proceso principal, de modo que hay un solo escritor por archivo.
+"""
+
+import atexit
+import json
+import logging
+import multiprocessing
+import os
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+LOG_FORMAT = '%(asctime)s [%(levelname)s] %(name)s — %(message)s'
+
+# Nombre del logger de eventos estructurados (ver registrar_evento)
+EVENTOS_LOGGER = 'incidentes.eventos'
+
+# Rotación por tamaño: 5 MB por archivo, 5 respaldos
+MAX_BYTES = 5 * 1024 * 1024
+BACKUP_COUNT = 5
+
+_listener: QueueListener | None = None
+_eventos_logger = logging.getLogger(EVENTOS_LOGGER)
+
+
+class JsonlFormatter(logging.Formatter):
+    """
+    Serializa un registro como una línea JSON compacta.
+    Los campos del evento viajan en el atributo `evento` del LogRecord.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            'ts': round(record.created, 3),
+            'nivel': record.levelname,
+            'proc': record.process,
+        }
+        payload.update(getattr(record, 'evento', None) or {})
+        return json.dumps(payload, ensure_ascii=False,
+                          separators=(',', ':'), default=str)
+
+
+class _SoloEventos(logging.Filter):
+    """Deja pasar únicamente los registros emitidos con registrar_evento()."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return hasattr(record, 'evento')
+
+
+def crear_cola_multiproceso():
+    """
+    Cola apta para compartir entre procesos. Pasarla a configurar_logging()
+    en el proceso principal y a configurar_logging_worker() en cada hijo.
+    """
+    return multiprocessing.Queue(-1)
+
+
+def configurar_logging(log_dir: str = 'logs', nivel: int = logging.INFO,
+                       eventos_jsonl: bool = False,
+                       cola=None) -> QueueListener:
+    """
+    Instala el logging asíncrono en el proceso principal.
+
+    Args:
+        log_dir: directorio donde se escriben processor.log y eventos.jsonl.
+        nivel: nivel mínimo del logger raíz.
+        eventos_jsonl: si True, agrega el flujo estructurado eventos.jsonl.
+        cola: cola a drenar. Por defecto una cola en memoria del proceso;
+              usar crear_cola_multiproceso() si habrá workers.
+
+    Returns:
+        El QueueListener ya iniciado (se detiene solo al salir del intérprete).
+    """
+    global _listener
+    detener_logging()
+    os.makedirs(log_dir, exist_ok=True)
+
+    formatter = logging.Formatter(LOG_FORMAT)
+
+    archivo = RotatingFileHandler(
+        os.path.join(log_dir, 'processor.log'),
+        maxBytes=MAX_BYTES, backupCount=BACKUP_COUNT,
+        encoding='utf-8', delay=True,
+    )
+    archivo.setFormatter(formatter)
+
+    consola = logging.StreamHandler()
+    consola.setFormatter(formatter)
+
+    handlers = [archivo, consola]
+
+    if eventos_jsonl:
+        eventos = RotatingFileHandler(
+            os.path.join(log_dir, 'eventos.jsonl'),
+            maxBytes=MAX_BYTES, backupCount=BACKUP_COUNT,
+            encoding='utf-8', delay=True,
+        )
+        eventos.setFormatter(JsonlFormatter())
+        eventos.addFilter(_SoloEventos())
+        handlers.append(eventos)
+        # Los eventos no se duplican en consola ni en processor.log
+        for h in (archivo, consola):
+            h.addFilter(lambda r: not hasattr(r, 'evento'))
+
+    cola = cola if cola is not None else queue.SimpleQueue()
+    _instalar_en_raiz(QueueHandler(cola), nivel)
+    # Los eventos se emiten a INFO: con el flujo desactivado ni se construyen
+    _eventos_logger.setLevel(logging.INFO if eventos_jsonl else logging.CRITICAL + 1)
+
+    _listener = QueueListener(cola, *handlers, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def configurar_logging_worker(cola, nivel: int = logging.INFO,
+                              eventos_jsonl: bool = False) -> None:
+    """
+    Configura un proceso hijo para que envíe todo su logging a `cola`.
+    Pensado para usarse como `initializer` de un pool de procesos.
+    """
+    _instalar_en_raiz(QueueHandler(cola), nivel)
+    _eventos_logger.setLevel(logging.INFO if eventos_jsonl else logging.CRITICAL + 1)
+
+
+def detener_logging() -> None:
+    """Vacía la cola y detiene el hilo escritor, si estaba activo."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for h in _listener.handlers:
+            h.close()
+        _listener = None
+
+
+def registrar_evento(tipo: str, **campos) -> None:
+    """
+    Emite un evento estructurado al flujo eventos.jsonl.
+    Si el flujo no está activo, el costo es una comparación de nivel.
+
+    Ej: registrar_evento('insertado', num_inc='YPF-0000246524', archivo='x.pdf')
+    """
+    if _eventos_logger.isEnabledFor(logging.INFO):
+        _eventos_logger.info(tipo, extra={'evento': {'tipo': tipo, **campos}})
+
+
+def _instalar_en_raiz(handler: logging.Handler, nivel: int) -> None:
+    root = logging.getLogger()
+    for h in list(root.handlers):
+        root.removeHandler(h)
+    root.addHandler(handler)
+    root.setLevel(nivel)
+
+
+atexit.register(detener_logging)
@@ -5,28 +5,29 @@ Exporta automáticamente a Excel al finalizar.
 """
 
 import os
+import json
+import time
+import hashlib
 import logging
+import argparse
 import sqlite3
+from collections import Counter, deque
+from typing import Iterator, NamedTuple
 import fitz       # PyMuPDF
 import pandas as pd
 
-from src.extractors.ypf import YPFExtractor
-from src.extractors.pluspetrol import PluspetrolExtractor
-from src.extractors.petsud import PetSudExtractor
-from src.extractors.aconcagua import AconcaguaExtractor
-from src.extractors.pcr import PCRExtractor
+from src.extractors.registry import (EXTRACTOR_REGISTRY, extractor_por_nombre,  # noqa: F401
+                                     identify_extractor)
+from src.extractors.clasificador_paginas import extraer_texto
+from src.extractors.segmentacion import dividir_en_segmentos
 from src.transformation.coordinates import transform_to_cartesian
+from src.storage import (agregados, cambios, clusters, consultas, cuarentena, duplicados,
+                         paginas, textos)
+from src.storage.incidentes import IncidentRecord, insertar, insertar_lote
+from src.logging_setup import configurar_logging, detener_logging, registrar_evento
 
-# ── Configuración de logging ────────────────────────────────────────────────
-os.makedirs('logs', exist_ok=True)
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s [%(levelname)s] %(name)s — %(message)s',
-    handlers=[
-        logging.FileHandler('logs/processor.log', encoding='utf-8'),
-        logging.StreamHandler(),
-    ]
-)
+# El logging (cola + escritor en segundo plano) se configura en main();
+# importar este módulo desde un worker o un test no abre archivos de log.
 logger = logging.getLogger(__name__)
 
 # ── Esquema de columnas ──────────────────────────────────────────────────────
@@ -47,52 +48,20 @@ COLUMNAS_MAPA = {
     'AGUA_PCT':            'AGUA_PCT',
     'AREA_AFECT_m2':       'AREA_AFECT_m2',
     'RECURSOS_AFECTADOS':  'RECURSOS_AFECTADOS',
+    'DIST_CAUCE_M':        'DIST_CAUCE_M',           # calculada, no viene del PDF
+    'CAUCE_CERCANO':       'CAUCE_CERCANO',
+    'CLUSTER':             'CLUSTER',                # foco de densidad (DBSCAN)
+    'AREA_ID':             'AREA_ID',                # nombres canónicos
+    'YACIMIENTO_ID':       'YACIMIENTO_ID',
+    'INSTALACION_ID':      'INSTALACION_ID',
 }
 
-def normalizar(data: dict) -> dict:
-    desc = data.get('DESCRIPCION') or data.get('DETALLE') or None
-    desc_abrev = (desc[:120] + '...') if desc and len(desc) > 120 else desc
-
-    return {
-        'NUM_INC':           data.get('NUM_INC'),
-        'OPERADOR':          data.get('OPERADOR'),
-        'AREA_CONCESION':    data.get('AREA_CONCE'),
-        'YACIMIENTO':        data.get('YACIMIENTO'),
-        'MAGNITUD':          data.get('MAGNITUD'),
-        'TIPO_INSTALACION':  data.get('TIPO_INST'),
-        'SUBTIPO':           data.get('SUBTIPO_INC'),
-        'FECHA':             data.get('FECHA_INC'),
-        'DESC_ABREV':        desc_abrev,          # clave interna sin espacio
-        'LAT':               data.get('Y_COORD'),
-        'LON':               data.get('X_COORD'),
-        'VOL_M3':            data.get('VOL_D_m3'),
-        'AGUA_PCT':          data.get('AGUA_PCT'),
-        'AREA_AFECT_m2':     data.get('AREA_AFECT_m2'),
-        'RECURSOS_AFECTADOS': data.get('RECURSOS'),
-    }
-
-EXTRACTOR_REGISTRY: list[tuple[str, type]] = [
-    ("YPF S.A.",                YPFExtractor),
-    ("PLUSPETROL",              PluspetrolExtractor),
-    ("PETROLEOS SUDAMERICANOS",  PetSudExtractor),
-    ("PETRÓLEOS SUDAMERICANOS",  PetSudExtractor),
-    ("ACONCAGUA ENERGIA",       AconcaguaExtractor),
-    ("PCR",                     PCRExtractor),
-    ("COMODORO RIVADAVIA",      PCRExtractor),
-]
-
-def identify_extractor(text: str):
-    import unicodedata
-    def normalizar_texto(s):
-        return ''.join(
-            c for c in unicodedata.normalize('NFD', s.upper())
-            if unicodedata.category(c) != 'Mn'
-        )
-    text_norm = normalizar_texto(text)
-    for keyword, extractor_cls in EXTRACTOR_REGISTRY:
-        if normalizar_texto(keyword) in text_norm:
-            return extractor_cls()
-    return None
+# Columnas de la tabla que no se exportan
+COLUMNAS_INTERNAS = ['COORDS_REPORTADAS']
+
+def normalizar(data: dict) -> IncidentRecord:
+    """Dict de un extractor → registro con las columnas de la tabla incidentes."""
+    return IncidentRecord.desde_extraccion(data)
 
 def init_database(db_path: str) -> None:
     os.makedirs(os.path.dirname(db_path), exist_ok=True)
@@ -113,33 +82,172 @@ def init_database(db_path: str) -> None:
                 VOL_M3             REAL,
                 AGUA_PCT           REAL,
                 AREA_AFECT_m2      REAL,
-                RECURSOS_AFECTADOS TEXT
+                RECURSOS_AFECTADOS TEXT,
+                DIST_CAUCE_M       REAL,
+                CAUCE_CERCANO      TEXT,
+                CLUSTER            INTEGER,
+                COORDS_REPORTADAS  TEXT,
+                AREA_ID            TEXT,
+                YACIMIENTO_ID      TEXT,
+                INSTALACION_ID     TEXT
+            )
+        ''')
+        # Bases creadas antes de medir la distancia a cauces
+        _agregar_columnas(conn, 'incidentes', {'DIST_CAUCE_M': 'REAL', 'CAUCE_CERCANO': 'TEXT',
+                                               'CLUSTER': 'INTEGER',
+                                               'COORDS_REPORTADAS': 'TEXT',
+                                               'AREA_ID': 'TEXT', 'YACIMIENTO_ID': 'TEXT',
+                                               'INSTALACION_ID': 'TEXT'})
+        # Resúmenes por operadora/mes y área/magnitud, mantenidos por triggers
+        agregados.crear_tablas(conn)
+        # Contador de cambios (ETag de la API de lectura) e índices por fecha
+        consultas.crear_tablas(conn)
+        # Registro de cambios para sincronización incremental (después de las
+        # migraciones: los triggers enumeran las columnas)
+        cambios.crear_tablas(conn)
+        # Un registro por PDF distinto (por contenido), venga de data/raw o
+        # de un adjunto de correo. MESSAGE_ID/FECHA_MENSAJE sólo para correo.
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS documentos (
+                SHA256             TEXT PRIMARY KEY,
+                NOMBRE             TEXT,
+                ORIGEN             TEXT,
+                MESSAGE_ID         TEXT,
+                FECHA_MENSAJE      TEXT,
+                REGISTRADO_EN      TEXT DEFAULT (datetime('now')),
+                EXTRACTOR          TEXT,
+                VERSION            TEXT
             )
         ''')
+        # Bases creadas antes de registrar la versión del extractor
+        _agregar_columnas(conn, 'documentos', {'EXTRACTOR': 'TEXT', 'VERSION': 'TEXT'})
+        cuarentena.crear_tabla(conn)
+        textos.crear_tabla(conn)
+        paginas.crear_tabla(conn)
+        duplicados.crear_tablas(conn)
+        clusters.crear_tablas(conn)
+        # Qué documento(s) aportaron cada incidente, y de qué páginas
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS procedencia (
+                NUM_INC            TEXT NOT NULL,
+                SHA256             TEXT NOT NULL,
+                PAGINA_DESDE       INTEGER,
+                PAGINA_HASTA       INTEGER,
+                PRIMARY KEY (NUM_INC, SHA256)
+            )
+        ''')
+        _agregar_columnas(conn, 'procedencia',
+                          {'PAGINA_DESDE': 'INTEGER', 'PAGINA_HASTA': 'INTEGER'})
         conn.commit()
-    logger.info(f"Base de datos lista: {db_path}")
+    logger.info("Base de datos lista: %s", db_path)
+
+def _agregar_columnas(conn: sqlite3.Connection, tabla: str,
+                      columnas: dict[str, str]) -> None:
+    """Migración mínima: agrega las columnas que falten en una tabla existente."""
+    existentes = {fila[1] for fila in conn.execute(f"PRAGMA table_info({tabla})")}
+    for nombre, tipo in columnas.items():
+        if nombre not in existentes:
+            conn.execute(f"ALTER TABLE {tabla} ADD COLUMN {nombre} {tipo}")
+
+class IncidenteExtraido(NamedTuple):
+    """Un incidente extraído de un PDF y las páginas (1-based) de donde salió."""
+    data: IncidentRecord
+    pagina_desde: int | None = None
+    pagina_hasta: int | None = None
+
+class AnalisisPDF(NamedTuple):
+    """
+    Resultado detallado de analizar un PDF.
+    `data` es el primer incidente; `incidentes` los trae todos cuando el PDF
+    concatena varios formularios.
+    Si `data` es None, `etapa` indica dónde falló:
+    'apertura', 'identificacion' o 'extraccion'.
+    `texto` es el texto extraído, para la caché (None si no se pudo abrir).
+    `paginas` son las decisiones del clasificador de páginas y `ms_ahorro`
+    el tiempo de render estimado que se ahorró al omitir anexos.
+    """
+    data: IncidentRecord | None
+    etapa: str | None = None
+    error: str | None = None
+    extractor: str | None = None
+    texto: str | None = None
+    incidentes: tuple[IncidenteExtraido, ...] = ()
+    paginas: tuple = ()
+    ms_ahorro: float = 0.0
 
-def process_pdf(path: str) -> dict | None:
+def analizar_pdf(path: str, datos: bytes | None = None) -> AnalisisPDF:
+    """
+    Extrae y normaliza un incidente desde un PDF.
+    Si se pasan `datos`, el PDF se abre desde memoria y `path` sólo se usa
+    como nombre en los logs (ej. adjuntos de correo que nunca tocan disco).
+    """
     filename = os.path.basename(path)
     try:
-        with fitz.open(path) as doc:
-            text = chr(12).join(page.get_text() for page in doc)
+        if datos is not None:
+            doc = fitz.open(stream=datos, filetype='pdf')
+        else:
+            doc = fitz.open(path)
+        with doc:
+            extraido = extraer_texto(doc)
+    except MemoryError:
+        raise  # el worker lo reporta como "oom" y se recicla
     except Exception as e:
-        logger.error(f"[{filename}] Error abriendo PDF: {e}")
-        return None
+        logger.error("[%s] Error abriendo PDF: %s", filename, e)
+        return AnalisisPDF(None, 'apertura', str(e))
+
+    omitidas = [d.pagina for d in extraido.paginas if not d.renderizada]
+    if omitidas:
+        logger.debug("[%s] Páginas sin renderizar (anexos): %s", filename, omitidas)
+    return analizar_texto(filename, extraido.texto)._replace(
+        paginas=extraido.paginas, ms_ahorro=extraido.ms_ahorro_estimado)
+
+def analizar_texto(filename: str, text: str) -> AnalisisPDF:
+    """
+    Identifica la operadora y extrae el/los incidente(s) del texto de un PDF.
+    Si el texto concatena varios formularios, cada uno se extrae por separado.
+    """
+    segmentos = dividir_en_segmentos(text)
+    if len(segmentos) == 1:
+        seg = segmentos[0]
+        analisis = _extraer_segmento(filename, text, identify_extractor(text))
+        if analisis.data is None:
+            return analisis._replace(texto=text)
+        return analisis._replace(texto=text, incidentes=(
+            IncidenteExtraido(analisis.data, seg.pagina_desde, seg.pagina_hasta),))
 
-    extractor = identify_extractor(text)
+    logger.info("[%s] %d formularios en el documento", filename, len(segmentos))
+    incidentes = []
+    extractor = primer_fallo = None
+    for seg in segmentos:
+        etiqueta = f"{filename} p.{seg.pagina_desde}-{seg.pagina_hasta}"
+        analisis = _extraer_segmento(etiqueta, seg.texto, seg.extractor())
+        if analisis.data is None:
+            primer_fallo = primer_fallo or analisis
+            continue
+        extractor = extractor or analisis.extractor
+        incidentes.append(
+            IncidenteExtraido(analisis.data, seg.pagina_desde, seg.pagina_hasta))
+
+    if not incidentes:
+        return primer_fallo._replace(texto=text)
+    return AnalisisPDF(incidentes[0].data, extractor=extractor, texto=text,
+                       incidentes=tuple(incidentes))
+
+def _extraer_segmento(filename: str, text: str, extractor) -> AnalisisPDF:
+    """Extrae un único incidente con el extractor dado (None = no reconocido)."""
     if not extractor:
-        logger.warning(f"[{filename}] Formato no reconocido, se omite.")
-        return None
+        logger.warning("[%s] Formato no reconocido, se omite.", filename)
+        return AnalisisPDF(None, 'identificacion', "Formato no reconocido")
 
-    logger.info(f"[{filename}] Extractor: {type(extractor).__name__}")
+    nombre_extractor = type(extractor).__name__
+    logger.info("[%s] Extractor: %s", filename, nombre_extractor)
 
     try:
         raw = extractor.extract(text)
     except (KeyError, AttributeError, ValueError) as e:
-        logger.error(f"[{filename}] Error de extracción: {e}")
-        return None
+        logger.error("[%s] Error de extracción: %s", filename, e)
+        return AnalisisPDF(None, 'extraccion', f"{type(e).__name__}: {e}",
+                           nombre_extractor)
 
     try:
         if raw.get('Y_COORD') and raw.get('X_COORD'):
@@ -147,29 +255,127 @@ def process_pdf(path: str) -> dict | None:
                 raw['Y_COORD'], raw['X_COORD']
             )
     except Exception as e:
-        logger.error(f"[{filename}] Error en transformación UTM: {e}")
+        logger.error("[%s] Error en transformación UTM: %s", filename, e)
+
+    return AnalisisPDF(normalizar(raw), extractor=nombre_extractor)
 
-    return normalizar(raw)
+def process_pdf(path: str, datos: bytes | None = None) -> IncidentRecord | None:
+    """Igual que analizar_pdf() pero retorna sólo el registro normalizado (o None)."""
+    return analizar_pdf(path, datos).data
 
-def insert_incident(conn: sqlite3.Connection, data: dict) -> bool:
+def insert_incident(conn: sqlite3.Connection, data: IncidentRecord | dict) -> bool:
     try:
-        columns = ', '.join(data.keys())
-        placeholders = ':' + ', :'.join(data.keys())
-        cursor = conn.execute(
-            f"INSERT OR IGNORE INTO incidentes ({columns}) VALUES ({placeholders})",
-            data
-        )
-        if cursor.rowcount == 0:
-            logger.info(f"Duplicado ignorado: {data.get('NUM_INC')}")
+        if not isinstance(data, IncidentRecord):
+            data = IncidentRecord(**data)
+        if not insertar(conn, data):
+            logger.info("Duplicado ignorado: %s", data.get('NUM_INC'))
+            cambios.registrar_duplicado(conn, data)
             return False
         return True
     except sqlite3.IntegrityError as e:
-        logger.error(f"Error de integridad para {data.get('NUM_INC')}: {e}")
+        logger.error("Error de integridad para %s: %s", data.get('NUM_INC'), e)
         return False
-    except sqlite3.OperationalError as e:
-        logger.error(f"Error de base de datos para {data.get('NUM_INC')}: {e}")
+    except (sqlite3.OperationalError, TypeError) as e:   # TypeError: columna desconocida
+        logger.error("Error de base de datos para %s: %s", data.get('NUM_INC'), e)
         return False
 
+
+def insert_incidents(conn: sqlite3.Connection, datos: list[IncidentRecord | dict]) -> list[bool]:
+    """
+    Como insert_incident para varios incidentes, con un solo executemany.
+    Si el lote falla (columna desconocida, error de integridad), se inserta
+    de a uno para que sólo se pierda la fila con problemas.
+    """
+    try:
+        registros = [d if isinstance(d, IncidentRecord) else IncidentRecord(**d) for d in datos]
+        insertados = insertar_lote(conn, registros)
+    except (sqlite3.IntegrityError, sqlite3.OperationalError, TypeError):
+        return [insert_incident(conn, d) for d in datos]
+    for registro, insertado in zip(registros, insertados):
+        if not insertado:
+            logger.info("Duplicado ignorado: %s", registro.get('NUM_INC'))
+            cambios.registrar_duplicado(conn, registro)
+    return insertados
+
+def actualizar_incidente(conn: sqlite3.Connection, data: IncidentRecord | dict,
+                         num_inc_previo: str | None = None) -> list[str] | None:
+    """
+    Actualiza un incidente existente escribiendo sólo las columnas cuyo valor
+    cambió. `num_inc_previo` permite corregir el propio NUM_INC.
+    Retorna las columnas modificadas, o None si la fila no existe o no se
+    pudo actualizar.
+    """
+    clave = num_inc_previo or data.get('NUM_INC')
+    cursor = conn.execute("SELECT * FROM incidentes WHERE NUM_INC = ?", (clave,))
+    fila = cursor.fetchone()
+    if fila is None:
+        return None
+    actual = dict(zip((d[0] for d in cursor.description), fila))
+    modificados = {k: v for k, v in data.items() if k in actual and actual[k] != v}
+    if not modificados:
+        return []
+    asignaciones = ', '.join(f"{k} = :{k}" for k in modificados)
+    if 'LAT' in modificados or 'LON' in modificados:
+        # Coordenadas corregidas: la distancia a cauces queda pendiente
+        asignaciones += ", DIST_CAUCE_M = NULL, CAUCE_CERCANO = NULL"
+    for columna, columna_id in (('AREA_CONCESION', 'AREA_ID'), ('YACIMIENTO', 'YACIMIENTO_ID'),
+                                ('TIPO_INSTALACION', 'INSTALACION_ID')):
+        if columna in modificados:
+            # Nombre corregido: el ID canónico queda pendiente
+            asignaciones += f", {columna_id} = NULL"
+    try:
+        conn.execute(f"UPDATE incidentes SET {asignaciones} WHERE NUM_INC = :_clave",
+                     {**modificados, '_clave': clave})
+    except sqlite3.IntegrityError as e:
+        logger.error("No se pudo actualizar %s: %s", clave, e)
+        return None
+    if 'NUM_INC' in modificados:
+        conn.execute("UPDATE procedencia SET NUM_INC = ? WHERE NUM_INC = ?",
+                     (modificados['NUM_INC'], clave))
+    return sorted(modificados)
+
+def documento_registrado(conn: sqlite3.Connection, sha256: str) -> bool:
+    return conn.execute(
+        "SELECT 1 FROM documentos WHERE SHA256 = ?", (sha256,)
+    ).fetchone() is not None
+
+def registrar_documento(conn: sqlite3.Connection, sha256: str, nombre: str,
+                        origen: str, num_inc: str | None = None,
+                        message_id: str | None = None,
+                        fecha_mensaje: str | None = None,
+                        extractor: str | None = None,
+                        paginas: tuple[int | None, int | None] = (None, None)) -> None:
+    """
+    Registra la procedencia de un PDF y, si produjo un incidente, el vínculo
+    (con el rango de páginas del formulario, si se conoce).
+    Con `extractor`, guarda además su versión actual para poder detectar
+    más tarde los documentos extraídos con código viejo.
+    """
+    conn.execute(
+        "INSERT OR IGNORE INTO documentos "
+        "(SHA256, NOMBRE, ORIGEN, MESSAGE_ID, FECHA_MENSAJE) VALUES (?, ?, ?, ?, ?)",
+        (sha256, nombre, origen, message_id, fecha_mensaje)
+    )
+    if extractor:
+        cls = extractor_por_nombre(extractor)
+        conn.execute(
+            "UPDATE documentos SET EXTRACTOR = ?, VERSION = ? WHERE SHA256 = ?",
+            (extractor, cls.version() if cls else None, sha256)
+        )
+    if num_inc:
+        conn.execute('''
+            INSERT INTO procedencia (NUM_INC, SHA256, PAGINA_DESDE, PAGINA_HASTA)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(NUM_INC, SHA256) DO UPDATE SET
+                PAGINA_DESDE = COALESCE(excluded.PAGINA_DESDE, PAGINA_DESDE),
+                PAGINA_HASTA = COALESCE(excluded.PAGINA_HASTA, PAGINA_HASTA)
+        ''', (num_inc, sha256, *paginas))
+
+def _nombre_documento(conn: sqlite3.Connection, sha256: str) -> str:
+    fila = conn.execute("SELECT NOMBRE FROM documentos WHERE SHA256 = ?",
+                        (sha256,)).fetchone()
+    return fila[0] if fila else sha256[:12]
+
 def exportar_excel(db_path: str) -> None:
     xlsx_path = os.path.join('data', 'incidentes.xlsx')
     csv_path  = os.path.join('data', 'incidentes_qgis.csv')
@@ -177,7 +383,8 @@ def exportar_excel(db_path: str) -> None:
         with sqlite3.connect(db_path) as conn:
             df = pd.read_sql("SELECT * FROM incidentes ORDER BY FECHA", conn)
 
-        # Renombrar columnas internas a nombres legibles para el usuario
+        # Columnas internas (no van al Excel ni a QGIS) y nombres legibles
+        df.drop(columns=COLUMNAS_INTERNAS, errors='ignore', inplace=True)
         df.rename(columns=COLUMNAS_MAPA, inplace=True)
 
         # ── Excel ────────────────────────────────────────────────────────
@@ -187,7 +394,7 @@ def exportar_excel(db_path: str) -> None:
             for col in ws.columns:
                 max_len = max(len(str(cell.value or '')) for cell in col)
                 ws.column_dimensions[col[0].column_letter].width = min(max_len + 4, 60)
-        logger.info(f"Excel exportado: {xlsx_path}")
+        logger.info("Excel exportado: %s", xlsx_path)
 
         # ── CSV para QGIS ────────────────────────────────────────────────
         # decimal='.' fuerza punto decimal independientemente de la
@@ -196,47 +403,834 @@ def exportar_excel(db_path: str) -> None:
         # encoding='utf-8-sig' agrega BOM para que Excel lo abra bien
         # si se necesita revisar el archivo antes de cargar en QGIS.
         df.to_csv(csv_path, index=False, encoding='utf-8-sig', decimal='.')
-        logger.info(f"CSV QGIS exportado: {csv_path}")
+        logger.info("CSV QGIS exportado: %s", csv_path)
 
     except Exception as e:
-        logger.error(f"Error exportando archivos: {e}")
+        logger.error("Error exportando archivos: %s", e)
+
+RAW_DIR = os.path.join('data', 'raw')
+DB_PATH = os.path.join('data', 'database', 'incidentes.db')
+CAUCES_PATH = os.path.join('data', 'cauces.geojson')
+
+# Commit parcial cada N documentos: un lote grande no deja una transacción
+# gigante abierta y una interrupción no pierde lo ya procesado.
+COMMIT_CADA = 100
+
+class DocumentoEntrada(NamedTuple):
+    """
+    Un PDF listo para procesar: ya leído y con su hash calculado.
+    `datos` son los bytes del PDF, o su texto (str) si sale de la caché.
+    """
+    nombre: str
+    origen: str
+    sha256: str
+    datos: bytes | str
+    message_id: str | None = None
+    fecha_mensaje: str | None = None
+
+def leer_documento(path: str) -> DocumentoEntrada | None:
+    """Lee un PDF de disco una sola vez: el buffer sirve para el hash y para fitz."""
+    try:
+        with open(path, 'rb') as f:
+            datos = f.read()
+    except OSError as e:
+        logger.error("[%s] Error leyendo archivo: %s", os.path.basename(path), e)
+        return None
+    return DocumentoEntrada(os.path.basename(path), path,
+                            hashlib.sha256(datos).hexdigest(), datos)
+
+def nuevas_stats() -> dict:
+    return {'insertados': 0, 'omitidos': 0, 'errores': 0, 'timeout': 0, 'oom': 0,
+            'cuarentena': 0, 'paginas_renderizadas': 0, 'paginas_omitidas': 0,
+            'bytes_omitidos': 0, 'ms_ahorrados': 0.0}
+
+def _acumular_paginas(stats: dict, resultado) -> None:
+    for d in resultado.paginas:
+        if d.renderizada:
+            stats['paginas_renderizadas'] += 1
+        else:
+            stats['paginas_omitidas'] += 1
+            stats['bytes_omitidos'] += d.bytes_contenido
+    stats['ms_ahorrados'] += resultado.ms_ahorro
+
+def cargar_resultado(conn: sqlite3.Connection, resultado, nombre: str,
+                     origen: str, stats: dict, ms: float | None = None,
+                     message_id: str | None = None,
+                     fecha_mensaje: str | None = None,
+                     sha256: str | None = None) -> str:
+    """
+    Registra en la base el resultado de un worker (ResultadoDocumento) y
+    actualiza las estadísticas de la corrida. Retorna el desenlace final:
+    'insertado', 'no_insertado', 'omitido', 'error', 'timeout' u 'oom'.
 
-def main():
-    raw_dir = os.path.join('data', 'raw')
-    db_path  = os.path.join('data', 'database', 'incidentes.db')
+    Los fallos (omitido, error, timeout, oom) dejan el documento en
+    cuarentena; un éxito lo libera si estaba.
+    """
+    data = resultado.data
+    incidentes = resultado.incidentes or ((IncidenteExtraido(data),) if data else ())
+    sha256 = sha256 or resultado.sha256
+    if sha256:
+        registrar_documento(conn, sha256, os.path.basename(nombre), origen,
+                            message_id=message_id, fecha_mensaje=fecha_mensaje,
+                            extractor=resultado.extractor if data else None)
+        for inc in incidentes:
+            registrar_documento(conn, sha256, os.path.basename(nombre), origen,
+                                num_inc=inc.data.get('NUM_INC'),
+                                paginas=(inc.pagina_desde, inc.pagina_hasta))
+        if resultado.texto is not None:
+            textos.guardar_texto(conn, sha256, resultado.texto)
+            for otro, sim in duplicados.indexar(conn, sha256, resultado.texto):
+                logger.warning("[%s] Posible duplicado de %s (similitud %.2f)",
+                               nombre, _nombre_documento(conn, otro), sim)
+                registrar_evento('posible_duplicado', archivo=nombre,
+                                 sha256=sha256, otro=otro, similitud=round(sim, 3))
+        if resultado.paginas:
+            paginas.registrar_paginas(conn, sha256, resultado.paginas)
+    _acumular_paginas(stats, resultado)
+
+    desenlaces = []
+    if resultado.estado in ('timeout', 'oom'):
+        desenlace = resultado.estado
+        stats[desenlace] += 1
+    elif resultado.estado == 'error':
+        logger.error("[%s] Error en worker: %s", nombre, resultado.detalle)
+        desenlace = 'error'
+        stats['errores'] += 1
+    elif data is None:
+        desenlace = 'omitido'
+        stats['omitidos'] += 1
+    else:
+        insertados = insert_incidents(conn, [inc.data for inc in incidentes])
+        for inc, insertado in zip(incidentes, insertados):
+            if insertado:
+                desenlaces.append((inc.data, 'insertado'))
+                stats['insertados'] += 1
+            else:
+                desenlaces.append((inc.data, 'no_insertado'))
+                stats['errores'] += 1
+        desenlace = ('insertado' if any(d == 'insertado' for _, d in desenlaces)
+                     else 'no_insertado')
+
+    if sha256:
+        if data is None:
+            etapa = resultado.etapa if desenlace == 'omitido' else desenlace
+            cuarentena.poner_en_cuarentena(
+                conn, sha256, os.path.basename(nombre), origen,
+                etapa or 'error', resultado.detalle, resultado.extractor)
+        else:
+            cuarentena.liberar(conn, sha256)
+
+    for inc_data, inc_desenlace in desenlaces or [(data, desenlace)]:
+        registrar_evento(
+            inc_desenlace, archivo=nombre,
+            num_inc=inc_data.get('NUM_INC') if inc_data else None,
+            operador=inc_data.get('OPERADOR') if inc_data else None,
+            detalle=resultado.detalle, message_id=message_id,
+            ms=round(ms, 1) if ms is not None else None,
+        )
+    return desenlace
+
+def resumen_stats(prefijo: str, stats: dict) -> None:
+    logger.info(
+        "%s — Insertados: %d | Omitidos: %d | Errores: %d | Timeouts: %d | "
+        "Sin memoria: %d | En cuarentena: %d",
+        prefijo, stats['insertados'], stats['omitidos'], stats['errores'],
+        stats['timeout'], stats['oom'], stats['cuarentena']
+    )
+    if stats['paginas_omitidas']:
+        logger.info(
+            "Páginas — Renderizadas: %d | Omitidas (anexos): %d | "
+            "%.1f KB sin procesar | ~%.0f ms ahorrados",
+            stats['paginas_renderizadas'], stats['paginas_omitidas'],
+            stats['bytes_omitidos'] / 1024, stats['ms_ahorrados']
+        )
+    registrar_evento('corrida_finalizada', **stats)
+
+def crear_pool(workers: int = 1, timeout: float | None = None,
+               max_mem_mb: int | None = None, cola_log=None,
+               nivel_log: int = logging.INFO, eventos_jsonl: bool = False):
+    """
+    Pool de workers aislados: cada PDF corre con timeout y tope de memoria,
+    así un archivo patológico cuesta como mucho su presupuesto.
+    """
+    from src.ingestion.workers import MAX_MEM_MB, TIMEOUT_DOC, PoolCaliente
+    return PoolCaliente(
+        workers, cola_log, nivel_log, eventos_jsonl,
+        timeout=timeout or TIMEOUT_DOC,
+        max_mem_mb=MAX_MEM_MB if max_mem_mb is None else max_mem_mb,
+    )
+
+def procesar_documentos(conn: sqlite3.Connection, pool, documentos,
+                        stats: dict, respetar_cuarentena: bool = True,
+                        cargar=None) -> None:
+    """
+    Procesa un flujo de DocumentoEntrada en el pool y carga los resultados.
+
+    Los documentos en cuarentena vigente se omiten sin abrirlos. Como mucho
+    `2 × workers` documentos están en memoria a la vez, y se cargan en el
+    orden de entrada para que el resultado no dependa de qué worker termina
+    primero (importa para los duplicados).
+
+    `cargar(conn, doc, resultado, stats, ms)` reemplaza la carga por defecto
+    (cargar_resultado), ej. para actualizar filas en lugar de insertarlas.
+    """
+    ventana = 2 * pool.workers
+    en_vuelo: deque = deque()
+    t0 = time.perf_counter()
+
+    def _cargar_por_defecto(conn, doc, resultado, stats, ms):
+        cargar_resultado(conn, resultado, doc.nombre, doc.origen, stats, ms=ms,
+                         message_id=doc.message_id,
+                         fecha_mensaje=doc.fecha_mensaje, sha256=doc.sha256)
+
+    cargar = cargar or _cargar_por_defecto
+
+    def _cargar_primero():
+        doc, futuro = en_vuelo.popleft()
+        cargar(conn, doc, futuro.result(), stats, (time.perf_counter() - t0) * 1000)
+
+    for n, doc in enumerate(documentos, start=1):
+        if respetar_cuarentena and cuarentena.en_cuarentena(conn, doc.sha256):
+            logger.info("[%s] En cuarentena, se omite.", doc.nombre)
+            stats['cuarentena'] += 1
+            continue
+        logger.info("Procesando: %s", doc.nombre)
+        en_vuelo.append((doc, pool.enviar(doc.nombre, doc.datos)))
+        if len(en_vuelo) >= ventana:
+            _cargar_primero()
+        if n % COMMIT_CADA == 0:
+            conn.commit()
+
+    while en_vuelo:
+        _cargar_primero()
+    conn.commit()
+
+def main(workers: int = 1, timeout: float | None = None,
+         max_mem_mb: int | None = None, cola_log=None,
+         nivel_log: int = logging.INFO, eventos_jsonl: bool = False):
+    raw_dir = RAW_DIR
+    db_path  = DB_PATH
 
     if not os.path.isdir(raw_dir):
-        logger.error(f"Directorio no encontrado: {raw_dir}")
+        logger.error("Directorio no encontrado: %s", raw_dir)
         return
 
     init_database(db_path)
 
     pdfs = sorted(f for f in os.listdir(raw_dir) if f.lower().endswith('.pdf'))
     if not pdfs:
-        logger.warning(f"No se encontraron PDFs en {raw_dir}")
+        logger.warning("No se encontraron PDFs en %s", raw_dir)
+        return
+
+    logger.info("Iniciando proceso. PDFs encontrados: %d", len(pdfs))
+    stats = nuevas_stats()
+
+    documentos = (
+        doc for doc in (leer_documento(os.path.join(raw_dir, f)) for f in pdfs)
+        if doc is not None
+    )
+    pool = crear_pool(workers, timeout, max_mem_mb, cola_log, nivel_log, eventos_jsonl)
+    with sqlite3.connect(db_path) as conn:
+        corrida = cambios.iniciar_corrida(conn, 'run')
+    try:
+        with sqlite3.connect(db_path) as conn, pool:
+            procesar_documentos(conn, pool, documentos, stats)
+
+        resumen_stats("Proceso finalizado", stats)
+        puntuar_cauces(db_path, CAUCES_PATH, todos=False)
+        canonizar_nombres(db_path, todos=False)
+        actualizar_clusters(db_path)
+    finally:
+        # Cambios de la corrida (incluidas las etapas posteriores) → JSONL
+        with sqlite3.connect(db_path) as conn:
+            n = cambios.cerrar_corrida(conn, corrida)
+        logger.info("Corrida %d: %d cambios registrados", corrida, n)
+    exportar_excel(db_path)
+
+def releer_documentos(pares) -> Iterator[DocumentoEntrada]:
+    """
+    Vuelve a leer documentos ya vistos desde su origen, dados como pares
+    (ORIGEN, SHA256): un PDF en disco o el .eml/.mbox del que salió el
+    adjunto. Un archivo que cambió desde entonces (otro hash) se omite.
+    """
+    from src.ingestion.correo import iterar_adjuntos
+
+    por_origen: dict[str, set[str]] = {}
+    for origen, sha256 in pares:
+        por_origen.setdefault(origen, set()).add(sha256)
+    for origen, hashes in por_origen.items():
+        if not origen or not os.path.exists(origen):
+            logger.warning("Origen no disponible: %s", origen)
+            continue
+        if origen.lower().endswith(('.eml', '.mbox')):
+            for adj in iterar_adjuntos([origen]):
+                if adj.sha256 in hashes:
+                    yield DocumentoEntrada(
+                        f"{os.path.basename(origen)}:{adj.nombre}", origen,
+                        adj.sha256, adj.datos, adj.message_id, adj.fecha)
+            continue
+        doc = leer_documento(origen)
+        if doc is not None and doc.sha256 in hashes:
+            yield doc
+        elif doc is not None:
+            logger.warning("[%s] El archivo cambió desde que se procesó; "
+                           "se tomará como documento nuevo en la próxima corrida.",
+                           doc.nombre)
+
+# ── Posibles duplicados ──────────────────────────────────────────────────────
+
+def listar_duplicados(db_path: str, umbral: float, reindexar: bool = False) -> None:
+    init_database(db_path)
+    with sqlite3.connect(db_path) as conn:
+        if reindexar:
+            n = duplicados.reindexar(conn, todos=True)
+            conn.commit()
+            logger.info("Documentos reindexados: %d", n)
+        pares = duplicados.listar(conn, umbral)
+    if not pares:
+        print("No hay posibles duplicados.")
         return
+    for p in pares:
+        print(f"{p['SIMILITUD']:.2f}  {p['NUM_INC_A'] or '-':<22} {p['NOMBRE_A']}")
+        print(f"      {p['NUM_INC_B'] or '-':<22} {p['NOMBRE_B']}")
+    print(f"\n{len(pares)} par(es) con similitud ≥ {umbral:.2f}")
 
-    logger.info(f"Iniciando proceso. PDFs encontrados: {len(pdfs)}")
-    insertados = omitidos = errores = 0
+# ── Vecinos espacio-temporales ───────────────────────────────────────────────
 
+def mostrar_vecinos(db_path: str, num_inc: str, radio_m: float, dias: int) -> None:
+    from src.analysis import vecinos
+
+    init_database(db_path)
     with sqlite3.connect(db_path) as conn:
-        for filename in pdfs:
-            logger.info(f"Procesando: {filename}")
-            data = process_pdf(os.path.join(raw_dir, filename))
-            if data is None:
-                omitidos += 1
-                continue
-            if insert_incident(conn, data):
-                insertados += 1
-            else:
-                errores += 1
+        puntos = vecinos.cargar_puntos(conn)
+    objetivo = next((p for p in puntos if p.num_inc == num_inc), None)
+    if objetivo is None:
+        print(f"{num_inc}: no existe o no tiene coordenadas y fecha válidas.")
+        return
+    cercanos = vecinos.IndiceGrilla(puntos, radio_m, dias).vecinos(objetivo)
+    if not cercanos:
+        print(f"Sin incidentes a menos de {radio_m:.0f} m y {dias} días de {num_inc}.")
+        return
+    for q, distancia, d in cercanos:
+        print(f"{q.num_inc:<22} {distancia:7.0f} m  {d:3d} días  "
+              f"{vecinos.clasificar(distancia, d):<10}  {q.instalacion or ''}")
+
+def mostrar_repeticiones(db_path: str, radio_m: float, dias: int, min_foco: int) -> None:
+    from src.analysis import vecinos
+
+    init_database(db_path)
+    with sqlite3.connect(db_path) as conn:
+        puntos = vecinos.cargar_puntos(conn)
+    pares = vecinos.pares_vecinos(puntos, radio_m, dias)
+    duplicados_ = [p for p in pares if p.tipo == 'duplicado']
+    grupos = vecinos.focos(pares, min_foco)
+
+    print(f"{len(puntos)} incidentes con coordenadas y fecha; "
+          f"{len(pares)} par(es) a ≤ {radio_m:.0f} m y ≤ {dias} días.\n")
+    if duplicados_:
+        print("Posibles duplicados (mismo lugar y fecha):")
+        for p in duplicados_:
+            print(f"  {p.a.num_inc} ~ {p.b.num_inc}  ({p.distancia_m:.0f} m, {p.dias} días)")
+        print()
+    if grupos:
+        print(f"Focos de fallas recurrentes (≥ {min_foco} incidentes):")
+        for grupo in grupos:
+            print(f"  {len(grupo)}: {', '.join(grupo)}")
+    elif not duplicados_:
+        print("Sin duplicados ni focos de fallas recurrentes.")
+
+# ── Cauces ───────────────────────────────────────────────────────────────────
+
+def puntuar_cauces(db_path: str, geojson: str, todos: bool = True) -> None:
+    """
+    Distancia de los incidentes al cauce más cercano. Sin `todos`, sólo los
+    que no la tienen; si no hay archivo de cauces, no hace nada.
+    """
+    from src.analysis import cauces
+
+    if not os.path.exists(geojson):
+        if todos:
+            print(f"No existe {geojson}: exportar ríos y cauces como GeoJSON (WGS84).")
+        return
+    t0 = time.perf_counter()
+    segmentos = cauces.cargar_geojson(geojson)
+    init_database(db_path)
+    with sqlite3.connect(db_path) as conn:
+        n = cauces.puntuar_incidentes(conn, segmentos, todos)
         conn.commit()
+        if todos:
+            for num_inc, dist, cauce in conn.execute(
+                    "SELECT NUM_INC, DIST_CAUCE_M, CAUCE_CERCANO FROM incidentes "
+                    "WHERE DIST_CAUCE_M IS NOT NULL ORDER BY DIST_CAUCE_M LIMIT 20"):
+                print(f"{num_inc:<22} {dist:9.0f} m  {cauce}")
+    logger.info("Distancia a cauces: %d incidente(s) en %.2f s.", n, time.perf_counter() - t0)
 
-    logger.info(
-        f"Proceso finalizado — "
-        f"Insertados: {insertados} | Omitidos: {omitidos} | Errores: {errores}"
+def canonizar_nombres(db_path: str, todos: bool = True) -> None:
+    """
+    ID canónico de área, yacimiento e instalación. Sin `todos`, sólo las filas
+    que no lo tienen. Con `todos`, lista además los valores sin coincidencia.
+    """
+    from src.transformation import canonicos
+
+    t0 = time.perf_counter()
+    diccionario = canonicos.cargar()
+    init_database(db_path)
+    with sqlite3.connect(db_path) as conn:
+        n, sin_coincidencia = canonicos.canonizar_incidentes(conn, diccionario, todos)
+        conn.commit()
+    if todos:
+        for (columna, valor), veces in sorted(sin_coincidencia.items(),
+                                              key=lambda x: (x[0][0], -x[1], x[0][1])):
+            print(f"{columna:<17} x{veces:<4} {valor}")
+        print(f"\n{len(sin_coincidencia)} valor(es) sin nombre canónico: agregarlos a "
+              f"data/nombres_canonicos.json como nombre o alias.")
+    logger.info("Nombres canónicos: %d incidente(s) en %.2f s.", n, time.perf_counter() - t0)
+
+# ── Clusters de densidad ─────────────────────────────────────────────────────
+
+def actualizar_clusters(db_path: str, eps: float | None = None,
+                        min_pts: int | None = None, rehacer: bool = False) -> None:
+    with sqlite3.connect(db_path) as conn:
+        r = clusters.actualizar(conn, eps, min_pts, rehacer)
+        conn.commit()
+    logger.info("Clusters: %d incidente(s) nuevos, %d fusión(es), %d cluster(s)%s.",
+                r['nuevos'], r['fusiones'], r['clusters'],
+                " (rehecho desde cero)" if r['rehecho'] else "")
+
+def mostrar_clusters(db_path: str, eps: float | None, min_pts: int | None,
+                     rehacer: bool, mes: str | None) -> None:
+    init_database(db_path)
+    actualizar_clusters(db_path, eps, min_pts, rehacer)
+    with sqlite3.connect(db_path) as conn:
+        filas = clusters.listar(conn, mes)
+    if not filas:
+        print("Sin clusters" + (f" en {mes}." if mes else "."))
+        return
+    for f in filas:
+        if mes:
+            print(f"#{f['CLUSTER']:<4} {f['N']:3d} inc.  {f['VOL_M3'] or 0:8.1f} m3  "
+                  f"{f['YACIMIENTO'] or '-':<28} ({f['LAT']:.5f}, {f['LON']:.5f})")
+        else:
+            print(f"#{f['CLUSTER']:<4} {f['N']:3d} inc.  {f['VOL_M3'] or 0:8.1f} m3  "
+                  f"{f['YACIMIENTO'] or '-':<28} {f['DESDE']} → {f['HASTA']}  "
+                  f"({f['LAT']:.5f}, {f['LON']:.5f})")
+
+# ── Mapa de densidad ─────────────────────────────────────────────────────────
+
+def exportar_densidad(db_path: str, salida: str, celda_m: float,
+                      ancho_banda_m: float, peso: str) -> None:
+    from src.analysis import densidad
+
+    init_database(db_path)
+    t0 = time.perf_counter()
+    with sqlite3.connect(db_path) as conn:
+        este, norte, pesos = densidad.cargar_puntos(conn, peso)
+    grilla = densidad.densidad(este, norte, pesos, celda_m, ancho_banda_m)
+    densidad.escribir_asc(salida, grilla)
+    filas, columnas = grilla.valores.shape
+    unidad = 'm3/km2' if peso == 'volumen' else 'incidentes/km2'
+    print(f"{salida}: {columnas} × {filas} celdas de {celda_m:g} m, {len(este)} incidente(s), "
+          f"máximo {grilla.valores.max():.3g} {unidad} ({time.perf_counter() - t0:.2f} s)")
+
+# ── Concesiones ──────────────────────────────────────────────────────────────
+
+def mostrar_concesiones(db_path: str, geojson: str, solo_discrepancias: bool) -> None:
+    from src.analysis import concesiones
+
+    if not os.path.exists(geojson):
+        print(f"No existe {geojson}: exportar los límites de concesiones como GeoJSON (WGS84).")
+        return
+    poligonos = concesiones.cargar_geojson(geojson)
+    init_database(db_path)
+    with sqlite3.connect(db_path) as conn:
+        asignaciones = concesiones.asignar_incidentes(conn, poligonos)
+
+    conteo = Counter(a.estado for a in asignaciones)
+    for a in asignaciones:
+        if solo_discrepancias and a.estado == 'coincide':
+            continue
+        print(f"{a.num_inc:<22} {a.estado:<13} reportada={a.reportada or '-':<28} "
+              f"polígono={a.concesion or '-'} / {a.yacimiento or '-'}")
+    print(f"\n{len(asignaciones)} incidente(s): " +
+          ", ".join(f"{conteo[e]} {e}" for e in ('coincide', 'discrepancia', 'fuera', 'sin_area')))
+
+# ── Validación de coordenadas ────────────────────────────────────────────────
+
+def validar_coordenadas(db_path: str, umbral_m: float) -> None:
+    from src.analysis import validacion_coordenadas
+
+    init_database(db_path)
+    t0 = time.perf_counter()
+    with sqlite3.connect(db_path) as conn:
+        discrepancias = validacion_coordenadas.validar(conn, umbral_m)
+    for d in discrepancias:
+        distancia = f"{d.distancia_m:10.0f} m" if d.distancia_m is not None else "  ilegible  "
+        print(f"{d.num_inc:<22} {d.sistema:<4} {distancia}  {d.reportada}")
+    print(f"\n{len(discrepancias)} representación(es) a más de {umbral_m:g} m del DD "
+          f"({time.perf_counter() - t0:.2f} s)")
+
+# ── Corpus de referencia ─────────────────────────────────────────────────────
+
+def grabar_corpus_referencia(db_path: str, salida: str, workers: int = 1,
+                             timeout: float | None = None) -> None:
+    from src.ingestion import corpus
+
+    init_database(db_path)
+    t0 = time.perf_counter()
+    with sqlite3.connect(db_path) as conn:
+        n = corpus.grabar_corpus(conn, salida, workers, timeout)
+    print(f"{n} documento(s) grabados en {salida} ({time.perf_counter() - t0:.1f} s)")
+
+def comparar_corpus_referencia(path: str, workers: int = 1, timeout: float | None = None,
+                               ejemplos: int = 3) -> int:
+    """Imprime las diferencias con el corpus por operadora y campo; retorna cuántas hay."""
+    from src.ingestion import corpus
+
+    reporte = corpus.comparar_corpus(path, workers, timeout, ejemplos)
+    print(f"\n{reporte.documentos} documento(s) en {reporte.segundos:.1f} s — "
+          f"{reporte.con_cambios} con diferencias")
+    if not reporte.conteos:
+        return 0
+    filas: dict = {}
+    for (operadora, campo, tipo), n in reporte.conteos.items():
+        filas.setdefault((operadora, campo), Counter())[tipo] += n
+    print(f"\n{'Operadora':<22} {'Campo':<18} {'Cambiados':>9} {'Agregados':>9} {'Perdidos':>9}")
+    for (operadora, campo), c in sorted(filas.items()):
+        print(f"{operadora:<22} {campo:<18} {c['cambiado']:>9} {c['agregado']:>9} "
+              f"{c['perdido']:>9}")
+        for d in reporte.ejemplos.get((operadora, campo), []):
+            print(f"    {d.documento}: {d.antes!r:.60} → {d.despues!r:.60}")
+    return reporte.total
+
+# ── Resúmenes ────────────────────────────────────────────────────────────────
+
+def mostrar_stats(db_path: str, desde: str | None = None) -> None:
+    """Incidentes y volumen por operadora/mes y por área/magnitud (tablas agg_*)."""
+    init_database(db_path)
+    with sqlite3.connect(db_path) as conn:
+        por_mes = agregados.por_operador_mes(conn, desde)
+        por_area = agregados.por_area_magnitud(conn)
+    print(f"{'Operadora':<36} {'Mes':<8} {'Inc.':>5} {'Vol. m3':>10}")
+    for operador, mes, n, vol in por_mes:
+        print(f"{operador or '-':<36} {mes or '-':<8} {n:>5} {vol:>10.3f}")
+    print(f"\n{'Área':<36} {'Magnitud':<12} {'Inc.':>5} {'Vol. m3':>10}")
+    for area, magnitud, n, vol in por_area:
+        print(f"{area or '-':<36} {magnitud or '-':<12} {n:>5} {vol:>10.3f}")
+
+def reconstruir_agregados(db_path: str) -> int:
+    """Recalcula las tablas agg_* desde cero; retorna cuántos grupos diferían."""
+    init_database(db_path)
+    t0 = time.perf_counter()
+    with sqlite3.connect(db_path) as conn:
+        distintos = agregados.reconstruir_todos(conn)
+        conn.commit()
+    for tabla, n in distintos.items():
+        print(f"{tabla:<20} {n} grupo(s) distintos de lo incremental")
+    print(f"Resúmenes reconstruidos en {time.perf_counter() - t0:.2f} s")
+    return sum(distintos.values())
+
+# ── Cambios ──────────────────────────────────────────────────────────────────
+
+def listar_cambios(db_path: str, despues: int = 0, limite: int | None = None) -> None:
+    """Imprime en stdout, una línea JSON por cambio, los posteriores a `despues`."""
+    init_database(db_path)
+    with sqlite3.connect(db_path) as conn:
+        while limite is None or limite > 0:
+            lote = cambios.despues(conn, despues, min(limite or cambios.LIMITE, cambios.LIMITE))
+            if not lote:
+                break
+            for cambio in lote:
+                print(json.dumps(cambio.como_dict(), ensure_ascii=False))
+            despues = lote[-1].seq
+            if limite is not None:
+                limite -= len(lote)
+
+# ── Cuarentena ───────────────────────────────────────────────────────────────
+
+def listar_cuarentena(db_path: str) -> None:
+    init_database(db_path)
+    with sqlite3.connect(db_path) as conn:
+        entradas = cuarentena.listar(conn)
+    if not entradas:
+        print("La cuarentena está vacía.")
+        return
+    for e in entradas:
+        marca = ' ' if e['vigente'] else '*'
+        print(f"{marca} {e['SHA256'][:12]}  {e['ETAPA']:<14} x{e['INTENTOS']:<3} "
+              f"{e['ULTIMA_VEZ']}  {e['NOMBRE']}")
+        if e['ERROR']:
+            print(f"    {e['ERROR']}")
+    print(f"\n{len(entradas)} documento(s). "
+          "* = el código cambió desde el fallo; se reintentará en la próxima corrida.")
+
+def reintentar_cuarentena(db_path: str, prefijos: list[str], todos: bool = False,
+                          **opciones_pool) -> dict:
+    """
+    Saca de cuarentena los documentos indicados (por prefijo de SHA-256, o
+    todos) y los vuelve a procesar desde su origen: un PDF en disco o el
+    .eml/.mbox del que salió el adjunto.
+    """
+    init_database(db_path)
+    stats = nuevas_stats()
+    with sqlite3.connect(db_path) as conn:
+        entradas = cuarentena.listar(conn) if todos else cuarentena.buscar(conn, prefijos)
+        if not entradas:
+            logger.warning("No hay documentos en cuarentena que coincidan.")
+            return stats
+
+        objetivos = {e['SHA256'] for e in entradas}
+        for sha256 in objetivos:
+            cuarentena.liberar(conn, sha256)
+        conn.commit()
+        logger.info("Reencolados %d documento(s)", len(objetivos))
+
+        pares = [(e['ORIGEN'], e['SHA256']) for e in entradas]
+        with crear_pool(**opciones_pool) as pool:
+            procesar_documentos(conn, pool, releer_documentos(pares), stats,
+                                respetar_cuarentena=False)
+
+    resumen_stats("Reintento finalizado", stats)
+    return stats
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Procesador de incidentes ambientales — Oil & Gas Mendoza")
+    parser.add_argument(
+        '--eventos-jsonl', action='store_true',
+        help="Escribir además logs/eventos.jsonl (un evento JSON por línea)")
+    parser.add_argument(
+        '--log-level', default='INFO',
+        choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'],
+        help="Nivel mínimo de logging (default: INFO)")
+
+    parser.add_argument(
+        '--timeout', type=float, default=None,
+        help="Segundos máximos por documento antes de abortarlo (default: 60)")
+    parser.add_argument(
+        '--max-mem-mb', type=int, default=None,
+        help="Memoria adicional máxima por worker en MB, 0 = sin tope "
+             "(default: 1024; sólo Linux/macOS)")
+
+    sub = parser.add_subparsers(dest='comando')
+    run = sub.add_parser('run', help="Procesar data/raw una vez y exportar (default)")
+    run.add_argument('--workers', type=int, default=1,
+                     help="Procesos en paralelo (default: 1)")
+
+    watch = sub.add_parser(
+        'watch', help="Vigilar data/raw y procesar cada PDF nuevo al llegar")
+    watch.add_argument('--workers', type=int, default=2,
+                       help="Procesos precargados (default: 2)")
+    watch.add_argument('--intervalo', type=float, default=0.2,
+                       help="Segundos entre sondeos de la carpeta (default: 0.2)")
+    watch.add_argument('--estabilidad', type=float, default=0.4,
+                       help="Segundos sin cambios para considerar un archivo "
+                            "completamente copiado (default: 0.4)")
+    watch.add_argument('--ignorar-existentes', action='store_true',
+                       help="No reprocesar los PDFs ya presentes al arrancar")
+
+    serve = sub.add_parser(
+        'serve', help="Servicio HTTP local: cargar PDFs (POST) y consultar incidentes (GET)")
+    serve.add_argument('--host', default='127.0.0.1',
+                       help="Dirección donde escuchar (default: 127.0.0.1)")
+    serve.add_argument('--port', type=int, default=8765,
+                       help="Puerto (default: 8765)")
+    serve.add_argument('--workers', type=int, default=2,
+                       help="Procesos precargados (default: 2)")
+    serve.add_argument('--max-cola', type=int, default=16,
+                       help="PDFs en proceso a la vez antes de responder 503 (default: 16)")
+    serve.add_argument('--solo-lectura', action='store_true',
+                       help="Atender sólo GET /incidents, sin pool de workers")
+
+    correo = sub.add_parser(
+        'email', help="Procesar adjuntos PDF de exportaciones .eml/.mbox")
+    correo.add_argument('paths', nargs='+',
+                        help="Archivos .eml/.mbox o directorios que los contengan")
+
+    cuar = sub.add_parser(
+        'quarantine', help="Ver o reencolar documentos que fallaron")
+    cuar_sub = cuar.add_subparsers(dest='accion', required=True)
+    cuar_sub.add_parser('list', help="Listar documentos en cuarentena")
+    retry = cuar_sub.add_parser('retry', help="Sacar de cuarentena y reprocesar")
+    retry.add_argument('sha256', nargs='*',
+                       help="Prefijos de SHA-256 (los que muestra 'list')")
+    retry.add_argument('--todos', action='store_true',
+                       help="Reencolar toda la cuarentena")
+    retry.add_argument('--workers', type=int, default=1,
+                       help="Procesos en paralelo (default: 1)")
+    reproc = sub.add_parser(
+        'reprocess', help="Reextraer documentos ya cargados con el código actual")
+    reproc.add_argument('--stale', action='store_true',
+                        help="Sólo los extraídos con una versión vieja de su extractor")
+    reproc.add_argument('--workers', type=int, default=1,
+                        help="Procesos en paralelo (default: 1)")
+    dup = sub.add_parser(
+        'duplicates', help="Listar documentos casi duplicados (MinHash)")
+    dup.add_argument('--umbral', type=float, default=duplicados.UMBRAL_SIMILITUD,
+                     help="Similitud mínima a listar (default: %(default)s)")
+    dup.add_argument('--reindex', action='store_true',
+                     help="Recalcular las firmas desde el texto cacheado")
+    def _args_vecindad(p):
+        p.add_argument('--radio', type=float, default=200.0,
+                       help="Distancia máxima en metros (default: 200)")
+        p.add_argument('--dias', type=int, default=30,
+                       help="Días máximos de diferencia (default: 30)")
+
+    vec = sub.add_parser(
+        'neighbors', help="Incidentes cercanos en espacio y tiempo a uno dado")
+    vec.add_argument('num_inc', help="NUM_INC del incidente (ej. PETSUD-576)")
+    _args_vecindad(vec)
+    rep = sub.add_parser(
+        'repeats', help="Duplicados y focos de fallas repetidas en toda la tabla")
+    _args_vecindad(rep)
+    rep.add_argument('--min-foco', type=int, default=3,
+                     help="Incidentes mínimos para reportar un foco (default: 3)")
+    hot = sub.add_parser(
+        'hotspots', help="Clusters de densidad (DBSCAN) y su resumen por mes y yacimiento")
+    hot.add_argument('--eps', type=float, default=None,
+                     help="Radio en metros (default: el de la corrida anterior, o 500)")
+    hot.add_argument('--min-pts', type=int, default=None,
+                     help="Incidentes a ≤ eps para ser núcleo (default: anterior, o 3)")
+    hot.add_argument('--rebuild', action='store_true',
+                     help="Rehacer los clusters desde cero")
+    hot.add_argument('--mes', metavar='YYYY-MM',
+                     help="Mostrar los clusters con incidentes en ese mes, por yacimiento")
+    den = sub.add_parser(
+        'heatmap', help="Superficie de densidad (ESRI ASCII Grid, UTM 19S) para QGIS")
+    den.add_argument('--salida', default=os.path.join('data', 'densidad.asc'),
+                     help="Archivo .asc de salida (default: data/densidad.asc)")
+    den.add_argument('--celda', type=float, default=1000.0,
+                     help="Tamaño de celda en metros (default: 1000)")
+    den.add_argument('--ancho-banda', type=float, default=2000.0,
+                     help="Desvío del kernel gaussiano en metros; 0 = sin suavizar (default: 2000)")
+    den.add_argument('--peso', choices=('volumen', 'cantidad'), default='volumen',
+                     help="Pesar por VOL_M3 o contar incidentes (default: volumen)")
+    cau = sub.add_parser(
+        'watercourses', help="Recalcular la distancia de todos los incidentes a cauces")
+    cau.add_argument('--geojson', default=CAUCES_PATH,
+                     help="Ríos y cauces como líneas GeoJSON (default: data/cauces.geojson)")
+    con = sub.add_parser(
+        'concessions', help="Concesión y yacimiento según los límites en un GeoJSON")
+    con.add_argument('--geojson', default='data/concesiones.geojson',
+                     help="Límites de concesiones/yacimientos (default: data/concesiones.geojson)")
+    con.add_argument('--discrepancias', action='store_true',
+                     help="Mostrar sólo los incidentes que no coinciden con lo reportado")
+    val = sub.add_parser(
+        'check-coords', help="Contrastar GM/GMS (YPF) y Gauss-Krüger (Pluspetrol) con el DD")
+    val.add_argument('--umbral', type=float, default=30.0,
+                     help="Diferencia en metros a partir de la cual se reporta (default: 30)")
+    can = sub.add_parser(
+        'canonicalize', help="Recalcular los ID canónicos de área, yacimiento e instalación")
+    can.add_argument('--pendientes', action='store_true',
+                     help="Sólo los incidentes sin ID (default: todos)")
+    gold = sub.add_parser(
+        'golden', help="Corpus de referencia: congelar la salida de los extractores y comparar")
+    gold_sub = gold.add_subparsers(dest='accion', required=True)
+    for accion, ayuda in (('record', "Grabar la salida actual para los textos cacheados"),
+                          ('diff', "Reextraer el corpus y reportar diferencias por campo")):
+        p = gold_sub.add_parser(accion, help=ayuda)
+        p.add_argument('--corpus', default=os.path.join('data', 'corpus_referencia.jsonl.gz'),
+                       help="Archivo del corpus (default: data/corpus_referencia.jsonl.gz)")
+        p.add_argument('--workers', type=int, default=1,
+                       help="Procesos en paralelo (default: 1)")
+    gold_sub.choices['diff'].add_argument(
+        '--ejemplos', type=int, default=3,
+        help="Ejemplos a mostrar por operadora y campo (default: 3)")
+    st = sub.add_parser(
+        'stats', help="Incidentes y volumen por operadora/mes y área/magnitud (resúmenes)")
+    st.add_argument('--desde', metavar='AAAA-MM',
+                    help="Sólo meses desde éste en la tabla por operadora")
+    sub.add_parser('rebuild-aggregates',
+                   help="Recalcular los resúmenes desde cero e informar diferencias")
+    cam = sub.add_parser(
+        'changes', help="Cambios de incidentes posteriores a una secuencia, en JSONL")
+    cam.add_argument('--despues', type=int, default=0, metavar='SEQ',
+                     help="Última secuencia ya aplicada (default: 0, todo)")
+    cam.add_argument('--limite', type=int, default=None,
+                     help="Máximo de cambios a listar (default: todos)")
+    args = parser.parse_args(argv)
+    if args.comando == 'quarantine' and args.accion == 'retry' \
+            and not (args.sha256 or args.todos):
+        parser.error("quarantine retry: indicar prefijos de SHA-256 o --todos")
+    return args
+
+def cli(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    nivel = getattr(logging, args.log_level)
+
+    # Los workers loguean a través de una cola multiproceso que drena
+    # el hilo escritor de este proceso
+    from src.logging_setup import crear_cola_multiproceso
+    cola = crear_cola_multiproceso()
+    configurar_logging(nivel=nivel, eventos_jsonl=args.eventos_jsonl, cola=cola)
+    opciones_pool = dict(
+        timeout=args.timeout, max_mem_mb=args.max_mem_mb,
+        cola_log=cola, nivel_log=nivel, eventos_jsonl=args.eventos_jsonl,
     )
-    exportar_excel(db_path)
+    try:
+        if args.comando == 'watch':
+            from src.ingestion.daemon import run_daemon
+            run_daemon(
+                RAW_DIR, DB_PATH,
+                workers=args.workers,
+                intervalo=args.intervalo,
+                estabilidad=args.estabilidad,
+                procesar_existentes=not args.ignorar_existentes,
+                **opciones_pool,
+            )
+        elif args.comando == 'serve':
+            from src.ingestion.servidor import run_servidor
+            run_servidor(DB_PATH, args.host, args.port, workers=args.workers,
+                         max_cola=args.max_cola, solo_lectura=args.solo_lectura,
+                         **opciones_pool)
+        elif args.comando == 'email':
+            from src.ingestion.correo import run_correo
+            run_correo(args.paths, DB_PATH, **opciones_pool)
+        elif args.comando == 'reprocess':
+            from src.ingestion.reproceso import run_reproceso
+            run_reproceso(DB_PATH, todos=not args.stale, workers=args.workers,
+                          **opciones_pool)
+        elif args.comando == 'duplicates':
+            listar_duplicados(DB_PATH, args.umbral, reindexar=args.reindex)
+        elif args.comando == 'neighbors':
+            mostrar_vecinos(DB_PATH, args.num_inc, args.radio, args.dias)
+        elif args.comando == 'repeats':
+            mostrar_repeticiones(DB_PATH, args.radio, args.dias, args.min_foco)
+        elif args.comando == 'hotspots':
+            mostrar_clusters(DB_PATH, args.eps, args.min_pts, args.rebuild, args.mes)
+        elif args.comando == 'heatmap':
+            exportar_densidad(DB_PATH, args.salida, args.celda, args.ancho_banda, args.peso)
+        elif args.comando == 'watercourses':
+            puntuar_cauces(DB_PATH, args.geojson)
+        elif args.comando == 'concessions':
+            mostrar_concesiones(DB_PATH, args.geojson, args.discrepancias)
+        elif args.comando == 'check-coords':
+            validar_coordenadas(DB_PATH, args.umbral)
+        elif args.comando == 'canonicalize':
+            canonizar_nombres(DB_PATH, todos=not args.pendientes)
+        elif args.comando == 'stats':
+            mostrar_stats(DB_PATH, args.desde)
+        elif args.comando == 'rebuild-aggregates':
+            if reconstruir_agregados(DB_PATH):
+                raise SystemExit(1)
+        elif args.comando == 'changes':
+            listar_cambios(DB_PATH, args.despues, args.limite)
+        elif args.comando == 'golden':
+            if args.accion == 'record':
+                grabar_corpus_referencia(DB_PATH, args.corpus, args.workers, args.timeout)
+            elif comparar_corpus_referencia(args.corpus, args.workers, args.timeout,
+                                            args.ejemplos):
+                raise SystemExit(1)
+        elif args.comando == 'quarantine':
+            if args.accion == 'list':
+                listar_cuarentena(DB_PATH)
+            else:
+                reintentar_cuarentena(DB_PATH, args.sha256, todos=args.todos,
+                                      workers=args.workers, **opciones_pool)
+        else:
+            main(workers=getattr(args, 'workers', 1), **opciones_pool)
+    finally:
+        # Drenar la cola multiproceso antes de que multiprocessing la cierre
+        detener_logging()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    cli()
\ No newline at end of file
@@ -0,0 +1,158 @@
+"""
+Tablas de resumen mantenidas incrementalmente.
+
+  agg_operador_mes     cantidad de incidentes y volumen derramado por
+                       (operadora, mes de la fecha del incidente)
+  agg_area_magnitud    lo mismo por (área, magnitud); el área es el ID
+                       canónico si ya se asignó, si no el nombre reportado
+
+Las mantienen triggers sobre `incidentes`: cada INSERT, DELETE o UPDATE de
+las columnas involucradas suma o resta su aporte en la misma transacción.
+Así valen para cualquier camino de escritura (carga, reproceso, nombres
+canónicos) y `stats` las lee sin recorrer la tabla de incidentes.
+
+El volumen se acumula como entero en litros. Con sumas y restas de REAL
+quedarían residuos de redondeo (0.1 + 0.2 − 0.2 ≠ 0.1), y la
+reconstrucción desde cero no coincidiría exactamente con lo incremental.
+
+`rebuild-aggregates` recalcula todo con un GROUP BY por tabla, informa las
+filas que no coincidían con lo incremental y las reemplaza.
+"""
+
+import logging
+import sqlite3
+from typing import NamedTuple
+
+logger = logging.getLogger(__name__)
+
+# 'dd-mm-yyyy' (normalizar_fecha) → 'yyyy-mm'; '' si no hay fecha
+_MES = ("CASE WHEN {t}.FECHA GLOB '[0-9][0-9]-[0-9][0-9]-[0-9][0-9][0-9][0-9]' "
+        "THEN substr({t}.FECHA, 7, 4) || '-' || substr({t}.FECHA, 4, 2) ELSE '' END")
+_LITROS = "CAST(round(COALESCE({t}.VOL_M3, 0) * 1000) AS INTEGER)"
+
+
+class Agregado(NamedTuple):
+    tabla: str
+    claves: dict[str, str]      # columna → expresión sobre {t} (NEW, OLD o la tabla)
+    depende_de: tuple[str, ...]  # columnas de incidentes que cambian el agregado
+
+
+AGREGADOS = (
+    Agregado('agg_operador_mes',
+             {'OPERADOR': "COALESCE({t}.OPERADOR, '')", 'MES': _MES},
+             ('OPERADOR', 'FECHA', 'VOL_M3')),
+    Agregado('agg_area_magnitud',
+             {'AREA': "COALESCE({t}.AREA_ID, {t}.AREA_CONCESION, '')",
+              'MAGNITUD': "COALESCE({t}.MAGNITUD, '')"},
+             ('AREA_ID', 'AREA_CONCESION', 'MAGNITUD', 'VOL_M3')),
+)
+
+
+def _sumar(agg: Agregado, t: str, signo: str) -> str:
+    """UPSERT que suma (o resta) el aporte de la fila {t} a su grupo."""
+    claves = ', '.join(agg.claves)
+    valores = ', '.join(e.format(t=t) for e in agg.claves.values())
+    sql = (f"INSERT INTO {agg.tabla} ({claves}, N, VOL_L) "
+           f"VALUES ({valores}, {signo}1, {signo}{_LITROS.format(t=t)}) "
+           f"ON CONFLICT({claves}) DO UPDATE SET N = N + excluded.N, "
+           f"VOL_L = VOL_L + excluded.VOL_L;")
+    if signo == '-':
+        condicion = ' AND '.join(f"{c} = {e.format(t=t)}" for c, e in agg.claves.items())
+        sql += f" DELETE FROM {agg.tabla} WHERE {condicion} AND N = 0;"
+    return sql
+
+
+def crear_tablas(conn: sqlite3.Connection) -> None:
+    """Tablas y triggers. Si las tablas no existían, se llenan desde incidentes."""
+    existentes = {f[0] for f in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE 'agg_%'")}
+    for agg in AGREGADOS:
+        columnas = ', '.join(f"{c} TEXT NOT NULL" for c in agg.claves)
+        conn.execute(f'''
+            CREATE TABLE IF NOT EXISTS {agg.tabla} (
+                {columnas},
+                N      INTEGER NOT NULL,
+                VOL_L  INTEGER NOT NULL,
+                PRIMARY KEY ({', '.join(agg.claves)})
+            )
+        ''')
+        conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {agg.tabla}_ins AFTER INSERT ON incidentes
+            BEGIN
+                {_sumar(agg, 'NEW', '')}
+            END
+        ''')
+        conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {agg.tabla}_del AFTER DELETE ON incidentes
+            BEGIN
+                {_sumar(agg, 'OLD', '-')}
+            END
+        ''')
+        cambio = ' OR '.join(f"OLD.{c} IS NOT NEW.{c}" for c in agg.depende_de)
+        conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {agg.tabla}_upd
+            AFTER UPDATE OF {', '.join(agg.depende_de)} ON incidentes
+            WHEN {cambio}
+            BEGIN
+                {_sumar(agg, 'OLD', '-')}
+                {_sumar(agg, 'NEW', '')}
+            END
+        ''')
+        if agg.tabla not in existentes:
+            reconstruir(conn, agg)
+
+
+def _agrupar(agg: Agregado) -> str:
+    claves = ', '.join(f"{e.format(t='i')} AS {c}" for c, e in agg.claves.items())
+    return (f"SELECT {claves}, COUNT(*) AS N, SUM({_LITROS.format(t='i')}) AS VOL_L "
+            f"FROM incidentes i GROUP BY {', '.join(str(n + 1) for n in range(len(agg.claves)))}")
+
+
+def reconstruir(conn: sqlite3.Connection, agg: Agregado) -> int:
+    """
+    Recalcula la tabla desde incidentes en una sola pasada. Retorna cuántos
+    grupos diferían de lo mantenido incrementalmente (agregados, faltantes o
+    con otros totales).
+    """
+    claves = ', '.join(agg.claves)
+    conn.execute(f"CREATE TEMP TABLE _nuevo AS {_agrupar(agg)}")
+    try:
+        distintos = conn.execute(f'''
+            SELECT COUNT(*) FROM (
+                SELECT * FROM (SELECT {claves}, N, VOL_L FROM _nuevo
+                               EXCEPT SELECT {claves}, N, VOL_L FROM {agg.tabla})
+                UNION ALL
+                SELECT * FROM (SELECT {claves}, N, VOL_L FROM {agg.tabla}
+                               EXCEPT SELECT {claves}, N, VOL_L FROM _nuevo)
+            )
+        ''').fetchone()[0]
+        conn.execute(f"DELETE FROM {agg.tabla}")
+        conn.execute(f"INSERT INTO {agg.tabla} ({claves}, N, VOL_L) "
+                     f"SELECT {claves}, N, VOL_L FROM _nuevo")
+    finally:
+        conn.execute("DROP TABLE _nuevo")
+    return distintos
+
+
+def reconstruir_todos(conn: sqlite3.Connection) -> dict[str, int]:
+    """Reconstruye todas las tablas de resumen: tabla → grupos que diferían."""
+    return {agg.tabla: reconstruir(conn, agg) for agg in AGREGADOS}
+
+
+# ── Lectura ──────────────────────────────────────────────────────────────────
+
+def por_operador_mes(conn: sqlite3.Connection, desde: str | None = None) -> list[tuple]:
+    """(operadora, mes, cantidad, VOL_M3) ordenado por operadora y mes."""
+    sql = "SELECT OPERADOR, MES, N, VOL_L / 1000.0 FROM agg_operador_mes"
+    params = ()
+    if desde:
+        sql += " WHERE MES >= ?"
+        params = (desde,)
+    return conn.execute(sql + " ORDER BY OPERADOR, MES", params).fetchall()
+
+
+def por_area_magnitud(conn: sqlite3.Connection) -> list[tuple]:
+    """(área, magnitud, cantidad, VOL_M3) ordenado por área y magnitud."""
+    return conn.execute(
+        "SELECT AREA, MAGNITUD, N, VOL_L / 1000.0 FROM agg_area_magnitud "
+        "ORDER BY AREA, MAGNITUD").fetchall()
@@ -0,0 +1,201 @@
+"""
+Registro de cambios de incidentes (change-data feed).
+
+Los sistemas de abajo (servidor GIS, base de reportes) no necesitan recargar
+el CSV completo: leen los cambios posteriores a la última secuencia que
+aplicaron.
+
+    python src/main.py changes --despues 1520
+
+Cada fila de `cambios` tiene:
+
+  SEQ        secuencia creciente: el cursor de los consumidores
+  CORRIDA    corrida abierta en ese momento (tabla `corridas`), o NULL
+  NUM_INC    incidente (el anterior, si la operación lo renombró)
+  OPERACION  'insert' | 'update' | 'delete' | 'duplicado' (INSERT ignorado)
+  CAMPOS     JSON: la fila completa en 'insert'; las columnas que cambiaron,
+             con su valor nuevo, en 'update'; las que diferían de la fila
+             existente en 'duplicado'
+
+Los triggers sobre `incidentes` registran insert, update y delete en la
+misma transacción que la escritura, así que valen para cualquier camino
+(carga, reproceso, cauces, nombres canónicos, clusters). El INSERT OR IGNORE
+de un duplicado no dispara triggers: lo registra insert_incident.
+
+Al cerrar una corrida, los cambios nuevos se agregan además a
+data/cambios.jsonl (una línea por cambio, en orden de SEQ).
+"""
+
+import json
+import logging
+import os
+import sqlite3
+from typing import NamedTuple
+
+logger = logging.getLogger(__name__)
+
+JSONL = os.path.join('data', 'cambios.jsonl')
+LIMITE = 1000
+
+_CORRIDA_ABIERTA = "(SELECT MAX(ID) FROM corridas WHERE FIN IS NULL)"
+
+
+class Cambio(NamedTuple):
+    seq: int
+    corrida: int | None
+    num_inc: str
+    operacion: str
+    campos: dict | None
+    en: str
+
+    def como_dict(self) -> dict:
+        return self._asdict()
+
+
+# ── Esquema ──────────────────────────────────────────────────────────────────
+
+def _triggers(columnas: list[str]) -> dict[str, str]:
+    """SQL de los triggers para las columnas actuales de incidentes."""
+    fila_nueva = ', '.join(f"'{c}', NEW.{c}" for c in columnas)
+    distintas = ' UNION ALL '.join(
+        f"SELECT '{c}' AS c, NEW.{c} AS v WHERE OLD.{c} IS NOT NEW.{c}" for c in columnas)
+    cabecera = "INSERT INTO cambios (CORRIDA, NUM_INC, OPERACION, CAMPOS)"
+    return {
+        'cambios_insert': f'''CREATE TRIGGER cambios_insert AFTER INSERT ON incidentes
+            BEGIN
+                {cabecera} VALUES ({_CORRIDA_ABIERTA}, NEW.NUM_INC, 'insert',
+                                   json_object({fila_nueva}));
+            END''',
+        'cambios_update': f'''CREATE TRIGGER cambios_update AFTER UPDATE ON incidentes
+            BEGIN
+                {cabecera} SELECT {_CORRIDA_ABIERTA}, OLD.NUM_INC, 'update',
+                                  json_group_object(c, v)
+                FROM ({distintas}) HAVING COUNT(*) > 0;
+            END''',
+        'cambios_delete': f'''CREATE TRIGGER cambios_delete AFTER DELETE ON incidentes
+            BEGIN
+                {cabecera} VALUES ({_CORRIDA_ABIERTA}, OLD.NUM_INC, 'delete', NULL);
+            END''',
+    }
+
+
+def crear_tablas(conn: sqlite3.Connection) -> None:
+    """
+    Tablas y triggers. Los triggers enumeran las columnas de incidentes: si
+    una migración agrega columnas, se regeneran.
+    """
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS corridas (
+            ID        INTEGER PRIMARY KEY AUTOINCREMENT,
+            COMANDO   TEXT,
+            INICIO    TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%SZ', 'now')),
+            FIN       TEXT
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS cambios (
+            SEQ        INTEGER PRIMARY KEY AUTOINCREMENT,
+            CORRIDA    INTEGER,
+            NUM_INC    TEXT NOT NULL,
+            OPERACION  TEXT NOT NULL,
+            CAMPOS     TEXT,
+            EN         TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%SZ', 'now'))
+        )
+    ''')
+    columnas = [f[1] for f in conn.execute("PRAGMA table_info(incidentes)")]
+    existentes = dict(conn.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'cambios_%'"))
+    for nombre, sql in _triggers(columnas).items():
+        if existentes.get(nombre) == sql:
+            continue
+        conn.execute(f"DROP TRIGGER IF EXISTS {nombre}")
+        conn.execute(sql)
+
+
+# ── Corridas ─────────────────────────────────────────────────────────────────
+
+def iniciar_corrida(conn: sqlite3.Connection, comando: str) -> int:
+    """
+    Abre una corrida y la confirma, para que la vean los triggers de todas
+    las conexiones. Una corrida anterior que quedó abierta (proceso
+    interrumpido) se cierra antes.
+    """
+    conn.execute("UPDATE corridas SET FIN = strftime('%Y-%m-%dT%H:%M:%SZ', 'now') "
+                 "WHERE FIN IS NULL")
+    corrida = conn.execute("INSERT INTO corridas (COMANDO) VALUES (?)", (comando,)).lastrowid
+    conn.commit()
+    return corrida
+
+
+def cerrar_corrida(conn: sqlite3.Connection, corrida: int, jsonl: str | None = JSONL) -> int:
+    """Cierra la corrida y agrega los cambios nuevos al JSONL. Retorna cuántos tuvo la corrida."""
+    conn.execute("UPDATE corridas SET FIN = strftime('%Y-%m-%dT%H:%M:%SZ', 'now') "
+                 "WHERE ID = ?", (corrida,))
+    conn.commit()
+    if jsonl:
+        exportar_jsonl(conn, jsonl)
+    return conn.execute("SELECT COUNT(*) FROM cambios WHERE CORRIDA = ?", (corrida,)).fetchone()[0]
+
+
+# ── Escritura y lectura ──────────────────────────────────────────────────────
+
+def registrar_duplicado(conn: sqlite3.Connection, registro) -> None:
+    """Un INSERT ignorado: NUM_INC ya existía. CAMPOS son los que diferían."""
+    cursor = conn.execute("SELECT * FROM incidentes WHERE NUM_INC = ?", (registro.get('NUM_INC'),))
+    fila = cursor.fetchone()
+    actual = dict(zip((d[0] for d in cursor.description), fila)) if fila else {}
+    distintos = {k: v for k, v in registro.items() if k in actual and actual[k] != v}
+    conn.execute(f"INSERT INTO cambios (CORRIDA, NUM_INC, OPERACION, CAMPOS) "
+                 f"VALUES ({_CORRIDA_ABIERTA}, ?, 'duplicado', ?)",
+                 (registro.get('NUM_INC'), json.dumps(distintos, ensure_ascii=False)))
+
+
+def despues(conn: sqlite3.Connection, seq: int = 0, limite: int = LIMITE) -> list[Cambio]:
+    """
+    Cambios con SEQ > seq, en orden. Para sincronizar: guardar el `seq` del
+    último aplicado y volver a pedir desde ahí hasta recibir una lista vacía.
+    """
+    filas = conn.execute(
+        "SELECT SEQ, CORRIDA, NUM_INC, OPERACION, CAMPOS, EN FROM cambios "
+        "WHERE SEQ > ? ORDER BY SEQ LIMIT ?", (seq, limite))
+    return [Cambio(s, c, n, o, json.loads(campos) if campos else None, en)
+            for s, c, n, o, campos, en in filas]
+
+
+def _ultima_seq_jsonl(path: str) -> int:
+    """SEQ de la última línea del archivo (0 si no existe), leyendo sólo el final."""
+    try:
+        with open(path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            tamanio = f.tell()
+            bloque = 4096
+            while True:
+                desde = max(0, tamanio - bloque)
+                f.seek(desde)
+                lineas = f.read().splitlines()
+                if len(lineas) > 1 or desde == 0:
+                    break
+                bloque *= 2
+    except FileNotFoundError:
+        return 0
+    for linea in reversed(lineas):
+        if linea.strip():
+            return json.loads(linea)['seq']
+    return 0
+
+
+def exportar_jsonl(conn: sqlite3.Connection, path: str = JSONL) -> int:
+    """Agrega al archivo los cambios posteriores a su última línea. Retorna cuántos."""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    seq = _ultima_seq_jsonl(path)
+    n = 0
+    with open(path, 'a', encoding='utf-8') as f:
+        while True:
+            lote = despues(conn, seq)
+            if not lote:
+                break
+            for cambio in lote:
+                f.write(json.dumps(cambio.como_dict(), ensure_ascii=False) + '\n')
+            seq = lote[-1].seq
+            n += len(lote)
+    return n
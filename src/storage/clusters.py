@@ -0,0 +1,206 @@
+"""
+Clusters de incidentes (DBSCAN sobre UTM 19S) persistidos en SQLite.
+
+  clusters_puntos      estado de cada incidente agrupado: coordenadas con
+                       las que se agrupó, cantidad de vecinos, núcleo, cluster
+  clusters             resumen por cluster: centroide, cantidad, VOL_M3 total,
+                       yacimiento y operadora más frecuentes, primera y última fecha
+  clusters_mensual     cantidad y VOL_M3 por (cluster, mes, yacimiento), para
+                       los mapas mensuales de focos
+  clusters_parametros  eps y min_pts con los que se armó el estado
+
+El id de cluster se copia además a incidentes.CLUSTER, así sale en el CSV
+para QGIS.
+
+Cada corrida inserta sólo los incidentes que todavía no están en
+clusters_puntos. Si un incidente agrupado se borró o cambió de coordenadas,
+o cambiaron los parámetros, se rehace todo (un cluster puede partirse).
+"""
+
+import logging
+import sqlite3
+from collections import Counter, defaultdict
+
+from src.analysis.dbscan import EPS_M, MIN_PTS, EstadoDBSCAN
+from src.analysis.vecinos import parsear_fecha
+from src.transformation.coordinates import transform_many_to_utm
+
+logger = logging.getLogger(__name__)
+
+
+def crear_tablas(conn: sqlite3.Connection) -> None:
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS clusters_puntos (
+            NUM_INC   TEXT PRIMARY KEY,
+            LAT       REAL NOT NULL,
+            LON       REAL NOT NULL,
+            ESTE      REAL NOT NULL,
+            NORTE     REAL NOT NULL,
+            VECINOS   INTEGER NOT NULL,
+            NUCLEO    INTEGER NOT NULL,
+            CLUSTER   INTEGER
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS clusters (
+            CLUSTER     INTEGER PRIMARY KEY,
+            N           INTEGER NOT NULL,
+            ESTE        REAL,
+            NORTE       REAL,
+            LAT         REAL,
+            LON         REAL,
+            VOL_M3      REAL,
+            YACIMIENTO  TEXT,
+            OPERADOR    TEXT,
+            DESDE       TEXT,
+            HASTA       TEXT
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS clusters_mensual (
+            CLUSTER     INTEGER NOT NULL,
+            MES         TEXT NOT NULL,
+            YACIMIENTO  TEXT NOT NULL,
+            N           INTEGER NOT NULL,
+            VOL_M3      REAL,
+            PRIMARY KEY (CLUSTER, MES, YACIMIENTO)
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS clusters_parametros (
+            ID       INTEGER PRIMARY KEY CHECK (ID = 1),
+            EPS      REAL NOT NULL,
+            MIN_PTS  INTEGER NOT NULL
+        )
+    ''')
+
+
+def _parametros(conn: sqlite3.Connection) -> tuple[float, int] | None:
+    return conn.execute("SELECT EPS, MIN_PTS FROM clusters_parametros").fetchone()
+
+
+def _desactualizados(conn: sqlite3.Connection) -> int:
+    """Incidentes agrupados que ya no existen o cambiaron de coordenadas."""
+    return conn.execute('''
+        SELECT COUNT(*) FROM clusters_puntos p
+        LEFT JOIN incidentes i ON i.NUM_INC = p.NUM_INC
+        WHERE i.NUM_INC IS NULL OR i.LAT IS NOT p.LAT OR i.LON IS NOT p.LON
+    ''').fetchone()[0]
+
+
+def actualizar(conn: sqlite3.Connection, eps: float | None = None,
+               min_pts: int | None = None, rehacer: bool = False) -> dict:
+    """
+    Agrega los incidentes nuevos a los clusters y recalcula los resúmenes.
+    Sin `eps`/`min_pts` se usan los de la corrida anterior (o los default).
+    Retorna {'nuevos', 'fusiones', 'rehecho', 'clusters'}.
+    """
+    previos = _parametros(conn)
+    eps = eps if eps is not None else (previos[0] if previos else EPS_M)
+    min_pts = min_pts if min_pts is not None else (previos[1] if previos else MIN_PTS)
+
+    if not rehacer and previos and tuple(previos) != (eps, min_pts):
+        logger.info("Parámetros de clusters cambiados (%s → %s): se rehace todo.",
+                    tuple(previos), (eps, min_pts))
+        rehacer = True
+    if not rehacer and (n := _desactualizados(conn)):
+        logger.info("%d incidente(s) agrupados cambiaron o se borraron: se rehace todo.", n)
+        rehacer = True
+    if rehacer:
+        conn.execute("DELETE FROM clusters_puntos")
+        conn.execute("UPDATE incidentes SET CLUSTER = NULL WHERE CLUSTER IS NOT NULL")
+    conn.execute("INSERT OR REPLACE INTO clusters_parametros (ID, EPS, MIN_PTS) VALUES (1, ?, ?)",
+                 (eps, min_pts))
+
+    estado = EstadoDBSCAN(eps, min_pts)
+    coords = {}
+    for num_inc, lat, lon, este, norte, vecinos, nucleo, cluster in conn.execute(
+            "SELECT NUM_INC, LAT, LON, ESTE, NORTE, VECINOS, NUCLEO, CLUSTER "
+            "FROM clusters_puntos ORDER BY NUM_INC"):
+        estado.cargar(num_inc, este, norte, vecinos, bool(nucleo), cluster)
+        coords[num_inc] = (lat, lon)
+
+    nuevos = conn.execute('''
+        SELECT NUM_INC, LAT, LON FROM incidentes
+        WHERE LAT IS NOT NULL AND LON IS NOT NULL
+          AND NUM_INC NOT IN (SELECT NUM_INC FROM clusters_puntos)
+        ORDER BY NUM_INC
+    ''').fetchall()
+    fusiones = {}
+    if nuevos:
+        este, norte = transform_many_to_utm([f[1] for f in nuevos], [f[2] for f in nuevos])
+        coords.update((f[0], (f[1], f[2])) for f in nuevos)
+        fusiones = estado.insertar([(f[0], e, n) for f, e, n in zip(nuevos, este, norte)])
+        filas = [(estado.claves[i], *coords[estado.claves[i]], estado.x[i], estado.y[i],
+                  estado.vecinos[i], int(estado.nucleo[i]), estado.cluster[i])
+                 for i in sorted(estado.cambiados)]
+        conn.executemany(
+            "INSERT OR REPLACE INTO clusters_puntos "
+            "(NUM_INC, LAT, LON, ESTE, NORTE, VECINOS, NUCLEO, CLUSTER) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", filas)
+        conn.executemany("UPDATE incidentes SET CLUSTER = ? WHERE NUM_INC = ?",
+                         [(f[7], f[0]) for f in filas])
+
+    n_clusters = resumir(conn)
+    return {'nuevos': len(nuevos), 'fusiones': len(fusiones),
+            'rehecho': rehacer, 'clusters': n_clusters}
+
+
+def resumir(conn: sqlite3.Connection) -> int:
+    """
+    Recalcula clusters y clusters_mensual desde clusters_puntos. Es una
+    pasada de agregación (los VOL_M3 pueden corregirse sin mover el punto).
+    """
+    miembros = defaultdict(list)
+    for fila in conn.execute('''
+            SELECT p.CLUSTER, p.ESTE, p.NORTE, i.LAT, i.LON, i.VOL_M3, i.FECHA,
+                   i.YACIMIENTO, i.OPERADOR
+            FROM clusters_puntos p JOIN incidentes i ON i.NUM_INC = p.NUM_INC
+            WHERE p.CLUSTER IS NOT NULL'''):
+        miembros[fila[0]].append(fila[1:])
+
+    resumen, mensual = [], Counter()
+    vol_mensual: dict[tuple, float] = defaultdict(float)
+    for cluster, filas in miembros.items():
+        n = len(filas)
+        fechas = sorted(f for f in (parsear_fecha(r[5]) for r in filas) if f)
+        resumen.append((
+            cluster, n,
+            sum(r[0] for r in filas) / n, sum(r[1] for r in filas) / n,
+            sum(r[2] for r in filas) / n, sum(r[3] for r in filas) / n,
+            sum(r[4] or 0 for r in filas),
+            _mas_frecuente(r[6] for r in filas), _mas_frecuente(r[7] for r in filas),
+            fechas[0].isoformat() if fechas else None,
+            fechas[-1].isoformat() if fechas else None,
+        ))
+        for r in filas:
+            fecha = parsear_fecha(r[5])
+            clave = (cluster, fecha.strftime('%Y-%m') if fecha else '', r[6] or '')
+            mensual[clave] += 1
+            vol_mensual[clave] += r[4] or 0
+
+    conn.execute("DELETE FROM clusters")
+    conn.execute("DELETE FROM clusters_mensual")
+    conn.executemany("INSERT INTO clusters VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", resumen)
+    conn.executemany("INSERT INTO clusters_mensual VALUES (?, ?, ?, ?, ?)",
+                     [(*k, n, vol_mensual[k]) for k, n in mensual.items()])
+    return len(resumen)
+
+
+def _mas_frecuente(valores) -> str | None:
+    conteo = Counter(v for v in valores if v)
+    return conteo.most_common(1)[0][0] if conteo else None
+
+
+def listar(conn: sqlite3.Connection, mes: str | None = None) -> list[dict]:
+    """Clusters del más grande al más chico; con `mes` ('YYYY-MM'), los de ese mes."""
+    if mes is None:
+        cursor = conn.execute("SELECT * FROM clusters ORDER BY N DESC, CLUSTER")
+    else:
+        cursor = conn.execute('''
+            SELECT m.CLUSTER, m.YACIMIENTO, m.N, m.VOL_M3, c.LAT, c.LON
+            FROM clusters_mensual m JOIN clusters c ON c.CLUSTER = m.CLUSTER
+            WHERE m.MES = ? ORDER BY m.N DESC, m.CLUSTER
+        ''', (mes,))
+    claves = [d[0] for d in cursor.description]
+    return [dict(zip(claves, fila)) for fila in cursor]
@@ -0,0 +1,198 @@
+"""
+Consultas de lectura sobre incidentes: filtros, paginación por clave y
+versión de los datos para caché condicional.
+
+QGIS, el Excel y los tableros casi siempre piden "los incidentes desde la
+fecha X de la operadora Y". En lugar de releer la exportación completa:
+
+    filtros = Filtros(operador='YPF S.A.', desde='2026-01-01')
+    pagina = consultar(conn, filtros, limite=100)
+    pagina = consultar(conn, filtros, limite=100, despues=pagina.siguiente)
+
+Paginación por clave (keyset): el orden es (fecha ISO, NUM_INC) y el cursor
+es la clave de la última fila, así que cada página cuesta lo mismo sin
+importar cuántas haya antes (no hay OFFSET). La fecha ISO es una expresión
+sobre FECHA ('dd-mm-yyyy') con índices propios, uno de ellos encabezado por
+OPERADOR para el filtro más común.
+
+`version_datos` guarda un contador que los triggers incrementan con cada
+INSERT, UPDATE o DELETE de incidentes, y el momento del último cambio. Sirve
+de ETag/Last-Modified: si no cambió, la misma consulta devuelve lo mismo.
+"""
+
+import base64
+import json
+import logging
+import sqlite3
+from typing import Iterator, NamedTuple
+
+logger = logging.getLogger(__name__)
+
+LIMITE = 100
+LIMITE_MAX = 1000
+COLUMNAS_OCULTAS = frozenset({'COORDS_REPORTADAS'})    # igual que en la exportación
+
+# FECHA 'dd-mm-yyyy' → 'yyyy-mm-dd'; '' si falta o tiene otro formato. Debe
+# coincidir letra por letra con la de los índices para que SQLite los use.
+FECHA_ISO = ("(CASE WHEN FECHA GLOB '[0-9][0-9]-[0-9][0-9]-[0-9][0-9][0-9][0-9]' "
+             "THEN substr(FECHA, 7, 4) || '-' || substr(FECHA, 4, 2) || '-' || "
+             "substr(FECHA, 1, 2) ELSE '' END)")
+
+
+class Filtros(NamedTuple):
+    operador: str | None = None
+    desde: str | None = None                # 'yyyy-mm-dd', inclusive
+    hasta: str | None = None                # 'yyyy-mm-dd', inclusive
+    magnitud: str | None = None
+    bbox: tuple[float, float, float, float] | None = None   # lon_min, lat_min, lon_max, lat_max
+
+
+class Pagina(NamedTuple):
+    filas: list[dict]
+    siguiente: str | None                   # cursor de la próxima página; None si es la última
+    version: int
+    modificado: str                         # momento ISO del último cambio, de la misma lectura
+
+
+def crear_tablas(conn: sqlite3.Connection) -> None:
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS version_datos (
+            ID          INTEGER PRIMARY KEY CHECK (ID = 1),
+            VERSION     INTEGER NOT NULL,
+            MODIFICADO  TEXT NOT NULL
+        )
+    ''')
+    conn.execute("INSERT OR IGNORE INTO version_datos VALUES (1, 0, "
+                 "strftime('%Y-%m-%dT%H:%M:%SZ', 'now'))")
+    for evento in ('INSERT', 'UPDATE', 'DELETE'):
+        conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS version_datos_{evento.lower()}
+            AFTER {evento} ON incidentes
+            BEGIN
+                UPDATE version_datos SET VERSION = VERSION + 1,
+                    MODIFICADO = strftime('%Y-%m-%dT%H:%M:%SZ', 'now') WHERE ID = 1;
+            END
+        ''')
+    conn.execute(f"CREATE INDEX IF NOT EXISTS idx_incidentes_fecha "
+                 f"ON incidentes ({FECHA_ISO}, NUM_INC)")
+    conn.execute(f"CREATE INDEX IF NOT EXISTS idx_incidentes_operador_fecha "
+                 f"ON incidentes (OPERADOR, {FECHA_ISO}, NUM_INC)")
+
+
+def version(conn: sqlite3.Connection) -> tuple[int, str]:
+    """(contador de cambios, momento ISO del último cambio) de la tabla incidentes."""
+    return conn.execute("SELECT VERSION, MODIFICADO FROM version_datos WHERE ID = 1").fetchone()
+
+
+# ── Cursor ───────────────────────────────────────────────────────────────────
+
+def codificar_cursor(fecha_iso: str, num_inc: str) -> str:
+    return base64.urlsafe_b64encode(json.dumps([fecha_iso, num_inc]).encode()).decode()
+
+
+def decodificar_cursor(cursor: str) -> tuple[str, str]:
+    try:
+        fecha_iso, num_inc = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Cursor inválido: {cursor!r}") from e
+    return str(fecha_iso), str(num_inc)
+
+
+# ── Consulta ─────────────────────────────────────────────────────────────────
+
+def _condiciones(filtros: Filtros) -> tuple[list[str], list]:
+    condiciones, params = [], []
+    if filtros.operador is not None:
+        condiciones.append("OPERADOR = ?")
+        params.append(filtros.operador)
+    if filtros.desde is not None:
+        condiciones.append(f"{FECHA_ISO} >= ?")
+        params.append(filtros.desde)
+    if filtros.hasta is not None:
+        condiciones.append(f"{FECHA_ISO} BETWEEN '0' AND ?")     # excluye las sin fecha ('')
+        params.append(filtros.hasta)
+    if filtros.magnitud is not None:
+        condiciones.append("MAGNITUD = ?")
+        params.append(filtros.magnitud)
+    if filtros.bbox is not None:
+        lon_min, lat_min, lon_max, lat_max = filtros.bbox
+        condiciones.append("LON BETWEEN ? AND ? AND LAT BETWEEN ? AND ?")
+        params += [lon_min, lon_max, lat_min, lat_max]
+    return condiciones, params
+
+
+def consultar(conn: sqlite3.Connection, filtros: Filtros = Filtros(),
+              limite: int = LIMITE, despues: str | None = None) -> Pagina:
+    """
+    Una página de incidentes que cumplen los filtros, en orden de fecha y
+    NUM_INC. `despues` es el cursor `siguiente` de la página anterior.
+    """
+    limite = max(1, min(limite, LIMITE_MAX))
+    condiciones, params = _condiciones(filtros)
+    if despues is not None:
+        # Equivale a (fecha, NUM_INC) > (?, ?); escrito así SQLite recorre el
+        # índice desde la clave en vez de desde el principio
+        fecha_iso, num_inc = decodificar_cursor(despues)
+        condiciones.append(f"{FECHA_ISO} >= ? AND ({FECHA_ISO} > ? OR NUM_INC > ?)")
+        params += [fecha_iso, fecha_iso, num_inc]
+    donde = f"WHERE {' AND '.join(condiciones)}" if condiciones else ""
+
+    # Lectura consistente: versión y filas en la misma transacción
+    propia = not conn.in_transaction
+    if propia:
+        conn.execute("BEGIN")
+    try:
+        actual, modificado = version(conn)
+        cursor = conn.execute(
+            f"SELECT *, {FECHA_ISO} AS _FECHA_ISO FROM incidentes {donde} "
+            f"ORDER BY {FECHA_ISO}, NUM_INC LIMIT ?", (*params, limite + 1))
+        columnas = [d[0] for d in cursor.description]
+        filas = [dict(zip(columnas, f)) for f in cursor.fetchall()]
+    finally:
+        if propia:
+            conn.execute("COMMIT")
+
+    siguiente = None
+    if len(filas) > limite:
+        filas = filas[:limite]
+        siguiente = codificar_cursor(filas[-1]['_FECHA_ISO'], filas[-1]['NUM_INC'])
+    for f in filas:
+        del f['_FECHA_ISO']
+        for c in COLUMNAS_OCULTAS:
+            f.pop(c, None)
+    return Pagina(filas, siguiente, actual, modificado)
+
+
+def iterar(conn: sqlite3.Connection, filtros: Filtros = Filtros(),
+           limite: int = LIMITE) -> Iterator[dict]:
+    """Todas las filas que cumplen los filtros, página por página."""
+    despues = None
+    while True:
+        pagina = consultar(conn, filtros, limite, despues)
+        yield from pagina.filas
+        if pagina.siguiente is None:
+            return
+        despues = pagina.siguiente
+
+
+def filtros_desde_query(params: dict[str, str]) -> Filtros:
+    """
+    Filtros a partir de los parámetros de una URL (?operador=&desde=&hasta=
+    &magnitud=&bbox=lon_min,lat_min,lon_max,lat_max). ValueError si alguno
+    es inválido.
+    """
+    for clave in ('desde', 'hasta'):
+        valor = params.get(clave)
+        if valor is not None and not (len(valor) == 10 and valor[4] == valor[7] == '-'
+                                      and (valor[:4] + valor[5:7] + valor[8:]).isdigit()):
+            raise ValueError(f"'{clave}' debe ser AAAA-MM-DD, no {valor!r}")
+    bbox = params.get('bbox')
+    if bbox is not None:
+        try:
+            bbox = tuple(float(v) for v in bbox.split(','))
+        except ValueError:
+            bbox = ()
+        if len(bbox) != 4:
+            raise ValueError("'bbox' debe ser lon_min,lat_min,lon_max,lat_max")
+    return Filtros(params.get('operador'), params.get('desde'), params.get('hasta'),
+                   params.get('magnitud'), bbox)
@@ -0,0 +1,128 @@
+"""
+Cuarentena de documentos que fallan al procesarse.
+
+Un PDF que no se pudo abrir, que ningún extractor reconoce ("Formato no
+reconocido"), que rompe un extractor o que agota el tiempo/la memoria del
+worker, queda registrado aquí por su SHA-256 junto con la etapa en que
+falló y la versión del código relevante para esa etapa.
+
+En las corridas siguientes el documento se omite sin abrirlo ni extraer
+texto, hasta que:
+  - cambie el código relevante (la versión guardada deja de coincidir), o
+  - se lo reencole explícitamente (`python src/main.py quarantine retry`).
+
+Versión relevante por etapa:
+  apertura         versión de PyMuPDF
+  identificacion   versión del registro (palabras clave + extractores)
+  extraccion       versión del extractor que falló
+  timeout/oom/error versión del registro
+"""
+
+import logging
+import sqlite3
+
+from src.extractors.registry import extractor_por_nombre, version_registro
+
+logger = logging.getLogger(__name__)
+
+ETAPAS = ('apertura', 'identificacion', 'extraccion', 'timeout', 'oom', 'error')
+
+
+def crear_tabla(conn: sqlite3.Connection) -> None:
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS cuarentena (
+            SHA256       TEXT PRIMARY KEY,
+            NOMBRE       TEXT,
+            ORIGEN       TEXT,
+            ETAPA        TEXT NOT NULL,
+            ERROR        TEXT,
+            EXTRACTOR    TEXT,
+            VERSION      TEXT NOT NULL,
+            INTENTOS     INTEGER NOT NULL DEFAULT 1,
+            PRIMERA_VEZ  TEXT DEFAULT (datetime('now')),
+            ULTIMA_VEZ   TEXT DEFAULT (datetime('now'))
+        )
+    ''')
+
+
+def version_vigente(etapa: str, extractor: str | None = None) -> str:
+    """Versión actual del código del que depende el resultado de `etapa`."""
+    if etapa == 'apertura':
+        import fitz
+        return f"pymupdf-{fitz.VersionBind}"
+    if etapa == 'extraccion' and extractor:
+        cls = extractor_por_nombre(extractor)
+        if cls is not None:
+            return cls.version()
+    return version_registro()
+
+
+def en_cuarentena(conn: sqlite3.Connection, sha256: str) -> bool:
+    """
+    True si el documento falló antes con el código actual.
+    Una entrada con versión vieja no bloquea: el documento se reintenta.
+    """
+    fila = conn.execute(
+        "SELECT ETAPA, EXTRACTOR, VERSION FROM cuarentena WHERE SHA256 = ?",
+        (sha256,)
+    ).fetchone()
+    if fila is None:
+        return False
+    etapa, extractor, version = fila
+    return version == version_vigente(etapa, extractor)
+
+
+def contiene(conn: sqlite3.Connection, sha256: str) -> bool:
+    """True si el documento tiene entrada en la cuarentena, vigente o no."""
+    return conn.execute("SELECT 1 FROM cuarentena WHERE SHA256 = ?",
+                        (sha256,)).fetchone() is not None
+
+
+def poner_en_cuarentena(conn: sqlite3.Connection, sha256: str, nombre: str,
+                        origen: str, etapa: str, error: str | None = None,
+                        extractor: str | None = None) -> None:
+    conn.execute('''
+        INSERT INTO cuarentena (SHA256, NOMBRE, ORIGEN, ETAPA, ERROR, EXTRACTOR, VERSION)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(SHA256) DO UPDATE SET
+            NOMBRE = excluded.NOMBRE,
+            ORIGEN = excluded.ORIGEN,
+            ETAPA = excluded.ETAPA,
+            ERROR = excluded.ERROR,
+            EXTRACTOR = excluded.EXTRACTOR,
+            VERSION = excluded.VERSION,
+            INTENTOS = INTENTOS + 1,
+            ULTIMA_VEZ = datetime('now')
+    ''', (sha256, nombre, origen, etapa, error, extractor,
+          version_vigente(etapa, extractor)))
+    logger.info("[%s] En cuarentena (etapa: %s)", nombre, etapa)
+
+
+def liberar(conn: sqlite3.Connection, sha256: str) -> bool:
+    """Quita un documento de la cuarentena. Retorna True si estaba."""
+    return conn.execute(
+        "DELETE FROM cuarentena WHERE SHA256 = ?", (sha256,)
+    ).rowcount > 0
+
+
+def listar(conn: sqlite3.Connection) -> list[dict]:
+    """Entradas de la cuarentena, con la marca `vigente` (False = se reintentará)."""
+    cursor = conn.execute('''
+        SELECT SHA256, NOMBRE, ORIGEN, ETAPA, ERROR, EXTRACTOR, VERSION,
+               INTENTOS, PRIMERA_VEZ, ULTIMA_VEZ
+        FROM cuarentena ORDER BY ULTIMA_VEZ DESC
+    ''')
+    columnas = [d[0] for d in cursor.description]
+    entradas = []
+    for fila in cursor:
+        entrada = dict(zip(columnas, fila))
+        entrada['vigente'] = entrada['VERSION'] == version_vigente(
+            entrada['ETAPA'], entrada['EXTRACTOR'])
+        entradas.append(entrada)
+    return entradas
+
+
+def buscar(conn: sqlite3.Connection, prefijos: list[str]) -> list[dict]:
+    """Entradas cuyo SHA-256 empieza con alguno de los prefijos dados."""
+    return [e for e in listar(conn)
+            if any(e['SHA256'].startswith(p.lower()) for p in prefijos)]
@@ -0,0 +1,127 @@
+"""
+Índice de documentos casi duplicados (MinHash + LSH) en SQLite.
+
+  minhash              firma de cada documento (SHA-256 → 128 × uint32)
+  lsh_bandas           una fila por (banda, clave, documento); buscar
+                       candidatos son BANDAS consultas por índice, sin
+                       recorrer la tabla: sublineal en la cantidad de documentos
+  posibles_duplicados  pares con similitud estimada ≥ UMBRAL_SIMILITUD
+
+No reemplaza a la clave primaria NUM_INC: la complementa, para detectar el
+mismo incidente cargado dos veces con identificadores distintos.
+"""
+
+import logging
+import sqlite3
+
+from src.analysis import minhash
+
+logger = logging.getLogger(__name__)
+
+# En el corpus, copias e impresiones del mismo PDF dan ≥ 0,95 y formularios
+# distintos de una misma operadora (misma plantilla) no pasan de 0,65.
+UMBRAL_SIMILITUD = 0.8
+
+
+def crear_tablas(conn: sqlite3.Connection) -> None:
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS minhash (
+            SHA256  TEXT PRIMARY KEY,
+            FIRMA   BLOB NOT NULL
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS lsh_bandas (
+            BANDA   INTEGER NOT NULL,
+            CLAVE   INTEGER NOT NULL,
+            SHA256  TEXT NOT NULL,
+            PRIMARY KEY (BANDA, CLAVE, SHA256)
+        ) WITHOUT ROWID
+    ''')
+    # Para reemplazar las bandas de un documento sin recorrer la tabla
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_lsh_bandas_sha256 ON lsh_bandas (SHA256)")
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS posibles_duplicados (
+            SHA256_A     TEXT NOT NULL,
+            SHA256_B     TEXT NOT NULL,
+            SIMILITUD    REAL NOT NULL,
+            DETECTADO_EN TEXT DEFAULT (datetime('now')),
+            PRIMARY KEY (SHA256_A, SHA256_B)
+        )
+    ''')
+
+
+def candidatos(conn: sqlite3.Connection, claves: list[int]) -> set[str]:
+    """Documentos que comparten al menos una banda con las claves dadas."""
+    encontrados: set[str] = set()
+    for banda, clave in enumerate(claves):
+        encontrados.update(fila[0] for fila in conn.execute(
+            "SELECT SHA256 FROM lsh_bandas WHERE BANDA = ? AND CLAVE = ?",
+            (banda, clave)))
+    return encontrados
+
+
+def indexar(conn: sqlite3.Connection, sha256: str, texto: str,
+            umbral: float = UMBRAL_SIMILITUD) -> list[tuple[str, float]]:
+    """
+    Agrega (o reemplaza) la firma de un documento y registra sus posibles
+    duplicados. Retorna sólo los pares nuevos: (SHA-256 del otro, similitud).
+    """
+    sig = minhash.firma(texto)
+    if sig is None:
+        return []
+    claves = minhash.claves_banda(sig)
+
+    nuevos = []
+    for otro in sorted(candidatos(conn, claves) - {sha256}):
+        fila = conn.execute("SELECT FIRMA FROM minhash WHERE SHA256 = ?", (otro,)).fetchone()
+        if fila is None:
+            continue
+        sim = minhash.similitud(sig, minhash.desde_bytes(fila[0]))
+        if sim < umbral:
+            continue
+        a, b = sorted((sha256, otro))
+        cursor = conn.execute(
+            "INSERT OR IGNORE INTO posibles_duplicados (SHA256_A, SHA256_B, SIMILITUD) "
+            "VALUES (?, ?, ?)", (a, b, round(sim, 4)))
+        if cursor.rowcount:
+            nuevos.append((otro, sim))
+
+    conn.execute("DELETE FROM lsh_bandas WHERE SHA256 = ?", (sha256,))
+    conn.execute("INSERT OR REPLACE INTO minhash (SHA256, FIRMA) VALUES (?, ?)",
+                 (sha256, minhash.a_bytes(sig)))
+    conn.executemany("INSERT INTO lsh_bandas (BANDA, CLAVE, SHA256) VALUES (?, ?, ?)",
+                     [(banda, clave, sha256) for banda, clave in enumerate(claves)])
+    return nuevos
+
+
+def reindexar(conn: sqlite3.Connection, todos: bool = False) -> int:
+    """Indexa los textos cacheados que aún no tienen firma (o todos)."""
+    from src.storage.textos import obtener_texto
+
+    consulta = "SELECT SHA256 FROM textos"
+    if not todos:
+        consulta += " WHERE SHA256 NOT IN (SELECT SHA256 FROM minhash)"
+    pendientes = [fila[0] for fila in conn.execute(consulta)]
+    for sha256 in pendientes:
+        indexar(conn, sha256, obtener_texto(conn, sha256))
+    return len(pendientes)
+
+
+def listar(conn: sqlite3.Connection, umbral: float = UMBRAL_SIMILITUD) -> list[dict]:
+    """Pares sospechosos con nombre de archivo y NUM_INC de cada lado."""
+    cursor = conn.execute('''
+        SELECT p.SIMILITUD,
+               p.SHA256_A, da.NOMBRE,
+               (SELECT group_concat(NUM_INC, ', ') FROM procedencia WHERE SHA256 = p.SHA256_A),
+               p.SHA256_B, db.NOMBRE,
+               (SELECT group_concat(NUM_INC, ', ') FROM procedencia WHERE SHA256 = p.SHA256_B)
+        FROM posibles_duplicados p
+        LEFT JOIN documentos da ON da.SHA256 = p.SHA256_A
+        LEFT JOIN documentos db ON db.SHA256 = p.SHA256_B
+        WHERE p.SIMILITUD >= ?
+        ORDER BY p.SIMILITUD DESC, p.DETECTADO_EN
+    ''', (umbral,))
+    claves = ('SIMILITUD', 'SHA256_A', 'NOMBRE_A', 'NUM_INC_A',
+              'SHA256_B', 'NOMBRE_B', 'NUM_INC_B')
+    return [dict(zip(claves, fila)) for fila in cursor]
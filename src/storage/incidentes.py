@@ -0,0 +1,169 @@
+"""
+Registro de un incidente normalizado, tal como se guarda en la tabla
+incidentes.
+
+Los extractores devuelven dicts con las claves de cada formulario;
+IncidentRecord.desde_extraccion los lleva una sola vez al esquema de la
+tabla. El registro usa __slots__ con los campos en el orden de las columnas:
+no tiene un dict por instancia, se convierte a la tupla de parámetros del
+INSERT sin reconstruir nada y se serializa entre procesos como
+(clase, tupla de valores).
+
+Para el código que ya trabajaba con dicts, el registro también responde
+get(), [clave], keys() e items().
+"""
+
+import json
+import logging
+import sqlite3
+
+logger = logging.getLogger(__name__)
+
+# Columnas que vienen del PDF, en el orden de la tabla. Las calculadas
+# después (DIST_CAUCE_M, CAUCE_CERCANO, CLUSTER) no son parte del registro.
+CAMPOS = (
+    'NUM_INC', 'OPERADOR', 'AREA_CONCESION', 'YACIMIENTO', 'MAGNITUD',
+    'TIPO_INSTALACION', 'SUBTIPO', 'FECHA', 'DESC_ABREV', 'LAT', 'LON',
+    'VOL_M3', 'AGUA_PCT', 'AREA_AFECT_m2', 'RECURSOS_AFECTADOS', 'COORDS_REPORTADAS',
+)
+CAMPOS_REAL = frozenset({'LAT', 'LON', 'VOL_M3', 'AGUA_PCT', 'AREA_AFECT_m2'})
+
+SQL_INSERT = (f"INSERT OR IGNORE INTO incidentes ({', '.join(CAMPOS)}) "
+              f"VALUES ({', '.join('?' * len(CAMPOS))})")
+_MAX_PARAMETROS = 500    # claves por consulta en insertar_lote; SQLite viejo admite hasta 999
+
+
+def _a_float(campo: str, valor) -> float | None:
+    if valor is None or isinstance(valor, float):
+        return valor
+    try:
+        return float(str(valor).replace(',', '.')) if isinstance(valor, str) else float(valor)
+    except ValueError:
+        logger.warning("%s no numérico, se descarta: %r", campo, valor)
+        return None
+
+
+class IncidentRecord:
+    """Un incidente con los campos de la tabla incidentes (None = sin dato)."""
+
+    __slots__ = CAMPOS
+
+    def __init__(self, *valores, **campos):
+        if len(valores) > len(CAMPOS):
+            raise TypeError(f"IncidentRecord: {len(valores)} valores para {len(CAMPOS)} campos")
+        for nombre, valor in zip(CAMPOS, valores):
+            campos.setdefault(nombre, valor)
+        for nombre in CAMPOS:
+            valor = campos.pop(nombre, None)
+            if nombre in CAMPOS_REAL:
+                valor = _a_float(nombre, valor)
+            setattr(self, nombre, valor)
+        if campos:
+            raise TypeError(f"IncidentRecord: campos desconocidos {sorted(campos)}")
+
+    @classmethod
+    def desde_extraccion(cls, data: dict) -> 'IncidentRecord':
+        """Del dict de un extractor (claves del formulario) al registro."""
+        desc = data.get('DESCRIPCION') or data.get('DETALLE') or None
+        desc_abrev = (desc[:120] + '...') if desc and len(desc) > 120 else desc
+        reportadas = data.get('COORDS_REPORTADAS')
+        return cls(
+            data.get('NUM_INC'),
+            data.get('OPERADOR'),
+            data.get('AREA_CONCE'),
+            data.get('YACIMIENTO'),
+            data.get('MAGNITUD'),
+            data.get('TIPO_INST'),
+            data.get('SUBTIPO_INC'),
+            data.get('FECHA_INC'),
+            desc_abrev,
+            data.get('Y_COORD'),
+            data.get('X_COORD'),
+            data.get('VOL_D_m3'),
+            data.get('AGUA_PCT'),
+            data.get('AREA_AFECT_m2'),
+            data.get('RECURSOS'),
+            # Otras representaciones de las coordenadas, crudas (JSON), para validarlas
+            json.dumps(reportadas, ensure_ascii=False) if reportadas else None,
+        )
+
+    def como_tupla(self) -> tuple:
+        """Parámetros de SQL_INSERT, en el orden de CAMPOS."""
+        return tuple(getattr(self, c) for c in CAMPOS)
+
+    # ── Compatibilidad con dict ──────────────────────────────────────────────
+
+    def get(self, clave: str, default=None):
+        return getattr(self, clave) if clave in CAMPOS else default
+
+    def __getitem__(self, clave: str):
+        if clave not in CAMPOS:
+            raise KeyError(clave)
+        return getattr(self, clave)
+
+    def __contains__(self, clave) -> bool:
+        return clave in CAMPOS
+
+    def keys(self) -> tuple[str, ...]:
+        return CAMPOS
+
+    def items(self):
+        return zip(CAMPOS, self.como_tupla())
+
+    # ── Igualdad, repr y pickle ──────────────────────────────────────────────
+
+    def __eq__(self, otro) -> bool:
+        if isinstance(otro, IncidentRecord):
+            return self.como_tupla() == otro.como_tupla()
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"IncidentRecord(NUM_INC={self.NUM_INC!r}, OPERADOR={self.OPERADOR!r})"
+
+    def __reduce__(self):
+        return IncidentRecord, self.como_tupla()
+
+
+def insertar(conn: sqlite3.Connection, registro: IncidentRecord) -> bool:
+    """INSERT OR IGNORE de un registro. False si ya existía ese NUM_INC."""
+    return conn.execute(SQL_INSERT, registro.como_tupla()).rowcount > 0
+
+
+def insertar_lote(conn: sqlite3.Connection, registros: list[IncidentRecord]) -> list[bool]:
+    """
+    INSERT OR IGNORE de muchos registros con un solo executemany. Retorna,
+    por registro, si se insertó: False si el NUM_INC ya estaba en la base o
+    antes en el mismo lote.
+
+    El desenlace sale de consultar las claves existentes antes del INSERT,
+    dentro de la misma transacción de escritura. Si el INSERT falla, no
+    queda ninguna fila del lote.
+    """
+    if not registros:
+        return []
+    if not conn.in_transaction:
+        conn.execute("BEGIN IMMEDIATE")
+    conn.execute("SAVEPOINT insertar_lote")
+    try:
+        claves = [r.NUM_INC for r in registros]
+        distintas = list({c for c in claves if c is not None})
+        existentes = set()
+        for i in range(0, len(distintas), _MAX_PARAMETROS):
+            parte = distintas[i:i + _MAX_PARAMETROS]
+            existentes.update(f[0] for f in conn.execute(
+                f"SELECT NUM_INC FROM incidentes WHERE NUM_INC IN ({', '.join('?' * len(parte))})",
+                parte))
+        insertados = []
+        for clave in claves:
+            # NUM_INC NULL no choca con nada (la clave primaria TEXT lo admite)
+            insertados.append(clave is None or clave not in existentes)
+            existentes.add(clave)
+        conn.executemany(SQL_INSERT, (r.como_tupla() for r in registros))
+    except sqlite3.Error:
+        conn.execute("ROLLBACK TO insertar_lote")
+        raise
+    finally:
+        conn.execute("RELEASE insertar_lote")
+    return insertados
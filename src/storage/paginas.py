@@ -0,0 +1,37 @@
+"""
+Registro de la clasificación de páginas de cada documento.
+
+Una fila por página: la clase asignada (formulario, anexo, imagen, vacia),
+si se renderizó su texto y los metadatos que motivaron la decisión. Sirve
+para auditar el clasificador: si un campo deja de extraerse, se puede ver
+qué páginas se omitieron y por qué.
+"""
+
+import sqlite3
+
+
+def crear_tabla(conn: sqlite3.Connection) -> None:
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS paginas (
+            SHA256           TEXT NOT NULL,
+            PAGINA           INTEGER NOT NULL,
+            CLASE            TEXT NOT NULL,
+            RENDERIZADA      INTEGER NOT NULL,
+            FUENTES          INTEGER,
+            IMAGENES         INTEGER,
+            BYTES_CONTENIDO  INTEGER,
+            BYTES_TEXTO      INTEGER,
+            PRIMARY KEY (SHA256, PAGINA)
+        )
+    ''')
+
+
+def registrar_paginas(conn: sqlite3.Connection, sha256: str, decisiones) -> None:
+    """Guarda (o reemplaza) las DecisionPagina de un documento."""
+    conn.executemany('''
+        INSERT OR REPLACE INTO paginas
+            (SHA256, PAGINA, CLASE, RENDERIZADA, FUENTES, IMAGENES,
+             BYTES_CONTENIDO, BYTES_TEXTO)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ''', [(sha256, d.pagina, d.clase, int(d.renderizada), d.fuentes, d.imagenes,
+           d.bytes_contenido, d.bytes_texto) for d in decisiones])
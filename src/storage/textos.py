@@ -0,0 +1,36 @@
+"""
+Caché del texto extraído de cada PDF.
+
+Extraer el texto con PyMuPDF es la parte cara de procesar un documento; los
+extractores sólo trabajan sobre ese texto. Guardarlo (comprimido con zlib)
+por SHA-256 permite volver a correr un extractor corregido sobre documentos
+ya cargados sin abrir los PDFs ni necesitar que sigan en disco.
+"""
+
+import sqlite3
+import zlib
+
+
+def crear_tabla(conn: sqlite3.Connection) -> None:
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS textos (
+            SHA256  TEXT PRIMARY KEY,
+            TEXTO   BLOB NOT NULL
+        )
+    ''')
+
+
+def guardar_texto(conn: sqlite3.Connection, sha256: str, texto: str) -> None:
+    conn.execute(
+        "INSERT OR REPLACE INTO textos (SHA256, TEXTO) VALUES (?, ?)",
+        (sha256, zlib.compress(texto.encode('utf-8')))
+    )
+
+
+def obtener_texto(conn: sqlite3.Connection, sha256: str) -> str | None:
+    fila = conn.execute(
+        "SELECT TEXTO FROM textos WHERE SHA256 = ?", (sha256,)
+    ).fetchone()
+    if fila is None:
+        return None
+    return zlib.decompress(fila[0]).decode('utf-8')
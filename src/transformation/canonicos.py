@@ -0,0 +1,216 @@
+"""
+Nombres canónicos de área, yacimiento e instalación.
+
+Un mismo lugar llega escrito de muchas formas: "DESFILADERO BAYO" y
+"Desfiladero Bayo", "Chañares Herrados" y "Chanares Herrados", "Vaca
+Muerta" y "VM". Agrupar por el texto crudo en SQL da resultados
+equivocados. Este módulo asigna a cada valor el ID de una entrada del
+diccionario de nombres (nombres_canonicos.json, más data/nombres_canonicos.json
+si existe), en este orden:
+
+  1. Igualdad exacta del texto plegado: sin acentos, en mayúsculas y sin
+     puntuación. Es un dict, O(1).
+  2. Candidatos difusos por trigramas. Por el lema de q-gramas, un texto a
+     distancia de edición ≤ k comparte al menos |trigramas| − 3k trigramas
+     con la clave, así que el índice no pierde candidatos. Sobre ellos se
+     calcula una distancia de Levenshtein acotada (k = 1, o 2 desde 8
+     letras; los nombres de menos de 4 letras sólo se aceptan exactos).
+  3. Si el valor completo no coincide, lo mismo con sus palabras iniciales,
+     de la más larga a la más corta: "Cañería de conduccion VM-64" →
+     "Cañería de conducción".
+
+Los resultados se memorizan por (categoría, valor). En una carga masiva
+los mismos nombres se repiten, así que el costo por registro es O(1)
+amortizado.
+
+Formato del diccionario:
+
+  {"yacimiento": [{"id": "VACA_MUERTA", "nombre": "Vaca Muerta", "alias": ["VM"]}, ...],
+   "area": [...], "instalacion": [...]}
+
+El "id" es opcional: por defecto es el nombre plegado con guiones bajos.
+"""
+
+import json
+import logging
+import re
+import sqlite3
+from collections import Counter, defaultdict
+from functools import lru_cache
+from pathlib import Path
+from typing import NamedTuple
+
+from src.extractors.registry import normalizar_texto
+
+logger = logging.getLogger(__name__)
+
+DICCIONARIOS = (Path(__file__).parent / 'nombres_canonicos.json',
+                Path('data') / 'nombres_canonicos.json')
+
+# Columna de la tabla incidentes → (categoría del diccionario, columna del ID)
+COLUMNAS = {
+    'AREA_CONCESION':   ('area', 'AREA_ID'),
+    'YACIMIENTO':       ('yacimiento', 'YACIMIENTO_ID'),
+    'TIPO_INSTALACION': ('instalacion', 'INSTALACION_ID'),
+}
+
+MIN_DIFUSO = 4          # letras mínimas para aceptar una coincidencia difusa
+_MEMO = 8192
+
+_NO_ALFANUM = re.compile(r'[^A-Z0-9]+')
+
+
+def plegar(texto: str) -> str:
+    """Sin acentos, mayúsculas, sin puntuación y con espacios simples."""
+    return _NO_ALFANUM.sub(' ', normalizar_texto(texto)).strip()
+
+
+def _trigramas(clave: str) -> set[str]:
+    relleno = f"  {clave} "
+    return {relleno[i:i + 3] for i in range(len(relleno) - 2)}
+
+
+def _max_distancia(clave: str) -> int:
+    if len(clave) < MIN_DIFUSO:
+        return 0
+    return 1 if len(clave) < 8 else 2
+
+
+def distancia_acotada(a: str, b: str, k: int) -> int | None:
+    """Levenshtein entre a y b si es ≤ k; None apenas se sabe que es mayor."""
+    if abs(len(a) - len(b)) > k:
+        return None
+    previa = list(range(len(b) + 1))
+    for i, ca in enumerate(a, start=1):
+        fila = [i]
+        for j, cb in enumerate(b, start=1):
+            fila.append(min(previa[j] + 1, fila[j - 1] + 1, previa[j - 1] + (ca != cb)))
+        if min(fila) > k:
+            return None
+        previa = fila
+    return previa[-1] if previa[-1] <= k else None
+
+
+class Coincidencia(NamedTuple):
+    id: str
+    nombre: str
+    distancia: int          # 0 = exacta (tras plegar)
+    parcial: bool           # coincidieron sólo las palabras iniciales
+
+
+class Diccionario:
+    """Índices exacto y de trigramas de los nombres de cada categoría."""
+
+    def __init__(self, datos: dict[str, list[dict]]):
+        self.nombres: dict[str, dict[str, str]] = defaultdict(dict)       # cat → id → nombre
+        self._exacto: dict[str, dict[str, str]] = defaultdict(dict)       # cat → clave → id
+        self._trigramas: dict[str, dict[str, set[str]]] = defaultdict(lambda: defaultdict(set))
+        for categoria, entradas in datos.items():
+            for entrada in entradas:
+                self.agregar(categoria, entrada['nombre'], entrada.get('id'),
+                             entrada.get('alias', ()))
+        self.buscar = lru_cache(maxsize=_MEMO)(self._buscar)
+
+    def agregar(self, categoria: str, nombre: str, id_: str | None = None,
+                alias=()) -> str:
+        id_ = id_ or plegar(nombre).replace(' ', '_')
+        self.nombres[categoria].setdefault(id_, nombre)
+        for variante in (nombre, *alias):
+            clave = plegar(variante)
+            previo = self._exacto[categoria].setdefault(clave, id_)
+            if previo != id_:
+                logger.warning("'%s' (%s) ya es alias de %s; se mantiene", variante, id_, previo)
+                continue
+            for t in _trigramas(clave):
+                self._trigramas[categoria][t].add(clave)
+        return id_
+
+    def _difuso(self, categoria: str, clave: str) -> tuple[str, int] | None:
+        k = _max_distancia(clave)
+        if not k:
+            return None
+        trigramas = _trigramas(clave)
+        comunes: Counter = Counter()
+        indice = self._trigramas[categoria]
+        for t in trigramas:
+            comunes.update(indice.get(t, ()))
+        minimo = len(trigramas) - 3 * k
+        mejor = None
+        for candidata, n in comunes.most_common():
+            if n < minimo:
+                break
+            if _max_distancia(candidata) < 1:
+                continue
+            d = distancia_acotada(clave, candidata, min(k, _max_distancia(candidata)))
+            if d is not None and (mejor is None or d < mejor[1]):
+                mejor = (candidata, d)
+                if d == 1:
+                    break
+        return mejor
+
+    def _buscar(self, categoria: str, valor: str | None) -> Coincidencia | None:
+        if not valor:
+            return None
+        exacto = self._exacto.get(categoria)
+        if not exacto:
+            return None
+        palabras = plegar(valor).split()
+        for n in range(len(palabras), 0, -1):
+            clave = ' '.join(palabras[:n])
+            id_, distancia = exacto.get(clave), 0
+            if id_ is None:
+                difusa = self._difuso(categoria, clave)
+                if difusa is None:
+                    continue
+                id_, distancia = exacto[difusa[0]], difusa[1]
+            return Coincidencia(id_, self.nombres[categoria][id_], distancia, n < len(palabras))
+        return None
+
+    def id_canonico(self, categoria: str, valor: str | None) -> str | None:
+        c = self.buscar(categoria, valor)
+        return c.id if c else None
+
+
+def cargar(paths=DICCIONARIOS) -> Diccionario:
+    """Diccionario con las entradas de todos los archivos que existan, en orden."""
+    datos: dict[str, list[dict]] = defaultdict(list)
+    for path in paths:
+        path = Path(path)
+        if not path.exists():
+            continue
+        with open(path, encoding='utf-8') as f:
+            for categoria, entradas in json.load(f).items():
+                datos[categoria].extend(entradas)
+    return Diccionario(datos)
+
+
+# ── Aplicación a la tabla ────────────────────────────────────────────────────
+
+def canonizar_incidentes(conn: sqlite3.Connection, diccionario: Diccionario,
+                         todos: bool = False) -> tuple[int, Counter]:
+    """
+    Completa AREA_ID, YACIMIENTO_ID e INSTALACION_ID. Sin `todos`, sólo las
+    filas a las que les falta alguno. Retorna (filas actualizadas, valores
+    sin coincidencia por (columna, valor)), para ampliar el diccionario.
+    """
+    ids = [col_id for _, col_id in COLUMNAS.values()]
+    sql = f"SELECT NUM_INC, {', '.join(COLUMNAS)}, {', '.join(ids)} FROM incidentes"
+    if not todos:
+        sql += " WHERE " + " OR ".join(f"({c} IS NOT NULL AND {i} IS NULL)"
+                                       for c, (_, i) in COLUMNAS.items())
+    sin_coincidencia: Counter = Counter()
+    cambios = []
+    for num_inc, *valores in conn.execute(sql).fetchall():
+        crudos, actuales = valores[:len(COLUMNAS)], valores[len(COLUMNAS):]
+        nuevos = []
+        for (columna, (categoria, _)), crudo in zip(COLUMNAS.items(), crudos):
+            id_ = diccionario.id_canonico(categoria, crudo)
+            if crudo and id_ is None:
+                sin_coincidencia[(columna, crudo)] += 1
+            nuevos.append(id_)
+        if nuevos != actuales:
+            cambios.append((*nuevos, num_inc))
+    conn.executemany(
+        f"UPDATE incidentes SET {', '.join(f'{i} = ?' for i in ids)} WHERE NUM_INC = ?",
+        cambios)
+    return len(cambios), sin_coincidencia
@@ -12,6 +12,7 @@ ya que algunos informes como Pluspetrol reportan en ese sistema.
 """
 
 import logging
+from functools import lru_cache
 from typing import Tuple
 
 logger = logging.getLogger(__name__)
@@ -76,21 +77,53 @@ def transform_to_gauss_kruger(lat: float, lon: float) -> Tuple[float, float]:
         return None, None
 
     try:
-        # EPSG:22192 = Campo Inchauspe / Argentina 2 (Faja 2, meridiano central -69°)
-        transformer = Transformer.from_crs(
-            "EPSG:4326",   # WGS84
-            "EPSG:22192",  # Campo Inchauspe Faja 2
-            always_xy=True
-        )
-        x_gk, y_gk = transformer.transform(lon, lat)
-        logger.debug(f"GK Faja 2: ({x_gk:.2f}, {y_gk:.2f})")
+        x_gk, y_gk = get_gk_transformer().transform(lon, lat)
+        logger.debug("GK Faja 2: (%.2f, %.2f)", x_gk, y_gk)
         return round(x_gk, 2), round(y_gk, 2)
 
     except Exception as e:
-        logger.error(f"Error en transformación Gauss-Krüger: {e}")
+        logger.error("Error en transformación Gauss-Krüger: %s", e)
         raise
 
 
+def transform_many_to_utm(lats, lons, utm_zone: int = 19) -> Tuple[list, list]:
+    """
+    Proyecta muchos puntos WGS84 DD a UTM en una sola zona fija (default 19S).
+
+    Para medir distancias entre incidentes conviene una única proyección:
+    mezclar zonas 19S y 20S desplaza cientos de km los puntos de la 20S. La
+    zona 19S extendida al este de Mendoza distorsiona menos de 0,1 %.
+
+    Returns:
+        Tuple (eastings, northings) como listas de metros.
+    """
+    lats, lons = list(lats), list(lons)
+    if PYPROJ_AVAILABLE:
+        este, norte = get_utm_transformer(utm_zone).transform(lons, lats)
+        return list(este), list(norte)
+    pares = [_transform_manual(lat, lon, utm_zone) for lat, lon in zip(lats, lons)]
+    return [p[0] for p in pares], [p[1] for p in pares]
+
+
+def transform_many_to_gauss_kruger(lats, lons) -> Tuple[list, list]:
+    """
+    Proyecta muchos puntos WGS84 DD a Gauss-Krüger Faja 2 sobre POSGAR 2007.
+
+    Sirve para comparar con las X/Y GK que informa Pluspetrol: aunque el PDF
+    dice "Campo Inchauspe", sus valores coinciden a ~1 m con POSGAR (≈ WGS84)
+    y difieren ~220 m con Campo Inchauspe (el corrimiento de datum).
+
+    Returns:
+        Tuple (este, norte) como listas de metros, o listas de None sin pyproj.
+    """
+    lats, lons = list(lats), list(lons)
+    if not PYPROJ_AVAILABLE:
+        logger.warning("pyproj requerido para conversión Gauss-Krüger. Retornando None.")
+        return [None] * len(lats), [None] * len(lats)
+    este, norte = get_gk_posgar_transformer().transform(lons, lats)
+    return list(este), list(norte)
+
+
 # ── Detección de zona UTM ────────────────────────────────────────────────────
 
 def _detect_utm_zone(lon: float) -> int:
@@ -100,36 +133,73 @@ def _detect_utm_zone(lon: float) -> int:
     En la práctica, casi todas las operaciones caen en zona 19S.
     """
     zone = int((lon + 180) / 6) + 1
-    logger.debug(f"Zona UTM detectada: {zone}S para lon={lon}")
+    logger.debug("Zona UTM detectada: %sS para lon=%s", zone, lon)
     return zone
 
 
 # ── Backend pyproj (preciso) ─────────────────────────────────────────────────
 
+# Construir un Transformer cuesta varios milisegundos (lectura de proj.db);
+# se crea una sola vez por zona y por proceso y se reutiliza.
+
+@lru_cache(maxsize=None)
+def get_utm_transformer(utm_zone: int) -> "Transformer":
+    """Transformer WGS84 → UTM hemisferio sur para la zona dada (cacheado)."""
+    crs_utm = CRS.from_dict({
+        "proj": "utm",
+        "zone": utm_zone,
+        "south": True,
+        "datum": "WGS84",
+        "units": "m",
+    })
+    return Transformer.from_crs(
+        "EPSG:4326",  # WGS84 lat/lon
+        crs_utm,
+        always_xy=True
+    )
+
+
+@lru_cache(maxsize=None)
+def get_gk_transformer() -> "Transformer":
+    """Transformer WGS84 → Gauss-Krüger Faja 2 (cacheado)."""
+    # EPSG:22192 = Campo Inchauspe / Argentina 2 (Faja 2, meridiano central -69°)
+    return Transformer.from_crs(
+        "EPSG:4326",   # WGS84
+        "EPSG:22192",  # Campo Inchauspe Faja 2
+        always_xy=True
+    )
+
+
+@lru_cache(maxsize=None)
+def get_gk_posgar_transformer() -> "Transformer":
+    """Transformer WGS84 → Gauss-Krüger Faja 2 POSGAR 2007 (cacheado)."""
+    # EPSG:5344 = POSGAR 2007 / Argentina 2 (Faja 2, meridiano central -69°)
+    return Transformer.from_crs("EPSG:4326", "EPSG:5344", always_xy=True)
+
+
+def warm_up() -> None:
+    """
+    Precarga los transformers usados en Mendoza (zonas 19S y 20S y GK Faja 2).
+    Pensado para procesos de larga vida (daemon, workers).
+    """
+    if not PYPROJ_AVAILABLE:
+        return
+    for zone in (19, 20):
+        get_utm_transformer(zone)
+    get_gk_transformer()
+
+
 def _transform_pyproj(lat: float, lon: float, utm_zone: int) -> Tuple[float, float]:
     """Transformación precisa usando pyproj."""
     try:
-        # Construir CRS UTM para el hemisferio sur
-        crs_utm = CRS.from_dict({
-            "proj": "utm",
-            "zone": utm_zone,
-            "south": True,
-            "datum": "WGS84",
-            "units": "m",
-        })
-        transformer = Transformer.from_crs(
-            "EPSG:4326",  # WGS84 lat/lon
-            crs_utm,
-            always_xy=True
-        )
-        easting, northing = transformer.transform(lon, lat)
+        easting, northing = get_utm_transformer(utm_zone).transform(lon, lat)
         logger.debug(
-            f"UTM {utm_zone}S (pyproj): E={easting:.2f}, N={northing:.2f}"
+            "UTM %sS (pyproj): E=%.2f, N=%.2f", utm_zone, easting, northing
         )
         return round(easting, 2), round(northing, 2)
 
     except Exception as e:
-        logger.error(f"Error en transformación pyproj: {e}")
+        logger.error("Error en transformación pyproj: %s", e)
         raise
 
 
@@ -191,6 +261,6 @@ def _transform_manual(lat: float, lon: float,
     ) + N0
 
     logger.debug(
-        f"UTM {utm_zone}S (manual): E={easting:.2f}, N={northing:.2f}"
+        "UTM %sS (manual): E=%.2f, N=%.2f", utm_zone, easting, northing
     )
     return round(easting, 2), round(northing, 2)
\ No newline at end of file
@@ -1,11 +1,30 @@
 """
-Fixtures compartidos para los tests de extractores.
+Fixtures compartidos para los tests.
 Los textos reproducen exactamente el contenido extraído por PyMuPDF
-de los PDFs reales provistos.
+de los PDFs reales provistos; `db_path` y `conn` dan una base recién
+inicializada en el directorio temporal del test.
 """
 
+import sqlite3
+
 import pytest
 
+from src.main import init_database
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / 'incidentes.db')
+    init_database(path)
+    return path
+
+
+@pytest.fixture
+def conn(db_path):
+    c = sqlite3.connect(db_path)
+    yield c
+    c.close()
+
 
 @pytest.fixture
 def ypf_text():
@@ -142,3 +161,20 @@ Volumen derramado neto de hidrocarburo: 1,1 m3. Con un 40 % de agua.
 Volumen recuperado neto de hidrocarburo: 0 m3.
 Responsable del comunicado: Sabrina Estegui
 """
+
+
+@pytest.fixture
+def ejemplo_text():
+    return """OPERADORA EJEMPLO S.A.
+Parte de Incidente N° 0042
+Concesión: Cerro Ejemplo
+Lote: L-7
+Fecha: 05/03/2026
+Hora: 14:30
+Tipo de instalación: [ ] Ducto [x] Pozo [ ] Tanque
+Latitud: 33°30'57,62"
+Longitud: 68°53'12,5"
+Volumen derramado (m3): 2,5
+Hidrocarburo (ppm): 1200
+Recursos afectados: [x] Suelo [ ] Cauce aluvional [x] Agua superficial
+"""
@@ -0,0 +1,105 @@
+"""
+Tests para las tablas de resumen: los triggers las mantienen iguales a una
+reconstrucción desde cero en cada camino de escritura.
+"""
+
+import sqlite3
+
+from src.main import actualizar_incidente, init_database, insert_incident
+from src.storage import agregados
+from src.storage.incidentes import IncidentRecord, insertar_lote
+
+
+def _inc(num, **campos):
+    return {'NUM_INC': num, 'OPERADOR': 'YPF S.A.', 'FECHA': '10-02-2026',
+            'AREA_CONCESION': 'La Ventana', 'MAGNITUD': 'Menor', 'VOL_M3': 0.1, **campos}
+
+
+def _tablas(conn):
+    return {agg.tabla: sorted(conn.execute(f"SELECT * FROM {agg.tabla}").fetchall())
+            for agg in agregados.AGREGADOS}
+
+
+def _sin_diferencias(conn) -> bool:
+    antes = _tablas(conn)
+    return not any(agregados.reconstruir_todos(conn).values()) and _tablas(conn) == antes
+
+
+def test_insert(conn):
+    insert_incident(conn, _inc('A'))
+    insert_incident(conn, _inc('B', VOL_M3=0.2))
+    insert_incident(conn, _inc('C', FECHA=None, OPERADOR=None, VOL_M3=None))
+    assert agregados.por_operador_mes(conn) == [('', '', 1, 0.0),
+                                                ('YPF S.A.', '2026-02', 2, 0.3)]
+    assert agregados.por_area_magnitud(conn) == [('La Ventana', 'Menor', 3, 0.3)]
+    assert _sin_diferencias(conn)
+
+
+def test_insertar_lote_cuenta_solo_incidentes(conn):
+    registros = [IncidentRecord(**_inc(str(i))) for i in range(5)]
+    assert insertar_lote(conn, registros) == [True] * 5
+    assert insertar_lote(conn, registros) == [False] * 5     # ignorados: no suman dos veces
+    assert agregados.por_operador_mes(conn) == [('YPF S.A.', '2026-02', 5, 0.5)]
+    assert _sin_diferencias(conn)
+
+
+def test_duplicados_no_suman_dos_veces(conn):
+    for _ in range(2):
+        for i in range(5):
+            insert_incident(conn, _inc(str(i)))
+    assert agregados.por_operador_mes(conn) == [('YPF S.A.', '2026-02', 5, 0.5)]
+    assert _sin_diferencias(conn)
+
+
+def test_update_mueve_de_grupo(conn):
+    insert_incident(conn, _inc('A'))
+    insert_incident(conn, _inc('B'))
+    actualizar_incidente(conn, _inc('A', FECHA='03-03-2026', VOL_M3=1.5, MAGNITUD='Mayor'))
+    assert agregados.por_operador_mes(conn) == [('YPF S.A.', '2026-02', 1, 0.1),
+                                                ('YPF S.A.', '2026-03', 1, 1.5)]
+    # El ID canónico reemplaza al nombre reportado
+    conn.execute("UPDATE incidentes SET AREA_ID = 'LA_VENTANA' WHERE NUM_INC = 'B'")
+    assert agregados.por_area_magnitud(conn) == [('LA_VENTANA', 'Menor', 1, 0.1),
+                                                 ('La Ventana', 'Mayor', 1, 1.5)]
+    assert _sin_diferencias(conn)
+
+
+def test_delete_borra_grupos_vacios(conn):
+    insert_incident(conn, _inc('A'))
+    insert_incident(conn, _inc('B', OPERADOR='Pluspetrol S.A.'))
+    conn.execute("DELETE FROM incidentes WHERE NUM_INC = 'B'")
+    assert agregados.por_operador_mes(conn) == [('YPF S.A.', '2026-02', 1, 0.1)]
+    assert _sin_diferencias(conn)
+
+
+def test_volumen_sin_residuos_de_redondeo(conn):
+    for i in range(30):
+        insert_incident(conn, _inc(str(i), VOL_M3=0.1))
+    for i in range(29):
+        actualizar_incidente(conn, _inc(str(i), VOL_M3=0.2))
+    conn.execute("DELETE FROM incidentes WHERE NUM_INC != '29'")
+    assert agregados.por_operador_mes(conn) == [('YPF S.A.', '2026-02', 1, 0.1)]
+
+
+def test_reconstruir_informa_diferencias(conn):
+    insert_incident(conn, _inc('A'))
+    conn.execute("UPDATE agg_operador_mes SET N = 7")
+    assert agregados.reconstruir_todos(conn) == {'agg_operador_mes': 2, 'agg_area_magnitud': 0}
+    assert agregados.por_operador_mes(conn, desde='2026-01') == [('YPF S.A.', '2026-02', 1, 0.1)]
+    assert agregados.por_operador_mes(conn, desde='2026-03') == []
+
+
+def test_base_existente_se_completa(tmp_path):
+    db_path = str(tmp_path / 'incidentes.db')
+    init_database(db_path)
+    with sqlite3.connect(db_path) as conn:
+        insert_incident(conn, _inc('A'))
+        insert_incident(conn, _inc('B'))
+        # Base anterior a los resúmenes
+        for agg in agregados.AGREGADOS:
+            conn.execute(f"DROP TABLE {agg.tabla}")
+            for sufijo in ('ins', 'del', 'upd'):
+                conn.execute(f"DROP TRIGGER {agg.tabla}_{sufijo}")
+    init_database(db_path)
+    with sqlite3.connect(db_path) as conn:
+        assert agregados.por_operador_mes(conn) == [('YPF S.A.', '2026-02', 2, 0.2)]
@@ -0,0 +1,111 @@
+"""
+Tests para el registro de cambios: cada camino de escritura deja su entrada,
+el cursor por secuencia y el JSONL que sólo agrega lo nuevo.
+"""
+
+import json
+import sqlite3
+
+from src.main import (_agregar_columnas, actualizar_incidente, init_database, insert_incident,
+                      insert_incidents)
+from src.storage import cambios
+
+
+def _inc(num, **campos):
+    return {'NUM_INC': num, 'OPERADOR': 'YPF S.A.', 'FECHA': '10-02-2026',
+            'VOL_M3': 0.1, 'LAT': -37.3, 'LON': -69.0, **campos}
+
+
+def test_insert_update_duplicado_delete(conn):
+    corrida = cambios.iniciar_corrida(conn, 'run')
+    insert_incident(conn, _inc('A'))
+    insert_incident(conn, _inc('A', VOL_M3=0.5))                 # ignorado
+    actualizar_incidente(conn, _inc('A', VOL_M3=2.0))
+    conn.execute("UPDATE incidentes SET VOL_M3 = 2.0 WHERE NUM_INC = 'A'")   # sin cambio real
+    conn.execute("DELETE FROM incidentes WHERE NUM_INC = 'A'")
+
+    insertado, duplicado, actualizado, borrado = cambios.despues(conn)
+    assert [c.operacion for c in (insertado, duplicado, actualizado, borrado)] == \
+        ['insert', 'duplicado', 'update', 'delete']
+    assert {c.corrida for c in (insertado, duplicado, actualizado, borrado)} == {corrida}
+    assert insertado.campos['VOL_M3'] == 0.1 and insertado.campos['OPERADOR'] == 'YPF S.A.'
+    assert duplicado.campos == {'VOL_M3': 0.5}
+    assert actualizado.campos == {'VOL_M3': 2.0}
+    assert borrado.campos is None
+
+
+def test_lote_registra_inserts_y_duplicados(conn):
+    insert_incident(conn, _inc('A'))
+    assert insert_incidents(conn, [_inc('A', VOL_M3=0.5), _inc('B'), _inc('B', VOL_M3=0.7)]) == \
+        [False, True, False]
+    # Los duplicados se registran después del executemany
+    insertado, *duplicados = cambios.despues(conn)[1:]
+    assert (insertado.num_inc, insertado.operacion) == ('B', 'insert')
+    assert [(c.num_inc, c.operacion, c.campos) for c in duplicados] == \
+        [('A', 'duplicado', {'VOL_M3': 0.5}), ('B', 'duplicado', {'VOL_M3': 0.7})]
+
+
+def test_renombre_y_columnas_anuladas(conn):
+    insert_incident(conn, _inc('A'))
+    conn.execute("UPDATE incidentes SET DIST_CAUCE_M = 12.5 WHERE NUM_INC = 'A'")
+    actualizar_incidente(conn, _inc('B', LAT=-38.0), num_inc_previo='A')
+    ultimo = cambios.despues(conn)[-1]
+    assert ultimo.num_inc == 'A'
+    assert ultimo.campos == {'NUM_INC': 'B', 'LAT': -38.0, 'DIST_CAUCE_M': None}
+
+
+def test_cursor(conn):
+    for i in range(7):
+        insert_incident(conn, _inc(str(i)))
+    primeros = cambios.despues(conn, 0, limite=3)
+    assert [c.num_inc for c in primeros] == ['0', '1', '2']
+    siguientes = cambios.despues(conn, primeros[-1].seq, limite=10)
+    assert [c.num_inc for c in siguientes] == ['3', '4', '5', '6']
+    assert cambios.despues(conn, siguientes[-1].seq) == []
+
+
+def test_sin_corrida_abierta(conn):
+    corrida = cambios.iniciar_corrida(conn, 'run')
+    cambios.cerrar_corrida(conn, corrida, jsonl=None)
+    insert_incident(conn, _inc('A'))
+    assert cambios.despues(conn)[0].corrida is None
+
+
+def test_corrida_interrumpida_se_cierra(conn):
+    vieja = cambios.iniciar_corrida(conn, 'run')
+    nueva = cambios.iniciar_corrida(conn, 'run')
+    insert_incident(conn, _inc('A'))
+    assert cambios.despues(conn)[0].corrida == nueva
+    assert conn.execute("SELECT FIN IS NOT NULL FROM corridas WHERE ID = ?",
+                        (vieja,)).fetchone() == (1,)
+
+
+def test_jsonl_agrega_solo_lo_nuevo(conn, tmp_path):
+    jsonl = str(tmp_path / 'cambios.jsonl')
+    corrida = cambios.iniciar_corrida(conn, 'run')
+    insert_incident(conn, _inc('A'))
+    insert_incident(conn, _inc('B'))
+    assert cambios.cerrar_corrida(conn, corrida, jsonl) == 2
+
+    corrida = cambios.iniciar_corrida(conn, 'run')
+    actualizar_incidente(conn, _inc('A', VOL_M3=3.0))
+    assert cambios.cerrar_corrida(conn, corrida, jsonl) == 1
+    assert cambios.exportar_jsonl(conn, jsonl) == 0
+
+    with open(jsonl, encoding='utf-8') as f:
+        lineas = [json.loads(linea) for linea in f]
+    assert [(c['seq'], c['num_inc'], c['operacion']) for c in lineas] == \
+        [(1, 'A', 'insert'), (2, 'B', 'insert'), (3, 'A', 'update')]
+    assert lineas[2]['campos'] == {'VOL_M3': 3.0}
+
+
+def test_columna_nueva_regenera_triggers(tmp_path):
+    db_path = str(tmp_path / 'incidentes.db')
+    init_database(db_path)
+    with sqlite3.connect(db_path) as conn:
+        _agregar_columnas(conn, 'incidentes', {'NUEVA': 'TEXT'})
+    init_database(db_path)
+    with sqlite3.connect(db_path) as conn:
+        insert_incident(conn, _inc('A'))
+        conn.execute("UPDATE incidentes SET NUEVA = 'x'")
+        assert cambios.despues(conn)[-1].campos == {'NUEVA': 'x'}
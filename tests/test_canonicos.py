@@ -0,0 +1,95 @@
+"""
+Tests para los nombres canónicos: coincidencia exacta tras plegar, difusa
+acotada por trigramas, por palabras iniciales, y la aplicación a la tabla.
+"""
+
+import sqlite3
+
+import pytest
+
+from src.main import actualizar_incidente, init_database, insert_incident
+from src.transformation import canonicos
+from src.transformation.canonicos import Diccionario
+
+
+@pytest.fixture(scope='module')
+def dic():
+    return Diccionario({
+        'yacimiento': [{'nombre': 'Desfiladero Bayo'},
+                       {'nombre': 'Vaca Muerta', 'alias': ['VM']},
+                       {'nombre': 'Chañares Herrados'},
+                       {'id': 'PBN', 'nombre': 'Paso de las Bardas Norte'}],
+        'instalacion': [{'nombre': 'Cañería'}, {'nombre': 'Cañería de conducción'}],
+    })
+
+
+class TestBuscar:
+    @pytest.mark.parametrize('valor, esperado', [
+        ('DESFILADERO BAYO', 'DESFILADERO_BAYO'),
+        ('Chanares Herrados', 'CHANARES_HERRADOS'),
+        ('VM', 'VACA_MUERTA'),
+        ('paso de las bardas norte.', 'PBN'),
+    ])
+    def test_exacta_tras_plegar(self, dic, valor, esperado):
+        c = dic.buscar('yacimiento', valor)
+        assert (c.id, c.distancia, c.parcial) == (esperado, 0, False)
+
+    def test_difusa(self, dic):
+        c = dic.buscar('yacimiento', 'Chañarez Herrados')
+        assert (c.id, c.nombre, c.distancia) == ('CHANARES_HERRADOS', 'Chañares Herrados', 1)
+        assert dic.buscar('yacimiento', 'Desfiladro Bayyo').distancia == 2
+
+    def test_cortos_solo_exactos(self, dic):
+        assert dic.buscar('yacimiento', 'VX') is None
+        assert dic.buscar('yacimiento', 'Vaca Muerta Este').id == 'VACA_MUERTA'
+
+    def test_palabras_iniciales(self, dic):
+        c = dic.buscar('instalacion', 'Cañería de conduccion VM-64')
+        assert (c.id, c.parcial) == ('CANERIA_DE_CONDUCCION', True)
+        assert dic.id_canonico('instalacion', 'cañería  LV-20  b/p') == 'CANERIA'
+
+    def test_sin_coincidencia(self, dic):
+        assert dic.buscar('yacimiento', 'Cerro Lindo') is None
+        assert dic.buscar('yacimiento', None) is None
+        assert dic.buscar('otra_categoria', 'Vaca Muerta') is None
+
+    def test_memo(self, dic):
+        dic.buscar.cache_clear()
+        for _ in range(3):
+            dic.buscar('yacimiento', 'Vaca Muerta')
+        assert dic.buscar.cache_info().hits == 2
+
+
+@pytest.mark.parametrize('a, b, k, esperado', [
+    ('VIZCACHERAS', 'VISCACHERAS', 1, 1), ('ABC', 'ABC', 0, 0),
+    ('ABCDEF', 'ABXXEF', 1, None), ('ABC', 'ABCDE', 1, None),
+])
+def test_distancia_acotada(a, b, k, esperado):
+    assert canonicos.distancia_acotada(a, b, k) == esperado
+
+
+def test_diccionario_incluido_cubre_los_pdfs():
+    dic = canonicos.cargar(canonicos.DICCIONARIOS[:1])
+    assert dic.id_canonico('area', 'CHIHUIDO DE LA SIERRA NEGRA') == 'CHIHUIDO_DE_LA_SIERRA_NEGRA'
+    assert dic.id_canonico('yacimiento', 'VM') == 'VACA_MUERTA'
+    assert dic.id_canonico('instalacion', 'Línea impulsión Bba N°1') == 'LINEA_DE_IMPULSION'
+
+
+def test_canonizar_incidentes(tmp_path, dic):
+    db_path = str(tmp_path / 'incidentes.db')
+    init_database(db_path)
+    with sqlite3.connect(db_path) as conn:
+        insert_incident(conn, {'NUM_INC': 'A', 'YACIMIENTO': 'VM', 'TIPO_INSTALACION': 'Cañeria'})
+        insert_incident(conn, {'NUM_INC': 'B', 'YACIMIENTO': 'Cerro Lindo'})
+        n, sin = canonicos.canonizar_incidentes(conn, dic)
+        assert n == 1 and sin == {('YACIMIENTO', 'Cerro Lindo'): 1}
+        assert conn.execute("SELECT YACIMIENTO_ID, INSTALACION_ID FROM incidentes "
+                            "WHERE NUM_INC = 'A'").fetchone() == ('VACA_MUERTA', 'CANERIA')
+
+        # Un nombre corregido al reextraer deja su ID pendiente
+        actualizar_incidente(conn, {'NUM_INC': 'A', 'YACIMIENTO': 'Desfiladero Bayo'})
+        assert conn.execute("SELECT YACIMIENTO_ID, INSTALACION_ID FROM incidentes "
+                            "WHERE NUM_INC = 'A'").fetchone() == (None, 'CANERIA')
+        assert canonicos.canonizar_incidentes(conn, dic)[0] == 1
+        assert conn.execute("SELECT YACIMIENTO_ID FROM incidentes WHERE NUM_INC = 'A'") \
+            .fetchone() == ('DESFILADERO_BAYO',)
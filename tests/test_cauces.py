@@ -0,0 +1,105 @@
+"""
+Tests para la distancia a cauces.
+Los segmentos se arman directamente en UTM (metros) para controlar las
+distancias; la carga del GeoJSON y la etapa sobre la DB usan lon/lat.
+"""
+
+import json
+import sqlite3
+
+import numpy as np
+import pytest
+
+from src.analysis import cauces
+from src.analysis.cauces import IndiceSegmentos, Segmentos, _distancias
+from src.main import actualizar_incidente, init_database
+
+X0, Y0 = 2_500_000.0, 5_800_000.0
+
+
+def _segmentos(lineas):
+    ax, ay, bx, by, idx = [], [], [], [], []
+    for i, linea in enumerate(lineas):
+        for (x1, y1), (x2, y2) in zip(linea, linea[1:]):
+            ax.append(X0 + x1); ay.append(Y0 + y1)
+            bx.append(X0 + x2); by.append(Y0 + y2)
+            idx.append(i)
+    return Segmentos(*(np.asarray(v, dtype=float) for v in (ax, ay, bx, by)),
+                     np.asarray(idx), [f"cauce {i}" for i in range(len(lineas))])
+
+
+class TestIndiceSegmentos:
+    def test_distancia_perpendicular_y_a_extremo(self):
+        seg = _segmentos([[(0, 0), (1000, 0)]])
+        d, s = IndiceSegmentos(seg).mas_cercano([X0 + 500, X0 + 1300], [Y0 + 40, Y0 + 400])
+        assert d == pytest.approx([40, 500])
+        assert s.tolist() == [0, 0]
+
+    def test_elige_el_cauce_mas_cercano(self):
+        seg = _segmentos([[(0, 0), (0, 5000)], [(300, 0), (300, 5000)]])
+        d, s = IndiceSegmentos(seg).mas_cercano([X0 + 200], [Y0 + 2500])
+        assert d[0] == pytest.approx(100) and seg.cauce[s[0]] == 1
+
+    def test_punto_lejano_sube_de_nivel(self):
+        seg = _segmentos([[(0, 0), (100, 0)]])
+        d, _ = IndiceSegmentos(seg).mas_cercano([X0 + 50], [Y0 + 80_000])
+        assert d[0] == pytest.approx(80_000)
+
+    def test_igual_que_fuerza_bruta(self):
+        rng = np.random.default_rng(7)
+        lineas = [np.cumsum(rng.normal(0, 300, (40, 2)), axis=0) + rng.uniform(0, 50_000, 2)
+                  for _ in range(30)]
+        seg = _segmentos([[tuple(p) for p in linea] for linea in lineas])
+        px = X0 + rng.uniform(-10_000, 60_000, 500)
+        py = Y0 + rng.uniform(-10_000, 60_000, 500)
+        d, _ = IndiceSegmentos(seg, tam_celda_m=500).mas_cercano(px, py)
+        esperado, _ = _distancias(px, py, seg, np.arange(len(seg.ax)))
+        assert np.allclose(d, esperado)
+
+    def test_sin_segmentos(self):
+        d, s = IndiceSegmentos(_segmentos([])).mas_cercano([X0], [Y0])
+        assert np.isinf(d[0]) and s[0] == -1
+
+
+@pytest.fixture
+def geojson(tmp_path):
+    path = tmp_path / 'cauces.geojson'
+    path.write_text(json.dumps({'type': 'FeatureCollection', 'features': [
+        {'type': 'Feature', 'properties': {'nombre': 'Río Tunuyán'},
+         'geometry': {'type': 'LineString',
+                      'coordinates': [[-68.80, -33.30], [-68.70, -33.30], [-68.60, -33.32]]}},
+        {'type': 'Feature', 'properties': {'name': 'Arroyo'},
+         'geometry': {'type': 'MultiLineString',
+                      'coordinates': [[[-68.40, -33.60], [-68.40, -33.50]],
+                                      [[-68.30, -33.60], [-68.30, -33.50]]]}},
+    ]}), encoding='utf-8')
+    return path
+
+
+def test_carga_no_une_lineas_distintas(geojson):
+    seg = cauces.cargar_geojson(geojson)
+    assert seg.nombres == ['Río Tunuyán', 'Arroyo']
+    assert seg.cauce.tolist() == [0, 0, 1, 1]
+
+
+def test_puntuar_incidentes(tmp_path, geojson):
+    db_path = str(tmp_path / 'incidentes.db')
+    init_database(db_path)
+    seg = cauces.cargar_geojson(geojson)
+    with sqlite3.connect(db_path) as conn:
+        conn.executemany("INSERT INTO incidentes (NUM_INC, LAT, LON) VALUES (?, ?, ?)",
+                         [('A', -33.301, -68.75), ('B', -33.55, -68.35), ('C', None, None)])
+        assert cauces.puntuar_incidentes(conn, seg) == 2
+        filas = dict((r[0], r[1:]) for r in conn.execute(
+            "SELECT NUM_INC, DIST_CAUCE_M, CAUCE_CERCANO FROM incidentes"))
+        assert filas['A'][0] == pytest.approx(111, abs=2) and filas['A'][1] == 'Río Tunuyán'
+        assert filas['B'][1] == 'Arroyo'
+        assert filas['C'] == (None, None)
+
+        # Corregir coordenadas deja la distancia pendiente; sólo esa se recalcula
+        actualizar_incidente(conn, {'NUM_INC': 'B', 'LAT': -33.55, 'LON': -68.3})
+        assert conn.execute("SELECT DIST_CAUCE_M FROM incidentes WHERE NUM_INC = 'B'"
+                            ).fetchone() == (None,)
+        assert cauces.puntuar_incidentes(conn, seg, todos=False) == 1
+        assert conn.execute("SELECT DIST_CAUCE_M FROM incidentes WHERE NUM_INC = 'B'"
+                            ).fetchone()[0] == pytest.approx(0, abs=1)
@@ -0,0 +1,67 @@
+"""
+Tests para el clasificador de páginas.
+Los PDFs se arman en memoria con PyMuPDF: un formulario con texto, un anexo
+fotográfico con epígrafe, una página sólo imagen y una página vacía.
+"""
+
+import fitz
+import pytest
+
+from src.extractors.clasificador_paginas import (SALTO_PAGINA, clasificar_pagina,
+                                                 extraer_texto)
+
+FORMULARIO = "\n".join(f"Campo {i}: valor del formulario de incidente {i}" for i in range(60))
+
+
+def _imagen(page):
+    pix = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 16, 16), False)
+    page.insert_image(fitz.Rect(50, 50, 500, 700), pixmap=pix)
+
+
+@pytest.fixture
+def doc():
+    d = fitz.open()
+    d.new_page().insert_text((50, 50), FORMULARIO, fontsize=8)   # 1 formulario
+    anexo = d.new_page()                                          # 2 anexo
+    _imagen(anexo)
+    anexo.insert_text((50, 720), "Fotos del incidente")
+    _imagen(d.new_page())                                         # 3 imagen
+    d.new_page()                                                  # 4 vacía
+    d.new_page().insert_text((50, 50), FORMULARIO, fontsize=8)   # 5 formulario
+    yield d
+    d.close()
+
+
+class TestClasificarPagina:
+    def test_clases(self, doc):
+        clases = [clasificar_pagina(p, n).clase for n, p in enumerate(doc, start=1)]
+        assert clases == ['formulario', 'anexo', 'imagen', 'vacia', 'formulario']
+
+    def test_primera_pagina_siempre_se_renderiza(self, doc):
+        doc.move_page(2, 0)   # la página sólo imagen pasa a ser la primera
+        assert clasificar_pagina(doc[0], 1).renderizada
+
+    def test_form_xobject_se_renderiza(self, doc):
+        fuente = fitz.open()
+        fuente.new_page().insert_text((50, 50), FORMULARIO, fontsize=8)
+        pagina = doc.new_page()
+        _imagen(pagina)
+        pagina.show_pdf_page(pagina.rect, fuente, 0)   # texto dentro de un XObject
+        assert clasificar_pagina(pagina, len(doc)).clase == 'formulario'
+
+
+class TestExtraerTexto:
+    def test_omite_anexos_y_conserva_numeracion(self, doc):
+        resultado = extraer_texto(doc)
+        paginas = resultado.texto.split(SALTO_PAGINA)
+        assert len(paginas) == 5
+        assert 'Campo 0' in paginas[0] and 'Campo 0' in paginas[4]
+        assert paginas[1] == paginas[2] == paginas[3] == ''
+        assert [d.renderizada for d in resultado.paginas] == [True, False, False, False, True]
+
+    def test_sin_omitir_renderiza_todo(self, doc):
+        resultado = extraer_texto(doc, omitir_anexos=False)
+        assert 'Fotos del incidente' in resultado.texto
+        assert all(d.renderizada for d in resultado.paginas)
+        assert resultado.paginas[1].clase == 'anexo'
+        assert resultado.ms_ahorro_estimado == 0.0
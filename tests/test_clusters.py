@@ -0,0 +1,131 @@
+"""
+Tests para los clusters de densidad (DBSCAN incremental).
+El algoritmo se prueba en UTM contra un DBSCAN directo (todos contra todos);
+la persistencia, con incidentes mínimos en una DB temporal.
+"""
+
+import random
+
+import pytest
+
+from src.analysis.dbscan import EstadoDBSCAN, dbscan
+from src.main import actualizar_incidente
+from src.storage import clusters
+
+
+def _dbscan_directo(puntos, eps, min_pts):
+    """Referencia O(n²): núcleos y componentes de núcleos."""
+    n = len(puntos)
+    vecinos = [[j for j in range(n)
+                if (puntos[i][1] - puntos[j][1]) ** 2 + (puntos[i][2] - puntos[j][2]) ** 2 <= eps ** 2]
+               for i in range(n)]
+    nucleo = [len(v) >= min_pts for v in vecinos]
+    etiqueta = [None] * n
+    siguiente = 0
+    for i in range(n):
+        if nucleo[i] and etiqueta[i] is None:
+            siguiente += 1
+            pila, etiqueta[i] = [i], siguiente
+            while pila:
+                for j in vecinos[pila.pop()]:
+                    if nucleo[j] and etiqueta[j] is None:
+                        etiqueta[j] = siguiente
+                        pila.append(j)
+    return vecinos, nucleo, etiqueta
+
+
+class TestDBSCAN:
+    def test_dos_clusters_y_ruido(self):
+        puntos = [('a1', 0, 0), ('a2', 100, 0), ('a3', 0, 100),
+                  ('b1', 5000, 0), ('b2', 5100, 0), ('b3', 5000, 100), ('b4', 5200, 200),
+                  ('r', 20000, 0)]
+        etiquetas = dbscan(puntos, eps=300, min_pts=3)
+        assert etiquetas['a1'] == etiquetas['a2'] == etiquetas['a3']
+        assert etiquetas['b1'] == etiquetas['b2'] == etiquetas['b3'] == etiquetas['b4']
+        assert etiquetas['a1'] != etiquetas['b1']
+        assert etiquetas['r'] is None
+
+    def test_nucleo_nuevo_fusiona_clusters(self):
+        estado = EstadoDBSCAN(eps=300, min_pts=3)
+        estado.insertar([('a1', 0, 0), ('a2', 100, 0), ('a3', 200, 0),
+                         ('b1', 700, 0), ('b2', 800, 0), ('b3', 900, 0)])
+        assert estado.cluster == [1, 1, 1, 2, 2, 2]
+        fusiones = estado.insertar([('puente', 450, 0)])
+        assert fusiones == {2: 1}
+        assert set(estado.cluster) == {1}
+
+    @pytest.mark.parametrize('semilla', range(5))
+    def test_incremental_igual_que_directo(self, semilla):
+        rnd = random.Random(semilla)
+        puntos = [(f"p{i}", rnd.gauss(rnd.choice([0, 3000, 8000]), 800), rnd.gauss(0, 800))
+                  for i in range(250)]
+        vecinos, nucleo, etiqueta = _dbscan_directo(puntos, 300, 4)
+
+        estado = EstadoDBSCAN(eps=300, min_pts=4)
+        k = 0
+        while k < len(puntos):
+            lote = rnd.randint(1, 40)
+            estado.insertar(puntos[k:k + lote])
+            k += lote
+
+        assert estado.nucleo == nucleo
+        # Misma partición de los núcleos (los ids pueden diferir)
+        equivalencia = {}
+        for i, es_nucleo in enumerate(nucleo):
+            if es_nucleo:
+                assert equivalencia.setdefault(etiqueta[i], estado.cluster[i]) == estado.cluster[i]
+        assert len(set(equivalencia.values())) == len(equivalencia)
+        # Bordes: en el cluster de algún núcleo vecino; si no hay ninguno, ruido
+        for i, es_nucleo in enumerate(nucleo):
+            if not es_nucleo:
+                posibles = {estado.cluster[j] for j in vecinos[i] if nucleo[j]}
+                assert estado.cluster[i] in posibles if posibles else estado.cluster[i] is None
+
+
+def _insertar(conn, filas):
+    conn.executemany(
+        "INSERT INTO incidentes (NUM_INC, FECHA, LAT, LON, VOL_M3, YACIMIENTO) "
+        "VALUES (?, ?, ?, ?, ?, ?)", filas)
+
+
+class TestPersistencia:
+    def test_incremental_y_resumen(self, conn):
+        _insertar(conn, [('A', '05-02-2026', -33.4700, -68.6200, 1.0, 'Vaca Muerta'),
+                         ('B', '06-02-2026', -33.4710, -68.6210, 2.0, 'Vaca Muerta'),
+                         ('C', '20-03-2026', -33.4705, -68.6190, 0.5, 'La Ventana'),
+                         ('R', '05-02-2026', -37.0000, -69.0000, 9.0, 'Otro')])
+        r = clusters.actualizar(conn, eps=500, min_pts=3)
+        assert r == {'nuevos': 4, 'fusiones': 0, 'rehecho': False, 'clusters': 1}
+        [c] = clusters.listar(conn)
+        assert c['N'] == 3 and c['VOL_M3'] == pytest.approx(3.5)
+        assert c['YACIMIENTO'] == 'Vaca Muerta'
+        assert (c['DESDE'], c['HASTA']) == ('2026-02-05', '2026-03-20')
+        assert [f['N'] for f in clusters.listar(conn, mes='2026-02')] == [2]
+        assert dict(conn.execute("SELECT NUM_INC, CLUSTER FROM incidentes")) == \
+            {'A': 1, 'B': 1, 'C': 1, 'R': None}
+
+        # Un incidente nuevo se agrega sin rehacer
+        _insertar(conn, [('D', '21-03-2026', -33.4702, -68.6205, 1.0, 'Vaca Muerta')])
+        r = clusters.actualizar(conn)
+        assert (r['nuevos'], r['rehecho']) == (1, False)
+        assert clusters.listar(conn)[0]['N'] == 4
+
+        # Nada nuevo: no inserta nada
+        assert clusters.actualizar(conn)['nuevos'] == 0
+
+    def test_coordenadas_corregidas_rehacen(self, conn):
+        _insertar(conn, [(n, '05-02-2026', -33.47 - i * 0.001, -68.62, 1.0, 'X')
+                         for i, n in enumerate('ABC')])
+        clusters.actualizar(conn, eps=500, min_pts=3)
+        actualizar_incidente(conn, {'NUM_INC': 'C', 'LAT': -34.5, 'LON': -68.62})
+        r = clusters.actualizar(conn)
+        assert r['rehecho'] and r['clusters'] == 0
+        assert conn.execute("SELECT COUNT(*) FROM incidentes WHERE CLUSTER IS NOT NULL"
+                            ).fetchone() == (0,)
+
+    def test_cambiar_parametros_rehace(self, conn):
+        _insertar(conn, [('A', None, -33.47, -68.62, None, None),
+                         ('B', None, -33.472, -68.62, None, None)])
+        assert clusters.actualizar(conn, eps=500, min_pts=2)['clusters'] == 1
+        r = clusters.actualizar(conn, eps=100, min_pts=2)
+        assert r['rehecho'] and r['clusters'] == 0
@@ -0,0 +1,99 @@
+"""
+Tests para la asignación de concesiones por punto en polígono.
+El GeoJSON se arma en tmp_path con cuadrados simples (lon/lat), uno con hueco,
+un MultiPolygon y un yacimiento dentro de una concesión.
+"""
+
+import json
+import sqlite3
+
+import pytest
+
+from src.analysis import concesiones
+from src.main import init_database
+
+
+def _cuadrado(lon0, lat0, lado):
+    return [[lon0, lat0], [lon0 + lado, lat0], [lon0 + lado, lat0 + lado],
+            [lon0, lat0 + lado], [lon0, lat0]]
+
+
+def _feature(nombre, geometria, tipo=None):
+    props = {'nombre': nombre}
+    if tipo:
+        props['tipo'] = tipo
+    return {'type': 'Feature', 'properties': props, 'geometry': geometria}
+
+
+@pytest.fixture
+def poligonos(tmp_path):
+    path = tmp_path / 'concesiones.geojson'
+    path.write_text(json.dumps({'type': 'FeatureCollection', 'features': [
+        _feature('La Ventana', {'type': 'Polygon', 'coordinates': [
+            _cuadrado(-68.8, -33.6, 0.4), _cuadrado(-68.7, -33.5, 0.1)]}),   # con hueco
+        _feature('Barrancas', {'type': 'MultiPolygon', 'coordinates': [
+            [_cuadrado(-68.9, -33.2, 0.2)], [_cuadrado(-68.5, -33.2, 0.1)]]}),
+        _feature('Punta de las Bardas', {'type': 'Polygon', 'coordinates': [
+            _cuadrado(-68.75, -33.58, 0.05)]}, tipo='yacimiento'),
+        _feature(None, {'type': 'Polygon', 'coordinates': [_cuadrado(0, 0, 1)]}),
+    ]}), encoding='utf-8')
+    return concesiones.cargar_geojson(path)
+
+
+class TestPuntoEnPoligono:
+    def test_carga_ignora_features_sin_nombre(self, poligonos):
+        assert [p.nombre for p in poligonos] == ['La Ventana', 'Barrancas', 'Punta de las Bardas']
+
+    def test_asignacion_por_lote(self, poligonos):
+        lats = [-33.55, -33.45, -33.15, -33.15, -30.0]
+        lons = [-68.60, -68.65, -68.80, -68.45, -68.60]
+        assert concesiones.asignar_poligonos(poligonos, lats, lons) == [
+            'La Ventana',
+            None,          # dentro del hueco
+            'Barrancas',
+            'Barrancas',   # segunda parte del MultiPolygon
+            None,
+        ]
+
+    def test_tipo_yacimiento(self, poligonos):
+        assert concesiones.asignar_poligonos(
+            poligonos, [-33.56, -33.40], [-68.73, -68.73], 'yacimiento') == \
+            ['Punta de las Bardas', None]
+
+    def test_solapados_gana_el_mas_chico(self, poligonos):
+        chico = concesiones.preparar_poligono(
+            'Lote Chico', 'concesion', {'type': 'Polygon', 'coordinates': [_cuadrado(-68.62, -33.57, 0.02)]})
+        for orden in ([chico] + poligonos, poligonos + [chico]):
+            assert concesiones.asignar_poligonos(orden, [-33.56], [-68.61]) == ['Lote Chico']
+
+
+class TestMismoNombre:
+    @pytest.mark.parametrize('reportado,oficial', [
+        ('CHAÑARES HERRADOS', 'Chañares Herrados'),
+        ('La Ventana', 'LA VENTANA (Área de concesión)'),
+        ('Cerro Fortunoso.', 'CERRO FORTUNOSO'),
+    ])
+    def test_coinciden(self, reportado, oficial):
+        assert concesiones.mismo_nombre(reportado, oficial)
+
+    def test_no_coinciden(self):
+        assert not concesiones.mismo_nombre('JCP', 'El Sosneado')
+        assert not concesiones.mismo_nombre('Ventana Sur', 'La Ventana')
+
+
+def test_asignar_incidentes(tmp_path, poligonos):
+    db_path = str(tmp_path / 'incidentes.db')
+    init_database(db_path)
+    with sqlite3.connect(db_path) as conn:
+        conn.executemany(
+            "INSERT INTO incidentes (NUM_INC, AREA_CONCESION, LAT, LON) VALUES (?, ?, ?, ?)",
+            [('A', 'La Ventana', -33.55, -68.60), ('B', 'Barrancas', -33.56, -68.73),
+             ('C', None, -33.15, -68.80), ('D', 'JCP', -37.4, -68.4)])
+        estados = {a.num_inc: (a.estado, a.concesion, a.yacimiento)
+                   for a in concesiones.asignar_incidentes(conn, poligonos)}
+    assert estados == {
+        'A': ('coincide', 'La Ventana', None),
+        'B': ('discrepancia', 'La Ventana', 'Punta de las Bardas'),
+        'C': ('sin_area', 'Barrancas', None),
+        'D': ('fuera', None, None),
+    }
@@ -0,0 +1,92 @@
+"""
+Tests para las consultas de lectura: filtros, paginación por clave, uso de
+los índices y contador de cambios.
+"""
+
+import pytest
+
+from src.main import actualizar_incidente, insert_incident
+from src.storage import consultas
+from src.storage.consultas import Filtros
+
+
+@pytest.fixture
+def conn(conn):
+    for i in range(1, 11):
+        insert_incident(conn, {
+            'NUM_INC': f'N{i:02d}', 'OPERADOR': 'YPF S.A.' if i % 2 else 'Pluspetrol S.A.',
+            'FECHA': f'{i:02d}-0{1 + i // 6}-2026', 'MAGNITUD': 'Mayor' if i > 8 else 'Menor',
+            'LAT': -37.0 - i / 10, 'LON': -69.0, 'COORDS_REPORTADAS': '{}'})
+    insert_incident(conn, {'NUM_INC': 'SIN_FECHA', 'OPERADOR': 'YPF S.A.'})
+    conn.commit()
+    return conn
+
+
+def _nums(filas):
+    return [f['NUM_INC'] for f in filas]
+
+
+class TestFiltros:
+    def test_orden_por_fecha_y_sin_fecha_primero(self, conn):
+        filas = consultas.consultar(conn).filas
+        assert _nums(filas)[:3] == ['SIN_FECHA', 'N01', 'N02']
+        assert 'COORDS_REPORTADAS' not in filas[0]
+
+    def test_operador_y_rango_de_fechas(self, conn):
+        f = Filtros(operador='YPF S.A.', desde='2026-01-03', hasta='2026-02-07')
+        assert _nums(consultas.consultar(conn, f).filas) == ['N03', 'N05', 'N07']
+
+    def test_magnitud_y_bbox(self, conn):
+        assert _nums(consultas.consultar(conn, Filtros(magnitud='Mayor')).filas) == ['N09', 'N10']
+        f = Filtros(bbox=(-70.0, -37.35, -68.0, -37.15))
+        assert _nums(consultas.consultar(conn, f).filas) == ['N02', 'N03']
+
+    def test_filtros_desde_query(self):
+        f = consultas.filtros_desde_query({'operador': 'YPF S.A.', 'desde': '2026-01-01',
+                                           'bbox': '-70,-38,-68,-36'})
+        assert f == Filtros('YPF S.A.', '2026-01-01', None, None, (-70.0, -38.0, -68.0, -36.0))
+        with pytest.raises(ValueError):
+            consultas.filtros_desde_query({'desde': '01-01-2026'})
+        with pytest.raises(ValueError):
+            consultas.filtros_desde_query({'bbox': '1,2,3'})
+
+
+class TestPaginacion:
+    def test_paginas_sin_huecos_ni_repetidos(self, conn):
+        todos = _nums(consultas.consultar(conn, limite=100).filas)
+        paginas, despues = [], None
+        while True:
+            pagina = consultas.consultar(conn, limite=3, despues=despues)
+            paginas.append(_nums(pagina.filas))
+            if pagina.siguiente is None:
+                break
+            despues = pagina.siguiente
+        assert [n for p in paginas for n in p] == todos and len(paginas) == 4
+
+    def test_iterar(self, conn):
+        f = Filtros(operador='Pluspetrol S.A.')
+        assert _nums(consultas.iterar(conn, f, limite=2)) == ['N02', 'N04', 'N06', 'N08', 'N10']
+
+    def test_cursor_invalido(self, conn):
+        with pytest.raises(ValueError):
+            consultas.consultar(conn, despues='no-es-un-cursor')
+
+    @pytest.mark.parametrize('filtros', [Filtros(), Filtros(operador='YPF S.A.')])
+    def test_la_pagina_siguiente_usa_el_indice(self, conn, filtros):
+        condiciones, params = consultas._condiciones(filtros)
+        f = consultas.FECHA_ISO
+        condiciones.append(f"{f} >= ? AND ({f} > ? OR NUM_INC > ?)")
+        plan = conn.execute(
+            f"EXPLAIN QUERY PLAN SELECT * FROM incidentes WHERE {' AND '.join(condiciones)} "
+            f"ORDER BY {f}, NUM_INC LIMIT 3", (*params, '2026-01-05', '2026-01-05', 'N05')
+        ).fetchall()
+        assert 'SEARCH incidentes USING INDEX idx_incidentes_' in plan[0][3]
+
+
+def test_version_cambia_con_cada_escritura(conn):
+    version, modificado = consultas.version(conn)
+    pagina = consultas.consultar(conn)
+    assert (pagina.version, pagina.modificado) == (version, modificado)
+    actualizar_incidente(conn, {'NUM_INC': 'N01', 'MAGNITUD': 'Mayor'})
+    conn.execute("DELETE FROM incidentes WHERE NUM_INC = 'N02'")
+    assert consultas.version(conn)[0] == version + 2
@@ -0,0 +1,84 @@
+"""
+Tests para el corpus de referencia: grabar la salida de los extractores
+sobre los textos cacheados y detectar campos cambiados, agregados y perdidos.
+"""
+
+import sqlite3
+
+import pytest
+
+from src.ingestion import corpus
+from src.main import init_database, registrar_documento
+from src.storage import textos
+
+
+def _seg(extractor, **campos):
+    return {'extractor': extractor, 'campos': campos}
+
+
+class TestCompararDocumento:
+    def test_cambiado_agregado_perdido(self):
+        esperado = [_seg('YPFExtractor', AREA='A', VOL=None, PPM=1.0)]
+        obtenido = [_seg('YPFExtractor', AREA='B', VOL=2.0, PPM=None, NUEVO='x')]
+        difs = corpus.comparar_documento('a.pdf', esperado, obtenido)
+        assert [(d.campo, d.tipo, d.antes, d.despues) for d in difs] == [
+            ('AREA', 'cambiado', 'A', 'B'), ('VOL', 'agregado', None, 2.0),
+            ('PPM', 'perdido', 1.0, None), ('NUEVO', 'agregado', None, 'x')]
+
+    def test_identificacion_y_formularios(self):
+        esperado = [_seg('YPFExtractor', A=1), _seg('YPFExtractor', A=2)]
+        obtenido = [_seg('PCRExtractor', A=1)]
+        difs = corpus.comparar_documento('a.pdf', esperado, obtenido)
+        assert [(d.operadora, d.campo, d.tipo) for d in difs] == [
+            ('YPFExtractor', corpus.CAMPO_EXTRACTOR, 'cambiado'),
+            ('YPFExtractor', corpus.CAMPO_SEGMENTO, 'perdido')]
+
+    def test_sin_diferencias(self):
+        seg = [_seg('PCRExtractor', A=[1, 2], B=None)]
+        assert corpus.comparar_documento('a.pdf', seg, seg) == []
+
+
+@pytest.fixture
+def db(tmp_path, ypf_text, pluspetrol_text):
+    db_path = str(tmp_path / 'incidentes.db')
+    init_database(db_path)
+    with sqlite3.connect(db_path) as conn:
+        for sha, nombre, texto in (('a' * 64, 'ypf.pdf', ypf_text),
+                                   ('b' * 64, 'pluspetrol.pdf', pluspetrol_text),
+                                   ('c' * 64, 'otro.pdf', 'Nada que reconocer')):
+            registrar_documento(conn, sha, nombre, nombre)
+            textos.guardar_texto(conn, sha, texto)
+    return db_path
+
+
+def test_grabar_y_comparar(db, tmp_path):
+    path = str(tmp_path / 'corpus.jsonl.gz')
+    with sqlite3.connect(db) as conn:
+        assert corpus.grabar_corpus(conn, path) == 3
+    encabezado, docs = corpus.leer_corpus(path)
+    assert encabezado['documentos'] == 3
+    assert [d['nombre'] for d in docs] == ['otro.pdf', 'pluspetrol.pdf', 'ypf.pdf']
+    assert docs[0]['segmentos'] == [{'extractor': None, 'campos': None}]
+    assert corpus.comparar_corpus(path).total == 0
+
+    # Un corpus grabado con otra versión del extractor
+    ypf = docs[2]['segmentos'][0]['campos']
+    ypf['AREA_CONCE'], ypf['VOL_D_m3'] = 'OTRA', None
+    docs[1]['segmentos'][0]['campos']['PPM_HC'] = 50.0
+    corpus.escribir_corpus(path, docs)
+
+    reporte = corpus.comparar_corpus(path, workers=2)
+    assert (reporte.documentos, reporte.con_cambios) == (3, 2)
+    assert reporte.conteos == {('YPFExtractor', 'AREA_CONCE', 'cambiado'): 1,
+                               ('YPFExtractor', 'VOL_D_m3', 'agregado'): 1,
+                               ('PluspetrolExtractor', 'PPM_HC', 'perdido'): 1}
+    assert reporte.ejemplos[('YPFExtractor', 'AREA_CONCE')][0].antes == 'OTRA'
+
+
+def test_formato_desconocido(tmp_path):
+    import gzip
+    path = tmp_path / 'viejo.jsonl.gz'
+    with gzip.open(path, 'wt') as f:
+        f.write('{"formato": 99}\n')
+    with pytest.raises(ValueError, match='formato'):
+        corpus.leer_corpus(str(path))
@@ -0,0 +1,101 @@
+"""
+Tests para la ingesta de correo (.eml / .mbox).
+Los mensajes se construyen en memoria con adjuntos PDF mínimos; no hace
+falta PyMuPDF para verificar la lectura, la deduplicación ni la procedencia.
+"""
+
+import mailbox
+import sqlite3
+from email.message import EmailMessage
+
+import pytest
+
+from src.ingestion.correo import extraer_adjuntos, iterar_adjuntos, run_correo
+
+PDF_A = b'%PDF-1.4\n% comunicado 06-26\n%%EOF'
+PDF_B = b'%PDF-1.4\n% comunicado 08-26\n%%EOF'
+
+
+def _mensaje(message_id, adjuntos, fecha='Tue, 10 Feb 2026 19:30:00 -0300'):
+    msg = EmailMessage()
+    msg['From'] = 'incidentes@mendoza.gov.ar'
+    msg['To'] = 'ambiente@mendoza.gov.ar'
+    msg['Subject'] = 'Comunicado'
+    msg['Message-ID'] = message_id
+    msg['Date'] = fecha
+    msg.set_content('Se adjunta comunicado.')
+    for nombre, datos in adjuntos:
+        msg.add_attachment(datos, maintype='application', subtype='pdf',
+                           filename=nombre)
+    return msg
+
+
+@pytest.fixture
+def eml(tmp_path):
+    path = tmp_path / 'comunicado.eml'
+    path.write_bytes(bytes(_mensaje('<a@mendoza>', [('06-26.pdf', PDF_A)])))
+    return str(path)
+
+
+@pytest.fixture
+def mbox(tmp_path):
+    path = tmp_path / 'export.mbox'
+    caja = mailbox.mbox(str(path))
+    caja.add(_mensaje('<a@mendoza>', [('06-26.pdf', PDF_A)]))
+    # Reenvío del mismo comunicado + uno nuevo
+    caja.add(_mensaje('<b@mendoza>', [('06-26 (1).pdf', PDF_A), ('08-26.pdf', PDF_B)]))
+    caja.flush()
+    caja.close()
+    return str(path)
+
+
+class TestExtraerAdjuntos:
+    def test_extrae_pdf_con_procedencia(self):
+        msg = _mensaje('<a@mendoza>', [('06-26.pdf', PDF_A)])
+        [adj] = list(extraer_adjuntos(msg, 'x.eml'))
+        assert adj.nombre == '06-26.pdf'
+        assert adj.datos == PDF_A
+        assert adj.message_id == '<a@mendoza>'
+        assert adj.fecha.startswith('2026-02-10T19:30:00')
+
+    def test_ignora_adjuntos_que_no_son_pdf(self):
+        msg = _mensaje('<a@mendoza>', [])
+        msg.add_attachment(b'foto', maintype='image', subtype='jpeg',
+                           filename='foto.jpg')
+        assert list(extraer_adjuntos(msg, 'x.eml')) == []
+
+    def test_fecha_invalida_no_lanza(self):
+        msg = _mensaje('<a@mendoza>', [('a.pdf', PDF_A)], fecha='no es fecha')
+        [adj] = list(extraer_adjuntos(msg, 'x.eml'))
+        assert adj.fecha is None
+
+
+class TestIterarAdjuntos:
+    def test_lee_eml(self, eml):
+        adjuntos = list(iterar_adjuntos([eml]))
+        assert [a.nombre for a in adjuntos] == ['06-26.pdf']
+
+    def test_mbox_deduplica_por_hash(self, mbox):
+        adjuntos = list(iterar_adjuntos([mbox]))
+        assert [a.datos for a in adjuntos] == [PDF_A, PDF_B]
+        assert adjuntos[1].message_id == '<b@mendoza>'
+
+    def test_directorio_recorre_eml_y_mbox(self, tmp_path, eml, mbox):
+        adjuntos = list(iterar_adjuntos([str(tmp_path)]))
+        # PDF_A aparece en ambos archivos pero se entrega una vez
+        assert sorted(a.datos for a in adjuntos) == sorted([PDF_A, PDF_B])
+
+
+class TestRunCorreo:
+    def test_adjunto_en_cuarentena_se_reintenta_con_version_nueva(self, eml, db_path):
+        pytest.importorskip('fitz')
+        # PDF_A no es un PDF válido: queda registrado y en cuarentena
+        assert run_correo([eml], db_path, max_mem_mb=0)['omitidos'] == 1
+
+        stats = run_correo([eml], db_path, max_mem_mb=0)
+        assert stats['cuarentena'] == 1 and stats['ya_procesados'] == 0
+
+        with sqlite3.connect(db_path) as conn:
+            conn.execute("UPDATE cuarentena SET VERSION = 'vieja'")
+        stats = run_correo([eml], db_path, max_mem_mb=0)
+        assert stats['omitidos'] == 1 and stats['cuarentena'] == 0
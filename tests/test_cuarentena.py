@@ -0,0 +1,58 @@
+"""
+Tests para la cuarentena de documentos fallidos.
+Usa una base SQLite temporal; el cambio de código se simula alterando la
+versión guardada de la entrada.
+"""
+
+from src.main import cargar_resultado, nuevas_stats
+from src.ingestion.workers import ResultadoDocumento
+from src.storage import cuarentena
+
+SHA = 'ab' * 32
+
+
+class TestCuarentena:
+    def test_fallo_queda_en_cuarentena_con_version_vigente(self, conn):
+        cuarentena.poner_en_cuarentena(conn, SHA, 'x.pdf', 'data/raw/x.pdf',
+                                       'identificacion', 'Formato no reconocido')
+        assert cuarentena.en_cuarentena(conn, SHA)
+        [entrada] = cuarentena.listar(conn)
+        assert entrada['ETAPA'] == 'identificacion'
+        assert entrada['vigente']
+
+    def test_cambio_de_codigo_invalida_la_entrada(self, conn):
+        cuarentena.poner_en_cuarentena(conn, SHA, 'x.pdf', 'x.pdf', 'identificacion')
+        conn.execute("UPDATE cuarentena SET VERSION = 'vieja'")
+        assert not cuarentena.en_cuarentena(conn, SHA)
+        assert not cuarentena.listar(conn)[0]['vigente']
+
+    def test_reintentos_incrementan_contador(self, conn):
+        for _ in range(3):
+            cuarentena.poner_en_cuarentena(conn, SHA, 'x.pdf', 'x.pdf', 'timeout')
+        assert cuarentena.listar(conn)[0]['INTENTOS'] == 3
+
+    def test_version_de_extraccion_es_la_del_extractor(self):
+        from src.extractors.ypf import YPFExtractor
+        assert cuarentena.version_vigente('extraccion', 'YPFExtractor') == YPFExtractor.version()
+
+    def test_buscar_por_prefijo(self, conn):
+        cuarentena.poner_en_cuarentena(conn, SHA, 'x.pdf', 'x.pdf', 'error')
+        cuarentena.poner_en_cuarentena(conn, 'cd' * 32, 'y.pdf', 'y.pdf', 'error')
+        assert [e['NOMBRE'] for e in cuarentena.buscar(conn, ['ABAB'])] == ['x.pdf']
+
+
+class TestCargarResultado:
+    def test_timeout_usa_hash_del_padre(self, conn):
+        stats = nuevas_stats()
+        resultado = ResultadoDocumento('timeout', detalle='superó 60 s')
+        assert cargar_resultado(conn, resultado, 'x.pdf', 'x.pdf', stats,
+                                sha256=SHA) == 'timeout'
+        assert cuarentena.listar(conn)[0]['ETAPA'] == 'timeout'
+
+    def test_omitido_guarda_etapa_y_extractor(self, conn):
+        resultado = ResultadoDocumento('omitido', SHA, None, 'sin NUM_INC',
+                                       etapa='extraccion', extractor='YPFExtractor')
+        cargar_resultado(conn, resultado, 'x.pdf', 'x.pdf', nuevas_stats())
+        [entrada] = cuarentena.listar(conn)
+        assert (entrada['ETAPA'], entrada['EXTRACTOR']) == ('extraccion', 'YPFExtractor')
+        assert entrada['vigente']
@@ -0,0 +1,88 @@
+"""
+Tests para los extractores declarativos: las cinco operadoras del repo
+escritas como definiciones (tests/fixtures/operadoras/, fuera del
+descubrimiento) producen exactamente el mismo dict (valores y orden de
+claves) que su clase Python, y la definición de ejemplo
+(src/extractors/operadora_ejemplo.json) extrae la operadora ficticia del
+fixture `ejemplo_text`.
+"""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from src.extractors import declarativo
+from src.extractors.aconcagua import AconcaguaExtractor
+from src.extractors.declarativo import DIRS_OPERADORAS, cargar
+from src.extractors.pcr import PCRExtractor
+from src.extractors.petsud import PetSudExtractor
+from src.extractors.pluspetrol import PluspetrolExtractor
+from src.extractors.ypf import YPFExtractor
+
+EJEMPLO = Path(declarativo.__file__).parent / 'operadora_ejemplo.json'
+OPERADORAS = Path(__file__).parent / 'fixtures' / 'operadoras'
+
+
+@pytest.mark.parametrize('archivo, clase, fixture', [
+    ('ypf.json', YPFExtractor, 'ypf_text'),
+    ('pluspetrol.json', PluspetrolExtractor, 'pluspetrol_text'),
+    ('petsud.json', PetSudExtractor, 'petsud_text'),
+    ('aconcagua.json', AconcaguaExtractor, 'aconcagua_text'),
+    ('pcr.json', PCRExtractor, 'pcr_text'),
+])
+def test_igual_que_la_clase_python(archivo, clase, fixture, request):
+    texto = request.getfixturevalue(fixture)
+    cls = cargar(OPERADORAS / archivo)
+    assert cls.__name__ == clase.__name__
+    assert list(cls().extract(texto).items()) == list(clase().extract(texto).items())
+
+
+def test_ejemplo(ejemplo_text):
+    cls = cargar(EJEMPLO)
+    assert cls.__name__ == 'OperadoraEjemploExtractor'
+    assert list(cls().extract(ejemplo_text).items()) == [
+        ('OPERADOR', 'Operadora Ejemplo S.A.'),
+        ('NUM_INC', 'EJ-0042'),
+        ('AREA_CONCE', 'Cerro Ejemplo'),
+        ('YACIMIENTO', 'L-7'),                          # si_no
+        ('CUENCA', 'Cuyana'),                           # defecto
+        ('TIPO_INST', 'Pozo'),                          # marcas
+        ('FECHA_INC', '05-03-2026'),
+        ('HORA_INC', '14:30'),
+        ('Y_COORD', -33.516006),
+        ('X_COORD', -68.886806),
+        ('SRID_ORIGEN', 'WGS84-DMS→DD'),
+        ('COORDS_REPORTADAS', {'GMS': ['33°30\'57,62"', '68°53\'12,5"']}),
+        ('VOL_D_m3', 2.5),
+        ('PPM_HC', 1200.0),
+        ('RECURSOS', 'Suelo, Agua superficial'),       # lista
+        ('MAGNITUD', 'Menor'),                          # inferida
+    ]
+
+
+def test_ejemplo_con_los_campos_opcionales(ejemplo_text):
+    texto = ejemplo_text.replace('Lote: L-7', 'Yacimiento: Cerro Alto\nCuenca: Neuquina') \
+        + 'Magnitud: Mayor\n'
+    data = cargar(EJEMPLO)().extract(texto)
+    assert (data['YACIMIENTO'], data['CUENCA'], data['MAGNITUD']) == \
+        ('Cerro Alto', 'Neuquina', 'Mayor')
+
+
+def test_ni_el_ejemplo_ni_las_equivalencias_se_registran():
+    assert EJEMPLO.parent not in DIRS_OPERADORAS
+    assert OPERADORAS not in DIRS_OPERADORAS
+
+
+def test_cache_por_contenido(tmp_path):
+    copia = tmp_path / 'copia.json'
+    copia.write_bytes(EJEMPLO.read_bytes())
+    assert cargar(copia) is cargar(EJEMPLO)
+
+
+def test_definicion_invalida(tmp_path):
+    path = tmp_path / 'mala.json'
+    path.write_text(json.dumps({'nombre': 'X', 'etiqueta': 'X', 'palabras_clave': ['X'],
+                                'campos': {'NUM_INC': {'patron': '(sin cerrar'}}}))
+    with pytest.raises(ValueError, match='NUM_INC'):
+        cargar(path)
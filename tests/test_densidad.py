@@ -0,0 +1,67 @@
+"""
+Tests para la superficie de densidad.
+Las grillas chicas usan una extensión explícita en UTM para poder ubicar los
+puntos en celdas conocidas.
+"""
+
+import sqlite3
+
+import numpy as np
+import pytest
+
+from src.analysis import densidad
+from src.main import init_database
+
+EXT = (400_000.0, 6_000_000.0, 410_000.0, 6_005_000.0)   # 10 × 5 celdas de 1 km
+
+
+class TestDensidad:
+    def test_sin_suavizar_cuenta_por_celda(self):
+        g = densidad.densidad([400_500, 400_600, 409_500], [6_000_500, 6_000_100, 6_004_500],
+                              [2.0, 3.0, 1.0], ancho_banda_m=0, extension=EXT)
+        assert g.valores.shape == (5, 10)
+        # La primera fila del .asc es la del norte
+        assert g.valores[-1, 0] == 5.0 and g.valores[0, -1] == 1.0
+        assert g.valores.sum() == 6.0
+
+    def test_suavizado_conserva_la_masa(self):
+        ext = (400_000.0, 6_000_000.0, 420_000.0, 6_020_000.0)
+        g = densidad.densidad([410_500], [6_010_500], [10.0], ancho_banda_m=1000, extension=ext)
+        assert g.valores.sum() == pytest.approx(10.0, rel=1e-6)
+        fila, col = np.unravel_index(g.valores.argmax(), g.valores.shape)
+        assert (fila, col) == (9, 10)
+        assert g.valores[9, 9] == pytest.approx(g.valores[9, 11])
+        assert g.valores[8, 10] == pytest.approx(g.valores[10, 10])
+
+    def test_unidades_por_km2(self):
+        g = densidad.densidad([400_250], [6_000_250], ancho_banda_m=0, celda_m=500,
+                              extension=EXT)
+        assert g.valores.max() == 4.0   # 1 incidente en 0,25 km²
+
+    def test_extension_mendoza_cubre_el_bbox(self):
+        x_min, y_min, x_max, y_max = densidad.extension_mendoza()
+        assert x_min % 1000 == 0 and y_max % 1000 == 0
+        assert 250_000 < x_max - x_min < 320_000
+        assert 760_000 < y_max - y_min < 800_000
+
+
+def test_escribir_asc(tmp_path):
+    g = densidad.densidad([400_500], [6_000_500], [1.0], ancho_banda_m=0, extension=EXT)
+    densidad.escribir_asc(tmp_path / 'd.asc', g)
+    lineas = (tmp_path / 'd.asc').read_text().splitlines()
+    assert lineas[:6] == ['ncols 10', 'nrows 5', 'xllcorner 400000.0', 'yllcorner 6000000.0',
+                          'cellsize 1000', 'NODATA_value -9999']
+    assert lineas[-1].split()[0] == '1'
+    assert 'UTM_Zone_19S' in (tmp_path / 'd.prj').read_text()
+
+
+def test_cargar_puntos_por_volumen_o_cantidad(tmp_path):
+    db_path = str(tmp_path / 'incidentes.db')
+    init_database(db_path)
+    with sqlite3.connect(db_path) as conn:
+        conn.executemany("INSERT INTO incidentes (NUM_INC, LAT, LON, VOL_M3) VALUES (?, ?, ?, ?)",
+                         [('A', -33.5, -68.6, 2.5), ('B', -33.6, -68.7, None), ('C', None, None, 1)])
+        _, _, pesos = densidad.cargar_puntos(conn, 'volumen')
+        assert pesos.tolist() == [2.5]
+        este, _, pesos = densidad.cargar_puntos(conn, 'cantidad')
+        assert pesos.tolist() == [1.0, 1.0] and len(este) == 2
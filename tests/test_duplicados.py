@@ -0,0 +1,57 @@
+"""
+Tests para la detección de casi duplicados (MinHash + LSH).
+Los "documentos" son textos de conftest.py: la impresión de Webmail se
+simula agregando encabezado y pie al texto original.
+"""
+
+from src.analysis import minhash
+from src.main import registrar_documento
+from src.storage import duplicados
+
+WEBMAIL = "Webmail Gobierno de Mendoza :: {}\n{}\nhttps://webmail.mendoza.gov.ar/ 1/2"
+
+
+class TestMinHash:
+    def test_texto_identico_similitud_uno(self, ypf_text):
+        assert minhash.similitud(minhash.firma(ypf_text), minhash.firma(ypf_text)) == 1.0
+
+    def test_impresion_webmail_es_casi_igual(self, pcr_text):
+        impresion = WEBMAIL.format("Rep Preliminar", pcr_text)
+        sim = minhash.similitud(minhash.firma(pcr_text), minhash.firma(impresion))
+        assert sim >= duplicados.UMBRAL_SIMILITUD
+
+    def test_operadoras_distintas_no_se_parecen(self, ypf_text, petsud_text):
+        sim = minhash.similitud(minhash.firma(ypf_text), minhash.firma(petsud_text))
+        assert sim < 0.3
+
+    def test_normaliza_acentos_y_mayusculas(self):
+        assert minhash.firma("Pérdida en AÑELO hoy").tolist() == \
+            minhash.firma("perdida en anelo hoy").tolist()
+
+    def test_texto_vacio(self):
+        assert minhash.firma("  \n ") is None
+
+    def test_firma_ida_y_vuelta_en_bytes(self, ypf_text):
+        sig = minhash.firma(ypf_text)
+        assert (minhash.desde_bytes(minhash.a_bytes(sig)) == sig).all()
+
+
+class TestIndice:
+    def test_detecta_par_y_no_lo_repite(self, conn, pcr_text, ypf_text):
+        assert duplicados.indexar(conn, 'a' * 64, pcr_text) == []
+        assert duplicados.indexar(conn, 'y' * 64, ypf_text) == []
+        [(otro, sim)] = duplicados.indexar(conn, 'b' * 64, WEBMAIL.format("PCR", pcr_text))
+        assert otro == 'a' * 64 and sim >= duplicados.UMBRAL_SIMILITUD
+        # Reindexar el mismo documento no genera un par nuevo ni duplica bandas
+        assert duplicados.indexar(conn, 'b' * 64, WEBMAIL.format("PCR", pcr_text)) == []
+        assert conn.execute("SELECT COUNT(*) FROM lsh_bandas WHERE SHA256 = ?",
+                            ('b' * 64,)).fetchone() == (minhash.BANDAS,)
+
+    def test_listar_con_num_inc(self, conn, pcr_text):
+        registrar_documento(conn, 'a' * 64, 'original.pdf', 'original.pdf', 'PCR-MDZ-21-2026')
+        registrar_documento(conn, 'b' * 64, 'webmail.pdf', 'webmail.pdf', 'PCR-MDZ-21-2025-')
+        duplicados.indexar(conn, 'a' * 64, pcr_text)
+        duplicados.indexar(conn, 'b' * 64, WEBMAIL.format("PCR", pcr_text))
+        [par] = duplicados.listar(conn)
+        assert {par['NUM_INC_A'], par['NUM_INC_B']} == {'PCR-MDZ-21-2026', 'PCR-MDZ-21-2025-'}
+        assert duplicados.listar(conn, umbral=1.01) == []
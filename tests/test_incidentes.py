@@ -0,0 +1,62 @@
+"""
+Tests para IncidentRecord: normalización desde el dict del extractor,
+compatibilidad con dict, pickle e inserción (uno y por lote).
+"""
+
+import pickle
+
+import pytest
+
+from src.extractors.ypf import YPFExtractor
+from src.main import insert_incident, insert_incidents, normalizar
+from src.storage.incidentes import CAMPOS, IncidentRecord, insertar_lote
+
+
+class TestIncidentRecord:
+    def test_desde_extraccion(self, ypf_text):
+        raw = YPFExtractor().extract(ypf_text)
+        r = normalizar(raw)
+        assert r['NUM_INC'] == raw['NUM_INC'] and r.AREA_CONCESION == raw['AREA_CONCE']
+        assert (r.LAT, r.LON) == (raw['Y_COORD'], raw['X_COORD'])
+        assert r.get('NO_EXISTE', 'x') == 'x' and 'LAT' in r
+        assert list(r.keys()) == list(CAMPOS)
+
+    def test_descripcion_larga_se_abrevia(self):
+        r = IncidentRecord.desde_extraccion({'NUM_INC': 'A', 'DESCRIPCION': 'x' * 200})
+        assert r.DESC_ABREV == 'x' * 120 + '...'
+
+    def test_campos_numericos(self):
+        r = IncidentRecord(NUM_INC='A', VOL_M3='1,5', AGUA_PCT=20, LAT='no')
+        assert (r.VOL_M3, r.AGUA_PCT, r.LAT) == (1.5, 20.0, None)
+
+    def test_campo_desconocido(self):
+        with pytest.raises(TypeError):
+            IncidentRecord(NUM_INC='A', COLOR='rojo')
+
+    def test_sin_dict_y_pickle_compacto(self):
+        r = IncidentRecord(NUM_INC='A', OPERADOR='YPF', LAT=-33.1)
+        assert not hasattr(r, '__dict__')
+        copia = pickle.loads(pickle.dumps(r))
+        assert copia == r and copia.como_tupla() == r.como_tupla()
+
+
+class TestInsercion:
+    def test_insert_incident_acepta_registro_y_dict(self, conn):
+        assert insert_incident(conn, IncidentRecord(NUM_INC='A', VOL_M3=2.0))
+        assert insert_incident(conn, {'NUM_INC': 'B', 'LAT': -33.5})
+        assert not insert_incident(conn, IncidentRecord(NUM_INC='A'))
+        assert not insert_incident(conn, {'NUM_INC': 'C', 'COLOR': 'rojo'})
+        assert conn.execute("SELECT NUM_INC, VOL_M3, LAT FROM incidentes ORDER BY 1").fetchall() \
+            == [('A', 2.0, None), ('B', None, -33.5)]
+
+    def test_insertar_lote(self, conn):
+        registros = [IncidentRecord(NUM_INC=f"X-{i}", VOL_M3=float(i)) for i in range(600)]
+        assert insertar_lote(conn, registros) == [True] * 600
+        assert insertar_lote(conn, registros[:2] + [IncidentRecord(NUM_INC='Y')] * 2) == \
+            [False, False, True, False]
+        assert conn.execute("SELECT SUM(VOL_M3) FROM incidentes").fetchone() == (179700.0,)
+
+    def test_insert_incidents_fila_invalida_no_pierde_el_resto(self, conn):
+        assert insert_incidents(conn, [{'NUM_INC': 'A'}, {'NUM_INC': 'B', 'COLOR': 'rojo'},
+                                       IncidentRecord(NUM_INC='A')]) == [True, False, False]
+        assert conn.execute("SELECT NUM_INC FROM incidentes").fetchall() == [('A',)]
@@ -0,0 +1,85 @@
+"""
+Tests para la configuración de logging no bloqueante.
+Verifica que los mensajes lleguen a archivo a través de la cola y que
+el flujo estructurado eventos.jsonl sea JSON válido, una línea por evento.
+"""
+
+import json
+import logging
+import os
+
+import pytest
+
+from src.logging_setup import (
+    JsonlFormatter,
+    configurar_logging,
+    detener_logging,
+    registrar_evento,
+)
+
+
+@pytest.fixture
+def log_dir(tmp_path):
+    yield str(tmp_path)
+    detener_logging()
+    logging.getLogger().handlers.clear()
+
+
+def _leer(log_dir, nombre):
+    with open(os.path.join(log_dir, nombre), encoding='utf-8') as f:
+        return f.read()
+
+
+class TestConfigurarLogging:
+    def test_mensaje_llega_al_archivo(self, log_dir):
+        configurar_logging(log_dir)
+        logging.getLogger('src.test').info("Procesando: %s", 'x.pdf')
+        detener_logging()
+        assert 'Procesando: x.pdf' in _leer(log_dir, 'processor.log')
+
+    def test_nivel_deshabilitado_no_se_escribe(self, log_dir):
+        configurar_logging(log_dir, nivel=logging.WARNING)
+        logging.getLogger('src.test').info("no debe aparecer")
+        logging.getLogger('src.test').warning("sí debe aparecer")
+        detener_logging()
+        contenido = _leer(log_dir, 'processor.log')
+        assert 'no debe aparecer' not in contenido
+        assert 'sí debe aparecer' in contenido
+
+    def test_raiz_usa_un_solo_queue_handler(self, log_dir):
+        configurar_logging(log_dir)
+        handlers = logging.getLogger().handlers
+        assert len(handlers) == 1
+        assert isinstance(handlers[0], logging.handlers.QueueHandler)
+
+
+class TestEventosJsonl:
+    def test_evento_es_una_linea_json(self, log_dir):
+        configurar_logging(log_dir, eventos_jsonl=True)
+        registrar_evento('insertado', num_inc='YPF-0000246524', ms=12.5)
+        detener_logging()
+        lineas = _leer(log_dir, 'eventos.jsonl').splitlines()
+        assert len(lineas) == 1
+        evento = json.loads(lineas[0])
+        assert evento['tipo'] == 'insertado'
+        assert evento['num_inc'] == 'YPF-0000246524'
+
+    def test_eventos_no_ensucian_processor_log(self, log_dir):
+        configurar_logging(log_dir, eventos_jsonl=True)
+        registrar_evento('omitido', archivo='x.pdf')
+        detener_logging()
+        path = os.path.join(log_dir, 'processor.log')
+        assert not os.path.exists(path) or 'omitido' not in _leer(log_dir, 'processor.log')
+
+    def test_sin_flujo_activo_no_crea_archivo(self, log_dir):
+        configurar_logging(log_dir)
+        registrar_evento('omitido', archivo='x.pdf')
+        detener_logging()
+        assert not os.path.exists(os.path.join(log_dir, 'eventos.jsonl'))
+
+    def test_formatter_preserva_acentos(self):
+        record = logging.LogRecord('x', logging.INFO, __file__, 1, 'e', None, None)
+        record.evento = {'tipo': 'insertado', 'operador': 'Petróleos Sudamericanos'}
+        linea = JsonlFormatter().format(record)
+        assert 'Petróleos' in linea
+        assert '\n' not in linea
@@ -0,0 +1,61 @@
+"""
+Tests para el parseo de DMS y fechas: los casos borde de strptime y de las
+tres variantes DMS, la memoización y las funciones por lote.
+"""
+
+from datetime import datetime
+
+import pytest
+
+from src.extractors import parseo
+
+FORMATOS = ["%d/%m/%Y", "%d/%m/%y", "%d-%m-%Y", "%d-%m-%y", "%Y-%m-%d"]
+
+
+def _strptime(raw):
+    """Referencia: el criterio anterior, formato por formato."""
+    for fmt in FORMATOS:
+        try:
+            return datetime.strptime(raw.strip(), fmt).strftime("%d-%m-%Y")
+        except ValueError:
+            continue
+    return None
+
+
+class TestFechas:
+    @pytest.mark.parametrize('raw', [
+        '10/10/2025', '1/2/2025', '01/02/25', '31/12/68', '1/1/69', '29/02/2024',
+        '29/02/2023', '31/04/2025', '2025-10-10', '2025-1-9', ' 18-02-2026 ',
+        '10/10-2025', '10/10/202', '10/10/20255', '0/1/2025', '13/13/2025', '',
+    ])
+    def test_igual_que_strptime(self, raw):
+        assert parseo.normalizar_fecha(raw) == _strptime(raw)
+
+    def test_lote(self):
+        assert parseo.normalizar_fecha_lote(['10/10/25', None, 'x']) == ['10-10-2025', None, None]
+
+
+class TestDMS:
+    @pytest.mark.parametrize('raw, esperado', [
+        ("33°30'57,62\"", -(33 + 30 / 60 + 57.62 / 3600)),
+        ("33° 35´15,04''", -(33 + 35 / 60 + 15.04 / 3600)),
+        ("33°\n34'\n39,63\"", -(33 + 34 / 60 + 39.63 / 3600)),
+        ("37°20.936'", -(37 + 20.936 / 60)),
+        ("37 ° / 20 ' / 56.2 ''", -(37 + 20 / 60 + 56.2 / 3600)),
+    ])
+    def test_variantes(self, raw, esperado):
+        assert parseo.parsear_dms(raw) == round(esperado, 6)
+
+    def test_no_reconocidas(self):
+        assert parseo.parsear_dms_lote([None, 'no_es_coordenada']) == [None, None]
+
+    def test_normalizacion(self):
+        assert parseo.normalizar_dms("33°  35´15,04′′") == '33° 35\'15.04"'
+        assert parseo.dms_completo("33°\n34'39,63")
+        assert not parseo.dms_completo("33°")
+
+    def test_memo(self):
+        parseo._parsear_dms.cache_clear()
+        parseo.parsear_dms_lote(["34°57'51.5\""] * 3)
+        info = parseo._parsear_dms.cache_info()
+        assert (info.misses, info.hits) == (1, 2)
@@ -0,0 +1,108 @@
+"""
+Tests para el registro de plugins: la metadata coincide con las clases, la
+identificación no importa extractores hasta que un documento coincide, y las
+operadoras externas (directorio o entry point) se registran sin tocar código.
+"""
+
+import json
+import logging
+import subprocess
+import sys
+
+import pytest
+
+from src.extractors import plugins
+from src.extractors.plugins import Plugin
+from src.extractors.registry import PLUGINS_INTERNOS
+
+
+@pytest.mark.parametrize('plugin', PLUGINS_INTERNOS, ids=lambda p: p.nombre)
+def test_metadata_igual_que_la_clase(plugin):
+    cls = plugins.cargar(plugin)
+    assert cls.__name__ == plugin.nombre
+    assert cls.ANCLA == plugin.ancla
+
+
+def test_identificacion_perezosa():
+    # En un proceso limpio: arrancar y segmentar no importa ningún extractor;
+    # identificar un PDF de YPF importa sólo el de YPF
+    codigo = (
+        "import sys\n"
+        "from src.extractors.registry import identify_extractor, version_registro\n"
+        "from src.extractors.segmentacion import dividir_en_segmentos\n"
+        "mods = lambda: sorted(m for m in sys.modules if m.split('.')[-1] in "
+        "('ypf', 'pluspetrol', 'petsud', 'aconcagua', 'pcr'))\n"
+        "version_registro(); dividir_en_segmentos('sin formularios')\n"
+        "print(mods())\n"
+        "print(type(identify_extractor('YPF S.A. Comunicado')).__name__, mods())\n"
+    )
+    salida = subprocess.run([sys.executable, '-c', codigo], capture_output=True, text=True,
+                            check=True).stdout.splitlines()
+    assert salida == ["[]", "YPFExtractor ['src.extractors.ypf']"]
+
+
+def _escribir(path, datos):
+    path.write_text(json.dumps(datos), encoding='utf-8')
+
+
+def test_directorio(tmp_path, caplog):
+    _escribir(tmp_path / 'nueva.json', {
+        'nombre': 'NuevaExtractor', 'etiqueta': 'Nueva',
+        'palabras_clave': ['NUEVA ENERGIA'],
+        'ancla': r'Parte\s+N[°º]\s*(\d+)',
+        'campos': {
+            'OPERADOR': {'valor': 'Nueva Energía S.A.'},
+            'NUM_INC': {'desde_ancla': True, 'formato': 'NUE-{}'},
+            'FECHA_INC': {'patron': r'Fecha:\s*(\S+)', 'tipo': 'fecha'},
+            'VOL_D_m3': {'patron': r'Volumen:\s*([\d.,]+)', 'tipo': 'numero'},
+            'PPM_HC': {'valor': None},
+            'MAGNITUD': {'valor': None, 'inferir': True},
+        },
+    })
+    _escribir(tmp_path / 'manifiesto.json', {
+        'nombre': 'OtraExtractor', 'clase': 'otra_operadora:OtraExtractor',
+        'palabras_clave': ['OTRA S.A.'],
+    })
+    (tmp_path / 'otra_operadora.py').write_text(
+        "from src.extractors.base_extractor import BaseExtractor\n"
+        "class OtraExtractor(BaseExtractor):\n"
+        "    def extract(self, text):\n"
+        "        return {'OPERADOR': 'Otra S.A.'}\n", encoding='utf-8')
+    (tmp_path / 'rota.json').write_text('{', encoding='utf-8')
+    _escribir(tmp_path / 'pcr.json', {
+        'nombre': 'PCRExtractor', 'palabras_clave': ['PCR'],
+        'campos': {'OPERADOR': {'valor': 'PCR'}},
+    })
+
+    with caplog.at_level(logging.ERROR):
+        encontrados = plugins.descubrir(PLUGINS_INTERNOS, directorios=[tmp_path])
+    assert 'rota.json' in caplog.text
+    # pcr.json repite el nombre de una clase interna: manda la clase
+    assert [p.nombre for p in encontrados[len(PLUGINS_INTERNOS):]] == \
+        ['OtraExtractor', 'NuevaExtractor']
+
+    otra, nueva = encontrados[len(PLUGINS_INTERNOS):]
+    assert plugins.cargar(otra)().extract('') == {'OPERADOR': 'Otra S.A.'}
+    data = plugins.cargar(nueva)().extract("NUEVA ENERGIA\nParte N° 12\nFecha: 3/2/26\nVolumen: 0,5\n")
+    assert data == {'OPERADOR': 'Nueva Energía S.A.', 'NUM_INC': 'NUE-12', 'FECHA_INC': '03-02-2026',
+                    'VOL_D_m3': 0.5, 'PPM_HC': None, 'MAGNITUD': 'Menor'}
+
+
+def test_entry_point(monkeypatch):
+    class EntryPoint:
+        name, value = 'nueva', 'paquete.plugin:PLUGIN'
+
+        def load(self):
+            return {'nombre': 'EPExtractor', 'clase': 'src.extractors.pcr:PCRExtractor',
+                    'palabras_clave': ['EP S.A.']}
+
+    monkeypatch.setattr(plugins, 'entry_points', lambda group: [EntryPoint()])
+    encontrados = plugins.descubrir(directorios=[])
+    assert encontrados == [Plugin('EPExtractor', 'src.extractors.pcr:PCRExtractor', ('EP S.A.',))]
+
+
+def test_plugin_que_no_carga(caplog):
+    with caplog.at_level(logging.ERROR):
+        assert plugins.cargar(Plugin('X', 'no_existe.modulo:X', ('X',))) is None
+    assert 'no_existe' in caplog.text
+    assert plugins.firma(Plugin('X', 'no_existe.modulo:X', ('X',))) == 'sin-fuente'
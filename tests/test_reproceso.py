@@ -0,0 +1,94 @@
+"""
+Tests para la reextracción selectiva por versión de extractor.
+Base SQLite temporal; los resultados de worker se construyen a mano.
+"""
+
+from src.extractors.petsud import PetSudExtractor
+from src.extractors.ypf import YPFExtractor
+from src.ingestion.reproceso import (_cargar_reextraccion, documentos_vencidos,
+                                     nuevas_stats_reproceso)
+from src.ingestion.workers import ResultadoDocumento
+from src.main import (DocumentoEntrada, actualizar_incidente, insert_incident,
+                      registrar_documento)
+from src.storage import textos
+
+
+def _incidente(**campos):
+    return {'NUM_INC': 'PETSUD-1', 'OPERADOR': 'PETSUD', 'YACIMIENTO': 'Malargüe',
+            'VOL_M3': 1.5, **campos}
+
+
+class TestVersionExtractor:
+    def test_version_es_estable_y_distinta_por_extractor(self):
+        assert PetSudExtractor.version() == PetSudExtractor.version()
+        assert PetSudExtractor.version() != YPFExtractor.version()
+
+    def test_version_explicita(self):
+        class Fijo(PetSudExtractor):
+            VERSION = '3'
+        assert Fijo.version() == 'v3'
+
+
+class TestDocumentosVencidos:
+    def test_solo_los_de_version_vieja(self, conn):
+        registrar_documento(conn, 'a' * 64, 'a.pdf', 'a.pdf', 'PETSUD-1',
+                            extractor='PetSudExtractor')
+        registrar_documento(conn, 'b' * 64, 'b.pdf', 'b.pdf', 'YPF-1',
+                            extractor='YPFExtractor')
+        conn.execute("UPDATE documentos SET VERSION = 'vieja' WHERE SHA256 = ?",
+                     ('a' * 64,))
+        assert [d['NOMBRE'] for d in documentos_vencidos(conn)] == ['a.pdf']
+        assert len(documentos_vencidos(conn, todos=True)) == 2
+
+    def test_documento_sin_version_con_incidente_esta_vencido(self, conn):
+        registrar_documento(conn, 'c' * 64, 'c.pdf', 'c.pdf', 'PCR-1')
+        assert [d['NOMBRE'] for d in documentos_vencidos(conn)] == ['c.pdf']
+
+    def test_documento_sin_incidente_no_se_reextrae(self, conn):
+        registrar_documento(conn, 'd' * 64, 'd.pdf', 'd.pdf')
+        assert documentos_vencidos(conn) == []
+
+
+class TestActualizarIncidente:
+    def test_solo_columnas_que_cambian(self, conn):
+        insert_incident(conn, _incidente())
+        assert actualizar_incidente(conn, _incidente(YACIMIENTO='Llancanelo')) == ['YACIMIENTO']
+        assert actualizar_incidente(conn, _incidente(YACIMIENTO='Llancanelo')) == []
+
+    def test_corrige_num_inc_y_procedencia(self, conn):
+        insert_incident(conn, _incidente(NUM_INC='PETSUD-l'))
+        registrar_documento(conn, 'a' * 64, 'a.pdf', 'a.pdf', 'PETSUD-l')
+        assert actualizar_incidente(conn, _incidente(), 'PETSUD-l') == ['NUM_INC']
+        assert conn.execute("SELECT NUM_INC FROM procedencia").fetchone() == ('PETSUD-1',)
+
+    def test_fila_inexistente(self, conn):
+        assert actualizar_incidente(conn, _incidente()) is None
+
+
+class TestCargarReextraccion:
+    def test_actualiza_fila_y_version(self, conn):
+        insert_incident(conn, _incidente())
+        registrar_documento(conn, 'a' * 64, 'a.pdf', 'a.pdf', 'PETSUD-1')
+        doc = DocumentoEntrada('a.pdf', 'a.pdf', 'a' * 64, 'texto')
+        stats = nuevas_stats_reproceso()
+        resultado = ResultadoDocumento('ok', None, _incidente(VOL_M3=2.0),
+                                       extractor='PetSudExtractor')
+        _cargar_reextraccion(conn, doc, resultado, stats, 1.0)
+        assert stats['actualizados'] == 1
+        assert conn.execute("SELECT VOL_M3 FROM incidentes").fetchone() == (2.0,)
+        assert documentos_vencidos(conn) == []
+
+    def test_fallo_conserva_fila(self, conn):
+        insert_incident(conn, _incidente())
+        doc = DocumentoEntrada('a.pdf', 'a.pdf', 'a' * 64, 'texto')
+        stats = nuevas_stats_reproceso()
+        _cargar_reextraccion(conn, doc, ResultadoDocumento('omitido', etapa='extraccion'),
+                             stats, 1.0)
+        assert stats['errores'] == 1
+        assert conn.execute("SELECT COUNT(*) FROM incidentes").fetchone() == (1,)
+
+
+def test_cache_de_texto(conn):
+    textos.guardar_texto(conn, 'a' * 64, 'Comunicado N° 06/26 — Añelo')
+    assert textos.obtener_texto(conn, 'a' * 64) == 'Comunicado N° 06/26 — Añelo'
+    assert textos.obtener_texto(conn, 'b' * 64) is None
@@ -0,0 +1,61 @@
+"""
+Tests para la separación de PDFs con varios formularios de incidente.
+Los documentos concatenados se arman uniendo los textos de conftest.py
+con saltos de página (\\f), igual que los produce PyMuPDF.
+"""
+
+from src.extractors.petsud import PetSudExtractor
+from src.extractors.segmentacion import dividir_en_segmentos
+from src.extractors.ypf import YPFExtractor
+from src.main import analizar_texto
+
+F = chr(12)
+
+
+class TestDividirEnSegmentos:
+    def test_documento_simple_es_un_segmento(self, ypf_text):
+        [seg] = dividir_en_segmentos(ypf_text + F + "anexo")
+        assert seg.texto == ypf_text + F + "anexo"
+        assert (seg.pagina_desde, seg.pagina_hasta) == (1, 2)
+        assert seg.extractor is YPFExtractor
+
+    def test_sin_anclas(self):
+        [seg] = dividir_en_segmentos("texto sin formulario")
+        assert seg.extractor is None
+
+    def test_corta_al_inicio_de_pagina(self, ypf_text, petsud_text):
+        texto = ypf_text + F + "anexo fotográfico" + F + petsud_text
+        ypf, petsud = dividir_en_segmentos(texto)
+        assert (ypf.pagina_desde, ypf.pagina_hasta) == (1, 2)
+        assert (petsud.pagina_desde, petsud.pagina_hasta) == (3, 3)
+        assert petsud.extractor is PetSudExtractor
+        assert petsud.texto == petsud_text
+
+    def test_mismo_numero_repetido_no_corta(self):
+        texto = ("N° DE COMUNICADO 468\nPreliminar" + F +
+                 "N° DE COMUNICADO 468\nFinal")
+        [seg] = dividir_en_segmentos(texto)
+        assert (seg.pagina_desde, seg.pagina_hasta) == (1, 2)
+
+    def test_dos_formularios_en_la_misma_pagina(self):
+        texto = "COMUNICADO N°: 06/26\nuno\nCOMUNICADO N°: 07/26\ndos"
+        primero, segundo = dividir_en_segmentos(texto)
+        assert primero.texto == "COMUNICADO N°: 06/26\nuno\n"
+        assert segundo.texto == "COMUNICADO N°: 07/26\ndos"
+        assert segundo.pagina_desde == segundo.pagina_hasta == 1
+
+
+class TestAnalizarTextoMultiple:
+    def test_extrae_cada_formulario_con_sus_paginas(self, ypf_text, petsud_text):
+        analisis = analizar_texto('concatenado.pdf', ypf_text + F + petsud_text)
+        assert [i.data['NUM_INC'] for i in analisis.incidentes] == [
+            YPFExtractor().extract(ypf_text)['NUM_INC'],
+            PetSudExtractor().extract(petsud_text)['NUM_INC'],
+        ]
+        assert [(i.pagina_desde, i.pagina_hasta) for i in analisis.incidentes] == [(1, 1), (2, 2)]
+        assert analisis.data == analisis.incidentes[0].data
+
+    def test_segmentos_igual_que_documentos_sueltos(self, ypf_text, petsud_text):
+        suelto = analizar_texto('petsud.pdf', petsud_text).data
+        concatenado = analizar_texto('x.pdf', ypf_text + F + petsud_text)
+        assert concatenado.incidentes[1].data == suelto
@@ -0,0 +1,233 @@
+"""
+Tests para el servicio HTTP de ingesta: de punta a punta en localhost con
+el pool real, y la contrapresión y el commit agrupado con un pool de prueba
+cuyos resultados se liberan a mano.
+"""
+
+import json
+import sqlite3
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import Future
+from datetime import timedelta
+from email.utils import format_datetime, parsedate_to_datetime
+
+import fitz
+import pytest
+
+from src.ingestion import servidor
+from src.ingestion.servidor import ColaLlena, ServicioIngesta, crear_servidor
+from src.ingestion.workers import PoolCaliente, ResultadoDocumento
+from src.storage.incidentes import IncidentRecord
+
+
+def _pdf(texto: str) -> bytes:
+    doc = fitz.open()
+    doc.new_page(height=1400).insert_text((20, 20), texto, fontsize=6)
+    return doc.tobytes()
+
+
+def _post(url: str, datos: bytes, nombre: str = 'x.pdf') -> tuple[int, dict, dict]:
+    pedido = urllib.request.Request(url + '/incidents', data=datos, method='POST',
+                                    headers={'X-Nombre': nombre})
+    try:
+        with urllib.request.urlopen(pedido, timeout=30) as r:
+            return r.status, json.loads(r.read()), dict(r.headers)
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read()), dict(e.headers)
+
+
+def _servir(servicio, lectura=None):
+    http = crear_servidor(servicio, port=0, lectura=lectura)
+    threading.Thread(target=http.serve_forever, daemon=True).start()
+    return http, f"http://127.0.0.1:{http.server_address[1]}"
+
+
+class TestDePuntaAPunta:
+    def test_inserta_y_responde_el_incidente(self, db_path, ypf_text):
+        with PoolCaliente(workers=1, max_mem_mb=0) as pool, \
+                ServicioIngesta(db_path, pool) as servicio:
+            http, url = _servir(servicio)
+            try:
+                estado, cuerpo, _ = _post(url, _pdf(ypf_text), 'Comunicado N° 1.pdf')
+                assert estado == 201 and cuerpo['desenlace'] == 'insertado'
+                assert cuerpo['nombre'] == 'Comunicado N° 1.pdf'
+                inc, = cuerpo['incidentes']
+                assert inc['NUM_INC'] == 'YPF-0000246524' and inc['VOL_M3'] == 8.5
+                assert inc['advertencias'] == []
+
+                estado, cuerpo, _ = _post(url, _pdf(ypf_text), 'ypf-otra-vez.pdf')
+                assert estado == 200 and cuerpo['desenlace'] == 'no_insertado'
+                assert "NUM_INC ya cargado: no se insertó" in cuerpo['incidentes'][0]['advertencias']
+
+                estado, cuerpo, _ = _post(url, _pdf("Nota sin formato conocido"))
+                assert estado == 422 and cuerpo['etapa'] == 'identificacion'
+
+                assert _post(url, b'no soy un pdf')[0] == 400
+            finally:
+                http.shutdown()
+                http.server_close()
+
+        with sqlite3.connect(db_path) as conn:
+            assert conn.execute("SELECT NUM_INC FROM incidentes").fetchall() == \
+                [('YPF-0000246524',)]
+            assert conn.execute("SELECT DISTINCT ORIGEN FROM documentos").fetchall() == \
+                [('http',)]
+
+
+class _PoolManual:
+    """Pool de prueba: cada resultado queda pendiente hasta liberar()."""
+
+    def __init__(self):
+        self.futuros: list[Future] = []
+        self.enviados = threading.Semaphore(0)
+
+    def enviar(self, nombre, datos):
+        futuro = Future()
+        futuro.nombre = nombre
+        self.futuros.append(futuro)
+        self.enviados.release()
+        return futuro
+
+    def liberar(self):
+        for f in self.futuros:
+            if not f.done():
+                registro = IncidentRecord(NUM_INC=f.nombre, OPERADOR='YPF S.A.',
+                                          FECHA='10-02-2026', VOL_M3=1.0, LAT=-37.3, LON=-69.0)
+                f.set_result(ResultadoDocumento('ok', data=registro, extractor='YPFExtractor'))
+
+
+class TestContrapresion:
+    def test_cola_llena_responde_503(self, db_path):
+        pool = _PoolManual()
+        with ServicioIngesta(db_path, pool, max_cola=2) as servicio:
+            http, url = _servir(servicio)
+            try:
+                hilos = [threading.Thread(target=_post, args=(url, b'%PDF-1', f'P{i}.pdf'))
+                         for i in range(2)]
+                for h in hilos:
+                    h.start()
+                for _ in hilos:
+                    assert pool.enviados.acquire(timeout=5)
+                estado, cuerpo, encabezados = _post(url, b'%PDF-1', 'P3.pdf')
+                assert estado == 503 and encabezados['Retry-After'] == '1'
+                with pytest.raises(ColaLlena):
+                    servicio.procesar('P4.pdf', b'%PDF-1')
+                pool.liberar()
+                for h in hilos:
+                    h.join(timeout=5)
+                assert servicio.en_proceso == 0
+            finally:
+                http.shutdown()
+                http.server_close()
+
+    def test_resultados_juntos_se_cargan_en_un_commit(self, db_path, monkeypatch):
+        monkeypatch.setattr(servidor, 'ESPERA_LOTE', 0.5)
+        lotes = []
+        original = ServicioIngesta._lote
+
+        def _lote(self):
+            lote, fin = original(self)
+            lotes.append(len(lote))
+            return lote, fin
+
+        monkeypatch.setattr(ServicioIngesta, '_lote', _lote)
+        pool = _PoolManual()
+        respuestas = {}
+        with ServicioIngesta(db_path, pool) as servicio:
+            hilos = [threading.Thread(
+                target=lambda n=n: respuestas.update({n: servicio.procesar(n, b'%PDF-1')}))
+                for n in ('A', 'B', 'C')]
+            for h in hilos:
+                h.start()
+            for _ in hilos:
+                assert pool.enviados.acquire(timeout=5)
+            pool.liberar()
+            for h in hilos:
+                h.join(timeout=10)
+        assert {n: r[0] for n, r in respuestas.items()} == {'A': 201, 'B': 201, 'C': 201}
+        assert lotes[0] == 3
+
+
+@pytest.mark.parametrize('crudo, esperado', [
+    ('Comunicado N° 1.pdf'.encode().decode('latin-1'), 'Comunicado N° 1.pdf'),   # curl (UTF-8)
+    ('Comunicado N° 1.pdf', 'Comunicado N° 1.pdf'),                              # latin-1
+    (None, None),
+])
+def test_nombre_del_encabezado(crudo, esperado):
+    assert servidor._decodificar_encabezado(crudo) == esperado
+
+
+def _get(url: str, ruta: str, encabezados: dict | None = None) -> tuple[int, bytes, dict]:
+    pedido = urllib.request.Request(url + ruta, headers=encabezados or {})
+    try:
+        with urllib.request.urlopen(pedido, timeout=30) as r:
+            return r.status, r.read(), dict(r.headers)
+    except urllib.error.HTTPError as e:
+        return e.code, e.read(), dict(e.headers)
+
+
+class TestLectura:
+    @pytest.fixture
+    def url_y_lectura(self, db_path):
+        with sqlite3.connect(db_path) as conn:
+            for i in range(1, 6):
+                conn.execute("INSERT INTO incidentes (NUM_INC, OPERADOR, FECHA) VALUES (?, ?, ?)",
+                             (f'N{i}', 'YPF S.A.', f'0{i}-02-2026'))
+        lectura = servidor.LecturaIncidentes(db_path)
+        http, url = _servir(None, lectura)
+        yield url, lectura
+        http.shutdown()
+        http.server_close()
+
+    def test_pagina_con_filtros(self, url_y_lectura):
+        url, _ = url_y_lectura
+        estado, cuerpo, _ = _get(url, '/incidents?operador=YPF+S.A.&desde=2026-02-02&limite=2')
+        cuerpo = json.loads(cuerpo)
+        assert estado == 200 and [f['NUM_INC'] for f in cuerpo['incidentes']] == ['N2', 'N3']
+        estado, cuerpo, _ = _get(url, '/incidents?desde=2026-02-02&limite=2&despues='
+                                 + cuerpo['siguiente'])
+        assert [f['NUM_INC'] for f in json.loads(cuerpo)['incidentes']] == ['N4', 'N5']
+        assert _get(url, '/incidents?desde=ayer')[0] == 400
+
+    def test_304_y_cache_hasta_la_proxima_escritura(self, url_y_lectura, db_path):
+        url, lectura = url_y_lectura
+        estado, cuerpo, encabezados = _get(url, '/incidents?operador=YPF+S.A.')
+        etag = encabezados['ETag']
+        assert estado == 200 and encabezados['Last-Modified']
+
+        assert _get(url, '/incidents?operador=YPF+S.A.', {'If-None-Match': etag})[0] == 304
+        # Con resolución de segundos, la misma fecha no garantiza que no haya cambios
+        assert _get(url, '/incidents?operador=YPF+S.A.',
+                    {'If-Modified-Since': encabezados['Last-Modified']})[0] == 200
+        despues = format_datetime(parsedate_to_datetime(encabezados['Last-Modified'])
+                                  + timedelta(seconds=1), usegmt=True)
+        assert _get(url, '/incidents?operador=YPF+S.A.',
+                    {'If-Modified-Since': despues})[0] == 304
+        assert _get(url, '/incidents?operador=YPF+S.A.')[1] == cuerpo     # de la caché
+        assert lectura.consultas_ejecutadas == 1
+
+        with sqlite3.connect(db_path) as conn:
+            conn.execute("INSERT INTO incidentes (NUM_INC, OPERADOR, FECHA) "
+                         "VALUES ('N6', 'YPF S.A.', '06-02-2026')")
+        estado, cuerpo, encabezados = _get(url, '/incidents?operador=YPF+S.A.',
+                                           {'If-None-Match': etag})
+        assert estado == 200 and encabezados['ETag'] != etag
+        assert len(json.loads(cuerpo)['incidentes']) == 6
+        assert lectura.consultas_ejecutadas == 2
+
+    def test_sin_ingesta_no_acepta_post(self, url_y_lectura):
+        url, _ = url_y_lectura
+        assert _post(url, b'%PDF-1')[0] == 404
+
+    def test_cambios_por_secuencia(self, url_y_lectura):
+        url, _ = url_y_lectura
+        estado, cuerpo, _ = _get(url, '/changes?limite=3')
+        cuerpo = json.loads(cuerpo)
+        assert estado == 200 and [c['num_inc'] for c in cuerpo['cambios']] == ['N1', 'N2', 'N3']
+        cuerpo = json.loads(_get(url, f"/changes?despues={cuerpo['siguiente']}")[1])
+        assert [c['num_inc'] for c in cuerpo['cambios']] == ['N4', 'N5']
+        vacio = json.loads(_get(url, f"/changes?despues={cuerpo['siguiente']}")[1])
+        assert vacio == {'cambios': [], 'siguiente': cuerpo['siguiente']}
+        assert _get(url, '/changes?despues=x')[0] == 400
@@ -0,0 +1,68 @@
+"""
+Tests para la validación cruzada de coordenadas (GM/GMS de YPF, GK de
+Pluspetrol) contra el DD guardado en LAT/LON.
+"""
+
+import json
+import math
+
+import pytest
+
+from src.analysis.validacion_coordenadas import parsear_dms, validar
+from src.extractors import parseo
+from src.extractors.pluspetrol import PluspetrolExtractor
+from src.extractors.ypf import YPFExtractor
+from src.main import insert_incident, normalizar
+
+
+class TestParsearDMS:
+    def test_formatos(self):
+        g = parsear_dms(["37 ° / 20.936 '", "37 ° / 20 ' / 56.2 ''", "69°3'12,2\""])
+        assert g[0] == pytest.approx(37 + 20.936 / 60, abs=1e-6)
+        assert g[1] == pytest.approx(37 + 20 / 60 + 56.2 / 3600, abs=1e-6)
+        assert g[2] == pytest.approx(69 + 3 / 60 + 12.2 / 3600, abs=1e-6)
+
+    def test_ilegibles_y_fuera_de_rango(self):
+        ilegibles = ["sin dato", "37 ° / 75.2 '", "33°30'60\"", "", None]
+        assert all(math.isnan(v) for v in parsear_dms(ilegibles))
+
+    def test_misma_gramatica_que_los_extractores(self):
+        textos = ["33°30'57,62\"", "37°20.936'", "37 ° / 20 ' / 56.2 ''", "37.5"]
+        esperado = [-parseo.parsear_dms(t) if parseo.parsear_dms(t) is not None else None
+                    for t in textos]
+        assert [None if math.isnan(g) else g for g in parsear_dms(textos)] == esperado
+
+
+def test_extractores_guardan_las_representaciones(ypf_text, pluspetrol_text):
+    ypf = YPFExtractor().extract(ypf_text)
+    assert ypf['COORDS_REPORTADAS'] == {'GM': ["37 ° / 20.936 '", "69 ° / 3.204 '"],
+                                        'GMS': ["37 ° / 20 ' / 56.2 ''", "69 ° / 3 ' / 12.2 ''"]}
+    plus = PluspetrolExtractor().extract(pluspetrol_text)
+    assert plus['COORDS_REPORTADAS'] == {'GK': [5858159.0, 2552673.0]}
+
+
+def test_documentos_reales_concuerdan(conn, ypf_text, pluspetrol_text):
+    for extractor, texto in ((YPFExtractor(), ypf_text), (PluspetrolExtractor(), pluspetrol_text)):
+        insert_incident(conn, normalizar(extractor.extract(texto)))
+    assert validar(conn, umbral_m=30) == []
+    # Con umbral negativo aparecen las tres, todas a pocos metros (GM a 0 m:
+    # parseo redondea a 6 decimales, los mismos que el DD informado)
+    todas = validar(conn, umbral_m=-1)
+    assert sorted(d.sistema for d in todas) == ['GK', 'GM', 'GMS']
+    assert all(d.distancia_m < 10 for d in todas)
+
+
+def test_error_de_tipeo_y_texto_ilegible(conn):
+    conn.executemany(
+        "INSERT INTO incidentes (NUM_INC, LAT, LON, COORDS_REPORTADAS) VALUES (?, ?, ?, ?)",
+        [('TIPEO', -37.348933, -69.053400,
+          json.dumps({'GM': ["37 ° / 21.936 '", "69 ° / 3.204 '"]})),   # 1' de latitud ≈ 1,85 km
+         ('ILEGIBLE', -37.348933, -69.053400,
+          json.dumps({'GMS': ["37 ° / 20 ' / 56.2 ''", "??"]})),
+         ('GK_MAL', -33.392, -68.897,
+          json.dumps({'GK': [5858159.0, 2552673.0]}))])
+    r = {d.num_inc: d for d in validar(conn)}
+    assert set(r) == {'TIPEO', 'ILEGIBLE', 'GK_MAL'}
+    assert r['TIPEO'].distancia_m == pytest.approx(1852, rel=0.01)
+    assert r['ILEGIBLE'].distancia_m is None
+    assert validar(conn)[0].num_inc == 'ILEGIBLE'
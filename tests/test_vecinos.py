@@ -0,0 +1,73 @@
+"""
+Tests para la detección de vecinos espacio-temporales.
+Los puntos se arman directamente en UTM (metros) para controlar distancias;
+la carga desde la DB usa incidentes mínimos con LAT/LON y FECHA.
+"""
+
+import sqlite3
+
+import pytest
+
+from src.analysis import vecinos
+from src.analysis.vecinos import IndiceGrilla, Punto, focos, pares_vecinos, parsear_fecha
+from src.main import init_database
+
+DIA0 = 739000
+
+
+def _p(num_inc, este, norte, dia=0):
+    return Punto(num_inc, 2_500_000.0 + este, 5_800_000.0 + norte, DIA0 + dia, 'X', None)
+
+
+class TestIndiceGrilla:
+    def test_vecinos_dentro_del_radio_y_la_ventana(self):
+        p = _p('A', 0, 0)
+        puntos = [p, _p('B', 150, 0, 3), _p('C', 250, 0), _p('D', 0, 10, 45)]
+        indice = IndiceGrilla(puntos, radio_m=200, dias=30)
+        assert [q.num_inc for q, _, _ in indice.vecinos(p)] == ['B']
+
+    def test_borde_de_celda(self):
+        # 199 y 201 caen en celdas distintas pero están a 2 m
+        a, b = _p('A', 199, 0), _p('B', 201, 0)
+        [(q, distancia, dias)] = IndiceGrilla([a, b], 200, 30).vecinos(a)
+        assert q.num_inc == 'B' and distancia == pytest.approx(2) and dias == 0
+
+    def test_ordenados_por_distancia(self):
+        p = _p('A', 0, 0)
+        puntos = [p, _p('B', 0, 180), _p('C', 30, 0), _p('D', -90, 0)]
+        assert [q.num_inc for q, _, _ in IndiceGrilla(puntos).vecinos(p)] == ['C', 'D', 'B']
+
+
+class TestParesYFocos:
+    def test_duplicado_vs_repeticion(self):
+        pares = pares_vecinos([_p('A', 0, 0), _p('B', 20, 0, 1), _p('C', 120, 0, 10)])
+        tipos = {(par.a.num_inc, par.b.num_inc): par.tipo for par in pares}
+        assert tipos == {('A', 'B'): 'duplicado', ('A', 'C'): 'repeticion',
+                         ('B', 'C'): 'repeticion'}
+
+    def test_focos_unen_repeticiones_encadenadas(self):
+        # A–B–C encadenados a 150 m; D aislado; E–F duplicados no forman foco
+        puntos = [_p('A', 0, 0), _p('B', 150, 0, 5), _p('C', 300, 0, 10),
+                  _p('D', 5000, 0), _p('E', 9000, 0), _p('F', 9010, 0)]
+        assert focos(pares_vecinos(puntos)) == [['A', 'B', 'C']]
+        assert focos(pares_vecinos(puntos), min_foco=4) == []
+
+
+class TestCarga:
+    def test_parsear_fecha(self):
+        assert parsear_fecha('05-02-2026').isoformat() == '2026-02-05'
+        assert parsear_fecha('2026-02-05').isoformat() == '2026-02-05'
+        assert parsear_fecha('sin fecha') is None
+
+    def test_cargar_puntos_omite_sin_fecha_o_coordenadas(self, tmp_path):
+        db_path = str(tmp_path / 'incidentes.db')
+        init_database(db_path)
+        with sqlite3.connect(db_path) as conn:
+            conn.executemany(
+                "INSERT INTO incidentes (NUM_INC, FECHA, LAT, LON) VALUES (?, ?, ?, ?)",
+                [('A', '05-02-2026', -37.5, -69.0), ('B', None, -37.5, -69.0),
+                 ('C', '06-02-2026', None, None), ('D', '06-02-2026', -37.5001, -69.0)])
+            puntos = vecinos.cargar_puntos(conn)
+        assert [p.num_inc for p in puntos] == ['A', 'D']
+        [par] = pares_vecinos(puntos)
+        assert par.distancia_m == pytest.approx(11.1, abs=0.5) and par.tipo == 'duplicado'
@@ -0,0 +1,95 @@
+"""
+Tests para VigilanteCarpeta (modo daemon).
+Usa un reloj falso para controlar el antirrebote sin sleeps.
+"""
+
+import os
+
+import pytest
+
+from src.ingestion.watcher import VigilanteCarpeta
+
+
+class RelojFalso:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+    def avanzar(self, segundos):
+        self.t += segundos
+
+
+@pytest.fixture
+def reloj():
+    return RelojFalso()
+
+
+@pytest.fixture
+def vigilante(tmp_path, reloj):
+    return VigilanteCarpeta(str(tmp_path), estabilidad=0.4, reloj=reloj)
+
+
+def _escribir(path, contenido=b'%PDF-1.4 contenido'):
+    with open(path, 'wb') as f:
+        f.write(contenido)
+
+
+class TestAntirrebote:
+    def test_archivo_nuevo_no_se_entrega_en_el_primer_sondeo(self, tmp_path, vigilante):
+        _escribir(tmp_path / 'a.pdf')
+        assert vigilante.escanear() == []
+
+    def test_archivo_estable_se_entrega_una_sola_vez(self, tmp_path, vigilante, reloj):
+        _escribir(tmp_path / 'a.pdf')
+        vigilante.escanear()
+        reloj.avanzar(0.5)
+        assert vigilante.escanear() == [str(tmp_path / 'a.pdf')]
+        reloj.avanzar(0.5)
+        assert vigilante.escanear() == []
+
+    def test_archivo_creciendo_reinicia_la_espera(self, tmp_path, vigilante, reloj):
+        path = tmp_path / 'a.pdf'
+        _escribir(path, b'%PDF')
+        vigilante.escanear()
+        reloj.avanzar(0.5)
+        _escribir(path, b'%PDF-1.4 ya copiado del todo')
+        assert vigilante.escanear() == []
+        reloj.avanzar(0.5)
+        assert vigilante.escanear() == [str(path)]
+
+    def test_archivo_vacio_no_se_entrega(self, tmp_path, vigilante, reloj):
+        _escribir(tmp_path / 'a.pdf', b'')
+        vigilante.escanear()
+        reloj.avanzar(1.0)
+        assert vigilante.escanear() == []
+
+    def test_ignora_otras_extensiones(self, tmp_path, vigilante, reloj):
+        _escribir(tmp_path / 'notas.txt')
+        vigilante.escanear()
+        reloj.avanzar(1.0)
+        assert vigilante.escanear() == []
+
+
+class TestExistentes:
+    def test_marcar_existentes_los_omite(self, tmp_path, vigilante, reloj):
+        _escribir(tmp_path / 'viejo.pdf')
+        assert vigilante.marcar_existentes() == 1
+        vigilante.escanear()
+        reloj.avanzar(1.0)
+        assert vigilante.escanear() == []
+
+    def test_archivo_modificado_se_vuelve_a_entregar(self, tmp_path, vigilante, reloj):
+        path = tmp_path / 'a.pdf'
+        _escribir(path)
+        vigilante.marcar_existentes()
+        _escribir(path, b'%PDF-1.4 version corregida')
+        os.utime(path, ns=(1, 10**18))
+        vigilante.escanear()
+        reloj.avanzar(0.5)
+        assert vigilante.escanear() == [str(path)]
+
+    def test_directorio_inexistente_no_lanza(self, tmp_path, reloj):
+        v = VigilanteCarpeta(str(tmp_path / 'no_existe'), reloj=reloj)
+        assert v.escanear() == []
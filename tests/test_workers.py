@@ -0,0 +1,112 @@
+"""
+Tests para el pool aislado de workers.
+Las tareas de prueba simulan documentos patológicos: uno que se cuelga,
+uno que agota la memoria y uno que mata al proceso.
+"""
+
+import os
+import signal
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from src.ingestion.workers import RESOURCE_AVAILABLE, PoolCaliente, ResultadoDocumento
+
+
+# Las funciones de tarea deben ser de módulo para poder enviarse al worker
+
+def _tarea_ok(path, datos):
+    return ResultadoDocumento('ok', 'hash', {'NUM_INC': path})
+
+
+def _tarea_colgada(path, datos):
+    if path == 'colgado.pdf':
+        time.sleep(60)
+    return ResultadoDocumento('ok', 'hash', {'NUM_INC': path})
+
+
+def _tarea_glotona(path, datos):
+    if path == 'gigante.pdf':
+        bloques = []
+        while True:
+            bloques.append(bytearray(64 * 1024 * 1024))
+    return ResultadoDocumento('ok', 'hash', {'NUM_INC': path})
+
+
+def _tarea_que_muere(path, datos):
+    if path == 'fatal.pdf':
+        os.kill(os.getpid(), signal.SIGKILL)
+    return ResultadoDocumento('ok', 'hash', {'NUM_INC': path})
+
+
+def _tarea_que_lanza(path, datos):
+    raise ValueError("xref corrupto")
+
+
+class TestPoolCaliente:
+    def test_procesa_y_respeta_datos_en_memoria(self):
+        with PoolCaliente(workers=2, funcion=_tarea_ok, max_mem_mb=0) as pool:
+            resultados = [pool.enviar(f'{i}.pdf', b'%PDF').result() for i in range(4)]
+        assert [r.data['NUM_INC'] for r in resultados] == ['0.pdf', '1.pdf', '2.pdf', '3.pdf']
+        assert all(r.estado == 'ok' for r in resultados)
+
+    def test_timeout_recicla_worker_y_sigue(self):
+        with PoolCaliente(workers=1, funcion=_tarea_colgada, timeout=1.0,
+                          max_mem_mb=0) as pool:
+            pool.calentar()
+            t0 = time.monotonic()
+            colgado = pool.enviar('colgado.pdf').result()
+            siguiente = pool.enviar('normal.pdf').result()
+        assert colgado.estado == 'timeout'
+        assert time.monotonic() - t0 < 30
+        assert siguiente.estado == 'ok'
+
+    @pytest.mark.skipif(not RESOURCE_AVAILABLE, reason="RLIMIT_AS sólo en POSIX")
+    def test_sin_memoria_se_reporta_como_oom(self):
+        with PoolCaliente(workers=1, funcion=_tarea_glotona, max_mem_mb=256) as pool:
+            glotón = pool.enviar('gigante.pdf').result()
+            siguiente = pool.enviar('normal.pdf').result()
+        assert glotón.estado == 'oom'
+        assert siguiente.estado == 'ok'
+
+    @pytest.mark.skipif(not hasattr(signal, 'SIGKILL'), reason="requiere SIGKILL")
+    def test_worker_muerto_por_sigkill_es_oom(self):
+        with PoolCaliente(workers=1, funcion=_tarea_que_muere, max_mem_mb=0) as pool:
+            muerto = pool.enviar('fatal.pdf').result()
+            siguiente = pool.enviar('normal.pdf').result()
+        assert muerto.estado == 'oom'
+        assert siguiente.estado == 'ok'
+
+    def test_excepcion_es_error_sin_reciclar(self):
+        with PoolCaliente(workers=1, funcion=_tarea_que_lanza, max_mem_mb=0) as pool:
+            r = pool.enviar('x.pdf').result()
+        assert r.estado == 'error'
+        assert 'xref corrupto' in r.detalle
+
+    def test_enviar_con_pool_cerrado_lanza(self):
+        pool = PoolCaliente(workers=1, funcion=_tarea_ok, max_mem_mb=0)
+        pool.cerrar()
+        with pytest.raises(RuntimeError):
+            pool.enviar('x.pdf')
+
+    def test_oom_sin_tarea_asignada_recicla(self):
+        # Un 'oom' que llega cuando la tarea ya se resolvió (ej. por timeout)
+        class _Conexion:
+            mensajes = [ResultadoDocumento('oom')]
+
+            def poll(self):
+                return bool(self.mensajes)
+
+            def recv(self):
+                return self.mensajes.pop()
+
+        pool = PoolCaliente(workers=1, funcion=_tarea_ok, max_mem_mb=0)
+        try:
+            w = SimpleNamespace(conn=_Conexion(), tarea=None, listo=True)
+            reemplazos = []
+            pool._reemplazar = lambda viejo: reemplazos.append(viejo) or 'nuevo'
+            assert pool._revisar(w) == 'nuevo' and reemplazos == [w]
+        finally:
+            del pool._reemplazar
+            pool.cerrar()